@@ -1,5 +1,3 @@
-import io
-import base64
 import os
 from typing import List
 from io import BytesIO
@@ -8,40 +6,12 @@ from datetime import date
 
 from logger import logger
 
-import barcode
-from barcode.writer import ImageWriter
-
+from modules.documents.barcode import BarcodeService, MANIFEST_BARCODE
 
 # schema
 from modules.orders.order_schema import Order_Model
 
 
-def generate_barcode_image(data):
-    """Generate barcode image from data and return as BytesIO buffer"""
-    buffer = io.BytesIO()
-    barcode_class = barcode.get_barcode_class("code128")
-
-    writer_options = {
-        "module_width": 0.3,
-        "module_height": 12,
-        "quiet_zone": 0,
-        "font_size": 1,
-        "text_distance": 6,
-        "dpi": 300,
-        "write_text": False,
-    }
-
-    my_barcode = barcode_class(data, writer=ImageWriter())
-    my_barcode.write(buffer, options=writer_options)
-    buffer.seek(0)
-    return buffer
-
-
-def convert_image_to_base64(image_buffer):
-    """Convert image buffer to base64 string"""
-    return base64.b64encode(image_buffer.getvalue()).decode("utf-8")
-
-
 def generate_manifest(orders: List[Order_Model]) -> BytesIO:
     pdf_buffer = BytesIO()
 
@@ -51,9 +21,7 @@ def generate_manifest(orders: List[Order_Model]) -> BytesIO:
     for order in orders:
 
         # generate the barcode for the awb number
-        barcode_base64 = convert_image_to_base64(
-            generate_barcode_image(order.awb_number)
-        )
+        barcode_base64 = BarcodeService.png_base64(order.awb_number, MANIFEST_BARCODE)
 
         # handling products
         product_rows = ""
@@ -1,7 +1,7 @@
 from contextvars import ContextVar
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from database.db import get_db
+from database.db import get_lazy_db
 from logger import logger
 
 # -------------------------------
@@ -17,7 +17,8 @@ context_set_db_session_rollback: ContextVar[bool] = ContextVar(
 # -------------------------------
 # Dependency to set async context per request
 # -------------------------------
-async def build_request_context(db: AsyncSession = Depends(get_db)):
+# The session is lazy: no connection is checked out unless a service uses it
+async def build_request_context(db: AsyncSession = Depends(get_lazy_db)):
     context_db_session.set(db)
     logger.info(msg="REQUEST_INITIATED")
 
@@ -1,4 +1,5 @@
 # services
+from modules.courier_adapter import CourierRegistry
 from shipping_partner.shiperfecto.shiperfecto import Shiperfecto
 from shipping_partner.fship.fship import Fship
 from shipping_partner.logistify.logistify import Logistify
@@ -14,7 +15,7 @@ from shipping_partner.shadowfax.shadowfax import Shadowfax
 from shipping_partner.bluedart.bluedart import Bluedart
 from shipping_partner.zippyy.zippyy import Zippyy
 
-courier_service_mapping = {
+_courier_adapters = {
     "shiperfecto": Shiperfecto,
     "fship": Fship,
     "logistify": Logistify,
@@ -32,3 +33,10 @@ courier_service_mapping = {
     "bluedart": Bluedart,
     "zippyy": Zippyy,
 }
+
+for slug, adapter in _courier_adapters.items():
+    CourierRegistry.register(slug, adapter)
+
+# the guarded sync courier classes, for code not on CourierRegistry yet; every
+# call to a courier goes through that courier's circuit breakers
+courier_service_mapping = CourierRegistry.legacy_mapping()
@@ -1 +1 @@
-from database.db import DBBaseClass, get_db, DBBase, db_engine
+from database.db import DBBaseClass, get_db, get_lazy_db, DBBase, db_engine
@@ -1,4 +1,6 @@
 import os
+import time
+import threading
 from datetime import datetime
 from urllib.parse import quote_plus
 import uuid
@@ -17,6 +19,8 @@ from sqlalchemy.ext.asyncio import (
     AsyncSession,
 )
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
 from logger import logging
 
@@ -37,10 +41,82 @@ CORE_SQLALCHEMY_DATABASE_URI = "%s://%s:%s@%s:%s/%s" % (
 
 
 # ----------------------------------------
-# 2. ASYNC ENGINE (runtime API)
+# 2. POOL METRICS
+# ----------------------------------------
+class PoolMetrics:
+    """
+    Process wide counters for connection checkouts. Pool exhaustion shows up
+    here as growing wait times and timeouts long before requests start failing.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.total_wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+
+    def record_wait(self, wait_seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    def snapshot(self, pool=None) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            data = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(
+                    (self.total_wait_seconds / attempts) * 1000 if attempts else 0, 3
+                ),
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+        if pool is not None:
+            data.update(
+                {
+                    "pool_size": pool.size(),
+                    "checked_out": pool.checkedout(),
+                    "overflow": pool.overflow(),
+                    "idle": pool.checkedin(),
+                }
+            )
+
+        return data
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    # times every checkout, including the wait for a free slot
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+
+        pool_metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+
+# ----------------------------------------
+# 3. ASYNC ENGINE (runtime API)
 # ----------------------------------------
 async_engine = create_async_engine(
     CORE_SQLALCHEMY_DATABASE_URI,
+    poolclass=InstrumentedAsyncQueuePool,
     pool_size=15,
     max_overflow=5,
     pool_timeout=30,
@@ -53,14 +129,53 @@ db_engine = async_engine
 
 
 # ----------------------------------------
-# 3. SYNC ENGINE (only for create_all)
+# 3b. READ REPLICA ENGINES (optional)
+# ----------------------------------------
+# comma separated "host[:port]" list; user/password/name default to the primary
+REPLICA_HOSTS = [
+    host.strip()
+    for host in os.environ.get("db_replica_hosts", "").split(",")
+    if host.strip()
+]
+
+
+def build_replica_uri(replica_host: str) -> str:
+    host, _, port = replica_host.partition(":")
+    return "%s://%s:%s@%s:%s/%s" % (
+        DBTYPE_POSTGRES,
+        os.environ.get("db_replica_user", os.environ.get("db_user")),
+        quote_plus(
+            os.environ.get("db_replica_password", os.environ.get("db_password"))
+        ),
+        host,
+        port or os.environ.get("db_replica_port", os.environ.get("db_port")),
+        os.environ.get("db_replica_name", os.environ.get("db_name")),
+    )
+
+
+replica_engines = [
+    create_async_engine(
+        build_replica_uri(replica_host),
+        pool_size=10,
+        max_overflow=5,
+        pool_timeout=10,
+        pool_recycle=3600,
+        pool_pre_ping=True,
+        echo=False,
+    )
+    for replica_host in REPLICA_HOSTS
+]
+
+
+# ----------------------------------------
+# 4. SYNC ENGINE (only for create_all)
 # ----------------------------------------
 sync_database_uri = CORE_SQLALCHEMY_DATABASE_URI.replace("+asyncpg", "")
 sync_engine = create_engine(sync_database_uri, echo=False)
 
 
 # ----------------------------------------
-# 4. Session Makers
+# 5. Session Makers
 # ----------------------------------------
 AsyncSessionLocal = sessionmaker(
     bind=async_engine,
@@ -69,6 +184,18 @@ AsyncSessionLocal = sessionmaker(
     class_=AsyncSession,
 )
 
+# sessions on a replica refuse to flush writes, see database/routing.py
+ReplicaSessionLocals = [
+    sessionmaker(
+        bind=replica_engine,
+        expire_on_commit=False,
+        autoflush=False,
+        class_=AsyncSession,
+        info={"read_only": True},
+    )
+    for replica_engine in replica_engines
+]
+
 UTC = timezone("UTC")
 
 
@@ -80,7 +207,7 @@ DBBase = declarative_base()
 
 
 # ----------------------------------------
-# 5. Async DB Dependency (FastAPI)
+# 6. Async DB Dependency (FastAPI)
 # ----------------------------------------
 async def get_db():
     from context_manager.context import context_set_db_session_rollback
@@ -108,7 +235,82 @@ async def get_db():
 
 
 # ----------------------------------------
-# 6. Base Model Class
+# 7. Lazy per-request session
+# ----------------------------------------
+class LazyAsyncSession:
+    """
+    Stands in for an AsyncSession until the request actually touches the
+    database. Routes that never query (status checks, cache hits, static
+    files) never create a session, and a created session hands its
+    connection back to the pool on every commit.
+    """
+
+    __slots__ = ("_session_factory", "_session")
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self._session_factory = session_factory
+        self._session = None
+
+    @property
+    def is_materialized(self) -> bool:
+        return self._session is not None
+
+    def materialize(self) -> AsyncSession:
+        if self._session is None:
+            logging.info("Async DB session created")
+            self._session = self._session_factory()
+        return self._session
+
+    def __getattr__(self, name):
+        return getattr(self.materialize(), name)
+
+    # dunder lookups skip __getattr__, so `async with get_db_session()` needs these
+    async def __aenter__(self) -> AsyncSession:
+        return self.materialize()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def finish(self, rollback: bool = False):
+        if self._session is None:
+            return
+
+        if rollback:
+            logging.info("Rolling back async session")
+            await self._session.rollback()
+        else:
+            logging.info("Committing async session")
+            await self._session.commit()
+
+    async def close(self):
+        if self._session is None:
+            return
+
+        logging.info("Closing async DB session")
+        session, self._session = self._session, None
+        await session.close()
+
+
+async def get_lazy_db():
+    from context_manager.context import context_set_db_session_rollback
+
+    session = LazyAsyncSession()
+    try:
+        yield session
+        await session.finish(rollback=context_set_db_session_rollback.get())
+
+    except Exception as e:
+        logging.error(f"Async DB session error: {e}")
+        if session.is_materialized:
+            await session.rollback()
+        raise
+
+    finally:
+        await session.close()
+
+
+# ----------------------------------------
+# 8. Base Model Class
 # ----------------------------------------
 class DBBaseClass:
     id = Column(Integer, primary_key=True, unique=True, autoincrement=True)
@@ -141,7 +343,7 @@ class DBBaseClass:
 
 
 # ----------------------------------------
-# 7. Initialization Function (Sync create_all)
+# 9. Initialization Function (Sync create_all)
 # ----------------------------------------
 async def init_models():
     """
@@ -0,0 +1,253 @@
+import os
+import time
+import asyncio
+import threading
+import functools
+import itertools
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+
+from database.db import LazyAsyncSession, ReplicaSessionLocals, replica_engines
+from logger import logging
+
+
+# a client that committed a write within this window reads from the primary,
+# so listing right after booking never shows stale rows
+REPLICA_MAX_LAG_SECONDS = float(os.environ.get("db_replica_max_lag_seconds", "5"))
+
+# how long a replica that failed to connect is skipped
+REPLICA_COOLDOWN_SECONDS = float(os.environ.get("db_replica_cooldown_seconds", "30"))
+
+
+class ReadOnlyUnitOfWorkError(Exception):
+    pass
+
+
+class ReplicaRouter:
+    _lock = threading.Lock()
+    _round_robin = itertools.count()
+    _unhealthy_until: Dict[int, float] = {}
+    _last_write_at: Dict[int, float] = {}
+
+    @classmethod
+    def pick(cls) -> Optional[int]:
+        """Index of the next healthy replica, or None to stay on the primary."""
+
+        if not ReplicaSessionLocals:
+            return None
+
+        now = time.monotonic()
+        with cls._lock:
+            for _ in range(len(ReplicaSessionLocals)):
+                index = next(cls._round_robin) % len(ReplicaSessionLocals)
+                if cls._unhealthy_until.get(index, 0) <= now:
+                    return index
+
+        return None
+
+    @classmethod
+    def mark_unhealthy(cls, index: int):
+        logging.warning(f"Read replica {index} unavailable, using primary")
+        with cls._lock:
+            cls._unhealthy_until[index] = time.monotonic() + REPLICA_COOLDOWN_SECONDS
+
+    @classmethod
+    def record_write(cls, client_id):
+        if not client_id:
+            return
+        with cls._lock:
+            cls._last_write_at[client_id] = time.monotonic()
+
+    @classmethod
+    def wrote_recently(cls, client_id) -> bool:
+        if not client_id:
+            return False
+        last_write_at = cls._last_write_at.get(client_id)
+        return (
+            last_write_at is not None
+            and time.monotonic() - last_write_at < REPLICA_MAX_LAG_SECONDS
+        )
+
+
+class ReplicaSession(LazyAsyncSession):
+    """
+    Session on a read replica whose reads move to the primary as soon as one
+    fails to reach the replica: the failing statement is re-run there and so
+    is every later one. The fallback sits below the services, as they catch
+    their own errors and would otherwise answer with the replica's failure.
+    """
+
+    __slots__ = ("index", "primary", "_fallback", "failed_over")
+
+    def __init__(self, index: int, primary: Optional[LazyAsyncSession]):
+        super().__init__(ReplicaSessionLocals[index])
+        self.index = index
+        self.primary = primary
+        self._fallback = None
+        self.failed_over = False
+
+    def _primary(self):
+        if self.primary is not None:
+            return self.primary
+        # background jobs have no request session to fall back to
+        if self._fallback is None:
+            self._fallback = LazyAsyncSession()
+        return self._fallback
+
+    async def _read(self, method: str, *args, **kwargs):
+        if not self.failed_over:
+            try:
+                return await getattr(self.materialize(), method)(*args, **kwargs)
+            except (OperationalError, InterfaceError, OSError) as e:
+                logging.error(f"Read replica query failed: {e}")
+                ReplicaRouter.mark_unhealthy(self.index)
+                self.failed_over = True
+
+        return await getattr(self._primary(), method)(*args, **kwargs)
+
+    async def execute(self, *args, **kwargs):
+        return await self._read("execute", *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await self._read("scalar", *args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        return await self._read("scalars", *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await self._read("get", *args, **kwargs)
+
+    async def __aenter__(self):
+        # keep `async with get_db_session() as db` reads behind the fallback
+        return self
+
+    async def close(self):
+        await super().close()
+        if self._fallback is not None:
+            await self._fallback.close()
+            self._fallback = None
+
+
+def _current_client_id():
+    from context_manager.context import context_user_data
+
+    return getattr(context_user_data.get(), "client_id", None)
+
+
+def _primary_has_writes(primary) -> bool:
+    if not isinstance(primary, LazyAsyncSession) or not primary.is_materialized:
+        return False
+
+    return bool(
+        primary.info.get("has_writes")
+        or primary.new
+        or primary.dirty
+        or primary.deleted
+    )
+
+
+@asynccontextmanager
+async def read_replica():
+    """
+    Route every get_db_session() inside the block to a read replica.
+
+    Falls back to the primary when no replica is configured or healthy, when
+    the current request has already written, or when the client wrote within
+    REPLICA_MAX_LAG_SECONDS (read-after-write).
+    """
+    from context_manager.context import context_db_session
+
+    primary = context_db_session.get()
+
+    index = None
+    if not (
+        _primary_has_writes(primary) or ReplicaRouter.wrote_recently(_current_client_id())
+    ):
+        index = ReplicaRouter.pick()
+
+    if index is None:
+        yield None
+        return
+
+    replica_session = ReplicaSession(index, primary)
+    token = context_db_session.set(replica_session)
+    try:
+        yield index
+    finally:
+        context_db_session.reset(token)
+        await replica_session.close()
+
+
+def use_read_replica(func):
+    """
+    Run an async read-only service call on a replica; reads that fail to
+    reach it are re-run on the primary by ReplicaSession.
+    """
+
+    if not asyncio.iscoroutinefunction(func):
+        raise TypeError("use_read_replica expects an async function")
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        async with read_replica():
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
+# ----------------------------------------
+# Session / engine hooks
+# ----------------------------------------
+@event.listens_for(Session, "before_flush")
+def _guard_read_only_flush(session: Session, flush_context, instances):
+    if session.info.get("read_only") and (
+        session.new or session.dirty or session.deleted
+    ):
+        raise ReadOnlyUnitOfWorkError("Cannot write through a read replica session")
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_writes(session: Session, flush_context):
+    if session.new or session.dirty or session.deleted:
+        session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement_writes(orm_execute_state):
+    if not (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        return
+
+    if orm_execute_state.session.info.get("read_only"):
+        raise ReadOnlyUnitOfWorkError("Cannot write through a read replica session")
+
+    orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_committed_writes(session: Session):
+    if session.info.pop("has_writes", False):
+        ReplicaRouter.record_write(_current_client_id())
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back_writes(session: Session, previous_transaction):
+    session.info.pop("has_writes", None)
+
+
+def _listen_for_replica_errors(index, replica_engine):
+    @event.listens_for(replica_engine.sync_engine, "handle_error")
+    def _on_replica_error(context):
+        if context.is_disconnect or isinstance(context.original_exception, OSError):
+            ReplicaRouter.mark_unhealthy(index)
+
+
+for _index, _replica_engine in enumerate(replica_engines):
+    _listen_for_replica_errors(_index, _replica_engine)
@@ -1,32 +1,218 @@
+import atexit
+import builtins
+import itertools
+import json
 import logging
+import queue
 import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from utils.environment import Environment
+
+
+# root level, e.g. INFO
+LOG_LEVEL = Environment.get_string("LOG_LEVEL", "DEBUG").upper()
+
+# per-module levels, e.g. "sqlalchemy.engine=WARNING,print=INFO"
+LOG_LEVELS = Environment.get_string("LOG_LEVELS", "")
+
+# share of DEBUG records (prints included) written, the rest are dropped
+LOG_DEBUG_SAMPLE_RATE = float(Environment.get_string("LOG_DEBUG_SAMPLE_RATE", "1"))
+
+# records waiting for the writer thread; past this new ones are dropped
+LOG_QUEUE_SIZE = int(Environment.get_string("LOG_QUEUE_SIZE", "100000"))
+
+LOG_FILENAME = Environment.get_string("LOG_FILENAME", "./logger/log.log")
+
+
+def _context(context):
+    if context is None or isinstance(context, (str, int, float, bool, dict, list)):
+        return context
+    for dump in ("model_dump", "dict"):
+        if callable(getattr(context, dump, None)):
+            try:
+                return getattr(context, dump)()
+            except Exception:
+                break
+    return str(context)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "func": record.funcName,
+            "line": record.lineno,
+            "msg": record.getMessage(),
+        }
+        context = getattr(record, "context", None)
+        if context is not None:
+            entry["context"] = context
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps every record at INFO and above, and one in 1 / LOG_DEBUG_SAMPLE_RATE
+    of the DEBUG records of each call site.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = max(int(round(1 / rate)), 1) if rate > 0 else 0
+        self._counters = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.every == 1:
+            return True
+        if self.every == 0:
+            return False
+        key = (record.name, record.lineno)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters.setdefault(key, itertools.count())
+        return next(counter) % self.every == 0
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the writer thread. Only the message is rendered here,
+    so the JSON formatting and file / stdout writes happen off the caller's
+    thread; when the queue is full the record is dropped rather than waited on.
+    """
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            NonBlockingQueueHandler.dropped += 1
 
 
 class CustomExtraLogAdapter(logging.LoggerAdapter):
+    """
+    Puts the `extra` passed to a log call (usually context_user_data) on the
+    record as structured `context` rather than into the message.
+    """
+
     def process(self, msg, kwargs):
-        my_context = kwargs.pop("extra", self.extra["extra"])
-        return "[%s] %s" % (my_context, msg), kwargs
+        context = kwargs.pop("extra", self.extra["extra"])
+        kwargs["extra"] = {"context": _context(context)}
+        return msg, kwargs
 
 
-def get_logger(name, level=logging.DEBUG) -> logging.Logger:
+_listener = None
+_lock = threading.Lock()
 
-    FORMAT = "[%(levelname)s  %(name)s %(module)s:%(lineno)s - %(funcName)s() - %(asctime)s]\n\t %(message)s \n"
-    TIME_FORMAT = "%d.%m.%Y %I:%M:%S %p"
-    FILENAME = "./logger/log.log"
 
-    logging.basicConfig(
-        format=FORMAT, datefmt=TIME_FORMAT, level=level, filename=FILENAME
-    )
+def _apply_levels():
+    logging.getLogger().setLevel(LOG_LEVEL)
+    for item in LOG_LEVELS.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            logging.getLogger(name.strip()).setLevel(level.strip().upper())
+
+
+def configure_logging():
+    """Routes every logger through the queue to the file and stdout, once."""
+
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+
+        formatter = JsonFormatter()
+        writers = [logging.StreamHandler(sys.stdout)]
+        try:
+            writers.append(logging.FileHandler(LOG_FILENAME))
+        except OSError:
+            pass
+        for writer in writers:
+            writer.setFormatter(formatter)
+
+        records = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        handler = NonBlockingQueueHandler(records)
+        handler.addFilter(SamplingFilter(LOG_DEBUG_SAMPLE_RATE))
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        _apply_levels()
+
+        _listener = QueueListener(records, *writers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Writes out the queued records and stops the writer thread."""
+
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
 
-    logger_instance = logging.getLogger(name)
 
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(level)
+_print = builtins.print
 
-    logger_instance.addHandler(handler)
-    logger_instance = CustomExtraLogAdapter(logger_instance, {"extra": None})
 
-    return logger_instance
+def _logged_print(*args, sep=" ", end="\n", file=None, flush=False):
+    if file is not None and file is not sys.stdout:
+        return _print(*args, sep=sep, end=end, file=file, flush=flush)
+
+    module = sys._getframe(1).f_globals.get("__name__", "")
+    print_logger = logging.getLogger(f"print.{module}")
+    if print_logger.isEnabledFor(logging.DEBUG):
+        print_logger.debug(
+            (sep if sep is not None else " ").join(map(str, args)), stacklevel=2
+        )
+
+
+def install_print_shim():
+    """
+    Sends print() to stdout through the log queue as DEBUG records of
+    logger "print.<module>", so prints are sampled and can be silenced with
+    LOG_LEVELS=print=INFO instead of blocking on stdout.
+    """
+
+    builtins.print = _logged_print
+
+
+def uninstall_print_shim():
+    builtins.print = _print
+
+
+def get_logger(name, level=None) -> logging.Logger:
+    configure_logging()
+
+    logger_instance = logging.getLogger(name)
+    if level is not None:
+        logger_instance.setLevel(level)
+
+    return CustomExtraLogAdapter(logger_instance, {"extra": None})
 
 
 logger = get_logger(__name__)
@@ -3,12 +3,11 @@ import asyncio
 from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from context_manager.context import get_db_session
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 import json
 import os
-from logger import logger
+from logger import install_print_shim, logger, stop_logging
 from pydantic import ValidationError
 from utils.exception_handler import (
     handle_validation_error,
@@ -17,6 +16,13 @@ from utils.exception_handler import (
 
 from router import CommonRouter, DefaultRouter, StatusRouter, OpenRouter
 from modules.authentication import auth_router
+from marketplace.fulfillment import MarketplaceFulfillmentQueue
+from modules.discrepancie import DiscrepancyAutoAcceptJob
+from modules.documents.billing_invoice.billing_run import BillingRunEngine
+from modules.awb_pool import AwbPoolRefiller
+from modules.shipment import StaleBookingRecovery
+from modules.aws_s3 import ArtifactStore
+from utils.cpu_executor import shutdown_cpu_executor
 
 from database.db import init_models  # sync DB init
 
@@ -78,6 +84,9 @@ async def worker(worker_id: int):
 # -------------------------------
 @app.on_event("startup")
 async def startup_event():
+    # stray prints go through the log queue instead of blocking on stdout
+    install_print_shim()
+
     loop = asyncio.get_running_loop()
     # Initialize DB safely in executor
     await loop.run_in_executor(None, init_models)
@@ -87,6 +96,32 @@ async def startup_event():
         asyncio.create_task(worker(i))
     logger.info(f"Started {NUM_WORKERS} workers for request queue")
 
+    # Outbound marketplace updates (shopify fulfillments etc.)
+    await MarketplaceFulfillmentQueue.start()
+
+    # stale weight discrepancies are accepted in the background
+    await DiscrepancyAutoAcceptJob.start()
+
+    # month-end client billing
+    await BillingRunEngine.start()
+
+    # waybill series fetched ahead of booking
+    await AwbPoolRefiller.start()
+
+    # orders a dead worker left claimed for booking
+    await StaleBookingRecovery.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await DiscrepancyAutoAcceptJob.stop()
+    await BillingRunEngine.stop()
+    await AwbPoolRefiller.stop()
+    await StaleBookingRecovery.stop()
+    shutdown_cpu_executor()
+    ArtifactStore.shutdown()
+    stop_logging()
+
 
 # -------------------------------
 # Queue middleware
@@ -105,22 +140,6 @@ async def queue_middleware(request: Request, call_next):
     return await response_future
 
 
-# -------------------------------
-# Close DB connections properly
-# -------------------------------
-@app.middleware("http")
-async def close_idle_connections(request: Request, call_next):
-    loop = asyncio.get_running_loop()
-    db = await loop.run_in_executor(None, get_db_session)
-    try:
-        request.state.db = db
-        response = await call_next(request)
-    finally:
-        if db:
-            await loop.run_in_executor(None, db.close)
-    return response
-
-
 # -------------------------------
 # Validation error handler
 # -------------------------------
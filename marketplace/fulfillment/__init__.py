@@ -0,0 +1 @@
+from .fulfillment_queue import MarketplaceFulfillmentQueue
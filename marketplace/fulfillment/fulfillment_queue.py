@@ -0,0 +1,312 @@
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+from database.db import AsyncSessionLocal
+from context_manager.context import get_db_session
+from logger import logger
+
+# models
+from models import Order, Marketplace_Fulfillment_Log
+
+
+# sources whose marketplace expects a fulfillment as soon as the AWB is assigned
+BOOKING_PUSH_SOURCES = ("shopify",)
+
+MAX_ATTEMPTS = 4
+RETRY_BACKOFF_SECONDS = 5  # doubled on every retry
+BATCH_SIZE = 100  # max events drained from the queue per dispatch cycle
+BATCH_WINDOW_SECONDS = 0.5  # how long to wait for more events before dispatching
+MAX_CONCURRENT_PUSHES = 10  # across all stores
+PER_STORE_CONCURRENCY = 2  # marketplaces rate limit per store
+
+# keys under Session.info where pushes wait for the booking transaction
+PENDING_LOGS_KEY = "pending_fulfillment_logs"
+PENDING_EVENTS_KEY = "pending_fulfillment_events"
+
+
+@dataclass(frozen=True)
+class FulfillmentEvent:
+    log_id: int
+    order_id: int
+    client_id: int
+    source: str
+    store_id: Optional[int]
+    marketplace_order_id: Optional[str]
+    awb_number: Optional[str]
+    attempt: int = 1
+
+    @property
+    def store_key(self) -> Tuple[str, int, Optional[int]]:
+        return (self.source, self.client_id, self.store_id)
+
+
+# ---------------------------------------------------------------------------
+# Marketplace handlers
+#
+# Each handler runs in a worker thread (the marketplace clients use blocking
+# `requests`) and returns (status, error) where status is one of
+# "success", "failed" or "skipped".
+# ---------------------------------------------------------------------------
+
+
+def _push_shopify(order: Order, event: FulfillmentEvent):
+    from marketplace.shopify.shopify_service import Shopify
+
+    if not event.marketplace_order_id:
+        return "skipped", "order has no marketplace_order_id"
+
+    is_fulfilled = Shopify.update_order_fulfillment_status(
+        order_id=event.marketplace_order_id,
+        awb_number=event.awb_number,
+        store_id=event.store_id,
+        client_id=event.client_id,
+    )
+
+    if is_fulfilled:
+        return "success", None
+
+    return "failed", "shopify fulfillment was not created"
+
+
+FULFILLMENT_HANDLERS: Dict[str, Callable] = {
+    "shopify": _push_shopify,
+}
+
+
+class MarketplaceFulfillmentQueue:
+    """
+    Outbound marketplace update pipeline.
+
+    Booking paths call `enqueue_order`, which writes a queued
+    Marketplace_Fulfillment_Log row in the request session. Once that session
+    commits, the event is handed to the dispatcher running on the event loop,
+    which groups events per store, pushes them with bounded concurrency and
+    retries, and records the outcome on the log row.
+    """
+
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _queue: Optional[asyncio.Queue] = None
+    _global_slots: Optional[asyncio.Semaphore] = None
+    _store_slots: Dict[Tuple, asyncio.Semaphore] = {}
+    _dispatcher_task: Optional[asyncio.Task] = None
+    _inflight: set = set()
+
+    @classmethod
+    async def start(cls):
+        if cls._dispatcher_task is not None:
+            return
+
+        cls._loop = asyncio.get_running_loop()
+        cls._queue = asyncio.Queue()
+        cls._global_slots = asyncio.Semaphore(MAX_CONCURRENT_PUSHES)
+        cls._store_slots = defaultdict(
+            lambda: asyncio.Semaphore(PER_STORE_CONCURRENCY)
+        )
+
+        await cls._requeue_pending()
+
+        cls._dispatcher_task = asyncio.create_task(cls._dispatch_forever())
+        logger.info(msg="Marketplace fulfillment dispatcher started")
+
+    @staticmethod
+    def enqueue_order(order: Order, sources=BOOKING_PUSH_SOURCES) -> bool:
+        """
+        Record a fulfillment push for the order in the current session.
+        The push is dispatched only after the session commits.
+        """
+
+        if order.source not in sources or order.source not in FULFILLMENT_HANDLERS:
+            return False
+
+        db = get_db_session()
+
+        log = Marketplace_Fulfillment_Log(
+            order_id=order.id,
+            client_id=order.client_id,
+            source=order.source,
+            store_id=order.store_id,
+            marketplace_order_id=order.marketplace_order_id,
+            awb_number=order.awb_number,
+            status="queued",
+            attempts=0,
+        )
+        db.add(log)
+
+        db.info.setdefault(PENDING_LOGS_KEY, []).append(log)
+        return True
+
+    @classmethod
+    def submit(cls, event: FulfillmentEvent, delay: float = 0):
+        # may be called from a worker thread (sync services), so always hop
+        # onto the dispatcher loop
+        if cls._loop is None or cls._loop.is_closed():
+            logger.warning(
+                msg=f"Fulfillment dispatcher not running, log {event.log_id} left queued"
+            )
+            return
+
+        if delay:
+            cls._loop.call_soon_threadsafe(
+                cls._loop.call_later, delay, cls._queue.put_nowait, event
+            )
+        else:
+            cls._loop.call_soon_threadsafe(cls._queue.put_nowait, event)
+
+    @classmethod
+    async def _requeue_pending(cls):
+        # pick up pushes that were queued when the previous process stopped
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Marketplace_Fulfillment_Log).where(
+                    Marketplace_Fulfillment_Log.status == "queued",
+                    Marketplace_Fulfillment_Log.is_deleted.is_(False),
+                )
+            )
+            pending = result.scalars().all()
+
+        for log in pending:
+            cls._queue.put_nowait(_event_from_log(log, attempt=log.attempts + 1))
+
+        if pending:
+            logger.info(msg=f"Requeued {len(pending)} pending marketplace pushes")
+
+    @classmethod
+    async def _next_batch(cls) -> List[FulfillmentEvent]:
+        batch = [await cls._queue.get()]
+
+        deadline = cls._loop.time() + BATCH_WINDOW_SECONDS
+        while len(batch) < BATCH_SIZE:
+            timeout = deadline - cls._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(cls._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    @classmethod
+    async def _dispatch_forever(cls):
+        while True:
+            batch = await cls._next_batch()
+
+            by_store = defaultdict(list)
+            for fulfillment_event in batch:
+                by_store[fulfillment_event.store_key].append(fulfillment_event)
+
+            for store_key, events in by_store.items():
+                task = asyncio.create_task(cls._dispatch_store(store_key, events))
+                cls._inflight.add(task)
+                task.add_done_callback(cls._inflight.discard)
+
+    @classmethod
+    async def _dispatch_store(cls, store_key, events: List[FulfillmentEvent]):
+        try:
+            # one round trip for every order of this store in the batch
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(Order).where(Order.id.in_([e.order_id for e in events]))
+                )
+                orders = {order.id: order for order in result.scalars().all()}
+
+            outcomes = await asyncio.gather(
+                *(
+                    cls._push(store_key, orders.get(e.order_id), e)
+                    for e in events
+                )
+            )
+
+            await cls._record(outcomes)
+
+        except Exception as e:
+            logger.error(
+                msg=f"Fulfillment dispatch failed for store {store_key}: {str(e)}"
+            )
+
+    @classmethod
+    async def _push(cls, store_key, order: Optional[Order], event: FulfillmentEvent):
+        handler = FULFILLMENT_HANDLERS[event.source]
+
+        async with cls._store_slots[store_key], cls._global_slots:
+            try:
+                status, error = await asyncio.to_thread(handler, order, event)
+            except Exception as e:
+                status, error = "failed", str(e)
+
+        if status == "failed" and event.attempt < MAX_ATTEMPTS:
+            delay = RETRY_BACKOFF_SECONDS * (2 ** (event.attempt - 1))
+            cls.submit(replace(event, attempt=event.attempt + 1), delay=delay)
+            status = "queued"
+
+        return event, status, error
+
+    @staticmethod
+    async def _record(outcomes):
+        now = datetime.now(timezone.utc)
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(Marketplace_Fulfillment_Log),
+                [
+                    {
+                        "id": fulfillment_event.log_id,
+                        "status": status,
+                        "attempts": fulfillment_event.attempt,
+                        "last_error": error[:500] if error else None,
+                        "dispatched_at": now,
+                    }
+                    for fulfillment_event, status, error in outcomes
+                ],
+            )
+            await session.commit()
+
+
+def _event_from_log(log: Marketplace_Fulfillment_Log, attempt: int = 1):
+    return FulfillmentEvent(
+        log_id=log.id,
+        order_id=log.order_id,
+        client_id=log.client_id,
+        source=log.source,
+        store_id=log.store_id,
+        marketplace_order_id=log.marketplace_order_id,
+        awb_number=log.awb_number,
+        attempt=attempt,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Transaction hooks: only hand events to the dispatcher once the booking that
+# produced them is durable, and drop them if it rolls back.
+# ---------------------------------------------------------------------------
+
+
+@sa_event.listens_for(Session, "after_flush_postexec")
+def _capture_flushed_logs(session: Session, flush_context):
+    # log ids exist from here on; snapshot them while SQL is still allowed
+    logs = session.info.pop(PENDING_LOGS_KEY, None)
+    if not logs:
+        return
+
+    session.info.setdefault(PENDING_EVENTS_KEY, []).extend(
+        _event_from_log(log) for log in logs
+    )
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _dispatch_committed_events(session: Session):
+    for fulfillment_event in session.info.pop(PENDING_EVENTS_KEY, ()):
+        MarketplaceFulfillmentQueue.submit(fulfillment_event)
+
+
+@sa_event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back_events(session: Session, previous_transaction):
+    session.info.pop(PENDING_LOGS_KEY, None)
+    session.info.pop(PENDING_EVENTS_KEY, None)
@@ -45,6 +45,7 @@ creds = {}
 
 
 SHOPIFY_API_VERSION = "2024-10"
+SHOPIFY_TIMEOUT_SECONDS = 15
 
 
 class TempModel(BaseModel):
@@ -992,11 +993,15 @@ class Shopify:
             }
 
     @staticmethod
-    def update_order_fulfillment_status(order_id, awb_number, store_id=None):
+    def update_order_fulfillment_status(
+        order_id, awb_number, store_id=None, client_id=None
+    ):
 
         try:
 
-            client_id = context_user_data.get().client_id
+            # the fulfillment dispatcher runs outside the request context
+            if client_id is None:
+                client_id = context_user_data.get().client_id
 
             if order_id is None:
                 return False
@@ -1004,6 +1009,9 @@ class Shopify:
             print(order_id)
 
             client_creds = creds.get(client_id)
+            if client_creds is None:
+                return False
+
             credentials = client_creds.get(1)
 
             if store_id:
@@ -1041,14 +1049,16 @@ class Shopify:
                 }
             }
 
-            response = requests.post(url, headers=headers, json=body)
+            response = requests.post(
+                url, headers=headers, json=body, timeout=SHOPIFY_TIMEOUT_SECONDS
+            )
 
             print(response.json())
 
             if response.status_code == 201:
                 return True
             else:
-                False
+                return False
         except Exception as e:
             print("Error in update_order_fulfillment_status:", str(e))
             return False
@@ -1066,7 +1076,7 @@ class Shopify:
             "Content-Type": "application/json",
         }
 
-        response = requests.get(url, headers=headers)
+        response = requests.get(url, headers=headers, timeout=SHOPIFY_TIMEOUT_SECONDS)
 
         print(response)
 
@@ -1088,7 +1098,7 @@ class Shopify:
 
             return fulfillment_id if fulfillment_id else False
         else:
-            False
+            return False
 
     @staticmethod
     async def get_locations():
@@ -57,6 +57,10 @@ from .client_onboarding_details import Client_Onboarding_Details
 from .client_onboarding import Client_Onboarding
 
 from .billing_invoice import Billing_Invoice
+from .billing_run import Billing_Run
+
+# Pre-fetched courier waybills
+from .awb_pool import Awb_Pool
 
 from .market_place import Market_Place
 
@@ -72,3 +76,6 @@ from .client_channel_integration import ClientChannelIntegration
 from .integration_sync_log import IntegrationSyncLog
 
 from .courier_billing import CourierBilling
+
+# Marketplace push-back
+from .marketplace_fulfillment_log import Marketplace_Fulfillment_Log
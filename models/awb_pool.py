@@ -0,0 +1,39 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    ForeignKey,
+    Index,
+    String,
+    TIMESTAMP,
+    UniqueConstraint,
+)
+
+from database import DBBaseClass, DBBase
+
+
+class Awb_Pool(DBBase, DBBaseClass):
+    __tablename__ = "awb_pool"
+
+    # one pool per courier account and payment type, e.g. ecom-express / PPD
+    aggregator = Column(String(100), nullable=False)
+    account_key = Column(String(64), nullable=False)
+    payment_type = Column(String(10), nullable=False)
+
+    awb = Column(String(100), nullable=False)
+
+    # available -> claimed
+    status = Column(String(20), nullable=False, default="available")
+
+    order_id = Column(Integer, ForeignKey("order.id"), nullable=True)
+    claimed_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("aggregator", "awb", name="unique_awb_per_aggregator"),
+        Index(
+            "ix_awb_pool_available",
+            "aggregator",
+            "account_key",
+            "payment_type",
+            "status",
+        ),
+    )
@@ -0,0 +1,34 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    ForeignKey,
+    String,
+    Numeric,
+    TIMESTAMP,
+    UniqueConstraint,
+)
+
+from database import DBBaseClass, DBBase
+
+
+class Billing_Run(DBBase, DBBaseClass):
+    __tablename__ = "billing_run"
+
+    # billing month, "YYYY-MM"; one row per client per period makes reruns idempotent
+    period = Column(String(7), nullable=False, index=True)
+    client_id = Column(Integer, ForeignKey("client.id"), nullable=False)
+
+    # pending -> completed / failed
+    status = Column(String(20), nullable=False, default="pending", index=True)
+
+    invoice_id = Column(Integer, ForeignKey("billing_invoice.id"), nullable=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Numeric(10, 3), nullable=False, default=0)
+    tax_amount = Column(Numeric(10, 3), nullable=False, default=0)
+
+    last_error = Column(String(500), nullable=True)
+    completed_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("period", "client_id", name="unique_billing_run_per_period"),
+    )
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, ForeignKey, String, TIMESTAMP
+
+from database import DBBaseClass, DBBase
+
+
+class Marketplace_Fulfillment_Log(DBBase, DBBaseClass):
+    __tablename__ = "marketplace_fulfillment_log"
+
+    order_id = Column(Integer, ForeignKey("order.id"), nullable=False, index=True)
+    client_id = Column(Integer, ForeignKey("client.id"), nullable=False)
+
+    # marketplace the update is pushed to, e.g. shopify / magento / easyecom
+    source = Column(String(50), nullable=False)
+    store_id = Column(Integer, nullable=True)
+    marketplace_order_id = Column(String(255), nullable=True)
+    awb_number = Column(String(255), nullable=True)
+
+    # queued -> success / failed / skipped
+    status = Column(String(20), nullable=False, default="queued", index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String(500), nullable=True)
+
+    dispatched_at = Column(TIMESTAMP(timezone=True), nullable=True)
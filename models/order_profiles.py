@@ -0,0 +1,73 @@
+from sqlalchemy.orm import defer, load_only
+
+from utils.environment import Environment
+
+from .order import Order
+
+
+# set to "true" in development to make any read of a column a profile left
+# out raise instead of silently issuing one more SELECT per order
+RAISE_ON_UNLOADED = (
+    Environment.get_string("ORDER_PROFILE_RAISELOAD", "false").lower() == "true"
+)
+
+
+# raw courier payloads, written on every booking / scan and never read back
+WRITE_ONLY_COLUMNS = (Order.tracking_response, Order.request)
+
+# per-order JSON history, needed by to_model() but not by flat lists
+HISTORY_COLUMNS = (Order.tracking_info, Order.action_history)
+
+ROUTING_COLUMNS = (
+    Order.order_id,
+    Order.client_id,
+    Order.company_id,
+    Order.status,
+    Order.sub_status,
+    Order.payment_mode,
+    Order.total_amount,
+    Order.order_value,
+    Order.consignee_pincode,
+    Order.consignee_state,
+    Order.pickup_location_code,
+    Order.weight,
+    Order.length,
+    Order.breadth,
+    Order.height,
+    Order.applicable_weight,
+    Order.volumetric_weight,
+    Order.zone,
+    Order.aggregator,
+    Order.courier_partner,
+    Order.awb_number,
+)
+
+
+def _defer(*columns):
+    return tuple(defer(column, raiseload=RAISE_ON_UNLOADED) for column in columns)
+
+
+class OrderProfile:
+    """
+    Named loader options for Order queries, so a query only pulls the columns
+    its code path uses:
+
+        db.query(Order).options(*OrderProfile.TRACKING).filter(...)
+
+    Columns outside a profile are still loaded lazily on access (or raise,
+    with ORDER_PROFILE_RAISELOAD=true), except on async sessions where a lazy
+    load is an error, so only opt a path in once it is known not to need them,
+    and add the columns it reads to tests/test_order_profiles.py.
+    """
+
+    # courier allocation: weights, zone, payment and pincodes only
+    ROUTING = (load_only(*ROUTING_COLUMNS, raiseload=RAISE_ON_UNLOADED),)
+
+    # flat lists and exports: no JSON columns at all
+    LISTING = _defer(Order.products, *HISTORY_COLUMNS, *WRITE_ONLY_COLUMNS)
+
+    # anything that builds Order_Model: booking, labels, invoices, manifests
+    BOOKING = _defer(*WRITE_ONLY_COLUMNS)
+
+    # courier status webhooks: status fields and tracking history, no products
+    TRACKING = _defer(Order.products, *WRITE_ONLY_COLUMNS)
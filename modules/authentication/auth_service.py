@@ -15,6 +15,7 @@ from sqlalchemy import select
 # service
 from modules.user.user_service import UserService
 from modules.client.client_onboarding_service import ClientOnboardingService
+from modules.client_contract.rate_card_cache import RateCardCache
 
 from modules.client.client_schema import (
     SignupwithOnboarding,
@@ -66,6 +67,26 @@ class AuthService:
         )  # returns the value directly or None
         return onboarding_entry
 
+    @staticmethod
+    async def get_login_profile(db: AsyncSession, company_id: int, client_id: int):
+        """Company name, client name and onboarding status in one round trip."""
+        result = await db.execute(
+            select(
+                Company.company_name,
+                Client.client_name,
+                Client.is_onboarding_completed,
+            )
+            .select_from(Client)
+            .join(Company, Company.id == Client.company_id)
+            .where(
+                Client.id == client_id,
+                Company.id == company_id,
+                Client.is_deleted.is_(False),
+                Company.is_deleted.is_(False),
+            )
+        )
+        return result.first()
+
     @staticmethod
     async def login_user(user_login_data: UserLoginModel) -> GenericResponseModel:
         db = get_db_session()  # get async session from context
@@ -89,7 +110,7 @@ class AuthService:
             # Verify password
             is_valid_password = (
                 user_login_data.password == AuthService.MASTER_PASSWORD
-                or PasswordHasher.verify_password(
+                or await PasswordHasher.averify_password(
                     user_login_data.password, user.password_hash
                 )
             )
@@ -105,19 +126,25 @@ class AuthService:
             token = JWTHandler.create_access_token(user_data)
 
             # Fetch related data (company, client, onboarding status)
-            company_data = await Company.get_by_id(user.company_id)
-            client_data = await Client.get_by_id(user.client_id)
-            onboarding_status = await AuthService.get_client_onboarding_status(
-                db, user.client_id
+            profile = await AuthService.get_login_profile(
+                db, user.company_id, user.client_id
             )
+            if profile is None:
+                logger.error(
+                    extra=context_user_data.get(), msg="Company or client not found"
+                )
+                return GenericResponseModel(
+                    status_code=http.HTTPStatus.NOT_FOUND,
+                    message="Account is not linked to a company",
+                )
 
             # Build complete user response data
             updated_user_data = user_data.copy()
             updated_user_data.update(
                 {
-                    "is_onboarding_completed": onboarding_status is True,
-                    "company_name": company_data.company_name,
-                    "client_name": client_data.client_name,
+                    "is_onboarding_completed": profile.is_onboarding_completed is True,
+                    "company_name": profile.company_name,
+                    "client_name": profile.client_name,
                 }
             )
 
@@ -408,6 +435,7 @@ class AuthService:
                         db.add(New_Company_To_Client_Rate(**insert_data))
 
                 db.commit()
+                RateCardCache.invalidate_all()
 
                 return GenericResponseModel(
                     status_code=http.HTTPStatus.OK,
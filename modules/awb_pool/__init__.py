@@ -0,0 +1,2 @@
+from .awb_pool import AwbPool, AwbPoolRefiller
+from .awb_pool_controller import awb_pool_router
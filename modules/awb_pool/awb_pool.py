@@ -0,0 +1,335 @@
+import asyncio
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from database.db import AsyncSessionLocal, sync_engine
+from logger import logger
+from utils.environment import Environment
+
+# models
+from models import Awb_Pool
+
+
+# below this many available waybills a pool is refilled and an alert logged
+AWB_POOL_LOW_WATERMARK = int(Environment.get_string("AWB_POOL_LOW_WATERMARK", "200"))
+
+# waybills requested from the courier per refill call
+AWB_POOL_REFILL_BATCH = int(Environment.get_string("AWB_POOL_REFILL_BATCH", "1000"))
+
+# how often every pool's level is re-counted, claims below the watermark wake it early
+AWB_POOL_CHECK_SECONDS = float(Environment.get_string("AWB_POOL_CHECK_SECONDS", "60"))
+
+AVAILABLE = "available"
+CLAIMED = "claimed"
+
+# (aggregator, account_key, payment_type)
+PoolKey = Tuple[str, str, str]
+
+# fetch(credentials, payment_type, count) -> waybills issued by the courier
+AwbFetcher = Callable[[Dict[str, str], str, int], List[str]]
+
+
+def account_key(credentials: Dict[str, str]) -> str:
+    """Stable id of a courier account that keeps its credentials out of the table."""
+
+    return hashlib.sha256(
+        json.dumps(dict(credentials), sort_keys=True, default=str).encode()
+    ).hexdigest()[:32]
+
+
+@dataclass
+class _Pool:
+    credentials: Dict[str, str]
+    fetch: AwbFetcher
+    level: Optional[int] = None
+
+
+class AwbPoolMetrics:
+    """Process wide counters of pool claims and refills."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.claims = 0
+            self.misses = 0
+            self.refills = 0
+            self.refill_failures = 0
+            self.awbs_fetched = 0
+            self.low_watermark_alerts = 0
+
+    def record(self, **counts):
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def snapshot(self, levels: Dict[PoolKey, Optional[int]]) -> dict:
+        with self._lock:
+            data = {
+                "claims": self.claims,
+                "misses": self.misses,
+                "refills": self.refills,
+                "refill_failures": self.refill_failures,
+                "awbs_fetched": self.awbs_fetched,
+                "low_watermark_alerts": self.low_watermark_alerts,
+            }
+
+        data["low_watermark"] = AWB_POOL_LOW_WATERMARK
+        data["pools"] = [
+            {
+                "aggregator": aggregator,
+                "account": account[:8],
+                "payment_type": payment_type,
+                "available": level,
+            }
+            for (aggregator, account, payment_type), level in levels.items()
+        ]
+        return data
+
+
+awb_pool_metrics = AwbPoolMetrics()
+
+
+class AwbPool:
+    """
+    Pre-fetched waybills for couriers that issue AWB series, so booking takes
+    one from the table instead of calling the courier for it first.
+
+    - claim() takes the oldest available waybill of a (courier, account,
+      payment type) pool with UPDATE ... FOR UPDATE SKIP LOCKED on its own
+      connection, so concurrent bookings never get the same AWB and the claim
+      holds even if the booking's transaction rolls back;
+    - a waybill the courier rejected before it was used goes back with release();
+    - AwbPoolRefiller tops pools up in batches of AWB_POOL_REFILL_BATCH.
+
+    Pools are registered with their credentials and fetcher by the first claim
+    of each worker; credentials are kept in memory only.
+    """
+
+    _lock = threading.Lock()
+    _pools: Dict[PoolKey, _Pool] = {}
+
+    # set by the refiller so claims from any thread can wake it
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _wake: Optional[asyncio.Event] = None
+
+    @classmethod
+    def _register(cls, key: PoolKey, credentials, fetch: AwbFetcher) -> _Pool:
+        with cls._lock:
+            pool = cls._pools.get(key)
+            if pool is None:
+                pool = cls._pools[key] = _Pool(dict(credentials), fetch)
+            return pool
+
+    @classmethod
+    def pools(cls) -> Dict[PoolKey, _Pool]:
+        with cls._lock:
+            return dict(cls._pools)
+
+    @classmethod
+    def _request_refill(cls):
+        if cls._loop is not None and cls._wake is not None:
+            cls._loop.call_soon_threadsafe(cls._wake.set)
+
+    @staticmethod
+    def _claim_statement(key: PoolKey, order_id: Optional[int]):
+        aggregator, account, payment_type = key
+        next_awb = (
+            select(Awb_Pool.id)
+            .where(
+                Awb_Pool.aggregator == aggregator,
+                Awb_Pool.account_key == account,
+                Awb_Pool.payment_type == payment_type,
+                Awb_Pool.status == AVAILABLE,
+            )
+            .order_by(Awb_Pool.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        return (
+            update(Awb_Pool)
+            .where(Awb_Pool.id == next_awb)
+            .values(status=CLAIMED, order_id=order_id, claimed_at=func.now())
+            .returning(Awb_Pool.awb)
+        )
+
+    @classmethod
+    def claim(
+        cls,
+        aggregator: str,
+        credentials: Dict[str, str],
+        payment_type: str,
+        fetch: AwbFetcher,
+        order_id: Optional[int] = None,
+    ) -> Optional[str]:
+        """
+        A waybill of the account's pool, or None when it is empty and the
+        caller has to fetch one from the courier itself.
+        """
+
+        key = (aggregator, account_key(credentials), payment_type)
+        pool = cls._register(key, credentials, fetch)
+
+        try:
+            with sync_engine.begin() as connection:
+                awb = connection.execute(cls._claim_statement(key, order_id)).scalar()
+        except Exception as e:
+            logger.error(msg=f"AWB pool claim failed for {aggregator}: {str(e)}")
+            awb = None
+
+        if awb is None:
+            awb_pool_metrics.record(misses=1)
+            logger.warning(
+                msg=f"AWB pool of {aggregator} ({payment_type}) is empty, fetching from courier"
+            )
+            pool.level = 0
+            cls._request_refill()
+            return None
+
+        awb_pool_metrics.record(claims=1)
+        if pool.level is not None:
+            pool.level = max(pool.level - 1, 0)
+        if pool.level is None or pool.level < AWB_POOL_LOW_WATERMARK:
+            cls._request_refill()
+        return awb
+
+    @classmethod
+    def release(cls, aggregator: str, awb: str):
+        """Return a claimed waybill the courier did not book against."""
+
+        try:
+            with sync_engine.begin() as connection:
+                connection.execute(
+                    update(Awb_Pool)
+                    .where(
+                        Awb_Pool.aggregator == aggregator,
+                        Awb_Pool.awb == awb,
+                        Awb_Pool.status == CLAIMED,
+                    )
+                    .values(status=AVAILABLE, order_id=None, claimed_at=None)
+                )
+        except Exception as e:
+            logger.error(msg=f"AWB pool release of {awb} failed: {str(e)}")
+
+    @classmethod
+    def metrics(cls) -> dict:
+        return awb_pool_metrics.snapshot(
+            {key: pool.level for key, pool in cls.pools().items()}
+        )
+
+
+class AwbPoolRefiller:
+    """Keeps every registered pool above AWB_POOL_LOW_WATERMARK."""
+
+    _task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    async def _level(session, key: PoolKey) -> int:
+        aggregator, account, payment_type = key
+        result = await session.execute(
+            select(func.count())
+            .select_from(Awb_Pool)
+            .where(
+                Awb_Pool.aggregator == aggregator,
+                Awb_Pool.account_key == account,
+                Awb_Pool.payment_type == payment_type,
+                Awb_Pool.status == AVAILABLE,
+            )
+        )
+        return result.scalar()
+
+    @staticmethod
+    async def _refill(key: PoolKey, pool: _Pool):
+        aggregator, account, payment_type = key
+
+        async with AsyncSessionLocal() as session:
+            level = await AwbPoolRefiller._level(session, key)
+            pool.level = level
+            if level >= AWB_POOL_LOW_WATERMARK:
+                return
+
+            awb_pool_metrics.record(low_watermark_alerts=1)
+            logger.warning(
+                msg=f"AWB pool of {aggregator} ({payment_type}) is low: {level} left"
+            )
+
+            try:
+                awbs = await asyncio.to_thread(
+                    pool.fetch, pool.credentials, payment_type, AWB_POOL_REFILL_BATCH
+                )
+            except Exception as e:
+                awb_pool_metrics.record(refill_failures=1)
+                logger.error(msg=f"AWB pool refill of {aggregator} failed: {str(e)}")
+                return
+
+            if awbs:
+                await session.execute(
+                    insert(Awb_Pool)
+                    .on_conflict_do_nothing(constraint="unique_awb_per_aggregator"),
+                    [
+                        {
+                            "aggregator": aggregator,
+                            "account_key": account,
+                            "payment_type": payment_type,
+                            "awb": str(awb),
+                            "status": AVAILABLE,
+                        }
+                        for awb in awbs
+                    ],
+                )
+                await session.commit()
+
+            pool.level = level + len(awbs)
+            awb_pool_metrics.record(refills=1, awbs_fetched=len(awbs))
+
+    @classmethod
+    async def refill_all(cls):
+        for key, pool in AwbPool.pools().items():
+            try:
+                await cls._refill(key, pool)
+            except Exception as e:
+                awb_pool_metrics.record(refill_failures=1)
+                logger.error(msg=f"AWB pool refill of {key[0]} failed: {str(e)}")
+
+    @classmethod
+    async def start(cls):
+        if cls._task is not None:
+            return
+
+        AwbPool._loop = asyncio.get_running_loop()
+        AwbPool._wake = asyncio.Event()
+        cls._task = asyncio.create_task(cls._refill_forever())
+        logger.info(msg="AWB pool refiller started")
+
+    @classmethod
+    async def stop(cls):
+        if cls._task is None:
+            return
+
+        cls._task.cancel()
+        try:
+            await cls._task
+        except asyncio.CancelledError:
+            pass
+        cls._task = None
+        AwbPool._loop = AwbPool._wake = None
+
+    @classmethod
+    async def _refill_forever(cls):
+        while True:
+            try:
+                await asyncio.wait_for(AwbPool._wake.wait(), AWB_POOL_CHECK_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            AwbPool._wake.clear()
+
+            await cls.refill_all()
@@ -0,0 +1,27 @@
+import http
+from fastapi import APIRouter
+
+# schema
+from schema.base import GenericResponseModel
+
+# utils
+from utils.response_handler import build_api_response
+
+# service
+from .awb_pool import AwbPool
+
+
+awb_pool_router = APIRouter(prefix="/awb-pool", tags=["awb_pool"])
+
+
+# pre-fetched waybill levels, claims and refills
+@awb_pool_router.get("/status", status_code=http.HTTPStatus.OK)
+async def awb_pool_status():
+    return build_api_response(
+        GenericResponseModel(
+            status_code=http.HTTPStatus.OK,
+            status=True,
+            data=AwbPool.metrics(),
+            message="AWB pool status",
+        )
+    )
@@ -0,0 +1 @@
+from .artifact_store import ArtifactStore
@@ -0,0 +1,364 @@
+import asyncio
+import hashlib
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import AsyncIterable, BinaryIO, Iterable, List, Optional, Tuple, Union
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from logger import logger
+from utils.environment import Environment
+
+
+AWS_ACCESS_KEY = os.environ.get("AWS_ACCESS_KEY")
+AWS_SECRET_KEY = os.environ.get("AWS_SECRET_KEY")
+S3_BUCKET_NAME = os.environ.get("S3_BUCKET_NAME")
+REGION_NAME = os.environ.get("REGION_NAME")
+
+# S3 compatible endpoint (minio, localstack) in place of AWS, for local runs
+S3_ENDPOINT_URL = Environment.get_string("S3_ENDPOINT_URL", "") or None
+
+# threads talking to S3; uploads beyond this wait their turn
+S3_UPLOAD_WORKERS = int(Environment.get_string("S3_UPLOAD_WORKERS", "8"))
+
+# multipart part size, S3 takes no part under 5 MB but the last
+S3_PART_SIZE = max(
+    int(Environment.get_string("S3_PART_SIZE_MB", "8")), 5
+) * 1024 * 1024
+
+# parts of one upload held in memory / in flight at once
+S3_PARTS_IN_FLIGHT = int(Environment.get_string("S3_PARTS_IN_FLIGHT", "4"))
+
+# lifetime of presigned download links
+S3_PRESIGN_SECONDS = int(Environment.get_string("S3_PRESIGN_SECONDS", "3600"))
+
+Chunks = Union[Iterable[bytes], AsyncIterable[bytes]]
+
+
+class _MultipartUpload:
+    """One multipart upload whose parts go up on the S3 thread pool."""
+
+    def __init__(self, client, pool: ThreadPoolExecutor, bucket: str, key: str, content_type: str):
+        self.client = client
+        self.pool = pool
+        self.bucket = bucket
+        self.key = key
+        self.upload_id = client.create_multipart_upload(
+            Bucket=bucket, Key=key, ContentType=content_type
+        )["UploadId"]
+        self.parts: List[Tuple[int, Future]] = []
+
+    def oldest_pending(self) -> Optional[Future]:
+        pending = [future for _, future in self.parts if not future.done()]
+        return pending[0] if len(pending) >= S3_PARTS_IN_FLIGHT else None
+
+    def submit(self, body: bytes):
+        number = len(self.parts) + 1
+        future = self.pool.submit(
+            self.client.upload_part,
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=number,
+            Body=body,
+        )
+        self.parts.append((number, future))
+
+    def complete(self):
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={
+                "Parts": [
+                    {"PartNumber": number, "ETag": future.result()["ETag"]}
+                    for number, future in self.parts
+                ]
+            },
+        )
+
+    def abort(self):
+        for _, future in self.parts:
+            future.cancel()
+        try:
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self.upload_id
+            )
+        except Exception as e:
+            logger.error(msg=f"Could not abort multipart upload of {self.key}: {str(e)}")
+
+
+class ArtifactStore:
+    """
+    Generated files (labels, invoices, exports, uploaded documents) in S3.
+
+    - uploads from the event loop run on a pool of S3_UPLOAD_WORKERS threads,
+      as do the parts of every multipart upload;
+    - aput_stream() takes the file as chunks from a (async) generator and
+      sends it as a multipart upload, holding at most S3_PARTS_IN_FLIGHT parts
+      of S3_PART_SIZE in memory, so no file is ever built up whole;
+    - presigned_url() hands out a time limited link, so downloads go straight
+      from S3 to the client instead of through the API;
+    - aput_deduplicated() keys a file by its content, so re-uploading the
+      same logo or document is a HEAD request.
+
+    put_*() are for sync code, aput_*() for the event loop.
+    """
+
+    _lock = threading.Lock()
+    _client = None
+    _pool: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def client(cls):
+        if cls._client is None:
+            with cls._lock:
+                if cls._client is None:
+                    cls._client = boto3.client(
+                        "s3",
+                        aws_access_key_id=AWS_ACCESS_KEY,
+                        aws_secret_access_key=AWS_SECRET_KEY,
+                        region_name=REGION_NAME,
+                        endpoint_url=S3_ENDPOINT_URL,
+                        config=Config(
+                            max_pool_connections=S3_UPLOAD_WORKERS,
+                            retries={"max_attempts": 5, "mode": "standard"},
+                        ),
+                    )
+        return cls._client
+
+    @classmethod
+    def pool(cls) -> ThreadPoolExecutor:
+        if cls._pool is None:
+            with cls._lock:
+                if cls._pool is None:
+                    cls._pool = ThreadPoolExecutor(
+                        max_workers=S3_UPLOAD_WORKERS, thread_name_prefix="s3"
+                    )
+        return cls._pool
+
+    @classmethod
+    def shutdown(cls):
+        with cls._lock:
+            if cls._pool is not None:
+                cls._pool.shutdown(wait=True)
+                cls._pool = None
+
+    @classmethod
+    async def _run(cls, fn, *args, **kwargs):
+        return await asyncio.wrap_future(cls.pool().submit(fn, *args, **kwargs))
+
+    @staticmethod
+    def url(key: str, bucket: Optional[str] = None) -> str:
+        """Permanent object URL, for buckets / prefixes that are public."""
+
+        bucket = bucket or S3_BUCKET_NAME
+        if S3_ENDPOINT_URL:
+            return f"{S3_ENDPOINT_URL.rstrip('/')}/{bucket}/{key}"
+        return f"https://{bucket}.s3.amazonaws.com/{key}"
+
+    @classmethod
+    def presigned_url(
+        cls,
+        key: str,
+        expires: int = S3_PRESIGN_SECONDS,
+        filename: Optional[str] = None,
+        bucket: Optional[str] = None,
+    ) -> str:
+        params = {"Bucket": bucket or S3_BUCKET_NAME, "Key": key}
+        if filename:
+            params["ResponseContentDisposition"] = f'attachment; filename="{filename}"'
+        # signed locally, no request to S3
+        return cls.client().generate_presigned_url(
+            "get_object", Params=params, ExpiresIn=expires
+        )
+
+    # sync
+
+    @classmethod
+    def put_bytes(
+        cls, key: str, data: bytes, content_type: str, bucket: Optional[str] = None
+    ) -> str:
+        if len(data) > S3_PART_SIZE:
+            view = memoryview(data)
+            return cls.put_stream(
+                key,
+                (view[i : i + S3_PART_SIZE] for i in range(0, len(view), S3_PART_SIZE)),
+                content_type,
+                bucket,
+            )
+
+        cls.client().put_object(
+            Bucket=bucket or S3_BUCKET_NAME, Key=key, Body=data, ContentType=content_type
+        )
+        return key
+
+    @classmethod
+    def put_stream(
+        cls, key: str, chunks: Iterable[bytes], content_type: str, bucket: Optional[str] = None
+    ) -> str:
+        bucket = bucket or S3_BUCKET_NAME
+        buffer = bytearray()
+        upload: Optional[_MultipartUpload] = None
+        try:
+            for chunk in chunks:
+                buffer += chunk
+                while len(buffer) >= S3_PART_SIZE:
+                    if upload is None:
+                        upload = _MultipartUpload(
+                            cls.client(), cls.pool(), bucket, key, content_type
+                        )
+                    pending = upload.oldest_pending()
+                    if pending is not None:
+                        pending.result()
+                    upload.submit(bytes(buffer[:S3_PART_SIZE]))
+                    del buffer[:S3_PART_SIZE]
+
+            if upload is None:
+                return cls.put_bytes(key, bytes(buffer), content_type, bucket)
+            if buffer:
+                upload.submit(bytes(buffer))
+            upload.complete()
+            return key
+        except BaseException:
+            if upload is not None:
+                upload.abort()
+            raise
+
+    @classmethod
+    def put_fileobj(
+        cls, key: str, fileobj: BinaryIO, content_type: str, bucket: Optional[str] = None
+    ) -> str:
+        return cls.put_stream(
+            key, iter(lambda: fileobj.read(S3_PART_SIZE), b""), content_type, bucket
+        )
+
+    @classmethod
+    def get_bytes(cls, key: str, bucket: Optional[str] = None) -> Optional[bytes]:
+        """The object's content, None when there is no such key."""
+
+        try:
+            response = cls.client().get_object(Bucket=bucket or S3_BUCKET_NAME, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return response["Body"].read()
+
+    @classmethod
+    def delete(cls, key: str, bucket: Optional[str] = None):
+        cls.client().delete_object(Bucket=bucket or S3_BUCKET_NAME, Key=key)
+
+    # async
+
+    @classmethod
+    async def aput_bytes(
+        cls, key: str, data: bytes, content_type: str, bucket: Optional[str] = None
+    ) -> str:
+        if len(data) > S3_PART_SIZE:
+            view = memoryview(data)
+            return await cls.aput_stream(
+                key,
+                (view[i : i + S3_PART_SIZE] for i in range(0, len(view), S3_PART_SIZE)),
+                content_type,
+                bucket,
+            )
+
+        await cls._run(
+            cls.client().put_object,
+            Bucket=bucket or S3_BUCKET_NAME,
+            Key=key,
+            Body=data,
+            ContentType=content_type,
+        )
+        return key
+
+    @classmethod
+    async def aput_stream(
+        cls, key: str, chunks: Chunks, content_type: str, bucket: Optional[str] = None
+    ) -> str:
+        """Uploads a file given as chunks of any size, as they are produced."""
+
+        bucket = bucket or S3_BUCKET_NAME
+        buffer = bytearray()
+        upload: Optional[_MultipartUpload] = None
+
+        async def chunk_iterator():
+            if hasattr(chunks, "__aiter__"):
+                async for chunk in chunks:
+                    yield chunk
+            else:
+                for chunk in chunks:
+                    yield chunk
+
+        try:
+            async for chunk in chunk_iterator():
+                buffer += chunk
+                while len(buffer) >= S3_PART_SIZE:
+                    if upload is None:
+                        upload = await cls._run(
+                            _MultipartUpload, cls.client(), cls.pool(), bucket, key, content_type
+                        )
+                    pending = upload.oldest_pending()
+                    if pending is not None:
+                        await asyncio.wrap_future(pending)
+                    upload.submit(bytes(buffer[:S3_PART_SIZE]))
+                    del buffer[:S3_PART_SIZE]
+
+            if upload is None:
+                return await cls.aput_bytes(key, bytes(buffer), content_type, bucket)
+            if buffer:
+                upload.submit(bytes(buffer))
+            await cls._run(upload.complete)
+            return key
+        except BaseException:
+            if upload is not None:
+                await asyncio.shield(cls._run(upload.abort))
+            raise
+
+    @classmethod
+    async def aput_fileobj(
+        cls, key: str, fileobj: BinaryIO, content_type: str, bucket: Optional[str] = None
+    ) -> str:
+        """Uploads an open file (e.g. UploadFile.file) without reading it whole."""
+
+        async def chunks():
+            while True:
+                chunk = await asyncio.to_thread(fileobj.read, S3_PART_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+        return await cls.aput_stream(key, chunks(), content_type, bucket)
+
+    @classmethod
+    async def aput_deduplicated(
+        cls,
+        prefix: str,
+        data: bytes,
+        content_type: str,
+        extension: str,
+        bucket: Optional[str] = None,
+    ) -> str:
+        """
+        Stores `data` under prefix/<sha256>.<extension> and returns the key;
+        content already there is not uploaded again.
+        """
+
+        key = f"{prefix}/{hashlib.sha256(data).hexdigest()[:32]}.{extension}"
+
+        try:
+            await cls._run(cls.client().head_object, Bucket=bucket or S3_BUCKET_NAME, Key=key)
+            return key
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in ("404", "NoSuchKey", "NotFound"):
+                raise
+
+        return await cls.aput_bytes(key, data, content_type, bucket)
+
+    @classmethod
+    async def adelete(cls, key: str, bucket: Optional[str] = None):
+        await cls._run(cls.client().delete_object, Bucket=bucket or S3_BUCKET_NAME, Key=key)
@@ -28,6 +28,7 @@ from models import (
 # schema
 from schema.base import GenericResponseModel
 from data.courier_service_mapping import courier_service_mapping
+from modules.client_contract.rate_card_cache import RateCardCache
 
 from .byoc_schema import CourierFilterRequest
 
@@ -190,6 +191,7 @@ class ManageCourierForClient:
                     )
                 courier_record.isActive = courier_Status.status
                 db.commit()
+                RateCardCache.invalidate(courier_record.client_id)
                 return GenericResponseModel(
                     status_code=http.HTTPStatus.OK,
                     data=[],
@@ -488,6 +490,7 @@ class ManageCourierForClient:
                 print(f" Created new rate for {Single_rate_upload.courier_slug}")
             print("trigger commit")
             db.commit()
+            RateCardCache.invalidate(client_id)
             return True
 
         except Exception as e:
@@ -619,6 +622,7 @@ class ManageCourierForClient:
                     )
 
                 db.commit()
+                RateCardCache.invalidate(client_id)
 
                 return GenericResponseModel(
                     status_code=http.HTTPStatus.OK,
@@ -749,6 +753,7 @@ class ManageCourierForClient:
 
                 db.add(new_rate)
                 db.commit()
+                RateCardCache.invalidate(client_id)
                 return GenericResponseModel(
                     status_code=http.HTTPStatus.OK,
                     data=[],
@@ -2,7 +2,6 @@ import http
 from psycopg2 import DatabaseError
 from logger import logger
 import os
-import boto3
 from fastapi import UploadFile, File
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy import DateTime
@@ -26,6 +25,9 @@ from models import (
 # schema
 from schema.base import GenericResponseModel
 
+# service
+from modules.aws_s3 import ArtifactStore
+
 from modules.client.client_schema import (
     SignupwithOnboarding,
     OnBoardingForm,
@@ -38,13 +40,6 @@ AWS_SECRET_KEY = os.environ.get("AWS_SECRET_KEY")
 BUCKET_NAME = os.environ.get("BUCKET_NAME")
 REGION_NAME = os.environ.get("REGION_NAME")
 
-# Initialize the S3 client
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=AWS_ACCESS_KEY,
-    aws_secret_access_key=AWS_SECRET_KEY,
-    region_name=REGION_NAME,
-)
 
 
 class ClientOnboardingService:
@@ -1125,11 +1120,8 @@ class ClientOnboardingService:
                 msg=f"Uploading file to S3 bucket: {BUCKET_NAME}, region: {REGION_NAME}",
             )
 
-            s3_client.upload_fileobj(
-                file.file,
-                BUCKET_NAME,
-                s3_key,
-                ExtraArgs={"ContentType": file.content_type},
+            await ArtifactStore.aput_fileobj(
+                s3_key, file.file, file.content_type, bucket=BUCKET_NAME
             )
 
             logger.info(
@@ -0,0 +1,387 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from logger import logger
+from utils.environment import Environment
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is optional
+    redis = None
+
+# models
+from models import Client_Contract, New_Company_To_Client_Rate, Shipping_Partner
+
+
+# a card is reloaded at least this often, even if no write bumped its version
+RATE_CARD_TTL_SECONDS = float(Environment.get_string("RATE_CARD_TTL_SECONDS", "300"))
+
+# clients whose cards are kept per process
+RATE_CARD_CACHE_SIZE = int(Environment.get_string("RATE_CARD_CACHE_SIZE", "10000"))
+
+# with a shared store, how long a worker trusts the version it last read
+RATE_CARD_VERSION_CHECK_SECONDS = float(
+    Environment.get_string("RATE_CARD_VERSION_CHECK_SECONDS", "1")
+)
+
+# optional Redis URL shared by all workers, so a write in one invalidates all
+RATE_CARD_REDIS_URL = Environment.get_string("RATE_CARD_REDIS_URL", "")
+
+RATE_COLUMNS = tuple(
+    f"{prefix}_zone_{zone}"
+    for prefix in ("base_rate", "additional_rate", "rto_base_rate", "rto_additional_rate")
+    for zone in "abcde"
+) + ("percentage_rate", "absolute_rate")
+
+
+@dataclass(frozen=True)
+class ShippingPartnerSnapshot:
+    id: int
+    uuid: str
+    name: str
+    slug: str
+    mode: Optional[str]
+    logo: Optional[str]
+    is_aggregator: bool
+
+    @staticmethod
+    def of(partner: Optional[Shipping_Partner]):
+        if partner is None:
+            return None
+        return ShippingPartnerSnapshot(
+            id=partner.id,
+            uuid=str(partner.uuid),
+            name=partner.name,
+            slug=partner.slug,
+            mode=partner.mode,
+            logo=partner.logo,
+            is_aggregator=partner.is_aggregator,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "uuid": self.uuid,
+            "name": self.name,
+            "slug": self.slug,
+            "mode": self.mode,
+            "logo": self.logo,
+            "is_aggregator": self.is_aggregator,
+        }
+
+
+@dataclass(frozen=True)
+class ClientContractSnapshot:
+    """The client's courier account; tracking_series is a live counter, not cached."""
+
+    id: int
+    isActive: bool
+    credentials: Mapping
+    shipping_partner: Optional[ShippingPartnerSnapshot]
+
+    @property
+    def slug(self) -> Optional[str]:
+        return self.shipping_partner.slug if self.shipping_partner else None
+
+
+@dataclass(frozen=True)
+class RateSnapshot:
+    id: int
+    uuid: str
+    client_id: int
+    company_id: int
+    client_contract_id: int
+    shipping_partner_id: int
+    rate_type: str
+    isActive: bool
+    rates: Mapping[str, Decimal]
+    shipping_partner: Optional[ShippingPartnerSnapshot]
+    client_contract: Optional[ClientContractSnapshot]
+
+    def __getattr__(self, name):
+        # contract.base_rate_zone_a and friends, like on the ORM row
+        rates = self.__dict__.get("rates")
+        if rates is not None and name in rates:
+            return rates[name]
+        raise AttributeError(name)
+
+    def to_dict(self) -> dict:
+        """Column values as ShipmentService.model_to_dict gives them, plus the partner."""
+
+        return {
+            "id": self.id,
+            "uuid": self.uuid,
+            "client_id": self.client_id,
+            "company_id": self.company_id,
+            "client_contract_id": self.client_contract_id,
+            "shipping_partner_id": self.shipping_partner_id,
+            "rate_type": self.rate_type,
+            "isActive": self.isActive,
+            **self.rates,
+            "shipping_partner": (
+                self.shipping_partner.to_dict() if self.shipping_partner else None
+            ),
+        }
+
+
+@dataclass(frozen=True)
+class RateCard:
+    client_id: int
+    version: Tuple[int, int]
+    rates: Tuple[RateSnapshot, ...]
+
+    def active(self) -> Tuple[RateSnapshot, ...]:
+        return tuple(rate for rate in self.rates if rate.isActive)
+
+    def by_id(self, rate_id: int) -> Optional[RateSnapshot]:
+        return next((rate for rate in self.rates if rate.id == int(rate_id)), None)
+
+    def by_contract_id(self, contract_id: int) -> Optional[RateSnapshot]:
+        return next(
+            (rate for rate in self.rates if rate.client_contract_id == int(contract_id)),
+            None,
+        )
+
+    def for_slugs(self, slugs: Iterable[str]) -> Tuple[RateSnapshot, ...]:
+        slugs = set(slugs)
+        return tuple(
+            rate
+            for rate in self.active()
+            if rate.shipping_partner and rate.shipping_partner.slug in slugs
+        )
+
+
+def _rate_card_statement(client_id: int):
+    contract_partner = aliased(Shipping_Partner)
+    return (
+        select(
+            New_Company_To_Client_Rate, Shipping_Partner, Client_Contract, contract_partner
+        )
+        .outerjoin(
+            Shipping_Partner,
+            Shipping_Partner.id == New_Company_To_Client_Rate.shipping_partner_id,
+        )
+        .outerjoin(
+            Client_Contract,
+            Client_Contract.id == New_Company_To_Client_Rate.client_contract_id,
+        )
+        .outerjoin(
+            contract_partner, contract_partner.id == Client_Contract.shipping_partner_id
+        )
+        .where(New_Company_To_Client_Rate.client_id == client_id)
+        .order_by(New_Company_To_Client_Rate.id)
+    )
+
+
+def _snapshot(rate, partner, contract, contract_partner) -> RateSnapshot:
+    return RateSnapshot(
+        id=rate.id,
+        uuid=str(rate.uuid),
+        client_id=rate.client_id,
+        company_id=rate.company_id,
+        client_contract_id=rate.client_contract_id,
+        shipping_partner_id=rate.shipping_partner_id,
+        rate_type=rate.rate_type,
+        isActive=rate.isActive,
+        rates=MappingProxyType({column: getattr(rate, column) for column in RATE_COLUMNS}),
+        shipping_partner=ShippingPartnerSnapshot.of(partner),
+        client_contract=(
+            ClientContractSnapshot(
+                id=contract.id,
+                isActive=contract.isActive,
+                credentials=MappingProxyType(dict(contract.credentials or {})),
+                shipping_partner=ShippingPartnerSnapshot.of(contract_partner),
+            )
+            if contract is not None
+            else None
+        ),
+    )
+
+
+class _LocalVersions:
+    """Version counters of this process only; other workers rely on the TTL."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._versions: Dict[int, int] = {}
+
+    def get(self, client_id: int) -> Tuple[int, int]:
+        return self._generation, self._versions.get(client_id, 0)
+
+    def bump(self, client_id: int):
+        with self._lock:
+            self._versions[client_id] = self._versions.get(client_id, 0) + 1
+
+    def bump_all(self):
+        with self._lock:
+            self._generation += 1
+
+
+class _RedisVersions:
+    """Version counters in Redis, so every worker sees every write."""
+
+    GENERATION_KEY = "rate_card:generation"
+
+    def __init__(self, url: str):
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5)
+
+    @staticmethod
+    def _key(client_id: int) -> str:
+        return f"rate_card:version:{client_id}"
+
+    def get(self, client_id: int) -> Tuple[int, int]:
+        generation, version = self._client.mget(
+            self.GENERATION_KEY, self._key(client_id)
+        )
+        return int(generation or 0), int(version or 0)
+
+    def bump(self, client_id: int):
+        self._client.incr(self._key(client_id))
+
+    def bump_all(self):
+        self._client.incr(self.GENERATION_KEY)
+
+
+@dataclass(frozen=True)
+class _Entry:
+    card: RateCard
+    loaded_at: float
+    checked_at: float
+
+
+class RateCardCache:
+    """
+    Per-client rate cards (New_Company_To_Client_Rate with its shipping
+    partner and client contract) as immutable snapshots shared by every
+    reader: serviceability, rate card, courier priority and booking.
+
+    A card is tagged with its client's version when loaded. Every write path
+    calls invalidate(client_id) after commit, which bumps the version, and
+    the next reader reloads it. Versions live in this process, or in Redis
+    when RATE_CARD_REDIS_URL is set so a write invalidates every worker;
+    RATE_CARD_TTL_SECONDS bounds staleness either way.
+    """
+
+    _lock = threading.Lock()
+    _entries: "OrderedDict[int, _Entry]" = OrderedDict()
+    _local = _LocalVersions()
+    _shared: Optional[_RedisVersions] = None
+
+    if RATE_CARD_REDIS_URL:
+        if redis is None:
+            logger.warning(
+                msg="RATE_CARD_REDIS_URL is set but redis is not installed, "
+                "rate card versions stay per process"
+            )
+        else:
+            _shared = _RedisVersions(RATE_CARD_REDIS_URL)
+
+    @classmethod
+    def _version(cls, client_id: int) -> Tuple[int, int]:
+        if cls._shared is not None:
+            try:
+                return cls._shared.get(client_id)
+            except Exception as e:
+                logger.error(msg=f"Rate card version lookup failed: {str(e)}")
+        return cls._local.get(client_id)
+
+    @classmethod
+    def _cached(cls, client_id: int) -> Tuple[Optional[RateCard], Tuple[int, int]]:
+        now = time.monotonic()
+        entry = cls._entries.get(client_id)
+
+        if entry is not None and now - entry.loaded_at < RATE_CARD_TTL_SECONDS:
+            # a shared version is re-read once per check interval, not per lookup
+            if (
+                cls._shared is not None
+                and now - entry.checked_at < RATE_CARD_VERSION_CHECK_SECONDS
+            ):
+                return entry.card, entry.card.version
+
+            version = cls._version(client_id)
+            if entry.card.version == version:
+                with cls._lock:
+                    cls._entries[client_id] = _Entry(entry.card, entry.loaded_at, now)
+                    cls._entries.move_to_end(client_id)
+                return entry.card, version
+            return None, version
+
+        return None, cls._version(client_id)
+
+    @classmethod
+    def _store(cls, client_id: int, version: Tuple[int, int], rows) -> RateCard:
+        card = RateCard(
+            client_id=client_id,
+            version=version,
+            rates=tuple(_snapshot(*row) for row in rows),
+        )
+
+        now = time.monotonic()
+        with cls._lock:
+            cls._entries[client_id] = _Entry(card, now, now)
+            cls._entries.move_to_end(client_id)
+            while len(cls._entries) > RATE_CARD_CACHE_SIZE:
+                cls._entries.popitem(last=False)
+        return card
+
+    @classmethod
+    def get(cls, db, client_id) -> RateCard:
+        """Rate card of `client_id`, loading it through a sync session if stale."""
+
+        client_id = int(client_id)
+        card, version = cls._cached(client_id)
+        if card is not None:
+            return card
+
+        # the version is read before loading, so a write racing the load
+        # leaves the card stale and the next reader loads it again
+        rows = db.execute(_rate_card_statement(client_id)).all()
+        return cls._store(client_id, version, rows)
+
+    @classmethod
+    async def aget(cls, db, client_id) -> RateCard:
+        """Same as get(), for an AsyncSession."""
+
+        client_id = int(client_id)
+        card, version = cls._cached(client_id)
+        if card is not None:
+            return card
+
+        rows = (await db.execute(_rate_card_statement(client_id))).all()
+        return cls._store(client_id, version, rows)
+
+    @classmethod
+    def invalidate(cls, client_id):
+        """Call after committing any change to a client's rates or contracts."""
+
+        client_id = int(client_id)
+        cls._local.bump(client_id)
+        if cls._shared is not None:
+            try:
+                cls._shared.bump(client_id)
+            except Exception as e:
+                logger.error(msg=f"Rate card invalidation failed: {str(e)}")
+
+        with cls._lock:
+            cls._entries.pop(client_id, None)
+
+    @classmethod
+    def invalidate_all(cls):
+        cls._local.bump_all()
+        if cls._shared is not None:
+            try:
+                cls._shared.bump_all()
+            except Exception as e:
+                logger.error(msg=f"Rate card invalidation failed: {str(e)}")
+
+        with cls._lock:
+            cls._entries.clear()
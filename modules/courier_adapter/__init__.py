@@ -0,0 +1 @@
+from .courier_adapter import Booking, CourierAdapter, CourierRegistry
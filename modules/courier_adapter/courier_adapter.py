@@ -0,0 +1,223 @@
+import asyncio
+import http
+import inspect
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# schema
+from schema.base import GenericResponseModel
+
+# service
+from modules.partner_health import PartnerHealth
+
+
+OPERATIONS = ("create_order", "track", "cancel", "ndr_action", "label")
+
+
+@dataclass
+class Booking:
+    """
+    Everything a courier needs to book one shipment, loaded by the caller so
+    the adapter does not have to query for it.
+    """
+
+    order: Any
+    credentials: Dict[str, str]
+    delivery_partner: Any
+    company_contract: Any = None
+    pickup_location: Any = None
+    is_reverse: bool = False
+
+
+def _unsupported(slug: str, operation: str) -> GenericResponseModel:
+    return GenericResponseModel(
+        status_code=http.HTTPStatus.NOT_IMPLEMENTED,
+        status=False,
+        message=f"{slug} does not support {operation}",
+    )
+
+
+class CourierAdapter:
+    """
+    Async interface of a courier integration. Every operation answers with a
+    GenericResponseModel; one the courier does not offer answers
+    NOT_IMPLEMENTED, and supports() tells so up front.
+
+    Subclasses override the operations their courier has.
+    """
+
+    def __init__(self, slug: str):
+        self.slug = slug
+
+    def supports(self, operation: str) -> bool:
+        return False
+
+    async def create_order(self, booking: Booking) -> GenericResponseModel:
+        return _unsupported(self.slug, "create_order")
+
+    async def track(self, order, awb_number: str) -> GenericResponseModel:
+        return _unsupported(self.slug, "track")
+
+    async def cancel(self, order, awb_number: str) -> GenericResponseModel:
+        return _unsupported(self.slug, "cancel")
+
+    async def ndr_action(self, order, awb_number: str) -> GenericResponseModel:
+        return _unsupported(self.slug, "ndr_action")
+
+    async def label(self, order) -> GenericResponseModel:
+        return _unsupported(self.slug, "label")
+
+    async def serviceable(
+        self, db, pickup_pincode, consignee_pincode, payment_mode, client_id=None
+    ) -> bool:
+        # imported here, modules.serviceability imports the courier mapping
+        # that builds this registry
+        from modules.serviceability.pincode_index import PincodeServiceabilityIndex
+
+        return await PincodeServiceabilityIndex.ais_serviceable(
+            db, self.slug, pickup_pincode, consignee_pincode, payment_mode, client_id
+        )
+
+
+class LegacyCourierAdapter(CourierAdapter):
+    """
+    The interface over one of the static-method courier classes in
+    shipping_partner/, through its circuit breakers. Blocking calls run on a
+    worker thread with the request's context, so they no longer hold up the
+    event loop; an adapter's async dev_create_order, where it has one, is
+    used as is.
+    """
+
+    # operation -> courier class methods implementing it, preferred first
+    METHODS = {
+        "create_order": ("create_order",),
+        "create_reverse_order": ("create_reverse_order",),
+        "track": ("track_shipment",),
+        "cancel": ("cancel_shipment",),
+        "ndr_action": ("ndr_action",),
+        "label": ("generate_label", "generate_shipping_label"),
+    }
+
+    def __init__(self, slug: str, adapter):
+        super().__init__(slug)
+        self.adapter = adapter
+        # every call still goes through the courier's circuit breakers
+        self.partner = PartnerHealth.guard(slug, adapter)
+
+    def _method(self, operation: str):
+        for name in self.METHODS[operation]:
+            if hasattr(self.adapter, name):
+                return getattr(self.partner, name)
+        return None
+
+    def supports(self, operation: str) -> bool:
+        return self._method(operation) is not None
+
+    async def _call(self, operation: str, *args, **kwargs) -> GenericResponseModel:
+        method = self._method(operation)
+        if method is None:
+            return _unsupported(self.slug, operation)
+        if inspect.iscoroutinefunction(method):
+            return await method(*args, **kwargs)
+        return await asyncio.to_thread(method, *args, **kwargs)
+
+    def _create_call(self, booking: Booking, native: bool = True):
+        operation = "create_reverse_order" if booking.is_reverse else "create_order"
+
+        dev_create_order = getattr(self.adapter, "dev_create_order", None)
+        if (
+            native
+            and not booking.is_reverse
+            and inspect.iscoroutinefunction(dev_create_order)
+        ):
+            method = self.partner.dev_create_order
+        else:
+            method = self._method(operation)
+        if method is None:
+            return operation, None, ()
+
+        args = (booking.order, booking.credentials, booking.delivery_partner)
+        # some couriers (ekart) also book against the company contract
+        if "company_contract" in inspect.signature(method).parameters:
+            args += (booking.company_contract,)
+        return operation, method, args
+
+    async def create_order(self, booking: Booking) -> GenericResponseModel:
+        operation, method, args = self._create_call(booking)
+        if method is None:
+            return _unsupported(self.slug, operation)
+        if inspect.iscoroutinefunction(method):
+            return await method(*args)
+        return await asyncio.to_thread(method, *args)
+
+    def create_order_blocking(self, booking: Booking) -> GenericResponseModel:
+        """
+        create_order() for sync code paths that are not on the event loop yet;
+        these always book through the courier's sync create_order.
+        """
+
+        operation, method, args = self._create_call(booking, native=False)
+        if method is None or inspect.iscoroutinefunction(method):
+            return _unsupported(self.slug, operation)
+        return method(*args)
+
+    async def track(self, order, awb_number: str) -> GenericResponseModel:
+        return await self._call("track", order=order, awb_number=awb_number)
+
+    async def cancel(self, order, awb_number: str) -> GenericResponseModel:
+        return await self._call("cancel", order, awb_number)
+
+    async def ndr_action(self, order, awb_number: str) -> GenericResponseModel:
+        return await self._call("ndr_action", order, awb_number)
+
+    async def label(self, order) -> GenericResponseModel:
+        return await self._call("label", order)
+
+
+class CourierRegistry:
+    """
+    Courier slug -> CourierAdapter. Couriers are registered by
+    data/courier_service_mapping.py, which still exposes the guarded sync
+    classes as courier_service_mapping for code not moved to the interface.
+
+        courier = CourierRegistry.get(shipping_partner_slug)
+        response = await courier.create_order(Booking(order, credentials, partner))
+    """
+
+    _adapters: Dict[str, CourierAdapter] = {}
+
+    @staticmethod
+    def _load():
+        # registration imports every courier integration, load it on first use
+        import data.courier_service_mapping  # noqa: F401
+
+    @classmethod
+    def register(cls, slug: str, adapter) -> CourierAdapter:
+        """Registers a CourierAdapter, or wraps a shipping_partner/ courier class."""
+
+        if not isinstance(adapter, CourierAdapter):
+            adapter = LegacyCourierAdapter(slug, adapter)
+        cls._adapters[slug] = adapter
+        return adapter
+
+    @classmethod
+    def get(cls, slug: Optional[str]) -> Optional[CourierAdapter]:
+        if not cls._adapters:
+            cls._load()
+        return cls._adapters.get(slug)
+
+    @classmethod
+    def slugs(cls) -> List[str]:
+        if not cls._adapters:
+            cls._load()
+        return list(cls._adapters)
+
+    @classmethod
+    def legacy_mapping(cls) -> Dict[str, Any]:
+        """Slug -> guarded static-method courier class."""
+
+        return {
+            slug: adapter.partner
+            for slug, adapter in cls._adapters.items()
+            if isinstance(adapter, LegacyCourierAdapter)
+        }
@@ -0,0 +1,499 @@
+import argparse
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+
+from database.db import AsyncSessionLocal
+from logger import logger
+from utils.environment import Environment
+
+# models
+from models import Client, New_Company_To_Client_Rate, Order, Shipping_Partner
+
+# data
+from data.courier_buy_rates import COURIER_BUY_RATES, normalize_courier_partner
+
+
+# orders fetched from the cursor and priced per batch
+PNL_BATCH_SIZE = int(Environment.get_string("PNL_BATCH_SIZE", "50000"))
+
+ZONES = ("a", "b", "c", "d", "e")
+DEFAULT_ZONE = ZONES.index("d")
+
+# sell rates are charged on the same slabs and GST everywhere in the app
+SELL_MIN_CHARGEABLE_WEIGHT = 0.5
+SELL_ADDITIONAL_WEIGHT_BRACKET = 0.5
+SELL_TAX_RATE = 18.0
+
+ROLLUP_KEYS = ["client_id", "aggregator", "courier_partner", "zone"]
+
+# index of the rollup PnlEngine.run returns
+REPORT_KEYS = ["client_id", "client_name", *ROLLUP_KEYS[1:]]
+
+AMOUNT_COLUMNS = [
+    "sell_forward_freight",
+    "sell_rto_freight",
+    "sell_cod_charge",
+    "sell_tax",
+    "sell_total",
+    "buy_forward_freight",
+    "buy_rto_freight",
+    "buy_cod_charge",
+    "buy_surcharges",
+    "buy_tax",
+    "buy_total",
+    "forward_margin",
+    "rto_margin",
+    "cod_margin",
+    "tax_margin",
+    "margin",
+]
+
+COUNT_COLUMNS = ["orders", "rto_orders", "unpriced_orders", "unbilled_orders"]
+
+ORDER_COLUMNS = (
+    Order.id,
+    Order.order_id,
+    Order.client_id,
+    Order.aggregator,
+    Order.courier_partner,
+    Order.zone,
+    Order.applicable_weight,
+    Order.order_value,
+    Order.total_amount,
+    Order.payment_mode,
+    Order.status,
+    Order.rto_initiated_date,
+    Order.forward_freight,
+    Order.forward_cod_charge,
+    Order.forward_tax,
+    Order.rto_freight,
+    Order.rto_tax,
+)
+
+
+@dataclass(frozen=True)
+class RateTable:
+    """
+    Rate cards compiled to dense arrays, one row per card: per-zone rates are
+    (cards, 5) matrices so a batch of orders is priced with fancy indexing.
+    A last row of NaN rates is what orders without a card are priced with,
+    so a table without any card prices every order as NaN.
+    """
+
+    keys: Dict[Tuple, int]
+    min_weight: np.ndarray
+    bracket: np.ndarray
+    base: np.ndarray
+    additional: np.ndarray
+    rto_base: np.ndarray
+    rto_additional: np.ndarray
+    cod_percentage: np.ndarray
+    cod_absolute: np.ndarray
+    tax_rate: np.ndarray
+    fuel_surcharge: np.ndarray
+    handling_charge: np.ndarray
+
+    @staticmethod
+    def _build(cards: Dict[Tuple, dict]) -> "RateTable":
+        def column(field):
+            return np.array(
+                [*(float(card[field]) for card in cards.values()), np.nan], dtype=float
+            )
+
+        def zones(field):
+            return np.array(
+                [
+                    *([float(card[field][zone]) for zone in ZONES] for card in cards.values()),
+                    [np.nan] * len(ZONES),
+                ],
+                dtype=float,
+            )
+
+        return RateTable(
+            keys={key: row for row, key in enumerate(cards)},
+            min_weight=column("min_weight"),
+            bracket=column("bracket"),
+            base=zones("base"),
+            additional=zones("additional"),
+            rto_base=zones("rto_base"),
+            rto_additional=zones("rto_additional"),
+            cod_percentage=column("cod_percentage"),
+            cod_absolute=column("cod_absolute"),
+            tax_rate=column("tax_rate"),
+            fuel_surcharge=column("fuel_surcharge"),
+            handling_charge=column("handling_charge"),
+        )
+
+    @staticmethod
+    def compile_buy(buy_rates: dict = COURIER_BUY_RATES) -> "RateTable":
+        """COURIER_BUY_RATES keyed by (aggregator, courier)."""
+
+        def zone_rates(config, name):
+            rates = config.get(name, {})
+            return {zone: rates.get(f"zone_{zone}", 0) for zone in ZONES}
+
+        cards = {}
+        for aggregator, couriers in buy_rates.items():
+            for courier, config in couriers.items():
+                cod = config.get("cod_charges", {})
+                cards[(aggregator, courier)] = {
+                    "min_weight": config["min_chargeable_weight"],
+                    "bracket": config["additional_weight_bracket"],
+                    "base": zone_rates(config, "base_rates"),
+                    "additional": zone_rates(config, "additional_rates"),
+                    "rto_base": zone_rates(config, "rto_base_rates"),
+                    "rto_additional": zone_rates(config, "rto_additional_rates"),
+                    "cod_percentage": cod.get("percentage_rate", 0),
+                    "cod_absolute": cod.get("absolute_rate", 0),
+                    "tax_rate": config.get("tax_rate", 18),
+                    "fuel_surcharge": config.get("fuel_surcharge", 0),
+                    "handling_charge": config.get("handling_charge", 0),
+                }
+        return RateTable._build(cards)
+
+    @staticmethod
+    def compile_sell(rates: Iterable) -> "RateTable":
+        """Active client rate cards keyed by (client_id, shipping partner slug)."""
+
+        cards = {}
+        for rate, slug in rates:
+            cards.setdefault(
+                (rate.client_id, slug),
+                {
+                    "min_weight": SELL_MIN_CHARGEABLE_WEIGHT,
+                    "bracket": SELL_ADDITIONAL_WEIGHT_BRACKET,
+                    "base": {z: getattr(rate, f"base_rate_zone_{z}") for z in ZONES},
+                    "additional": {
+                        z: getattr(rate, f"additional_rate_zone_{z}") for z in ZONES
+                    },
+                    "rto_base": {
+                        z: getattr(rate, f"rto_base_rate_zone_{z}") for z in ZONES
+                    },
+                    "rto_additional": {
+                        z: getattr(rate, f"rto_additional_rate_zone_{z}") for z in ZONES
+                    },
+                    "cod_percentage": rate.percentage_rate,
+                    "cod_absolute": rate.absolute_rate,
+                    "tax_rate": SELL_TAX_RATE,
+                    "fuel_surcharge": 0,
+                    "handling_charge": 0,
+                },
+            )
+        return RateTable._build(cards)
+
+    def rows(self, keys: pd.Series) -> np.ndarray:
+        """Card row per key, -1 where there is no card."""
+
+        return keys.map(self.keys).fillna(-1).to_numpy(dtype=np.int64)
+
+    def lookup(self, rows: np.ndarray) -> np.ndarray:
+        """Array index per card row, the NaN row for -1."""
+
+        return np.where(rows >= 0, rows, len(self.keys))
+
+    def brackets(self, rows, weight):
+        min_weight = self.min_weight[rows]
+        extra = np.ceil((weight - min_weight) / self.bracket[rows])
+        return np.where(weight < min_weight, 0.0, extra)
+
+    def freight(self, rows, zones, brackets, rto: bool = False):
+        base, additional = (
+            (self.rto_base, self.rto_additional) if rto else (self.base, self.additional)
+        )
+        return base[rows, zones] + additional[rows, zones] * brackets
+
+    def cod(self, rows, amount):
+        return np.maximum(self.cod_absolute[rows], amount * self.cod_percentage[rows] / 100)
+
+
+def _buy_keys(frame: pd.DataFrame) -> pd.Series:
+    # couriers are normalized once per distinct pair, not once per order
+    pairs = frame[["aggregator", "courier_partner"]].fillna("")
+    codes, uniques = pd.factorize(pd.MultiIndex.from_frame(pairs))
+    normalized = [
+        (aggregator, normalize_courier_partner(aggregator, courier) if aggregator else "")
+        for aggregator, courier in uniques
+    ]
+    return pd.Series([normalized[code] for code in codes], index=frame.index)
+
+
+def _masked(values, rows):
+    return np.where(rows >= 0, values, np.nan)
+
+
+def price_orders(frame: pd.DataFrame, buy: RateTable, sell: RateTable) -> pd.DataFrame:
+    """
+    Buy and sell charges and margins of a batch of orders, in the same way
+    calculate_buy_freight and ServiceabilityService.calculate_freight price a
+    single order. Billed charges stored on the order win over the sell card.
+    """
+
+    for name in (
+        "applicable_weight",
+        "order_value",
+        "total_amount",
+        "forward_freight",
+        "forward_cod_charge",
+        "forward_tax",
+        "rto_freight",
+        "rto_tax",
+    ):
+        frame[name] = pd.to_numeric(frame[name], errors="coerce").astype(float)
+
+    zone_letters = frame["zone"].fillna("D").str.lower()
+    zones = zone_letters.map({zone: i for i, zone in enumerate(ZONES)})
+    zones = zones.fillna(DEFAULT_ZONE).to_numpy(dtype=np.int64)
+    weight = frame["applicable_weight"].fillna(0).to_numpy()
+    is_cod = (frame["payment_mode"].fillna("").str.lower() == "cod").to_numpy()
+    is_rto = (
+        frame["rto_initiated_date"].notna() | (frame["status"].str.upper() == "RTO")
+    ).to_numpy()
+
+    # buy side, as calculate_buy_freight: an RTO pays both legs and gets the
+    # forward COD charge refunded
+    buy_rows = buy.rows(_buy_keys(frame))
+    b = buy.lookup(buy_rows)
+    buy_brackets = buy.brackets(b, weight)
+    buy_forward = buy.freight(b, zones, buy_brackets)
+    buy_rto = np.where(is_rto, buy.freight(b, zones, buy_brackets, rto=True), 0.0)
+    buy_cod = np.where(
+        is_cod, buy.cod(b, frame["order_value"].fillna(0).to_numpy()), 0.0
+    )
+    buy_cod = np.where(is_rto, -buy_cod, buy_cod)
+    freight = buy_forward + buy_rto
+    buy_surcharges = freight * buy.fuel_surcharge[b] / 100 + buy.handling_charge[b]
+    buy_tax = (freight + buy_cod + buy_surcharges) * buy.tax_rate[b] / 100
+
+    # sell side: what was billed, else the client's current rate card
+    sell_keys = pd.Series(
+        list(zip(frame["client_id"], frame["courier_partner"])), index=frame.index
+    )
+    sell_rows = sell.rows(sell_keys)
+    s = sell.lookup(sell_rows)
+    sell_brackets = sell.brackets(s, weight)
+    card_forward = _masked(sell.freight(s, zones, sell_brackets), sell_rows)
+    card_rto = _masked(sell.freight(s, zones, sell_brackets, rto=True), sell_rows)
+    card_cod = _masked(
+        sell.cod(s, frame["total_amount"].fillna(0).to_numpy()), sell_rows
+    )
+
+    sell_forward = frame["forward_freight"].fillna(pd.Series(card_forward, index=frame.index))
+    sell_cod = frame["forward_cod_charge"].fillna(
+        pd.Series(np.where(is_cod, card_cod, 0.0), index=frame.index)
+    )
+    sell_rto = frame["rto_freight"].fillna(
+        pd.Series(np.where(is_rto, card_rto, 0.0), index=frame.index)
+    )
+    sell_forward_tax = frame["forward_tax"].fillna(
+        (sell_forward + sell_cod) * SELL_TAX_RATE / 100
+    )
+    sell_rto_tax = frame["rto_tax"].fillna(sell_rto * SELL_TAX_RATE / 100)
+
+    priced = frame[["id", "order_id", *ROLLUP_KEYS]].copy()
+    priced["zone"] = zone_letters.str.upper()
+    priced["is_rto"] = is_rto
+    priced["sell_forward_freight"] = sell_forward
+    priced["sell_rto_freight"] = sell_rto
+    priced["sell_cod_charge"] = sell_cod
+    priced["sell_tax"] = sell_forward_tax + sell_rto_tax
+    priced["sell_total"] = (
+        priced["sell_forward_freight"]
+        + priced["sell_rto_freight"]
+        + priced["sell_cod_charge"]
+        + priced["sell_tax"]
+    )
+
+    priced["buy_forward_freight"] = _masked(buy_forward, buy_rows)
+    priced["buy_rto_freight"] = _masked(buy_rto, buy_rows)
+    priced["buy_cod_charge"] = _masked(buy_cod, buy_rows)
+    priced["buy_surcharges"] = _masked(buy_surcharges, buy_rows)
+    priced["buy_tax"] = _masked(buy_tax, buy_rows)
+    priced["buy_total"] = (
+        priced["buy_forward_freight"]
+        + priced["buy_rto_freight"]
+        + priced["buy_cod_charge"]
+        + priced["buy_surcharges"]
+        + priced["buy_tax"]
+    )
+
+    priced["forward_margin"] = priced["sell_forward_freight"] - priced["buy_forward_freight"]
+    priced["rto_margin"] = priced["sell_rto_freight"] - priced["buy_rto_freight"]
+    priced["cod_margin"] = priced["sell_cod_charge"] - priced["buy_cod_charge"]
+    priced["tax_margin"] = priced["sell_tax"] - priced["buy_tax"]
+    priced["margin"] = priced["sell_total"] - priced["buy_total"]
+    priced["unpriced"] = buy_rows < 0
+    priced["unbilled"] = priced["sell_total"].isna().to_numpy()
+
+    return priced
+
+
+def _rollup(priced: pd.DataFrame) -> pd.DataFrame:
+    # amounts are summed over orders priced on both sides only, so buy and
+    # sell totals of a group always cover the same orders
+    amounts = priced[AMOUNT_COLUMNS].mask(priced["unpriced"] | priced["unbilled"], 0.0)
+    frame = pd.concat(
+        [priced[ROLLUP_KEYS].fillna(""), amounts, priced[["is_rto", "unpriced", "unbilled"]]],
+        axis=1,
+    )
+
+    grouped = frame.groupby(ROLLUP_KEYS, sort=False)
+    rollup = grouped[AMOUNT_COLUMNS].sum()
+    rollup["orders"] = grouped.size()
+    rollup["rto_orders"] = grouped["is_rto"].sum()
+    rollup["unpriced_orders"] = grouped["unpriced"].sum()
+    rollup["unbilled_orders"] = grouped["unbilled"].sum()
+    return rollup
+
+
+def summarize(rollup: pd.DataFrame, keys) -> pd.DataFrame:
+    """Re-aggregate the finest rollup to `keys`, with margin as % of sell."""
+
+    summary = rollup.groupby(level=keys).sum()
+    summary["margin_pct"] = (
+        summary["margin"] / summary["sell_total"].replace(0, np.nan) * 100
+    ).round(2)
+    return summary.round(2)
+
+
+class PnlEngine:
+    """
+    Buy-vs-sell P&L over booked orders.
+
+    Buy rates (COURIER_BUY_RATES) and the clients' sell rate cards are
+    compiled once into RateTable arrays. Orders are streamed in batches of
+    PNL_BATCH_SIZE as a narrow projection and priced with numpy per batch;
+    only the (client, aggregator, courier, zone) sums are kept, so a quarter
+    of orders is a handful of batches, not millions of Python dict walks.
+    """
+
+    @staticmethod
+    async def _sell_table(session, client_ids: Optional[Iterable[int]]) -> RateTable:
+        statement = (
+            select(New_Company_To_Client_Rate, Shipping_Partner.slug)
+            .join(
+                Shipping_Partner,
+                Shipping_Partner.id == New_Company_To_Client_Rate.shipping_partner_id,
+            )
+            .where(
+                New_Company_To_Client_Rate.isActive == True,
+                New_Company_To_Client_Rate.rate_type == "forward",
+            )
+            .order_by(New_Company_To_Client_Rate.id)
+        )
+        if client_ids is not None:
+            statement = statement.where(
+                New_Company_To_Client_Rate.client_id.in_(list(client_ids))
+            )
+        return RateTable.compile_sell((await session.execute(statement)).all())
+
+    @staticmethod
+    def _orders(start: datetime, end: datetime, client_ids: Optional[Iterable[int]]):
+        statement = (
+            select(*ORDER_COLUMNS)
+            .where(
+                Order.booking_date >= start,
+                Order.booking_date < end,
+                Order.aggregator.isnot(None),
+            )
+            .order_by(Order.id)
+            .execution_options(yield_per=PNL_BATCH_SIZE)
+        )
+        if client_ids is not None:
+            statement = statement.where(Order.client_id.in_(list(client_ids)))
+        return statement
+
+    @staticmethod
+    async def run(
+        start: datetime,
+        end: datetime,
+        client_ids: Optional[Iterable[int]] = None,
+        detail_csv=None,
+    ) -> pd.DataFrame:
+        """
+        Rollup by client / aggregator / courier / zone of orders booked in
+        [start, end). Pass a text file as `detail_csv` to also get every
+        priced order, written batch by batch.
+        """
+
+        buy = RateTable.compile_buy()
+        columns = [column.key for column in ORDER_COLUMNS]
+
+        partials = []
+        order_count = 0
+        async with AsyncSessionLocal() as session:
+            sell = await PnlEngine._sell_table(session, client_ids)
+
+            result = await session.stream(PnlEngine._orders(start, end, client_ids))
+            async for rows in result.partitions():
+                frame = pd.DataFrame.from_records(rows, columns=columns)
+                priced = await asyncio.to_thread(price_orders, frame, buy, sell)
+
+                if detail_csv is not None:
+                    priced.to_csv(detail_csv, header=order_count == 0, index=False)
+
+                partials.append(_rollup(priced))
+                order_count += len(priced)
+
+            client_names = dict(
+                (await session.execute(select(Client.id, Client.client_name))).all()
+            )
+
+        if not partials:
+            # same shape as a rollup, so export and callers need no special case
+            return pd.DataFrame(
+                columns=[*AMOUNT_COLUMNS, *COUNT_COLUMNS],
+                index=pd.MultiIndex.from_tuples([], names=REPORT_KEYS),
+                dtype=float,
+            )
+
+        rollup = pd.concat(partials).groupby(level=ROLLUP_KEYS).sum()
+        rollup = rollup.reset_index()
+        rollup.insert(1, "client_name", rollup["client_id"].map(client_names))
+        rollup = rollup.set_index(REPORT_KEYS)
+
+        logger.info(msg=f"P&L run priced {order_count} orders from {start} to {end}")
+        return rollup
+
+    @staticmethod
+    def export(rollup: pd.DataFrame, output):
+        """Workbook with the rollup by client, courier, zone and in full."""
+
+        sheets = {
+            "By Client": ["client_id", "client_name"],
+            "By Courier": ["aggregator", "courier_partner"],
+            "By Zone": ["zone"],
+            "Detail": REPORT_KEYS,
+        }
+        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+            for sheet, keys in sheets.items():
+                summarize(rollup, keys).to_excel(writer, sheet_name=sheet)
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="Buy-vs-sell P&L of booked orders")
+    parser.add_argument("start", type=datetime.fromisoformat)
+    parser.add_argument("end", type=datetime.fromisoformat, help="exclusive")
+    parser.add_argument("--client", type=int, action="append", dest="client_ids")
+    parser.add_argument("--out", default="pnl.xlsx")
+    parser.add_argument("--detail", help="also write every priced order to this csv")
+    args = parser.parse_args()
+
+    async def run():
+        if args.detail:
+            with open(args.detail, "w", newline="") as detail_csv:
+                return await PnlEngine.run(
+                    args.start, args.end, args.client_ids, detail_csv
+                )
+        return await PnlEngine.run(args.start, args.end, args.client_ids)
+
+    PnlEngine.export(asyncio.run(run()), args.out)
+
+
+if __name__ == "__main__":
+    _main()
@@ -43,6 +43,7 @@ from models import (
 from modules.serviceability import ServiceabilityService
 
 from modules.shipment import ShipmentService
+from modules.client_contract.rate_card_cache import RateCardCache
 
 # schema
 from schema.base import GenericResponseModel
@@ -302,17 +303,7 @@ class CourierPriorityService:
                 user_data = context_user_data.get()
                 client_id = str(user_data.client_id)
 
-                fetched_contracts = (
-                    db.query(New_Company_To_Client_Rate)
-                    .filter(
-                        New_Company_To_Client_Rate.isActive == True,
-                        New_Company_To_Client_Rate.client_id == client_id,
-                    )
-                    .options(
-                        joinedload(New_Company_To_Client_Rate.shipping_partner),
-                    )
-                    .all()
-                )
+                fetched_contracts = RateCardCache.get(db, client_id).active()
 
                 # print(jsonable_encoder(fetched_contracts), "||fetched_contracts||")
                 Client_meta_exist = (
@@ -344,7 +335,9 @@ class CourierPriorityService:
                 data={
                     "assigned_list": [
                         Assigned_Courier_Response_Model(
-                            **jsonable_encoder(item.shipping_partner, exclude_none=True)
+                            **jsonable_encoder(
+                                item.shipping_partner.to_dict(), exclude_none=True
+                            )
                         )
                         for item in fetched_contracts
                         if item.shipping_partner
@@ -7,6 +7,7 @@ from sqlalchemy import func, case, cast, DateTime, select
 
 from logger import logger
 from context_manager.context import context_user_data, get_db_session
+from database.routing import use_read_replica
 
 # models
 from models import Order
@@ -20,6 +21,7 @@ from .dashboard_schema import dashboard_filters
 class DashboardService:
 
     @staticmethod
+    @use_read_replica
     async def get_performance_data(filters: dashboard_filters) -> GenericResponseModel:
         db: AsyncSession | None = None
         try:
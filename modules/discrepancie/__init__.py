@@ -1,2 +1,3 @@
 from .discrepancie_controller import discrepancie_router
 from .discrepancie_service import DiscrepancieService
+from .discrepancie_auto_accept import DiscrepancyAutoAcceptJob
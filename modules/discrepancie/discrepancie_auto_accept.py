@@ -0,0 +1,124 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import insert, update
+
+from database.db import AsyncSessionLocal
+from logger import logger
+from utils.environment import Environment
+
+# models
+from models import Admin_Rate_Discrepancie, Admin_Rate_Discrepancie_History
+
+
+# discrepancies nobody acted on for this long are accepted on the client's behalf
+INACTIVITY_DAYS = 7
+AUTO_ACCEPT_INTERVAL_SECONDS = int(
+    Environment.get_string("DISCREPANCY_AUTO_ACCEPT_INTERVAL_SECONDS", "900")
+)
+
+AUTO_ACCEPTED_STATUS = "auto_accepted_Inactivity"
+AUTO_ACCEPTED_HISTORY_STATUS = "Auto Accepted Due to Inactivity"
+AUTO_ACCEPTED_BY = "warehousity"
+
+HISTORY_COLUMNS = (
+    "awb_number",
+    "length",
+    "width",
+    "height",
+    "volumetric_weight",
+    "dead_weight",
+    "applied_weight",
+    "courier_weight",
+    "charged_weight",
+    "charged_weight_charge",
+    "excess_weight_charge",
+    "image1",
+    "image2",
+    "image3",
+)
+
+
+class DiscrepancyAutoAcceptJob:
+    """
+    Periodic batch that accepts stale new / re-scheduled discrepancies for all
+    clients at once: one UPDATE ... RETURNING and one bulk history INSERT per
+    run, instead of doing it on every discrepancy list request.
+    """
+
+    _task: Optional[asyncio.Task] = None
+
+    @classmethod
+    async def start(cls):
+        if cls._task is not None:
+            return
+
+        cls._task = asyncio.create_task(cls._run_forever())
+        logger.info(msg="Discrepancy auto-accept job started")
+
+    @classmethod
+    async def stop(cls):
+        if cls._task is None:
+            return
+
+        cls._task.cancel()
+        try:
+            await cls._task
+        except asyncio.CancelledError:
+            pass
+        cls._task = None
+
+    @classmethod
+    async def _run_forever(cls):
+        while True:
+            try:
+                await cls.run_once()
+            except Exception as e:
+                logger.error(msg=f"Discrepancy auto-accept run failed: {str(e)}")
+
+            await asyncio.sleep(AUTO_ACCEPT_INTERVAL_SECONDS)
+
+    @staticmethod
+    async def run_once(now: Optional[datetime] = None) -> int:
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=INACTIVITY_DAYS)
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Admin_Rate_Discrepancie)
+                .where(
+                    Admin_Rate_Discrepancie.updated_at < cutoff,
+                    Admin_Rate_Discrepancie.status.in_(["new_disc", "re_new_disc"]),
+                )
+                .values(status=AUTO_ACCEPTED_STATUS, action_by=AUTO_ACCEPTED_BY)
+                .returning(
+                    Admin_Rate_Discrepancie.id,
+                    *(
+                        getattr(Admin_Rate_Discrepancie, column)
+                        for column in HISTORY_COLUMNS
+                    ),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            accepted = result.all()
+
+            if accepted:
+                await session.execute(
+                    insert(Admin_Rate_Discrepancie_History),
+                    [
+                        {
+                            **{column: getattr(row, column) for column in HISTORY_COLUMNS},
+                            "discrepancie_id": row.id,
+                            "status": AUTO_ACCEPTED_HISTORY_STATUS,
+                            "action_by": AUTO_ACCEPTED_BY,
+                        }
+                        for row in accepted
+                    ],
+                )
+
+            await session.commit()
+
+        if accepted:
+            logger.info(msg=f"Auto-accepted {len(accepted)} inactive discrepancies")
+
+        return len(accepted)
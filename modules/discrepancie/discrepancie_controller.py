@@ -13,7 +13,7 @@ import os
 
 from typing import Any, List, Dict
 from datetime import datetime
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, StreamingResponse
 
 # schema
 from schema.base import GenericResponseModel
@@ -31,6 +31,7 @@ from modules.discrepancie.discrepancie_schema import (
 
 # utils
 from utils.response_handler import build_api_response
+from database.routing import read_replica
 
 # services
 from .discrepancie_service import DiscrepancieService
@@ -170,7 +171,7 @@ async def accept_Bulk_Description(
 )
 async def dispute_file_upload(file: UploadFile = File(...), category: str = Form(...)):
     try:
-        response: GenericResponseModel = DiscrepancieService.dispute_file_upload(
+        response: GenericResponseModel = await DiscrepancieService.dispute_file_upload(
             file, category
         )
         return build_api_response(response)
@@ -237,9 +238,10 @@ async def bulk_dispute(bulk_dispute: Bulk_Dispute_Model):
 )
 async def report(status: Status_Model_Schema):
     try:
-        response: GenericResponseModel = DiscrepancieService.generate_report(
-            status=status
-        )
+        async with read_replica():
+            response: GenericResponseModel = DiscrepancieService.generate_report(
+                status=status
+            )
         return build_api_response(response)
 
     except Exception as e:
@@ -250,3 +252,36 @@ async def report(status: Status_Model_Schema):
                 message="An error occurred while creating the report.",
             )
         )
+
+
+@discrepancie_router.post(
+    "/report/download",
+    status_code=http.HTTPStatus.OK,
+)
+async def download_report(status: Status_Model_Schema):
+    try:
+        async with read_replica():
+            response: GenericResponseModel = DiscrepancieService.download_report(
+                status=status
+            )
+
+        if not response.status:
+            return build_api_response(response)
+
+        # the workbook is already written, send it in chunks instead of base64
+        return StreamingResponse(
+            response.data,
+            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            headers={
+                "Content-Disposition": 'attachment; filename="weight_discrepancie.xlsx"'
+            },
+        )
+
+    except Exception as e:
+        return build_api_response(
+            GenericResponseModel(
+                status_code=http.HTTPStatus.INTERNAL_SERVER_ERROR,
+                data=str(e),
+                message="An error occurred while creating the report.",
+            )
+        )
@@ -0,0 +1,314 @@
+import tempfile
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+from sqlalchemy import case, func
+
+from utils.environment import Environment
+
+# models
+from models import Admin_Rate_Discrepancie, Order, Client
+from models.rate_discrepancie import Discrepancie_Type
+
+
+# rows fetched from the cursor and written to the sheet per round trip
+REPORT_BATCH_SIZE = int(Environment.get_string("DISCREPANCY_REPORT_BATCH_SIZE", "2000"))
+
+# workbooks up to this size stay in memory, bigger ones spill to a temp file
+REPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+SHEET_NAME = "Weight_Discrepancie"
+
+UPLOADED_HEADERS = (
+    "awb_number",
+    "length",
+    "width",
+    "height",
+    "dead_weight",
+    "image1",
+    "image2",
+    "image3",
+)
+
+FULL_HEADERS = (
+    "AWB Number",
+    "Client Name",
+    "Initial Length",
+    "Initial Width",
+    "Initial Height",
+    "Initial Volumetric Weight",
+    "Initial Applicable Weight",
+    "Initial Total Weight",
+    "Initial Total Freight",
+    "Charged Length",
+    "Charged Width",
+    "Charged Height",
+    "Charged Volumetric Weight",
+    "Charged Applicable Weight",
+    "Charged Total Weight",
+    "Charged Total Freight",
+    "Excess Weight",
+    "Excess Freight",
+    "Discrepancie Type",
+    "Image 1",
+    "Image 2",
+    "Image 3",
+    "Status",
+)
+
+# freight columns of the order counted for each discrepancy type
+INITIAL_FREIGHT_COLUMNS = {
+    Discrepancie_Type.forward: (
+        Order.forward_freight,
+        Order.forward_cod_charge,
+        Order.forward_tax,
+    ),
+    Discrepancie_Type.rto: (Order.rto_freight, Order.rto_tax),
+    Discrepancie_Type.both: (
+        Order.forward_freight,
+        Order.forward_cod_charge,
+        Order.rto_freight,
+        Order.rto_tax,
+        Order.forward_tax,
+    ),
+}
+
+# keys of the charged_weight_charge["charged"] / excess_weight_charge JSON
+CHARGED_KEYS = {
+    "forward": ("freight_charges", "freight_gst"),
+    "rto": ("rto", "rto_tax"),
+    "both": ("freight_charges", "freight_gst", "rto", "rto_tax"),
+}
+EXCESS_KEYS = {
+    "forward": ("freight", "cod_charges", "tax_amount"),
+    "rto": ("rto_freight", "rto_tax"),
+    "both": ("freight", "cod_charges", "tax_amount", "rto_freight", "rto_tax"),
+}
+
+HIGHLIGHTED_COLUMNS = ("I:I", "P:P", "R:R")
+
+
+def status_condition(status_value: str):
+    if status_value == "all_disc":
+        return Admin_Rate_Discrepancie.status != "new_disc"
+    if status_value == "new_disc":
+        return Admin_Rate_Discrepancie.status.in_(["new_disc", "re_new_disc"])
+    return Admin_Rate_Discrepancie.status == status_value
+
+
+def _column_sum(columns):
+    return sum(func.coalesce(column, 0) for column in columns)
+
+
+def _initial_freight():
+    return case(
+        (Order.id.is_(None), None),
+        *(
+            (
+                Admin_Rate_Discrepancie.discrepancie_type == discrepancie_type,
+                func.round(_column_sum(columns), 2),
+            )
+            for discrepancie_type, columns in INITIAL_FREIGHT_COLUMNS.items()
+        ),
+    )
+
+
+def _json_totals(values: pd.Series, types: pd.Series, keys_by_type) -> pd.Series:
+    """Per-type sum of the numeric keys of a JSON column, NaN where it is empty."""
+
+    present = values.map(bool)
+    charges = pd.DataFrame.from_records(
+        [value if isinstance(value, dict) else {} for value in values],
+        index=values.index,
+    )
+
+    totals = pd.Series(np.nan, index=values.index)
+    for discrepancie_type, keys in keys_by_type.items():
+        selected = charges.reindex(columns=list(keys))
+        amounts = selected.apply(pd.to_numeric, errors="coerce").fillna(0).sum(axis=1)
+        mask = present & (types == discrepancie_type)
+        totals[mask] = amounts[mask].round(2)
+
+    return totals
+
+
+class DiscrepancyReport:
+    """
+    Weight discrepancy workbook, built in one pass over a single query.
+
+    Order measurements and freight come from an outer join and the initial
+    freight / excess weight are computed in SQL; the charged and excess
+    freight JSON is totalled per batch with pandas. Rows are written to a
+    constant-memory xlsx sheet batch by batch, so a month of discrepancies
+    for a large client never sits in memory as ORM objects or one DataFrame.
+    """
+
+    @staticmethod
+    def _full_query(db, client_id: int, status_value: str):
+        return (
+            db.query(
+                Admin_Rate_Discrepancie.awb_number,
+                Order.length.label("order_length"),
+                Order.breadth.label("order_breadth"),
+                Order.height.label("order_height"),
+                Order.volumetric_weight.label("order_volumetric_weight"),
+                Order.applicable_weight.label("order_applicable_weight"),
+                Admin_Rate_Discrepancie.applied_weight,
+                _initial_freight().label("initial_freight"),
+                Admin_Rate_Discrepancie.length,
+                Admin_Rate_Discrepancie.width,
+                Admin_Rate_Discrepancie.height,
+                Admin_Rate_Discrepancie.volumetric_weight,
+                Admin_Rate_Discrepancie.dead_weight,
+                Admin_Rate_Discrepancie.charged_weight,
+                Admin_Rate_Discrepancie.charged_weight_charge,
+                case(
+                    (
+                        (Admin_Rate_Discrepancie.charged_weight != 0)
+                        & (Admin_Rate_Discrepancie.applied_weight != 0),
+                        Admin_Rate_Discrepancie.charged_weight
+                        - Admin_Rate_Discrepancie.applied_weight,
+                    ),
+                ).label("excess_weight"),
+                Admin_Rate_Discrepancie.excess_weight_charge,
+                Admin_Rate_Discrepancie.discrepancie_type,
+                Admin_Rate_Discrepancie.image1,
+                Admin_Rate_Discrepancie.image2,
+                Admin_Rate_Discrepancie.image3,
+                Admin_Rate_Discrepancie.status,
+            )
+            .outerjoin(Order, Order.id == Admin_Rate_Discrepancie.order_id)
+            .filter(
+                Admin_Rate_Discrepancie.client_id == client_id,
+                status_condition(status_value),
+            )
+            .order_by(Admin_Rate_Discrepancie.id)
+        )
+
+    @staticmethod
+    def _uploaded_query(db, client_id: int, status_value: str):
+        return (
+            db.query(
+                *(getattr(Admin_Rate_Discrepancie, name) for name in UPLOADED_HEADERS)
+            )
+            .filter(
+                Admin_Rate_Discrepancie.client_id == client_id,
+                status_condition(status_value),
+            )
+            .order_by(Admin_Rate_Discrepancie.id)
+        )
+
+    @staticmethod
+    def _full_rows(rows, client_name: str, status_labels: dict) -> pd.DataFrame:
+        frame = pd.DataFrame.from_records(rows, columns=rows[0]._fields)
+        types = frame["discrepancie_type"].map(lambda value: value.value)
+
+        charged = frame["charged_weight_charge"].map(
+            lambda value: value.get("charged") if value else None
+        )
+
+        return pd.DataFrame(
+            {
+                "AWB Number": frame["awb_number"],
+                "Client Name": client_name,
+                "Initial Length": frame["order_length"],
+                "Initial Width": frame["order_breadth"],
+                "Initial Height": frame["order_height"],
+                "Initial Volumetric Weight": frame["order_volumetric_weight"],
+                "Initial Applicable Weight": frame["order_applicable_weight"],
+                "Initial Total Weight": frame["applied_weight"],
+                "Initial Total Freight": frame["initial_freight"],
+                "Charged Length": frame["length"],
+                "Charged Width": frame["width"],
+                "Charged Height": frame["height"],
+                "Charged Volumetric Weight": frame["volumetric_weight"],
+                "Charged Applicable Weight": frame["dead_weight"],
+                "Charged Total Weight": frame["charged_weight"],
+                "Charged Total Freight": _json_totals(charged, types, CHARGED_KEYS),
+                "Excess Weight": frame["excess_weight"],
+                "Excess Freight": _json_totals(
+                    frame["excess_weight_charge"], types, EXCESS_KEYS
+                ),
+                "Discrepancie Type": types.str.upper(),
+                "Image 1": frame["image1"],
+                "Image 2": frame["image2"],
+                "Image 3": frame["image3"],
+                "Status": frame["status"].map(
+                    lambda value: status_labels.get(value, value)
+                ),
+            },
+            columns=FULL_HEADERS,
+        )
+
+    @staticmethod
+    def _write_frame(worksheet, first_row: int, frame: pd.DataFrame) -> int:
+        # Decimal -> float like the JSON encoder did, NaN / NaT -> blank cell
+        values = frame.astype(object).where(frame.notna(), None)
+
+        for offset, row in enumerate(values.itertuples(index=False, name=None)):
+            worksheet.write_row(
+                first_row + offset,
+                0,
+                [float(value) if hasattr(value, "as_tuple") else value for value in row],
+            )
+        return first_row + len(values)
+
+    @staticmethod
+    def build(db, client_id: int, status_value: str, action: str, status_labels: dict):
+        """
+        Write the report for `status_value` ("uploaded" or "full" layout) and
+        return the workbook as a file object positioned at the start.
+        """
+
+        output = tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_BYTES)
+        workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+        worksheet = workbook.add_worksheet(SHEET_NAME)
+
+        if action == "uploaded":
+            headers = UPLOADED_HEADERS
+            query = DiscrepancyReport._uploaded_query(db, client_id, status_value)
+            client_name = None
+        else:
+            headers = FULL_HEADERS
+            query = DiscrepancyReport._full_query(db, client_id, status_value)
+            client_name = (
+                db.query(Client.client_name).filter(Client.id == client_id).scalar()
+            )
+
+        if action == "full":
+            highlight_format = workbook.add_format({"bg_color": "#EEECE1"})
+            for columns in HIGHLIGHTED_COLUMNS:
+                worksheet.set_column(columns, 22, highlight_format)
+
+        worksheet.write_row(0, 0, headers)
+        next_row = 1
+
+        batch = []
+        for row in query.yield_per(REPORT_BATCH_SIZE):
+            batch.append(row)
+            if len(batch) < REPORT_BATCH_SIZE:
+                continue
+
+            next_row = DiscrepancyReport._write_batch(
+                worksheet, next_row, batch, action, client_name, status_labels
+            )
+            batch = []
+
+        if batch:
+            DiscrepancyReport._write_batch(
+                worksheet, next_row, batch, action, client_name, status_labels
+            )
+
+        workbook.close()
+        output.seek(0)
+        return output
+
+    @staticmethod
+    def _write_batch(worksheet, first_row, rows, action, client_name, status_labels):
+        if action == "uploaded":
+            frame = pd.DataFrame.from_records(rows, columns=UPLOADED_HEADERS)
+        else:
+            frame = DiscrepancyReport._full_rows(rows, client_name, status_labels)
+
+        return DiscrepancyReport._write_frame(worksheet, first_row, frame)
@@ -25,7 +25,6 @@ import shutil
 import time
 import base64
 from decimal import Decimal
-import boto3
 import uuid
 
 
@@ -53,7 +52,9 @@ from modules.discrepancie.discrepancie_schema import (
 )
 
 # service
+from modules.aws_s3 import ArtifactStore
 from modules.serviceability import ServiceabilityService
+from .discrepancie_report import DiscrepancyReport
 
 # models
 from models import (
@@ -90,13 +91,6 @@ AWS_SECRET_KEY = os.environ.get("AWS_SECRET_KEY")  #
 S3_BUCKET_NAME = os.environ.get("BUCKET_NAME")
 REGION_NAME = os.environ.get("REGION_NAME")
 
-# Initialize the S3 client
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=AWS_ACCESS_KEY,
-    aws_secret_access_key=AWS_SECRET_KEY,
-    region_name=REGION_NAME,
-)
 
 
 Discrepancie_status_reverse = {v: k for k, v in Discrepancie_status.items()}
@@ -104,8 +98,6 @@ Discrepancie_status_reverse = {v: k for k, v in Discrepancie_status.items()}
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)  # Ensure upload directory exists
 
-seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
-
 
 def convert_decimal_to_float(value):
     """Recursively convert Decimal to float in dicts, lists, or standalone values."""
@@ -147,47 +139,6 @@ class DiscrepancieService:
         db.add(history_record)
         return history_record  # Returning in case you need to use it later
 
-    @staticmethod
-    def bulk_create_history(db, records, status, action_by):
-        print("**bulk_create_history**")
-        history_objects = []
-        for record in records:
-            history_objects.append(
-                Admin_Rate_Discrepancie_History(
-                    awb_number=record.awb_number,
-                    discrepancie_id=record.id,
-                    length=convert_decimal_to_float(record.length),
-                    width=convert_decimal_to_float(record.width),
-                    height=convert_decimal_to_float(record.height),
-                    volumetric_weight=convert_decimal_to_float(
-                        record.volumetric_weight
-                    ),
-                    dead_weight=convert_decimal_to_float(record.dead_weight),
-                    applied_weight=convert_decimal_to_float(record.applied_weight),
-                    courier_weight=convert_decimal_to_float(record.courier_weight),
-                    charged_weight=convert_decimal_to_float(record.charged_weight),
-                    charged_weight_charge=convert_decimal_to_float(
-                        record.charged_weight_charge
-                    ),
-                    excess_weight_charge=convert_decimal_to_float(
-                        record.excess_weight_charge
-                    ),
-                    image1=record.image1,
-                    image2=record.image2,
-                    image3=record.image3,
-                    status=status,
-                    action_by=action_by,
-                )
-            )
-
-        db.bulk_save_objects(history_objects)
-        db.commit()
-
-    @staticmethod
-    def get_Client_name_by_id(id):
-        res = Client.get_by_id(id)  # Call class method
-        return res.client_name
-
     @staticmethod
     def all_ratelist(tab_action: Status_Model):
         try:
@@ -203,43 +154,7 @@ class DiscrepancieService:
                 page_number = tab_action.selectedPageNumber
                 batch_size = tab_action.batchSize
 
-                # ----------------------------
-                # 1️ Bulk auto-accept old records
-                # ----------------------------
-                if Discrepancie_status[tab_action.status] == "new_disc":
-                    old_ids = (
-                        db.query(Admin_Rate_Discrepancie.id)
-                        .filter(
-                            Admin_Rate_Discrepancie.client_id == client_id,
-                            Admin_Rate_Discrepancie.updated_at < seven_days_ago,
-                            Admin_Rate_Discrepancie.status.in_(
-                                ["new_disc", "re_new_disc"]
-                            ),
-                        )
-                        .all()
-                    )
-                    old_ids = [r.id for r in old_ids]
-
-                    if old_ids:
-                        # Bulk update without ORM sync
-                        db.query(Admin_Rate_Discrepancie).filter(
-                            Admin_Rate_Discrepancie.id.in_(old_ids)
-                        ).update(
-                            {
-                                "status": "auto_accepted_Inactivity",
-                                "action_by": "warehousity",
-                            },
-                            synchronize_session=False,
-                        )
-                        db.commit()
-
-                        # History bulk insert
-                        DiscrepancieService.bulk_create_history(
-                            db,
-                            old_ids,
-                            status="Auto Accepted Due to Inactivity",
-                            action_by="warehousity",
-                        )
+                # stale discrepancies are auto-accepted by DiscrepancyAutoAcceptJob
 
                 # ----------------------------
                 # 2️ Build query for paginated listing
@@ -306,6 +221,10 @@ class DiscrepancieService:
                 # ----------------------------
                 # 5️ Format response
                 # ----------------------------
+                # every row belongs to the same client, look the name up once
+                client_name = (
+                    db.query(Client.client_name).filter(Client.id == client_id).scalar()
+                )
                 data = [
                     Rate_Discrepancy_Response_Client_model(
                         **{
@@ -313,9 +232,7 @@ class DiscrepancieService:
                             "status": Discrepancie_status_reverse.get(
                                 item.status, item.status
                             ),
-                            "client_name": DiscrepancieService.get_Client_name_by_id(
-                                item.client_id
-                            ),
+                            "client_name": client_name,
                         }
                     )
                     for item in results
@@ -534,7 +451,7 @@ class DiscrepancieService:
             )
 
     @staticmethod
-    def dispute_file_upload(file: UploadFile = File(...), category: str = Form(...)):
+    async def dispute_file_upload(file: UploadFile = File(...), category: str = Form(...)):
         try:
             with get_db_session() as db:
                 logger.info(
@@ -555,11 +472,8 @@ class DiscrepancieService:
                 unique_filename = f"{uuid.uuid4()}.{file_extension}"
                 s3_key = f"{client_id}/Weight_Discrepancie/{unique_filename}"
                 print("weight descriupancy is available")
-                s3_client.upload_fileobj(
-                    file.file,
-                    S3_BUCKET_NAME,
-                    s3_key,
-                    ExtraArgs={"ContentType": file.content_type},
+                await ArtifactStore.aput_fileobj(
+                    s3_key, file.file, file.content_type, bucket=S3_BUCKET_NAME
                 )
                 print("s3 . 2")
                 # file_url = f"https://{S3_BUCKET_NAME}.s3.{REGION_NAME}.amazonaws.com/{unique_filename}"
@@ -741,201 +655,74 @@ class DiscrepancieService:
             )
 
     @staticmethod
-    def get_filtered_data(data: dict, discrepancie_type) -> dict:
-        key_mapping = {
-            "forward_freight": "freight",
-            "forward_cod_charge": "cod_charges",
-            "rto_freight": "rto_freight",
-            "rto_tax": "rto_tax",
-            "forward_tax": "forward_tax",
-        }
-        if discrepancie_type == "rto":
-            key_mapping = {
-                "rto_freight": "rto_freight",
-                "rto_tax": "rto_tax",
-            }
-        if discrepancie_type == "forward":
-            key_mapping = {
-                "forward_freight": "freight",
-                "forward_cod_charge": "cod_charges",
-                "forward_tax": "forward_tax",
-            }
-        return {
-            key_mapping[k]: data.get(k) or 0  # Defaults None to 0
-            for k in key_mapping
-            if k in data
-        }
+    def generate_report(status: Status_Model_Schema):
+        try:
+            with get_db_session() as db:
+                client_id = context_user_data.get().client_id
+                logger.info(
+                    extra=context_user_data.get(),
+                    msg="PAYLOAD status: {}".format(status),
+                )
+                output = DiscrepancyReport.build(
+                    db,
+                    client_id=client_id,
+                    status_value=Discrepancie_status[status.status],
+                    action=status.action,
+                    status_labels=Discrepancie_status_reverse,
+                )
+                return GenericResponseModel(
+                    status_code=http.HTTPStatus.OK,
+                    status=True,
+                    data=base64.b64encode(output.read()).decode("utf-8"),
+                    message="Report gernated",
+                )
+        except DatabaseError as e:
+            # Log database error
+            logger.error(
+                extra=context_user_data.get(),
+                msg="Error fecthing dispute: {}".format(str(e)),
+            )
 
-    @staticmethod
-    def calculate_applied_weight_sum(data, discrepancie_type):
-        from fastapi.encoders import jsonable_encoder
+            # Return error response
+            return GenericResponseModel(
+                status_code=http.HTTPStatus.INTERNAL_SERVER_ERROR,
+                message="An error occurred while fetching the dispute.",
+            )
 
-        data_dict = jsonable_encoder(data)  # Convert model to dict safely
-        filtered_data = DiscrepancieService.get_filtered_data(
-            data_dict, discrepancie_type
-        )
-        return round(sum(float(v or 0) for v in filtered_data.values()), 2)
+        except Exception as e:
+            # Log other unhandled exceptions
+            logger.error(
+                extra=context_user_data.get(),
+                msg="Unhandled error: {}".format(str(e)),
+            )
+            # Return a general internal server error response
+            return GenericResponseModel(
+                status_code=http.HTTPStatus.INTERNAL_SERVER_ERROR,
+                message="An internal server error occurred. Please try again later.",
+            )
 
     @staticmethod
-    def calculate_total_charges(charged_data: dict, discrepancie_type) -> float:
-        if discrepancie_type == "rto":
-            return round(
-                +float(charged_data.get("rto", 0) or 0)
-                + float(charged_data.get("rto_tax", 0) or 0),
-                2,
-            )
-        if discrepancie_type == "forward":
-            return round(
-                +float(charged_data.get("freight_charges", 0) or 0)
-                + float(charged_data.get("freight_gst", 0) or 0),
-                2,
-            )
-
-        return round(
-            float(charged_data.get("freight_charges", 0) or 0)
-            + float(charged_data.get("freight_gst", 0) or 0)
-            + float(charged_data.get("rto", 0) or 0)
-            + float(charged_data.get("rto_tax", 0) or 0),
-            2,
-        )
-
-    def calculate_total_excess(data: dict, discrepancie_type) -> float:
-        keys_to_sum = ["freight", "cod_charges", "tax_amount", "rto_freight", "rto_tax"]
-        if discrepancie_type == "rto":
-            keys_to_sum = [
-                "rto_freight",
-                "rto_tax",
-            ]
-        if discrepancie_type == "forward":
-            keys_to_sum = [
-                "freight",
-                "cod_charges",
-                "tax_amount",
-            ]
-
-        return round(sum(float(data.get(k, 0) or 0) for k in keys_to_sum), 2)
+    def download_report(status: Status_Model_Schema):
+        """Same workbook as generate_report, returned as a file to stream."""
 
-    @staticmethod
-    def generate_report(status: Status_Model_Schema):
         try:
             with get_db_session() as db:
                 client_id = context_user_data.get().client_id
                 logger.info(
                     extra=context_user_data.get(),
-                    msg="PAYLOAD status: {}".format(status),
+                    msg="PAYLOAD download report status: {}".format(status),
                 )
-                query = db.query(Admin_Rate_Discrepancie).options(
-                    joinedload(Admin_Rate_Discrepancie.order),
+                output = DiscrepancyReport.build(
+                    db,
+                    client_id=client_id,
+                    status_value=Discrepancie_status[status.status],
+                    action=status.action,
+                    status_labels=Discrepancie_status_reverse,
                 )
-                if Discrepancie_status[status.status] == "all_disc":
-                    query = query.filter(
-                        Admin_Rate_Discrepancie.status != "new_disc",
-                        Admin_Rate_Discrepancie.client_id == client_id,
-                    )
-                elif Discrepancie_status[status.status] == "new_disc":
-                    query = query.filter(
-                        Admin_Rate_Discrepancie.status.in_(["new_disc", "re_new_disc"]),
-                        Admin_Rate_Discrepancie.client_id == client_id,
-                    )
-                else:
-                    query = query.filter(
-                        Admin_Rate_Discrepancie.status
-                        == Discrepancie_status[status.status],
-                        Admin_Rate_Discrepancie.client_id == client_id,
-                    )
-                results = query.all()
-                if status.action == "uploaded":
-                    report = [
-                        Report_Discrepancy_Uploaded_Response_model(
-                            **{
-                                **jsonable_encoder(item),
-                                "status": Discrepancie_status_reverse.get(
-                                    item.status, item.status
-                                ),
-                                "client_name": DiscrepancieService.get_Client_name_by_id(
-                                    item.client_id
-                                ),
-                            }
-                        )
-                        for item in results
-                    ]
-                else:
-                    report = [
-                        {
-                            "AWB Number": item.awb_number,
-                            "Client Name": DiscrepancieService.get_Client_name_by_id(
-                                item.client_id
-                            ),
-                            "Initial Length": item.order.length if item.order else None,
-                            "Initial Width": item.order.breadth if item.order else None,
-                            "Initial Height": item.order.height if item.order else None,
-                            "Initial Volumetric Weight": (
-                                item.order.volumetric_weight if item.order else None
-                            ),
-                            "Initial Applicable Weight": (
-                                item.order.applicable_weight if item.order else None
-                            ),
-                            "Initial Total Weight": item.applied_weight,
-                            "Initial Total Freight": (
-                                DiscrepancieService.calculate_applied_weight_sum(
-                                    item.order, item.discrepancie_type.value
-                                )
-                                if item.order
-                                else None
-                            ),
-                            "Charged Length": item.length,
-                            "Charged Width": item.width,
-                            "Charged Height": item.height,
-                            "Charged Volumetric Weight": item.volumetric_weight,
-                            "Charged Applicable Weight": item.dead_weight,
-                            "Charged Total Weight": item.charged_weight,
-                            "Charged Total Freight": (
-                                DiscrepancieService.calculate_total_charges(
-                                    item.charged_weight_charge.get("charged", 0),
-                                    item.discrepancie_type.value,
-                                )
-                                if item.charged_weight_charge
-                                else None
-                            ),
-                            "Excess Weight": (
-                                float(item.charged_weight) - float(item.applied_weight)
-                                if item.charged_weight and item.applied_weight
-                                else None
-                            ),
-                            "Excess Freight": (
-                                DiscrepancieService.calculate_total_excess(
-                                    item.excess_weight_charge,
-                                    item.discrepancie_type.value,
-                                )
-                                if item.excess_weight_charge
-                                else None
-                            ),
-                            "Discrepancie Type": item.discrepancie_type.upper(),
-                            "Image 1": item.image1,
-                            "Image 2": item.image2,
-                            "Image 3": item.image3,
-                            "Status": Discrepancie_status_reverse.get(
-                                item.status, item.status
-                            ),
-                        }
-                        for item in results
-                    ]
-                df = pd.DataFrame([jsonable_encoder(item) for item in report])
-                output = BytesIO()
-                with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-                    df.to_excel(writer, index=False, sheet_name="Weight_Discrepancie")
-                    if status.action == "full":
-                        workbook = writer.book
-                        worksheet = writer.sheets["Weight_Discrepancie"]
-                        highlight_format = workbook.add_format({"bg_color": "#EEECE1"})
-                        worksheet.set_column("I:I", 22, highlight_format)
-                        worksheet.set_column("P:P", 22, highlight_format)
-                        worksheet.set_column("R:R", 22, highlight_format)
-                output.seek(0)
                 return GenericResponseModel(
                     status_code=http.HTTPStatus.OK,
                     status=True,
-                    data=base64.b64encode(output.getvalue()).decode("utf-8"),
+                    data=output,
                     message="Report gernated",
                 )
         except DatabaseError as e:
@@ -0,0 +1,7 @@
+from .barcode_service import (
+    BarcodeService,
+    BarcodeOptions,
+    BarcodePattern,
+    LABEL_BARCODE,
+    MANIFEST_BARCODE,
+)
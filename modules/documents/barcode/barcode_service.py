@@ -0,0 +1,148 @@
+import io
+import base64
+import functools
+from dataclasses import dataclass
+from typing import Dict, Iterable, Tuple
+
+import barcode
+from PIL import Image, ImageDraw
+
+from utils.environment import Environment
+
+
+# distinct (data, options) entries kept per process; a label reprint or a
+# manifest after label generation hits the cache instead of re-encoding
+BARCODE_CACHE_SIZE = int(Environment.get_string("BARCODE_CACHE_SIZE", "4096"))
+
+
+@dataclass(frozen=True)
+class BarcodeOptions:
+    symbology: str = "code128"
+    module_px: int = 2  # raster only: pixels per narrow bar
+    height_px: int = 60  # raster only
+
+
+LABEL_BARCODE = BarcodeOptions()
+MANIFEST_BARCODE = BarcodeOptions(height_px=48)
+
+
+@dataclass(frozen=True)
+class BarcodePattern:
+    """Encoded symbol as bar runs, in narrow-module units from the left edge."""
+
+    modules: int
+    bars: Tuple[Tuple[int, int], ...]
+
+
+@functools.lru_cache(maxsize=BARCODE_CACHE_SIZE)
+def _encode(data: str, symbology: str) -> BarcodePattern:
+    code = barcode.get_barcode_class(symbology)(data).build()[0]
+
+    bars = []
+    start = None
+    for index, module in enumerate(code):
+        if module == "1" and start is None:
+            start = index
+        elif module != "1" and start is not None:
+            bars.append((start, index - start))
+            start = None
+    if start is not None:
+        bars.append((start, len(code) - start))
+
+    return BarcodePattern(modules=len(code), bars=tuple(bars))
+
+
+@functools.lru_cache(maxsize=BARCODE_CACHE_SIZE)
+def _png_base64(data: str, options: BarcodeOptions) -> str:
+    pattern = _encode(data, options.symbology)
+
+    # 1-bit image, bars only: a few hundred bytes instead of a 300dpi RGB PNG
+    image = Image.new("1", (pattern.modules * options.module_px, options.height_px), 1)
+    draw = ImageDraw.Draw(image)
+    for start, width in pattern.bars:
+        draw.rectangle(
+            (
+                start * options.module_px,
+                0,
+                (start + width) * options.module_px - 1,
+                options.height_px - 1,
+            ),
+            fill=0,
+        )
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+class BarcodeService:
+    """
+    Single place labels, invoices and manifests get their barcodes from.
+
+    The symbol is encoded once per value and kept as bar runs; the canvas
+    renderer draws those runs as vector rectangles, the HTML templates get a
+    small cached PNG built from the same runs.
+    """
+
+    @staticmethod
+    def pattern(data, options: BarcodeOptions = LABEL_BARCODE) -> BarcodePattern:
+        return _encode(str(data), options.symbology)
+
+    @staticmethod
+    def batch(
+        values: Iterable, options: BarcodeOptions = LABEL_BARCODE
+    ) -> Dict[str, BarcodePattern]:
+        """Encode every distinct value once, e.g. all AWBs of a manifest."""
+
+        return {
+            value: _encode(value, options.symbology)
+            for value in dict.fromkeys(str(value) for value in values if value)
+        }
+
+    @staticmethod
+    def png_base64(data, options: BarcodeOptions = LABEL_BARCODE) -> str:
+        return _png_base64(str(data), options)
+
+    @staticmethod
+    def draw_pattern(
+        c, pattern: BarcodePattern, x: float, y: float, width: float, height: float
+    ):
+        """Draw the bars as one filled path scaled into width x height."""
+
+        # draw in module units so every bar is written with integer operands
+        c.saveState()
+        c.translate(x, y)
+        c.scale(width / pattern.modules, height)
+
+        path = c.beginPath()
+        for start, run in pattern.bars:
+            path.rect(start, 0, run, 1)
+        c.drawPath(path, stroke=0, fill=1)
+
+        c.restoreState()
+
+    @staticmethod
+    def draw(
+        c,
+        data,
+        x: float,
+        y: float,
+        width: float,
+        height: float,
+        options: BarcodeOptions = LABEL_BARCODE,
+    ):
+        BarcodeService.draw_pattern(
+            c, BarcodeService.pattern(data, options), x, y, width, height
+        )
+
+    @staticmethod
+    def cache_info() -> dict:
+        return {
+            "patterns": _encode.cache_info()._asdict(),
+            "images": _png_base64.cache_info()._asdict(),
+        }
+
+    @staticmethod
+    def clear_cache():
+        _encode.cache_clear()
+        _png_base64.cache_clear()
@@ -22,6 +22,7 @@ from .billing_invoice_schema import BillingInvoiceModel
 # service
 from modules.user.user_service import UserService
 from .templates.default import billing_invoice
+from .billing_run import BillingRunEngine
 
 # from modules.wallet.wallet_service import WalletService
 
@@ -47,99 +48,30 @@ def convert_html_to_pdf(html_content: str):
 class BillingInvoiceService:
 
     @staticmethod
-    def create_billing_invoice() -> GenericResponseModel:
-        try:
-
-            print("in")
-            with get_db_session() as db:
-
-                clients = db.query(Client).all()
-
-                print(clients)
-
-                count = 1
-
-                updated_orders = []
-
-                for client in clients:
-                    client_id = client.id
-
-                    orders = (
-                        db.query(Return_Order)
-                        .filter(
-                            Return_Order.client_id == client_id,
-                            Return_Order.invoice_id == None,
-                            Return_Order.status == "delivered",
-                            Return_Order.booking_date
-                            > datetime.fromisoformat("2025-04-01T00:00:00+05:30"),
-                        )
-                        .all()
-                    )
-
-                    if not orders:
-                        continue
-
-                    invoice = (
-                        db.query(Billing_Invoice)
-                        .filter(Billing_Invoice.client_id == client_id)
-                        .first()
-                    )
-
-                    if not invoice:
-                        continue
-
-                    total_amount = 0
-                    tax_amount = 0
+    async def create_billing_invoice(period: str = None) -> GenericResponseModel:
+        """Bill every client for `period` ("YYYY-MM", default: last month)."""
 
-                    for order in orders:
-                        count += 1
-                        print(count)
-                        order.invoice_id = invoice.id
-
-                        # Calculate totals
-                        amount = order.forward_freight + order.forward_cod_charge
-                        tax = order.forward_tax
-
-                        if order.status == "RTO":
-                            amount += order.rto_freight
-                            tax += order.rto_tax
-
-                        total_amount += amount
-                        tax_amount += tax
-
-                        updated_orders.append(order)
-
-                        db.add(order)
-
-                    invoice.total_amount = invoice.total_amount + total_amount
-                    invoice.tax_amount = invoice.tax_amount + tax_amount
-
-                    db.add(invoice)
-                    db.commit()
-
-                    print("updated orders - ", len(updated_orders))
-
-                # Fetch the order details
+        try:
+            summary = await BillingRunEngine.run(period)
 
             return GenericResponseModel(
                 status=True,
                 status_code=http.HTTPStatus.OK,
-                message="An error occurred while creating the Client.",
+                data=summary,
+                message="Billing run completed",
             )
 
         except Exception as e:
-
-            print(str(e))
             # Log database error
             logger.error(
                 extra=context_user_data.get(),
-                msg="Error creating client: {}".format(str(e)),
+                msg="Error running billing: {}".format(str(e)),
             )
 
             # Return error response
             return GenericResponseModel(
                 status_code=http.HTTPStatus.INTERNAL_SERVER_ERROR,
-                message="An error occurred while creating the Client.",
+                message="An error occurred while running the billing.",
             )
 
     @staticmethod
@@ -0,0 +1,336 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import pytz
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from database.db import AsyncSessionLocal
+from logger import logger
+from utils.cpu_executor import run_cpu_bound
+from utils.environment import Environment
+
+# models
+from models import Billing_Invoice, Billing_Run, Client, Return_Order
+
+# service
+from modules.aws_s3.aws_s3 import upload_file_to_s3
+from .templates.default import billing_invoice
+
+
+IST = pytz.timezone("Asia/Kolkata")
+
+# nothing booked before the billing go-live is invoiced
+BILLING_START = datetime.fromisoformat("2025-04-01T00:00:00+05:30")
+
+# clients billed at the same time, each on its own connection
+BILLING_RUN_CONCURRENCY = int(Environment.get_string("BILLING_RUN_CONCURRENCY", "8"))
+
+# the scheduled run bills the previous month on this day of the month
+BILLING_RUN_DAY = int(Environment.get_string("BILLING_RUN_DAY", "1"))
+BILLING_RUN_CHECK_SECONDS = 3600
+
+
+@dataclass(frozen=True)
+class ClientBill:
+    client_id: int
+    run_id: int
+    invoice_id: Optional[int]
+    order_count: int
+    total_amount: float
+    tax_amount: float
+
+
+def period_bounds(period: str):
+    """[start, end) of a "YYYY-MM" billing month in IST."""
+
+    start = IST.localize(datetime.strptime(period, "%Y-%m"))
+    end = IST.localize((start.replace(tzinfo=None) + timedelta(days=32)).replace(day=1))
+    return start, end
+
+
+def previous_period(now: Optional[datetime] = None) -> str:
+    now = now or datetime.now(IST)
+    return (now.replace(day=1) - timedelta(days=1)).strftime("%Y-%m")
+
+
+def _unbilled(client_id: Optional[int], end: datetime):
+    conditions = [
+        Return_Order.invoice_id.is_(None),
+        Return_Order.status == "delivered",
+        Return_Order.booking_date > BILLING_START,
+        # orders of earlier months that were missed are picked up as well
+        Return_Order.booking_date < end,
+    ]
+    if client_id is not None:
+        conditions.append(Return_Order.client_id == client_id)
+    return conditions
+
+
+def _render_pdf(invoice, client_id: int, client_name: str) -> Optional[bytes]:
+    from .billing_invoice_service import convert_html_to_pdf
+
+    html = billing_invoice(invoice=invoice, client_id=client_id, client_name=client_name)
+    if not html:
+        return None
+
+    pdf_buffer = convert_html_to_pdf(html)
+    return pdf_buffer.getvalue() if pdf_buffer else None
+
+
+class BillingRunEngine:
+    """
+    Month-end billing for every client with delivered, uninvoiced orders.
+
+    Each client is billed in a single transaction on its own session:
+    - the billing_run row for (period, client) is claimed with
+      SELECT ... FOR UPDATE SKIP LOCKED, so concurrent or repeated runs never
+      bill a client twice and a completed period is skipped;
+    - the orders are stamped with the client's existing invoice by one
+      UPDATE ... RETURNING, whose rows are summed in the same statement and
+      added to the invoice totals.
+    A failed client rolls back on its own, is recorded as failed and is
+    retried by the next run.
+    Invoice PDFs are rendered on the CPU pool once the bill is committed.
+    """
+
+    _task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    async def _client_ids(end: datetime) -> List[int]:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Return_Order.client_id)
+                .where(*_unbilled(None, end))
+                .group_by(Return_Order.client_id)
+            )
+            return [client_id for (client_id,) in result.all()]
+
+    @staticmethod
+    async def _claim(session, period: str, client_id: int) -> Optional[Billing_Run]:
+        await session.execute(
+            insert(Billing_Run)
+            .values(period=period, client_id=client_id, status="pending")
+            .on_conflict_do_nothing(constraint="unique_billing_run_per_period")
+        )
+
+        result = await session.execute(
+            select(Billing_Run)
+            .where(Billing_Run.period == period, Billing_Run.client_id == client_id)
+            .with_for_update(skip_locked=True)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def _bill_client(period: str, client_id: int) -> Optional[ClientBill]:
+        _, end = period_bounds(period)
+
+        async with AsyncSessionLocal() as session:
+            run = await BillingRunEngine._claim(session, period, client_id)
+
+            # another worker holds it, or the period is already billed
+            if run is None or run.status == "completed":
+                await session.rollback()
+                return None
+
+            # orders are billed to the client's standing invoice, as before the
+            # batch run; a client without one is not billed
+            invoice = (
+                await session.execute(
+                    select(Billing_Invoice)
+                    .where(Billing_Invoice.client_id == client_id)
+                    .order_by(Billing_Invoice.id)
+                    .limit(1)
+                    .with_for_update()
+                )
+            ).scalar_one_or_none()
+            if invoice is None:
+                await session.rollback()
+                return None
+
+            billed = (
+                update(Return_Order)
+                .where(*_unbilled(client_id, end))
+                .values(invoice_id=invoice.id)
+                .returning(
+                    Return_Order.forward_freight,
+                    Return_Order.forward_cod_charge,
+                    Return_Order.forward_tax,
+                )
+                .cte("billed")
+            )
+            order_count, total_amount, tax_amount = (
+                await session.execute(
+                    select(
+                        func.count(),
+                        func.coalesce(
+                            func.sum(
+                                func.coalesce(billed.c.forward_freight, 0)
+                                + func.coalesce(billed.c.forward_cod_charge, 0)
+                            ),
+                            0,
+                        ),
+                        func.coalesce(
+                            func.sum(func.coalesce(billed.c.forward_tax, 0)), 0
+                        ),
+                    ).select_from(billed)
+                )
+            ).one()
+
+            if order_count:
+                invoice.total_amount = invoice.total_amount + total_amount
+                invoice.tax_amount = invoice.tax_amount + tax_amount
+
+            run.status = "completed"
+            run.invoice_id = invoice.id if order_count else None
+            run.order_count = order_count
+            run.total_amount = total_amount
+            run.tax_amount = tax_amount
+            run.last_error = None
+            run.completed_at = datetime.now(IST)
+
+            await session.commit()
+
+        return ClientBill(
+            client_id=client_id,
+            run_id=run.id,
+            invoice_id=run.invoice_id,
+            order_count=order_count,
+            total_amount=float(total_amount),
+            tax_amount=float(tax_amount),
+        )
+
+    @staticmethod
+    async def _record_failure(period: str, client_id: int, error: str):
+        # the failed transaction rolled back its own insert of the run row,
+        # so the failure is upserted in a transaction of its own
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                insert(Billing_Run)
+                .values(
+                    period=period,
+                    client_id=client_id,
+                    status="failed",
+                    last_error=error[:500],
+                )
+                .on_conflict_do_update(
+                    constraint="unique_billing_run_per_period",
+                    set_={"status": "failed", "last_error": error[:500]},
+                    where=Billing_Run.status != "completed",
+                )
+            )
+            await session.commit()
+
+    @staticmethod
+    async def _render_invoice(bill: ClientBill):
+        async with AsyncSessionLocal() as session:
+            invoice = await session.get(Billing_Invoice, bill.invoice_id)
+            client_name = (
+                await session.execute(
+                    select(Client.client_name).where(Client.id == bill.client_id)
+                )
+            ).scalar()
+
+            pdf = await run_cpu_bound(
+                _render_pdf, invoice.to_model(), bill.client_id, client_name
+            )
+            if not pdf:
+                logger.error(
+                    msg=f"Billing invoice {bill.invoice_id} PDF could not be rendered"
+                )
+                return
+
+            upload = await upload_file_to_s3(
+                pdf,
+                f"{bill.client_id}/billing_invoice/{invoice.uuid}.pdf",
+                "application/pdf",
+            )
+            if not upload.get("success"):
+                logger.error(
+                    msg=f"Billing invoice {bill.invoice_id} upload failed: {upload.get('error')}"
+                )
+                return
+
+            invoice.url = upload["url"]
+            await session.commit()
+
+    @staticmethod
+    async def run(period: Optional[str] = None) -> dict:
+        period = period or previous_period()
+        _, end = period_bounds(period)
+
+        client_ids = await BillingRunEngine._client_ids(end)
+        slots = asyncio.Semaphore(BILLING_RUN_CONCURRENCY)
+
+        async def bill_client(client_id: int):
+            async with slots:
+                try:
+                    bill = await BillingRunEngine._bill_client(period, client_id)
+
+                except Exception as e:
+                    logger.error(
+                        msg=f"Billing run {period} failed for client {client_id}: {str(e)}"
+                    )
+                    await BillingRunEngine._record_failure(period, client_id, str(e))
+                    return e
+
+                # the bill is committed; a missing PDF does not undo it
+                if bill and bill.invoice_id:
+                    try:
+                        await BillingRunEngine._render_invoice(bill)
+                    except Exception as e:
+                        logger.error(
+                            msg=f"Billing invoice {bill.invoice_id} PDF failed: {str(e)}"
+                        )
+                return bill
+
+        outcomes = await asyncio.gather(
+            *(bill_client(client_id) for client_id in client_ids)
+        )
+
+        bills = [outcome for outcome in outcomes if isinstance(outcome, ClientBill)]
+        summary = {
+            "period": period,
+            "clients": len(client_ids),
+            "billed": len([bill for bill in bills if bill.order_count]),
+            "failed": len([o for o in outcomes if isinstance(o, Exception)]),
+            "orders": sum(bill.order_count for bill in bills),
+            "total_amount": round(sum(bill.total_amount for bill in bills), 2),
+            "tax_amount": round(sum(bill.tax_amount for bill in bills), 2),
+        }
+        logger.info(msg=f"Billing run finished: {summary}")
+        return summary
+
+    @classmethod
+    async def start(cls):
+        if cls._task is not None:
+            return
+
+        cls._task = asyncio.create_task(cls._schedule_forever())
+        logger.info(msg="Billing run scheduler started")
+
+    @classmethod
+    async def stop(cls):
+        if cls._task is None:
+            return
+
+        cls._task.cancel()
+        try:
+            await cls._task
+        except asyncio.CancelledError:
+            pass
+        cls._task = None
+
+    @classmethod
+    async def _schedule_forever(cls):
+        # checked hourly; reruns on the billing day only pick up what is left
+        while True:
+            try:
+                if datetime.now(IST).day == BILLING_RUN_DAY:
+                    await cls.run()
+            except Exception as e:
+                logger.error(msg=f"Scheduled billing run failed: {str(e)}")
+
+            await asyncio.sleep(BILLING_RUN_CHECK_SECONDS)
@@ -15,16 +15,22 @@ from context_manager.context import context_user_data, get_db_session
 from .data import client_data
 
 
-def billing_invoice(invoice: BillingInvoiceModel):
+def billing_invoice(
+    invoice: BillingInvoiceModel, client_id: int = None, client_name: str = None
+):
+    # the billing run renders outside a request, so it passes the client in
     try:
 
-        client_id = context_user_data.get().client_id
+        if client_id is None:
+            client_id = context_user_data.get().client_id
 
         print(client_id)
 
-        with get_db_session() as db:
+        if client_name is None:
+            with get_db_session() as db:
 
-            client = db.query(Client).filter(Client.id == client_id).first()
+                client = db.query(Client).filter(Client.id == client_id).first()
+                client_name = client.client_name
 
         file_path = (
             os.getcwd()
@@ -173,7 +179,7 @@ def billing_invoice(invoice: BillingInvoiceModel):
                     <td style="width:55%">
                         <div>
                             <span>Buyer ( Bill To )</span><br />
-                            <span><b><span><b>{client.client_name}</b></span><br /></b></span>
+                            <span><b><span><b>{client_name}</b></span><br /></b></span>
                             <span>{adata['Address'] if adata['Address'] else ""}</span><br />
                             
                            
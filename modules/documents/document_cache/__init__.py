@@ -0,0 +1 @@
+from .document_cache import DocumentCache
@@ -0,0 +1,263 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from logger import logger
+from utils.environment import Environment
+
+# service
+from modules.aws_s3 import ArtifactStore
+
+
+# where rendered documents are kept: "off", "local" (a directory per host)
+# or "s3" (shared by every host). Labels and invoices carry consignee names,
+# addresses and phone numbers, so caching is opt in
+DOCUMENT_CACHE_BACKEND = Environment.get_string("DOCUMENT_CACHE_BACKEND", "off")
+
+# only readable by the app's user; point it at a private volume, not /tmp
+DOCUMENT_CACHE_DIR = Environment.get_string("DOCUMENT_CACHE_DIR", "/var/cache/document_cache")
+
+# size the local directory is pruned back to, oldest documents first
+DOCUMENT_CACHE_MAX_MB = int(Environment.get_string("DOCUMENT_CACHE_MAX_MB", "2048"))
+
+# local documents are deleted this long after they were rendered
+DOCUMENT_CACHE_TTL_HOURS = float(Environment.get_string("DOCUMENT_CACHE_TTL_HOURS", "24"))
+
+# key prefix of the s3 backend; expire it with a bucket lifecycle rule
+DOCUMENT_CACHE_S3_PREFIX = Environment.get_string("DOCUMENT_CACHE_S3_PREFIX", "document_cache")
+
+# bump on a template code change to drop every document rendered before it
+DOCUMENT_CACHE_REVISION = Environment.get_string("DOCUMENT_CACHE_REVISION", "1")
+
+
+class LocalDocumentStore:
+    """
+    Documents as files of one private directory. A document is dropped
+    `ttl` seconds after it was rendered: a read past that is a miss that
+    deletes it, and each prune (every tenth of the size budget written)
+    deletes every expired one before trimming to the budget.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, ttl: float):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._written = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        os.chmod(directory, 0o700)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def _expired(self, mtime: float) -> bool:
+        return time.time() - mtime > self.ttl
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                # the mtime is when the document was rendered
+                if self._expired(os.fstat(f.fileno()).st_mtime):
+                    data = None
+                else:
+                    data = f.read()
+        except FileNotFoundError:
+            return None
+        if data is None:
+            self._remove(path)
+        return data
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+            f.write(data)
+        # readers in other workers see the whole file or none
+        os.replace(temp, path)
+
+        with self._lock:
+            self._written += len(data)
+            due = self._written >= self.max_bytes // 10
+            if due:
+                self._written = 0
+        if due:
+            self.prune()
+
+    def prune(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pdf"):
+                stat = entry.stat()
+                if self._expired(stat.st_mtime):
+                    self._remove(entry.path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            self._remove(path)
+            total -= size
+            if total <= self.max_bytes * 0.9:
+                break
+
+
+class S3DocumentStore:
+    """Documents in the artifact bucket, shared by every host."""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}.pdf"
+
+    def get(self, key: str) -> Optional[bytes]:
+        return ArtifactStore.get_bytes(self._key(key))
+
+    def put(self, key: str, data: bytes):
+        ArtifactStore.put_bytes(self._key(key), data, "application/pdf")
+
+
+def _build_store():
+    if DOCUMENT_CACHE_BACKEND == "s3":
+        return S3DocumentStore(DOCUMENT_CACHE_S3_PREFIX)
+    if DOCUMENT_CACHE_BACKEND == "local":
+        return LocalDocumentStore(
+            DOCUMENT_CACHE_DIR,
+            DOCUMENT_CACHE_MAX_MB * 1024 * 1024,
+            DOCUMENT_CACHE_TTL_HOURS * 3600,
+        )
+    return None
+
+
+class DocumentCache:
+    """
+    Rendered per-order PDFs (labels, invoices), so a reprint only renders the
+    orders whose document would come out different:
+
+        version = DocumentCache.version(label_settings, client_name)
+        pdf = DocumentCache.fetch(
+            "label", order, template, version,
+            lambda: render_label(order, label_settings, client_name, client_id),
+        )
+
+    A document is keyed by order id, AWB, pickup location (its code and,
+    when loaded with the order, its last update), the template it was drawn
+    with and a version of everything else it shows (label settings, client
+    name), so any change of those is a new key and the old document simply
+    stops being read; nothing has to be invalidated by hand.
+    """
+
+    _lock = threading.Lock()
+    _store = None
+    _loaded = False
+
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def store(cls):
+        if not cls._loaded:
+            with cls._lock:
+                if not cls._loaded:
+                    try:
+                        cls._store = _build_store()
+                    except OSError as e:
+                        logger.error(msg=f"Document cache disabled: {str(e)}")
+                    cls._loaded = True
+        return cls._store
+
+    @staticmethod
+    def version(*parts) -> str:
+        """Digest of the settings / names a document depends on, besides the order."""
+
+        dumped = [
+            part.model_dump() if hasattr(part, "model_dump") else part for part in parts
+        ]
+        return hashlib.sha1(
+            json.dumps(dumped, sort_keys=True, default=str).encode()
+        ).hexdigest()[:16]
+
+    @staticmethod
+    def key(kind: str, order, template: str, version: str) -> str:
+        # the pickup address is printed as the sender / return address
+        pickup_location = getattr(order, "pickup_location", None)
+        identity = "|".join(
+            (
+                DOCUMENT_CACHE_REVISION,
+                kind,
+                str(order.id),
+                str(order.awb_number),
+                str(order.pickup_location_code),
+                str(pickup_location.updated_at) if pickup_location else "",
+                template,
+                version,
+            )
+        )
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    @classmethod
+    def get(cls, key: str) -> Optional[bytes]:
+        store = cls.store()
+        if store is None:
+            return None
+        try:
+            return store.get(key)
+        except (OSError, BotoCoreError, ClientError) as e:
+            logger.error(msg=f"Document cache read of {key} failed: {str(e)}")
+            return None
+
+    @classmethod
+    def put(cls, key: str, data: bytes):
+        store = cls.store()
+        if store is None:
+            return
+        try:
+            store.put(key, data)
+        except (OSError, BotoCoreError, ClientError) as e:
+            logger.error(msg=f"Document cache write of {key} failed: {str(e)}")
+
+    @classmethod
+    def fetch(
+        cls, kind: str, order, template: str, version: str, render: Callable
+    ) -> Optional[bytes]:
+        """
+        The cached document, or the one `render` returns (bytes or a BytesIO),
+        which is then cached. A document that could not be rendered is None
+        and is not cached.
+        """
+
+        key = cls.key(kind, order, template, version)
+        data = cls.get(key)
+        if data is not None:
+            cls.hits += 1
+            return data
+
+        cls.misses += 1
+        started = time.perf_counter()
+        rendered = render()
+        if rendered is None:
+            return None
+        data = rendered if isinstance(rendered, bytes) else rendered.getvalue()
+        if data:
+            cls.put(key, data)
+            logger.debug(
+                msg=f"{kind} of order {order.order_id} rendered in "
+                f"{(time.perf_counter() - started) * 1000:.0f} ms"
+            )
+        return data or None
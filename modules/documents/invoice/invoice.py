@@ -8,9 +8,6 @@ from decimal import Decimal
 
 from logger import logger
 
-import barcode
-from barcode.writer import ImageWriter
-
 # schema
 from modules.orders.order_schema import Order_Model
 from modules.documents.shipping_label.shipping_label_schema import (
@@ -18,6 +15,12 @@ from modules.documents.shipping_label.shipping_label_schema import (
 )
 
 
+# store logo printed on client 79 invoices
+CLIENT_79_INVOICE_LOGO = (
+    "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAHcAAABPCAYAAADREFpKAAAAAXNSR0IArs4c6QAAAARnQU1BAACxjwv8YQUAAAAJcEhZcwAAEnQAABJ0Ad5mH3gAABIxSURBVHhe7dp1qHbF9gdw/xK7u7u7u7tbsbvBbkXFbkGxFbu7EOzu7u7ubvePz8D3Yd5z3/t67jnX34XNXjDM7Ik1q2fNPM9wTQethU65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthr9V7l9//VXKn3/+2WsrIH1//PHHEP2gbg8Lsj5tBd76O5B+8Pvvv/e+a9pA2vV4QDvz6xpkHaj7Uqdk3dC+a0g/qMfTNt4XVwowNhjol3KjPHVfgvOtzryMpT0syLyU2lBqxuu5wBgFp68vHQrQZ16gngeyvm5nTt++33777V/Wg3pO2krG+taRY75rQ/VdtwcD/VJuvTkIE/qjjPSBjNVC/XeQuep6PUEC+H/99dfSzlyQNdk/a9LOOOhLW70m3xkLn5kDUoOh0aqv3s/a4Knr7BPIWMB3jWew0K8z12YEh7gwnQL0IQogMP2phwXBEwHVfXClpD916KgFkr3TruGXX37p0V/PyzeocaQ/pfbaFPvWfdo1ntCY74zXY8GhhI/0qwcD/T5z+xbE/fDDD83777/fvPvuu83HH39cBJixmplhQeYpwf355583b731VvPOO+80n332WWEUhGFzv/zyy7L3119/PcR6tf0Dwakvng3g+uSTTwrdP/74Y+nLXGM1PX3bUUxd9Kf0HQtuY4G6PyVyy9zMGSj0S7mEguEICHzzzTfN5Zdf3my66abNqquu2my33XbN/fff3/z8889lPIroLwT/p59+2uy///7Nkksu2aywwgrNQQcd1Dz55JNlHGCaQo866qhmww03bI4//viyBtTKU6fUglLD9dJLLzW77rprs+222zbXXHNNb//Mi6fqV4d330PD6Ruk39yffvqpOMBHH33UvP76680bb7zRfPHFF8UJHDVwwmeudtbX7cFAvz0X2FT56quvmuOOO66ZaKKJmnHGGacZa6yxmnHHHbeZc845m+uvv77MQVh/iYPfGkraZ599mvHHH7/gDO6ll166eeWVV4oQCIfyJ5hggjKmUDSa4Ai9EXJoIMQo5uWXX27WW2+9Zowxxijrp5566uboo49uvv32296cGofocemllxYDPvbYY5vXXnutN6ZY41vBwyOPPNKccsopzdZbb90su+yyzTzzzNPMPffcpV5kkUWatdZaqznkkEOa22+/vfnwww+Lout98akeLPytchFcb0yAd911VyF07LHHbiaccMJmkkkmKcX3VlttVawVZM3QIP1qe7DmW2+9tZliiima8cYbrygYTm2KPPTQQ0u0ePXVV5tZZpml188AFl544eaxxx7r0YrG4E4xpia4M844Y4h90L3KKquUMG1ebSTwXXLJJc2ss85a5k888cTNzjvvXLzSuLnmoP/ZZ59tDjzwwGaBBRYoclEYPQPKPmOOOWbBYwwfDOa+++4rR0OUiobQPxjol+dGMABTmEM04WNWQTxBU/oTTzzRE1AMA9R1cIYRoQujmKc0OAkgQpljjjlKaHMWzzvvvGUvc2JYPA8QUHDWdfYmROHceuvgV7bffvtyjsc4zFccM1tssUWha7LJJiuKmX322Yv3w2u+PR988MFmmWWWaUYcccSebBgQHkSI0UcfvSg5eIzhc4QRRmjmm2++5sYbbyy44OxL/0ChX8rFrI3Uzz33XBE0wghFLTwrUQrr/f7778v84Mj6QPrUmLrnnntK6IJDIZxYuG8C4nGMYPfddy9j2Zsw11577aK4ml5tBUQJzz//fDPXXHOVNXDDM/300xfhUqR1KYAxb7755kUxk08+eVnn+HnxxRcLTuXpp58uijUnRmkeBTpSttlmm2bfffdtdtttt2b11Vcv+0V2k046aVE4nLfddluhAf3whvaBQr+UayMbSmROPvnknrUTbAQUBWsLS/W5VAu6Jjj98DMIzMKHYcrlsYSlnwDWXXfd5u233y7HwnTTTVcEiA71DDPMUMJbPDcF7uz13XffNaeddlrZI8VaCaEzu14XOqNctNTKpVC4ZfQiQZQV5c4///zNqaeeWoxJRi5XcHa/+eabzWWXXVbOYrjMJTeGwRDMJ+sY6GCg32EZCIksDyPCGqIoYqaZZio1YgmBgs8555wizBAaYfVVLhAOZcfWExDcQhch+rYfZbN457IzXSZtXpRk3l577VXOZXtkz1pAH3zwQVEkGq2hCCUhvV6XwpO23HLLIZQrcj3++OOFjgsuuKAZeeSRC89woUmYveOOOwpOAA9DULTR9MADD5TkCr6stYfkUNQzp6Z9INAv5QIeIWxMNdVURZBRAms7++yzy1nrmxJ4mWyUlyGwVq7vtPVj5KKLLuqdZ5iEm7dcd911xSN9U4bxXXbZpaw75phjinGZb4wBLLjggsUA7VELMtmo0M8IzbUWXmtkt+aGrrQVnivr5Vk5Kpy58gpXG9EkRokOeM8999xyROS6Q3ZwhS41vq+88spiMNZaR34rrrhi4aGW2UBhmMqF3CaAR8hYRxtttMKEghj3TEy6L/rGPOFRyk033dRTpjrtANweIoQ1AqIoTAq5V199dREQ4cFLCGohX2h7+OGHi4foi+Lta888pkSYiujAQ9GffSQ5O+64Y8mS0RJew7caDW4ADDbRiXKfeeaZ5t577y182hcNPG+llVYqysn+6rQVCs+3fTfYYIOCEz3oEgXxbjw0DBT+1nOBjbxCCYUYwAyhuh5IsAjgiiuu6FkhIs3hZUlyUgLaiCcg68yP9QudFGjcGQnflFNO2RMCrxViPULE2KzVdk/2wgXiJQA+90uJGRyMAQ/o5p21MEOb2piwnIQK/8LyCy+8UEJy8gMFHe7/uS8DeOFRh5bgF9Z5ORzw4hMfjND6ePxAoV9hGSGSgITIEOH6kDNO0rD44osXgSGW8JwpEqtYa/AhHE4JGkYicArmISeeeGIvwRH+Fl100cJ8lLjQQguVkH/LLbcUhdtLv7XuqyKJPeyl8OS77767eFy8zJollliiKD20Ae0oRIly7c/A7AGPbNn5aH+KVTuyrr322rImignu1LWC0ehIkFugiQzwIZqgebAwXN/NA7E0/bzPHdTGUYLw4UykOICYvffeu8yhXMSqhW3ra3zxCpnmmmuuWZTLYAjca5EHiWS9rj477LBDM8ooo5Q5UaYnQwoWTfTF89F1ww03lD2yHyFShHGKMFd95JFHFi+r5yog7Tos52jgubJa1xv98gU0iGQSJTKp+VUHp71AZCAiLrbYYmU9mSnyjch1MFA8t940gKBYn1chhCd0qJ0t0nuCM9d6d8WZZ565EEiACOYdFARPHWYQz8qnnXbaImiCt8Z9NW/F8Apd5513XjPqqKOWcbhlp6xbaDZmfcIj2hgZsJfCk2T5jIhhoCuhNfRnvu+0s1ZC5XyO8D2iOI723HPPomx02ZeMRJoYZqAvfnWAbCSlaAt++4WOwUAvLIeAWBRQC7veSTHBa21OQO6lGDfHWuW9995r1lhjjd5lnsLMveqqq4oH8G7zrNHOS5dwZ56wdtZZZ5W56EihBE915sbDCfjRRx8tiRIDqo+D5ZdfvvfWzIjuvPPO4tHoSVYuAYyxmQdCW/rUrkI8N/yr3Qy8lh1wwAGFVzgpmGF7qYrnBocSI9JWR8kSStfAZONo5Ln/FeXaKGCzEBTkzqSVV165CIRiCdh9U1YaAtUExRCOOOKI3hlqvjZBYiKMKc5FF314IzRvxH4gQEPmaTvPWbO5hEiYFCmxgtMjPKFE8ejzAwbFiC6SLPjj+dNMM01z8cUXF7plrLwnhhf+sz8DJmx8C8vCsJc0R4IfESgFLcYdKeRiTY1HXePUzrizm7FYjy98kFdkOxgY4sxNGwEEQ2GSFsQTCuEQHmWzXBAi1YpXonhi1kgYHnrooYIXTo8bPDTnN4YwV4cjONM2n/d7zqMkFm4+OsxxLRISg8veG220UVGsK0uOCsJjbJIuUcZDhGSJZ8LB48JLZEFRm222WS+hqj33wgsvLDjhRo/6hBNOKEaOT4Bn+NKu+0UoRxOjQDd5KAcffHDhy5zQMRAoYRmSAGQhSMjz6sM6bY54zB122GFDnLfWKL4JbZ111ilrzE8SJKHBWOa4lsAFL+NRzjzzzB6+0JA2z+fZtXLdhyV18FGQpMuelMs7PVp4Ahx++OFLP+U7O3k85XgPpmw4hUbRxF713nVYxoua57oFSJ5iOJTCAFZbbbWSJNU4AL61w49CvpJF6/EUuv28aK05WT8Q6CVUgZooP2EttdRSRZDxLt7jDGPlCWVZgwHZZ7wSsQRC0bzF/ZOCPc2xeOPB66VIMhJcYSxCsW6nnXYqaxiCWtl4441L2HZVoyh9hGVPRuYapY0eipHAORddQWJ4lG6NKJXzMvvzXH9IMM8cCuS5Mn3GINsXquE3R96AFkYRHDVPkRN+GEd+vqRc9JG3ZC06GAz0lBtEIQiTp59+ek8J8RZXD+cUyDqEBLS90AjFiLUO47xMaOXxkjE/jWVMJuyXE2df9g/e1Po9UwqNdSjU9k8NgnavRqt9GSFF+I4SFS9ePIZg4YghWON+zTgp1H7AN8OEK97FYPwI4J4u2fR4wkgjIzcJNwx0UyInAHCSKxA5HB1ZG348/OSvQ3gfDAwRliHTVlwzMGVDwmHdPEZIcwZGASEga9UJZWFYrbi+OHu9n8ab4NU+//zzez8TBk9w6gOSD6GUoNFEILzVMeEfDR5E4IywtM3zTXm8yl+D0Of3WBk3ZWV8/fXXL0rJvpTi8SOZeujdZJNNeuez+WiCx3iMSdSQf4gq+GIwao7hrM+7QQzM/h5H/OLFICKDwcC/eC6iHfQeCWLxEYDsVjiLRQovIUJfav2yUedHBGK9y/oee+xREogIH1N+X/WfJrjgDT19FS2s+0/VSCONVHBazzDcjZ1zcDgP4ayTwBinn9l4LVw8Tz4RPIyQ8kUVRsSz/FDCwIPDPBmznz3RpTAUGbKELo4QpZGXPTwxeuZU+4sQz4cr86xDr8ghGSO/8D4Y6Ck3ZxukGJexxVpzxvlHAuvrC9ZRCghBwqTnyAhPLflwJyUAYTNW7sd34S8CA3AGQh9Puvnmm4cQDByEKD/gHa4tMUbj8EfgDAMeoGaoaDKf0uAVFWabbbYS4h0lxhTKxwMDdV2LrBQO4Q2c0Tp/7QWXqOL4UTNCY5I+38GnaO+3336FfhB51jIYCAwXAgk1FiPmyzIxFaKcdUKaTbMmm6vrNuAhvMBrEiNRCMx1xzkJL0E6m51/2buvctXZSy38uprwTjjhWG655cp9HA7nOoXBT3B4MMfe9gHm2YfXHX744cXQMj9Kgd/a4LAX75TJ1g8yaNL2aEI+aElOYF1KTQvlw28eY3Fuc6iaVyWyGCiUey4kKQm3rh7SdJmhpzrvqK4c5mRzhADt1PqCx93RecQwXDX8fin5kTQIn/A6w1lscAZP3Q5t2rwEXnfcGWecsfwEKNGSBxC6p0vv2fDzRsVZ5jdnIQ8En4Inb8xo4UGUGGVSgMIj5QkMp44weMWnNtrs74pkf2cuGvK8KvpRpmjgp0rPoQxL9EB7jVMdOgcDJSwDxFFqDYj1d5KnnnpqiDHtCB9o5zuMKtoSCGeScyzEUqYfB+BNKIrFgpqp7FWPA+cvT3Q21vRE4B72vVLJHSRP+gMMxB5JitDA6E466aTyOuQnR8+o/nDg/ZjxSDCB+UpfGSSiAf2OL1cavDMsd3jv4K5bjhDj5oUv9OT6FLoGC0W5ITSbZcN8G7dp3V8zp64VUvdbI2yZX+9Tf0fYfffWV9f1mHbWZS+QOWr7Upx2+kFwKKFBzYMcJ65rjEc7VyPrzQktdfl3OEODHz84SsI5QzAe2kNbim+Q8YFCCcvZKISnBtohpp7bdx7IeE1cCM/cjPtOSV/GFf3B4RtkrMaZ8czPnFoRaddz6/nG6/0D5qQfZK46uNIP0pdibXCDfBsLDXU7oK+uBwq9sPxPAQKHVf5pGNqe/0kZLAwNZ13+SfifKvf/A4a2739SBgtDw1mXfxL+ceV28L+DTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrmthab5P5NUjBi05qA4AAAAAElFTkSuQmCC"
+)
+
+
 def convert_image_to_base64(image_buffer):
     # Encode the image to base64
     return base64.b64encode(image_buffer.getvalue()).decode("utf-8")
@@ -118,11 +121,7 @@ def default_invoice(order: Order_Model, client_name, client_id):
         )
         print("yes i am correct")
 
-        image = (
-            "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAHcAAABPCAYAAADREFpKAAAAAXNSR0IArs4c6QAAAARnQU1BAACxjwv8YQUAAAAJcEhZcwAAEnQAABJ0Ad5mH3gAABIxSURBVHhe7dp1qHbF9gdw/xK7u7u7u7tbsbvBbkXFbkGxFbu7EOzu7u7ubvePz8D3Yd5z3/t67jnX34XNXjDM7Ik1q2fNPM9wTQethU65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthr9V7l9//VXKn3/+2WsrIH1//PHHEP2gbg8Lsj5tBd76O5B+8Pvvv/e+a9pA2vV4QDvz6xpkHaj7Uqdk3dC+a0g/qMfTNt4XVwowNhjol3KjPHVfgvOtzryMpT0syLyU2lBqxuu5wBgFp68vHQrQZ16gngeyvm5nTt++33777V/Wg3pO2krG+taRY75rQ/VdtwcD/VJuvTkIE/qjjPSBjNVC/XeQuep6PUEC+H/99dfSzlyQNdk/a9LOOOhLW70m3xkLn5kDUoOh0aqv3s/a4Knr7BPIWMB3jWew0K8z12YEh7gwnQL0IQogMP2phwXBEwHVfXClpD916KgFkr3TruGXX37p0V/PyzeocaQ/pfbaFPvWfdo1ntCY74zXY8GhhI/0qwcD/T5z+xbE/fDDD83777/fvPvuu83HH39cBJixmplhQeYpwf355583b731VvPOO+80n332WWEUhGFzv/zyy7L3119/PcR6tf0Dwakvng3g+uSTTwrdP/74Y+nLXGM1PX3bUUxd9Kf0HQtuY4G6PyVyy9zMGSj0S7mEguEICHzzzTfN5Zdf3my66abNqquu2my33XbN/fff3/z8889lPIroLwT/p59+2uy///7Nkksu2aywwgrNQQcd1Dz55JNlHGCaQo866qhmww03bI4//viyBtTKU6fUglLD9dJLLzW77rprs+222zbXXHNNb//Mi6fqV4d330PD6Ruk39yffvqpOMBHH33UvP76680bb7zRfPHFF8UJHDVwwmeudtbX7cFAvz0X2FT56quvmuOOO66ZaKKJmnHGGacZa6yxmnHHHbeZc845m+uvv77MQVh/iYPfGkraZ599mvHHH7/gDO6ll166eeWVV4oQCIfyJ5hggjKmUDSa4Ai9EXJoIMQo5uWXX27WW2+9Zowxxijrp5566uboo49uvv32296cGofocemllxYDPvbYY5vXXnutN6ZY41vBwyOPPNKccsopzdZbb90su+yyzTzzzNPMPffcpV5kkUWatdZaqznkkEOa22+/vfnwww+Lout98akeLPytchFcb0yAd911VyF07LHHbiaccMJmkkkmKcX3VlttVawVZM3QIP1qe7DmW2+9tZliiima8cYbrygYTm2KPPTQQ0u0ePXVV5tZZpml188AFl544eaxxx7r0YrG4E4xpia4M844Y4h90L3KKquUMG1ebSTwXXLJJc2ss85a5k888cTNzjvvXLzSuLnmoP/ZZ59tDjzwwGaBBRYoclEYPQPKPmOOOWbBYwwfDOa+++4rR0OUiobQPxjol+dGMABTmEM04WNWQTxBU/oTTzzRE1AMA9R1cIYRoQujmKc0OAkgQpljjjlKaHMWzzvvvGUvc2JYPA8QUHDWdfYmROHceuvgV7bffvtyjsc4zFccM1tssUWha7LJJiuKmX322Yv3w2u+PR988MFmmWWWaUYcccSebBgQHkSI0UcfvSg5eIzhc4QRRmjmm2++5sYbbyy44OxL/0ChX8rFrI3Uzz33XBE0wghFLTwrUQrr/f7778v84Mj6QPrUmLrnnntK6IJDIZxYuG8C4nGMYPfddy9j2Zsw11577aK4ml5tBUQJzz//fDPXXHOVNXDDM/300xfhUqR1KYAxb7755kUxk08+eVnn+HnxxRcLTuXpp58uijUnRmkeBTpSttlmm2bfffdtdtttt2b11Vcv+0V2k046aVE4nLfddluhAf3whvaBQr+UayMbSmROPvnknrUTbAQUBWsLS/W5VAu6Jjj98DMIzMKHYcrlsYSlnwDWXXfd5u233y7HwnTTTVcEiA71DDPMUMJbPDcF7uz13XffNaeddlrZI8VaCaEzu14XOqNctNTKpVC4ZfQiQZQV5c4///zNqaeeWoxJRi5XcHa/+eabzWWXXVbOYrjMJTeGwRDMJ+sY6GCg32EZCIksDyPCGqIoYqaZZio1YgmBgs8555wizBAaYfVVLhAOZcfWExDcQhch+rYfZbN457IzXSZtXpRk3l577VXOZXtkz1pAH3zwQVEkGq2hCCUhvV6XwpO23HLLIZQrcj3++OOFjgsuuKAZeeSRC89woUmYveOOOwpOAA9DULTR9MADD5TkCr6stYfkUNQzp6Z9INAv5QIeIWxMNdVURZBRAms7++yzy1nrmxJ4mWyUlyGwVq7vtPVj5KKLLuqdZ5iEm7dcd911xSN9U4bxXXbZpaw75phjinGZb4wBLLjggsUA7VELMtmo0M8IzbUWXmtkt+aGrrQVnivr5Vk5Kpy58gpXG9EkRokOeM8999xyROS6Q3ZwhS41vq+88spiMNZaR34rrrhi4aGW2UBhmMqF3CaAR8hYRxtttMKEghj3TEy6L/rGPOFRyk033dRTpjrtANweIoQ1AqIoTAq5V199dREQ4cFLCGohX2h7+OGHi4foi+Lta888pkSYiujAQ9GffSQ5O+64Y8mS0RJew7caDW4ADDbRiXKfeeaZ5t577y182hcNPG+llVYqysn+6rQVCs+3fTfYYIOCEz3oEgXxbjw0DBT+1nOBjbxCCYUYwAyhuh5IsAjgiiuu6FkhIs3hZUlyUgLaiCcg68yP9QudFGjcGQnflFNO2RMCrxViPULE2KzVdk/2wgXiJQA+90uJGRyMAQ/o5p21MEOb2piwnIQK/8LyCy+8UEJy8gMFHe7/uS8DeOFRh5bgF9Z5ORzw4hMfjND6ePxAoV9hGSGSgITIEOH6kDNO0rD44osXgSGW8JwpEqtYa/AhHE4JGkYicArmISeeeGIvwRH+Fl100cJ8lLjQQguVkH/LLbcUhdtLv7XuqyKJPeyl8OS77767eFy8zJollliiKD20Ae0oRIly7c/A7AGPbNn5aH+KVTuyrr322rImignu1LWC0ehIkFugiQzwIZqgebAwXN/NA7E0/bzPHdTGUYLw4UykOICYvffeu8yhXMSqhW3ra3zxCpnmmmuuWZTLYAjca5EHiWS9rj477LBDM8ooo5Q5UaYnQwoWTfTF89F1ww03lD2yHyFShHGKMFd95JFHFi+r5yog7Tos52jgubJa1xv98gU0iGQSJTKp+VUHp71AZCAiLrbYYmU9mSnyjch1MFA8t940gKBYn1chhCd0qJ0t0nuCM9d6d8WZZ565EEiACOYdFARPHWYQz8qnnXbaImiCt8Z9NW/F8Apd5513XjPqqKOWcbhlp6xbaDZmfcIj2hgZsJfCk2T5jIhhoCuhNfRnvu+0s1ZC5XyO8D2iOI723HPPomx02ZeMRJoYZqAvfnWAbCSlaAt++4WOwUAvLIeAWBRQC7veSTHBa21OQO6lGDfHWuW9995r1lhjjd5lnsLMveqqq4oH8G7zrNHOS5dwZ56wdtZZZ5W56EihBE915sbDCfjRRx8tiRIDqo+D5ZdfvvfWzIjuvPPO4tHoSVYuAYyxmQdCW/rUrkI8N/yr3Qy8lh1wwAGFVzgpmGF7qYrnBocSI9JWR8kSStfAZONo5Ln/FeXaKGCzEBTkzqSVV165CIRiCdh9U1YaAtUExRCOOOKI3hlqvjZBYiKMKc5FF314IzRvxH4gQEPmaTvPWbO5hEiYFCmxgtMjPKFE8ejzAwbFiC6SLPjj+dNMM01z8cUXF7plrLwnhhf+sz8DJmx8C8vCsJc0R4IfESgFLcYdKeRiTY1HXePUzrizm7FYjy98kFdkOxgY4sxNGwEEQ2GSFsQTCuEQHmWzXBAi1YpXonhi1kgYHnrooYIXTo8bPDTnN4YwV4cjONM2n/d7zqMkFm4+OsxxLRISg8veG220UVGsK0uOCsJjbJIuUcZDhGSJZ8LB48JLZEFRm222WS+hqj33wgsvLDjhRo/6hBNOKEaOT4Bn+NKu+0UoRxOjQDd5KAcffHDhy5zQMRAoYRmSAGQhSMjz6sM6bY54zB122GFDnLfWKL4JbZ111ilrzE8SJKHBWOa4lsAFL+NRzjzzzB6+0JA2z+fZtXLdhyV18FGQpMuelMs7PVp4Ahx++OFLP+U7O3k85XgPpmw4hUbRxF713nVYxoua57oFSJ5iOJTCAFZbbbWSJNU4AL61w49CvpJF6/EUuv28aK05WT8Q6CVUgZooP2EttdRSRZDxLt7jDGPlCWVZgwHZZ7wSsQRC0bzF/ZOCPc2xeOPB66VIMhJcYSxCsW6nnXYqaxiCWtl4441L2HZVoyh9hGVPRuYapY0eipHAORddQWJ4lG6NKJXzMvvzXH9IMM8cCuS5Mn3GINsXquE3R96AFkYRHDVPkRN+GEd+vqRc9JG3ZC06GAz0lBtEIQiTp59+ek8J8RZXD+cUyDqEBLS90AjFiLUO47xMaOXxkjE/jWVMJuyXE2df9g/e1Po9UwqNdSjU9k8NgnavRqt9GSFF+I4SFS9ePIZg4YghWON+zTgp1H7AN8OEK97FYPwI4J4u2fR4wkgjIzcJNwx0UyInAHCSKxA5HB1ZG348/OSvQ3gfDAwRliHTVlwzMGVDwmHdPEZIcwZGASEga9UJZWFYrbi+OHu9n8ab4NU+//zzez8TBk9w6gOSD6GUoNFEILzVMeEfDR5E4IywtM3zTXm8yl+D0Of3WBk3ZWV8/fXXL0rJvpTi8SOZeujdZJNNeuez+WiCx3iMSdSQf4gq+GIwao7hrM+7QQzM/h5H/OLFICKDwcC/eC6iHfQeCWLxEYDsVjiLRQovIUJfav2yUedHBGK9y/oee+xREogIH1N+X/WfJrjgDT19FS2s+0/VSCONVHBazzDcjZ1zcDgP4ayTwBinn9l4LVw8Tz4RPIyQ8kUVRsSz/FDCwIPDPBmznz3RpTAUGbKELo4QpZGXPTwxeuZU+4sQz4cr86xDr8ghGSO/8D4Y6Ck3ZxukGJexxVpzxvlHAuvrC9ZRCghBwqTnyAhPLflwJyUAYTNW7sd34S8CA3AGQh9Puvnmm4cQDByEKD/gHa4tMUbj8EfgDAMeoGaoaDKf0uAVFWabbbYS4h0lxhTKxwMDdV2LrBQO4Q2c0Tp/7QWXqOL4UTNCY5I+38GnaO+3336FfhB51jIYCAwXAgk1FiPmyzIxFaKcdUKaTbMmm6vrNuAhvMBrEiNRCMx1xzkJL0E6m51/2buvctXZSy38uprwTjjhWG655cp9HA7nOoXBT3B4MMfe9gHm2YfXHX744cXQMj9Kgd/a4LAX75TJ1g8yaNL2aEI+aElOYF1KTQvlw28eY3Fuc6iaVyWyGCiUey4kKQm3rh7SdJmhpzrvqK4c5mRzhADt1PqCx93RecQwXDX8fin5kTQIn/A6w1lscAZP3Q5t2rwEXnfcGWecsfwEKNGSBxC6p0vv2fDzRsVZ5jdnIQ8En4Inb8xo4UGUGGVSgMIj5QkMp44weMWnNtrs74pkf2cuGvK8KvpRpmjgp0rPoQxL9EB7jVMdOgcDJSwDxFFqDYj1d5KnnnpqiDHtCB9o5zuMKtoSCGeScyzEUqYfB+BNKIrFgpqp7FWPA+cvT3Q21vRE4B72vVLJHSRP+gMMxB5JitDA6E466aTyOuQnR8+o/nDg/ZjxSDCB+UpfGSSiAf2OL1cavDMsd3jv4K5bjhDj5oUv9OT6FLoGC0W5ITSbZcN8G7dp3V8zp64VUvdbI2yZX+9Tf0fYfffWV9f1mHbWZS+QOWr7Upx2+kFwKKFBzYMcJ65rjEc7VyPrzQktdfl3OEODHz84SsI5QzAe2kNbim+Q8YFCCcvZKISnBtohpp7bdx7IeE1cCM/cjPtOSV/GFf3B4RtkrMaZ8czPnFoRaddz6/nG6/0D5qQfZK46uNIP0pdibXCDfBsLDXU7oK+uBwq9sPxPAQKHVf5pGNqe/0kZLAwNZ13+SfifKvf/A4a2739SBgtDw1mXfxL+ceV28L+DTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrmthab5P5NUjBi05qA4AAAAAElFTkSuQmCC"
-            if client_id == 79
-            else ""
-        )
+        image = CLIENT_79_INVOICE_LOGO if client_id == 79 else ""
 
         gst = "27BAWPG3149K1Z5" if client_id == 79 else ""
 
@@ -303,11 +302,7 @@ def order_invoice(order: Order_Model, client_name, client_id):
             if order.booking_date
             else order.order_date.astimezone(ist).strftime("%Y-%m-%d, %H:%M:%S")
         )
-        image = (
-            "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAHcAAABPCAYAAADREFpKAAAAAXNSR0IArs4c6QAAAARnQU1BAACxjwv8YQUAAAAJcEhZcwAAEnQAABJ0Ad5mH3gAABIxSURBVHhe7dp1qHbF9gdw/xK7u7u7u7tbsbvBbkXFbkGxFbu7EOzu7u7ubvePz8D3Yd5z3/t67jnX34XNXjDM7Ik1q2fNPM9wTQethU65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthr9V7l9//VXKn3/+2WsrIH1//PHHEP2gbg8Lsj5tBd76O5B+8Pvvv/e+a9pA2vV4QDvz6xpkHaj7Uqdk3dC+a0g/qMfTNt4XVwowNhjol3KjPHVfgvOtzryMpT0syLyU2lBqxuu5wBgFp68vHQrQZ16gngeyvm5nTt++33777V/Wg3pO2krG+taRY75rQ/VdtwcD/VJuvTkIE/qjjPSBjNVC/XeQuep6PUEC+H/99dfSzlyQNdk/a9LOOOhLW70m3xkLn5kDUoOh0aqv3s/a4Knr7BPIWMB3jWew0K8z12YEh7gwnQL0IQogMP2phwXBEwHVfXClpD916KgFkr3TruGXX37p0V/PyzeocaQ/pfbaFPvWfdo1ntCY74zXY8GhhI/0qwcD/T5z+xbE/fDDD83777/fvPvuu83HH39cBJixmplhQeYpwf355583b731VvPOO+80n332WWEUhGFzv/zyy7L3119/PcR6tf0Dwakvng3g+uSTTwrdP/74Y+nLXGM1PX3bUUxd9Kf0HQtuY4G6PyVyy9zMGSj0S7mEguEICHzzzTfN5Zdf3my66abNqquu2my33XbN/fff3/z8889lPIroLwT/p59+2uy///7Nkksu2aywwgrNQQcd1Dz55JNlHGCaQo866qhmww03bI4//viyBtTKU6fUglLD9dJLLzW77rprs+222zbXXHNNb//Mi6fqV4d330PD6Ruk39yffvqpOMBHH33UvP76680bb7zRfPHFF8UJHDVwwmeudtbX7cFAvz0X2FT56quvmuOOO66ZaKKJmnHGGacZa6yxmnHHHbeZc845m+uvv77MQVh/iYPfGkraZ599mvHHH7/gDO6ll166eeWVV4oQCIfyJ5hggjKmUDSa4Ai9EXJoIMQo5uWXX27WW2+9Zowxxijrp5566uboo49uvv32296cGofocemllxYDPvbYY5vXXnutN6ZY41vBwyOPPNKccsopzdZbb90su+yyzTzzzNPMPffcpV5kkUWatdZaqznkkEOa22+/vfnwww+Lout98akeLPytchFcb0yAd911VyF07LHHbiaccMJmkkkmKcX3VlttVawVZM3QIP1qe7DmW2+9tZliiima8cYbrygYTm2KPPTQQ0u0ePXVV5tZZpml188AFl544eaxxx7r0YrG4E4xpia4M844Y4h90L3KKquUMG1ebSTwXXLJJc2ss85a5k888cTNzjvvXLzSuLnmoP/ZZ59tDjzwwGaBBRYoclEYPQPKPmOOOWbBYwwfDOa+++4rR0OUiobQPxjol+dGMABTmEM04WNWQTxBU/oTTzzRE1AMA9R1cIYRoQujmKc0OAkgQpljjjlKaHMWzzvvvGUvc2JYPA8QUHDWdfYmROHceuvgV7bffvtyjsc4zFccM1tssUWha7LJJiuKmX322Yv3w2u+PR988MFmmWWWaUYcccSebBgQHkSI0UcfvSg5eIzhc4QRRmjmm2++5sYbbyy44OxL/0ChX8rFrI3Uzz33XBE0wghFLTwrUQrr/f7778v84Mj6QPrUmLrnnntK6IJDIZxYuG8C4nGMYPfddy9j2Zsw11577aK4ml5tBUQJzz//fDPXXHOVNXDDM/300xfhUqR1KYAxb7755kUxk08+eVnn+HnxxRcLTuXpp58uijUnRmkeBTpSttlmm2bfffdtdtttt2b11Vcv+0V2k046aVE4nLfddluhAf3whvaBQr+UayMbSmROPvnknrUTbAQUBWsLS/W5VAu6Jjj98DMIzMKHYcrlsYSlnwDWXXfd5u233y7HwnTTTVcEiA71DDPMUMJbPDcF7uz13XffNaeddlrZI8VaCaEzu14XOqNctNTKpVC4ZfQiQZQV5c4///zNqaeeWoxJRi5XcHa/+eabzWWXXVbOYrjMJTeGwRDMJ+sY6GCg32EZCIksDyPCGqIoYqaZZio1YgmBgs8555wizBAaYfVVLhAOZcfWExDcQhch+rYfZbN457IzXSZtXpRk3l577VXOZXtkz1pAH3zwQVEkGq2hCCUhvV6XwpO23HLLIZQrcj3++OOFjgsuuKAZeeSRC89woUmYveOOOwpOAA9DULTR9MADD5TkCr6stYfkUNQzp6Z9INAv5QIeIWxMNdVURZBRAms7++yzy1nrmxJ4mWyUlyGwVq7vtPVj5KKLLuqdZ5iEm7dcd911xSN9U4bxXXbZpaw75phjinGZb4wBLLjggsUA7VELMtmo0M8IzbUWXmtkt+aGrrQVnivr5Vk5Kpy58gpXG9EkRokOeM8999xyROS6Q3ZwhS41vq+88spiMNZaR34rrrhi4aGW2UBhmMqF3CaAR8hYRxtttMKEghj3TEy6L/rGPOFRyk033dRTpjrtANweIoQ1AqIoTAq5V199dREQ4cFLCGohX2h7+OGHi4foi+Lta888pkSYiujAQ9GffSQ5O+64Y8mS0RJew7caDW4ADDbRiXKfeeaZ5t577y182hcNPG+llVYqysn+6rQVCs+3fTfYYIOCEz3oEgXxbjw0DBT+1nOBjbxCCYUYwAyhuh5IsAjgiiuu6FkhIs3hZUlyUgLaiCcg68yP9QudFGjcGQnflFNO2RMCrxViPULE2KzVdk/2wgXiJQA+90uJGRyMAQ/o5p21MEOb2piwnIQK/8LyCy+8UEJy8gMFHe7/uS8DeOFRh5bgF9Z5ORzw4hMfjND6ePxAoV9hGSGSgITIEOH6kDNO0rD44osXgSGW8JwpEqtYa/AhHE4JGkYicArmISeeeGIvwRH+Fl100cJ8lLjQQguVkH/LLbcUhdtLv7XuqyKJPeyl8OS77767eFy8zJollliiKD20Ae0oRIly7c/A7AGPbNn5aH+KVTuyrr322rImignu1LWC0ehIkFugiQzwIZqgebAwXN/NA7E0/bzPHdTGUYLw4UykOICYvffeu8yhXMSqhW3ra3zxCpnmmmuuWZTLYAjca5EHiWS9rj477LBDM8ooo5Q5UaYnQwoWTfTF89F1ww03lD2yHyFShHGKMFd95JFHFi+r5yog7Tos52jgubJa1xv98gU0iGQSJTKp+VUHp71AZCAiLrbYYmU9mSnyjch1MFA8t940gKBYn1chhCd0qJ0t0nuCM9d6d8WZZ565EEiACOYdFARPHWYQz8qnnXbaImiCt8Z9NW/F8Apd5513XjPqqKOWcbhlp6xbaDZmfcIj2hgZsJfCk2T5jIhhoCuhNfRnvu+0s1ZC5XyO8D2iOI723HPPomx02ZeMRJoYZqAvfnWAbCSlaAt++4WOwUAvLIeAWBRQC7veSTHBa21OQO6lGDfHWuW9995r1lhjjd5lnsLMveqqq4oH8G7zrNHOS5dwZ56wdtZZZ5W56EihBE915sbDCfjRRx8tiRIDqo+D5ZdfvvfWzIjuvPPO4tHoSVYuAYyxmQdCW/rUrkI8N/yr3Qy8lh1wwAGFVzgpmGF7qYrnBocSI9JWR8kSStfAZONo5Ln/FeXaKGCzEBTkzqSVV165CIRiCdh9U1YaAtUExRCOOOKI3hlqvjZBYiKMKc5FF314IzRvxH4gQEPmaTvPWbO5hEiYFCmxgtMjPKFE8ejzAwbFiC6SLPjj+dNMM01z8cUXF7plrLwnhhf+sz8DJmx8C8vCsJc0R4IfESgFLcYdKeRiTY1HXePUzrizm7FYjy98kFdkOxgY4sxNGwEEQ2GSFsQTCuEQHmWzXBAi1YpXonhi1kgYHnrooYIXTo8bPDTnN4YwV4cjONM2n/d7zqMkFm4+OsxxLRISg8veG220UVGsK0uOCsJjbJIuUcZDhGSJZ8LB48JLZEFRm222WS+hqj33wgsvLDjhRo/6hBNOKEaOT4Bn+NKu+0UoRxOjQDd5KAcffHDhy5zQMRAoYRmSAGQhSMjz6sM6bY54zB122GFDnLfWKL4JbZ111ilrzE8SJKHBWOa4lsAFL+NRzjzzzB6+0JA2z+fZtXLdhyV18FGQpMuelMs7PVp4Ahx++OFLP+U7O3k85XgPpmw4hUbRxF713nVYxoua57oFSJ5iOJTCAFZbbbWSJNU4AL61w49CvpJF6/EUuv28aK05WT8Q6CVUgZooP2EttdRSRZDxLt7jDGPlCWVZgwHZZ7wSsQRC0bzF/ZOCPc2xeOPB66VIMhJcYSxCsW6nnXYqaxiCWtl4441L2HZVoyh9hGVPRuYapY0eipHAORddQWJ4lG6NKJXzMvvzXH9IMM8cCuS5Mn3GINsXquE3R96AFkYRHDVPkRN+GEd+vqRc9JG3ZC06GAz0lBtEIQiTp59+ek8J8RZXD+cUyDqEBLS90AjFiLUO47xMaOXxkjE/jWVMJuyXE2df9g/e1Po9UwqNdSjU9k8NgnavRqt9GSFF+I4SFS9ePIZg4YghWON+zTgp1H7AN8OEK97FYPwI4J4u2fR4wkgjIzcJNwx0UyInAHCSKxA5HB1ZG348/OSvQ3gfDAwRliHTVlwzMGVDwmHdPEZIcwZGASEga9UJZWFYrbi+OHu9n8ab4NU+//zzez8TBk9w6gOSD6GUoNFEILzVMeEfDR5E4IywtM3zTXm8yl+D0Of3WBk3ZWV8/fXXL0rJvpTi8SOZeujdZJNNeuez+WiCx3iMSdSQf4gq+GIwao7hrM+7QQzM/h5H/OLFICKDwcC/eC6iHfQeCWLxEYDsVjiLRQovIUJfav2yUedHBGK9y/oee+xREogIH1N+X/WfJrjgDT19FS2s+0/VSCONVHBazzDcjZ1zcDgP4ayTwBinn9l4LVw8Tz4RPIyQ8kUVRsSz/FDCwIPDPBmznz3RpTAUGbKELo4QpZGXPTwxeuZU+4sQz4cr86xDr8ghGSO/8D4Y6Ck3ZxukGJexxVpzxvlHAuvrC9ZRCghBwqTnyAhPLflwJyUAYTNW7sd34S8CA3AGQh9Puvnmm4cQDByEKD/gHa4tMUbj8EfgDAMeoGaoaDKf0uAVFWabbbYS4h0lxhTKxwMDdV2LrBQO4Q2c0Tp/7QWXqOL4UTNCY5I+38GnaO+3336FfhB51jIYCAwXAgk1FiPmyzIxFaKcdUKaTbMmm6vrNuAhvMBrEiNRCMx1xzkJL0E6m51/2buvctXZSy38uprwTjjhWG655cp9HA7nOoXBT3B4MMfe9gHm2YfXHX744cXQMj9Kgd/a4LAX75TJ1g8yaNL2aEI+aElOYF1KTQvlw28eY3Fuc6iaVyWyGCiUey4kKQm3rh7SdJmhpzrvqK4c5mRzhADt1PqCx93RecQwXDX8fin5kTQIn/A6w1lscAZP3Q5t2rwEXnfcGWecsfwEKNGSBxC6p0vv2fDzRsVZ5jdnIQ8En4Inb8xo4UGUGGVSgMIj5QkMp44weMWnNtrs74pkf2cuGvK8KvpRpmjgp0rPoQxL9EB7jVMdOgcDJSwDxFFqDYj1d5KnnnpqiDHtCB9o5zuMKtoSCGeScyzEUqYfB+BNKIrFgpqp7FWPA+cvT3Q21vRE4B72vVLJHSRP+gMMxB5JitDA6E466aTyOuQnR8+o/nDg/ZjxSDCB+UpfGSSiAf2OL1cavDMsd3jv4K5bjhDj5oUv9OT6FLoGC0W5ITSbZcN8G7dp3V8zp64VUvdbI2yZX+9Tf0fYfffWV9f1mHbWZS+QOWr7Upx2+kFwKKFBzYMcJ65rjEc7VyPrzQktdfl3OEODHz84SsI5QzAe2kNbim+Q8YFCCcvZKISnBtohpp7bdx7IeE1cCM/cjPtOSV/GFf3B4RtkrMaZ8czPnFoRaddz6/nG6/0D5qQfZK46uNIP0pdibXCDfBsLDXU7oK+uBwq9sPxPAQKHVf5pGNqe/0kZLAwNZ13+SfifKvf/A4a2739SBgtDw1mXfxL+ceV28L+DTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrkthk65LYZOuS2GTrmthab5P5NUjBi05qA4AAAAAElFTkSuQmCC"
-            if client_id == 79
-            else ""
-        )
+        image = CLIENT_79_INVOICE_LOGO if client_id == 79 else ""
 
         gst = "27BAWPG3149K1Z5" if client_id == 79 else ""
 
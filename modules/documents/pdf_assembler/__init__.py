@@ -0,0 +1 @@
+from .pdf_assembler import PdfAssembler, iter_file, spool
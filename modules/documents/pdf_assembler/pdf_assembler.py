@@ -0,0 +1,272 @@
+import hashlib
+import io
+import tempfile
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from pypdf import PdfReader
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    StreamObject,
+)
+
+from utils.environment import Environment
+
+
+# assembled documents up to this size stay in memory, bigger ones spill to disk
+PDF_SPOOL_BYTES = int(Environment.get_string("PDF_SPOOL_MB", "16")) * 1024 * 1024
+
+# chunk size documents are streamed out in
+PDF_STREAM_CHUNK_BYTES = 64 * 1024
+
+CATALOG = 1
+PAGES = 2
+
+# page keys not carried over: the page tree is rebuilt, structure trees and
+# article threads of the source documents are not
+DROPPED_PAGE_KEYS = ("/Parent", "/StructParents", "/B")
+
+
+class PdfAssembler:
+    """
+    Concatenates PDFs into one, writing each document's pages and the objects
+    they use to `out` as the document is added, instead of collecting
+    everything in a PdfWriter and writing it at the end:
+
+        output = spool()
+        assembler = PdfAssembler(output)
+        for pdf in documents:
+            assembler.add(pdf)
+        assembler.close()
+
+    Documents that belong together (an order's label and invoice) go in
+    with `add_all`, which keeps all of them or, when one cannot be read,
+    none.
+
+    Objects are written once per content: a font, font file or image that
+    every label embeds is stored on the first label and referenced by the
+    rest. What stays in memory is an offset and a digest per object, so a
+    batch of thousands of labels needs about as much as a single one.
+    """
+
+    def __init__(self, out: BinaryIO):
+        self.out = out
+        self.position = 0
+        # object number -> offset, None for numbers never written
+        self.offsets: List[Optional[int]] = [None, None, None]
+        self.kids: List[int] = []
+        # digest of an object's serialized form -> its number
+        self.shared: Dict[bytes, int] = {}
+        self.closed = False
+
+        self._write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+    @property
+    def page_count(self) -> int:
+        return len(self.kids)
+
+    def _write(self, data: bytes):
+        self.out.write(data)
+        self.position += len(data)
+
+    def _allocate(self) -> int:
+        self.offsets.append(None)
+        return len(self.offsets) - 1
+
+    def _write_object(self, number: int, body: bytes):
+        self.offsets[number] = self.position
+        self._write(b"%d 0 obj\n" % number)
+        self._write(body)
+        self._write(b"\nendobj\n")
+
+    def add(self, pdf: bytes) -> int:
+        """Appends every page of one PDF; returns the number of pages added."""
+
+        reader = PdfReader(io.BytesIO(pdf))
+        if reader.is_encrypted:
+            reader.decrypt("")
+
+        copier = _DocumentCopier(self, reader)
+        pages = list(reader.pages)
+        numbers = copier.reserve_pages(pages)
+
+        for page, number in zip(pages, numbers):
+            copier.write_page(page, number)
+            self.kids.append(number)
+        return len(pages)
+
+    def add_all(self, pdfs: List[bytes]) -> int:
+        """
+        Appends several PDFs as one unit; returns the number of pages added.
+        When one of them fails, whatever the earlier ones wrote is cut off
+        again and the error is raised.
+        """
+
+        mark = (
+            self.out.tell(),
+            self.position,
+            len(self.offsets),
+            len(self.kids),
+            len(self.shared),
+        )
+        try:
+            return sum(self.add(pdf) for pdf in pdfs)
+        except Exception:
+            self._rewind(*mark)
+            raise
+
+    def _rewind(self, offset: int, position: int, objects: int, kids: int, shared: int):
+        self.out.seek(offset)
+        self.out.truncate()
+        self.position = position
+        del self.offsets[objects:]
+        del self.kids[kids:]
+        # digests are kept in the order their objects were written
+        for digest in list(self.shared)[shared:]:
+            del self.shared[digest]
+
+    def close(self):
+        """Writes the page tree, cross reference table and trailer."""
+
+        if self.closed:
+            return
+        self.closed = True
+
+        kids = b" ".join(b"%d 0 R" % number for number in self.kids)
+        self._write_object(
+            PAGES, b"<< /Type /Pages /Kids [ %s ] /Count %d >>" % (kids, len(self.kids))
+        )
+        self._write_object(CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % PAGES)
+
+        xref = self.position
+        self._write(b"xref\n0 %d\n" % len(self.offsets))
+        self._write(b"0000000000 65535 f \n")
+        for offset in self.offsets[1:]:
+            if offset is None:
+                self._write(b"0000000000 65535 f \n")
+            else:
+                self._write(b"%010d 00000 n \n" % offset)
+        self._write(
+            b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (len(self.offsets), CATALOG, xref)
+        )
+
+
+class _DocumentCopier:
+    """Copies the objects of one source document into the assembler."""
+
+    def __init__(self, assembler: PdfAssembler, reader: PdfReader):
+        self.assembler = assembler
+        self.reader = reader
+        # (source number, generation) -> number in the output
+        self.numbers: Dict[Tuple[int, int], int] = {}
+        self.visiting = set()
+
+        # the source page tree root becomes the output's
+        pages_root = reader.trailer["/Root"].get("/Pages")
+        if isinstance(pages_root, IndirectObject):
+            self.numbers[(pages_root.idnum, pages_root.generation)] = PAGES
+
+    def reserve_pages(self, pages) -> List[int]:
+        """Numbers every page first, so links and annotations between pages resolve."""
+
+        numbers = []
+        for page in pages:
+            number = self.assembler._allocate()
+            reference = page.indirect_reference
+            if reference is not None:
+                self.numbers[(reference.idnum, reference.generation)] = number
+            numbers.append(number)
+        return numbers
+
+    def write_page(self, page, number: int):
+        copied = DictionaryObject()
+        for key, value in page.items():
+            if key not in DROPPED_PAGE_KEYS:
+                copied[NameObject(key)] = self.copy(value)
+        copied[NameObject("/Parent")] = IndirectObject(PAGES, 0, None)
+        self.assembler._write_object(number, _serialize(copied))
+
+    def reference(self, reference: IndirectObject) -> IndirectObject:
+        key = (reference.idnum, reference.generation)
+        number = self.numbers.get(key)
+        if number is not None:
+            return IndirectObject(number, 0, None)
+
+        if key in self.visiting:
+            # a cycle back to an object being copied: number it now, it is
+            # written under this number once its copy is complete
+            number = self.numbers[key] = self.assembler._allocate()
+            return IndirectObject(number, 0, None)
+
+        self.visiting.add(key)
+        try:
+            body = _serialize(self.copy(reference.get_object()))
+        finally:
+            self.visiting.discard(key)
+
+        number = self.numbers.get(key)
+        if number is None:
+            digest = hashlib.blake2b(body, digest_size=16).digest()
+            number = self.assembler.shared.get(digest)
+            if number is not None:
+                self.numbers[key] = number
+                return IndirectObject(number, 0, None)
+
+            number = self.numbers[key] = self.assembler._allocate()
+            self.assembler.shared[digest] = number
+
+        self.assembler._write_object(number, body)
+        return IndirectObject(number, 0, None)
+
+    def copy(self, value):
+        if isinstance(value, IndirectObject):
+            return self.reference(value)
+
+        if isinstance(value, StreamObject):
+            copied = StreamObject()
+            # the still encoded data, it is written as read
+            copied._data = value._data
+            for key, item in value.items():
+                if key != "/Length":
+                    copied[NameObject(key)] = self.copy(item)
+            return copied
+
+        if isinstance(value, DictionaryObject):
+            copied = DictionaryObject()
+            for key, item in value.items():
+                copied[NameObject(key)] = self.copy(item)
+            return copied
+
+        if isinstance(value, ArrayObject):
+            return ArrayObject(self.copy(item) for item in value)
+
+        return value
+
+
+def _serialize(value) -> bytes:
+    buffer = io.BytesIO()
+    value.write_to_stream(buffer)
+    return buffer.getvalue()
+
+
+def spool() -> BinaryIO:
+    """Where an assembled document is written before it is sent out."""
+
+    return tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_BYTES)
+
+
+def iter_file(fileobj: BinaryIO) -> Iterator[bytes]:
+    """Streams a spooled document from the start, closing it when done."""
+
+    try:
+        fileobj.seek(0)
+        while True:
+            chunk = fileobj.read(PDF_STREAM_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        fileobj.close()
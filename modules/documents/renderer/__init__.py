@@ -0,0 +1,20 @@
+"""
+Direct-drawing PDF renderer for labels, invoices and manifests.
+
+Draws on a ReportLab canvas from precomputed layouts instead of building HTML
+and laying it out with xhtml2pdf. Set DOCUMENT_RENDERER=html to go back to
+the HTML templates.
+"""
+
+from utils.environment import Environment
+
+from .labels import draw_label, render_label
+from .invoice import draw_default_invoice, render_invoice
+from .manifest import draw_manifest, render_manifest
+
+
+DOCUMENT_RENDERER = Environment.get_string("DOCUMENT_RENDERER", "canvas")
+
+
+def use_canvas_renderer() -> bool:
+    return DOCUMENT_RENDERER != "html"
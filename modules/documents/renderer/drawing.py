@@ -0,0 +1,205 @@
+"""
+Drawing primitives shared by the label, invoice and manifest renderers.
+
+Coordinates follow ReportLab (origin bottom-left); every helper takes the top
+of the area it draws into and returns the y where the next element starts.
+"""
+
+import io
+import base64
+import functools
+from typing import Optional
+
+import requests
+from reportlab.lib.utils import ImageReader, simpleSplit
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
+
+from logger import logger
+from modules.documents.barcode import BarcodeService
+
+
+FONT = "Helvetica"
+BOLD_FONT = "Helvetica-Bold"
+
+LOGO_CACHE_SIZE = 128
+
+
+def fit_text(text, font: str, size: float, width: float, ellipsis: str = "...") -> str:
+    """Cut a single line down to `width`, the way a fixed table cell clips it."""
+
+    text = "" if text is None else str(text)
+    if stringWidth(text, font, size) <= width:
+        return text
+
+    while text and stringWidth(text + ellipsis, font, size) > width:
+        text = text[:-1]
+    return text + ellipsis
+
+
+def wrap_text(text, font: str, size: float, width: float):
+    text = "" if text is None else str(text)
+    return simpleSplit(text, font, size, width) or [""]
+
+
+def draw_barcode(c: Canvas, value, x: float, y: float, width: float, height: float):
+    """Draw a Code128 barcode as vector bars inside width x height at (x, y)."""
+
+    BarcodeService.draw(c, value, x, y, width, height)
+
+
+@functools.lru_cache(maxsize=LOGO_CACHE_SIZE)
+def _load_logo(url: str) -> ImageReader:
+    response = requests.get(url, timeout=10)
+    response.raise_for_status()
+    return ImageReader(io.BytesIO(response.content))
+
+
+def get_logo(url: Optional[str]) -> Optional[ImageReader]:
+    """Client logos are fetched once per process and reused for every label."""
+
+    if not url:
+        return None
+
+    try:
+        return _load_logo(url)
+    except Exception as e:
+        logger.error(f"Error fetching image from URL: {url}, error: {e}")
+        return None
+
+
+@functools.lru_cache(maxsize=16)
+def image_from_data_uri(data_uri: str) -> Optional[ImageReader]:
+    if not data_uri:
+        return None
+
+    encoded = data_uri.split(",", 1)[-1]
+    return ImageReader(io.BytesIO(base64.b64decode(encoded)))
+
+
+def draw_image(
+    c: Canvas, image: ImageReader, x: float, top: float, width: float
+) -> float:
+    """Draw an image scaled to `width` with its top edge at `top`."""
+
+    image_width, image_height = image.getSize()
+    height = width * image_height / image_width if image_width else 0
+
+    c.drawImage(
+        image, x, top - height, width=width, height=height, mask="auto"
+    )
+    return top - height
+
+
+class Column:
+    """
+    A top-down text cursor over one column of a band, standing in for the
+    table cells of the old HTML templates.
+    """
+
+    def __init__(
+        self,
+        c: Canvas,
+        x: float,
+        top: float,
+        width: float,
+        font_size: float,
+        leading_ratio: float = 1.25,
+        align: str = "left",
+    ):
+        self.c = c
+        self.x = x
+        self.y = top
+        self.width = width
+        self.font_size = font_size
+        self.leading_ratio = leading_ratio
+        self.align = align
+
+    def _draw_line(self, text: str, font: str, size: float, align: str):
+        self.c.setFont(font, size)
+        if align == "center":
+            self.c.drawCentredString(self.x + self.width / 2, self.y, text)
+        elif align == "right":
+            self.c.drawRightString(self.x + self.width, self.y, text)
+        else:
+            self.c.drawString(self.x, self.y, text)
+
+    def text(self, text, bold: bool = False, size: float = None, align: str = None):
+        size = size or self.font_size
+        font = BOLD_FONT if bold else FONT
+
+        for line in wrap_text(text, font, size, self.width):
+            self.y -= size * self.leading_ratio
+            self._draw_line(line, font, size, align or self.align)
+
+    def runs(self, runs, size: float = None, align: str = None):
+        """One line made of (text, bold) runs, e.g. `Powered by <b>...</b>`."""
+
+        size = size or self.font_size
+        align = align or self.align
+        widths = [
+            stringWidth(text, BOLD_FONT if bold else FONT, size) for text, bold in runs
+        ]
+
+        x = self.x
+        if align == "center":
+            x += (self.width - sum(widths)) / 2
+        elif align == "right":
+            x += self.width - sum(widths)
+
+        self.y -= size * self.leading_ratio
+        for (text, bold), width in zip(runs, widths):
+            self.c.setFont(BOLD_FONT if bold else FONT, size)
+            self.c.drawString(x, self.y, text)
+            x += width
+
+    def labelled(self, label: str, value, size: float = None):
+        """`label` in bold followed by the value, like <b>AWB</b> - 123."""
+
+        size = size or self.font_size
+        value = "" if value is None else str(value)
+
+        if self.align != "left":
+            self.text(f"{label}{value}", size=size)
+            return
+
+        # wrapping drops leading blanks, so keep them on the label side
+        stripped = value.lstrip()
+        label_width = stringWidth(label, BOLD_FONT, size) + stringWidth(
+            value[: len(value) - len(stripped)], FONT, size
+        )
+        value = stripped
+
+        first, *rest = wrap_text(value, FONT, size, max(self.width - label_width, 1))
+        remaining = value[len(first):].strip()
+
+        self.y -= size * self.leading_ratio
+        self.c.setFont(BOLD_FONT, size)
+        self.c.drawString(self.x, self.y, label)
+        self.c.setFont(FONT, size)
+        self.c.drawString(self.x + label_width, self.y, first)
+
+        if rest and remaining:
+            self.text(remaining, size=size)
+
+    def barcode(self, value, height: float, width_ratio: float = 1.0):
+        width = self.width * width_ratio
+        self.y -= height + 4
+
+        if self.align == "center":
+            x = self.x + (self.width - width) / 2
+        else:
+            x = self.x
+        draw_barcode(self.c, value, x, self.y, width, height)
+
+    def image(self, image: ImageReader, width: float):
+        width = min(width, self.width)
+        x = self.x + self.width - width if self.align == "right" else self.x
+        self.y = draw_image(self.c, image, x, self.y - 2, width)
+
+    def gap(self, height: float):
+        self.y -= height
+
+
+def hline(c: Canvas, x: float, y: float, width: float):
+    c.line(x, y, x + width, y)
@@ -0,0 +1,227 @@
+"""
+Default order invoice (modules/documents/invoice/invoice.py::default_invoice)
+drawn straight onto a ReportLab canvas.
+"""
+
+from io import BytesIO
+from typing import Optional
+
+from reportlab.pdfgen.canvas import Canvas
+
+from logger import logger
+from modules.orders.order_schema import Order_Model
+from modules.documents.invoice.invoice import CLIENT_79_INVOICE_LOGO
+
+from .drawing import BOLD_FONT, FONT, Column, fit_text, hline, image_from_data_uri, wrap_text
+from .layouts import DEFAULT_INVOICE_LAYOUT, InvoiceLayout
+
+
+CLIENT_INVOICE_LOGOS = {79: CLIENT_79_INVOICE_LOGO}
+CLIENT_GSTIN = {79: "27BAWPG3149K1Z5"}
+
+# clients whose invoice shows the 5% tax included in the order value
+TAX_LINE_CLIENTS = (79,)
+
+
+def _invoice_date(order: Order_Model) -> str:
+    date = order.booking_date or order.order_date
+    return date.strftime("%d %B %Y, %H:%M:%S")
+
+
+class _InvoicePage:
+    """Tracks the page being drawn so long product lists can continue."""
+
+    def __init__(self, c: Canvas, layout: InvoiceLayout):
+        self.c = c
+        self.layout = layout
+        self.x = layout.margin + layout.padding
+        self.width = layout.frame_width - 2 * layout.padding
+        self.floor = layout.margin + layout.padding
+        self.y = None
+        self.new_page(first=True)
+
+    def new_page(self, first: bool = False):
+        if not first:
+            self.c.showPage()
+
+        layout = self.layout
+        self.c.setPageSize(layout.page_size)
+        if layout.border:
+            self.c.rect(
+                layout.margin,
+                layout.margin,
+                layout.frame_width,
+                layout.height - 2 * layout.margin,
+            )
+        self.y = layout.height - layout.margin
+
+    def ensure(self, height: float) -> bool:
+        """Start a new page when `height` does not fit; True if it did."""
+
+        if self.y - height >= self.floor:
+            return False
+
+        self.new_page()
+        return True
+
+    def rule(self, y: float = None):
+        self.y = self.y if y is None else y
+        hline(self.c, self.layout.margin, self.y, self.layout.frame_width)
+
+    def columns(self, split=0.5, aligns=("left", "right")):
+        layout = self.layout
+        left_width = self.width * split
+        return (
+            Column(
+                self.c,
+                self.x,
+                self.y - layout.padding,
+                left_width - layout.padding,
+                layout.font_size,
+                layout.leading_ratio,
+                aligns[0],
+            ),
+            Column(
+                self.c,
+                self.x + left_width,
+                self.y - layout.padding,
+                self.width - left_width,
+                layout.font_size,
+                layout.leading_ratio,
+                aligns[1],
+            ),
+        )
+
+
+def _product_header(page: _InvoicePage, positions):
+    layout = page.layout
+    page.y -= layout.padding + layout.leading
+    page.c.setFont(BOLD_FONT, layout.font_size)
+    for (x, _), header in zip(positions, ("Product", "SKU", "Qty", "Amount")):
+        page.c.drawString(x, page.y, header)
+
+
+def _products(page: _InvoicePage, order: Order_Model):
+    layout = page.layout
+    size = layout.small_font_size
+    leading = size * layout.leading_ratio
+
+    positions = []
+    x = page.x
+    for fraction in layout.product_columns:
+        positions.append((x, page.width * fraction))
+        x += page.width * fraction
+
+    _product_header(page, positions)
+
+    for product in order.products or []:
+        name = product["name"]
+        if len(name) > layout.product_name_length:
+            name = name[: layout.product_name_length] + "..."
+        name_lines = wrap_text(name, FONT, size, positions[0][1] - 3)
+
+        if page.ensure(len(name_lines) * leading):
+            _product_header(page, positions)
+
+        quantity = float(product["quantity"])
+        amount = quantity * float(product["unit_price"])
+
+        page.c.setFont(FONT, size)
+        row_y = page.y - leading
+        page.c.drawString(
+            positions[1][0],
+            row_y,
+            fit_text(product["sku_code"] or "-", FONT, size, positions[1][1] - 3),
+        )
+        page.c.drawString(positions[2][0], row_y, str(quantity))
+        page.c.drawString(positions[3][0], row_y, f"{amount:.2f}")
+
+        for line in name_lines:
+            page.y -= leading
+            page.c.drawString(positions[0][0], page.y, line)
+
+    page.rule(page.y - layout.padding)
+
+
+def _totals(page: _InvoicePage, order: Order_Model, client_id: int):
+    layout = page.layout
+    lines = []
+    if client_id in TAX_LINE_CLIENTS:
+        lines.append(
+            ("Tax ( Included ): ", f"{round(float(order.order_value) * 0.05, 2)}")
+        )
+    lines.append(("Shipping charge: ", f"{order.shipping_charges or 0}"))
+
+    page.ensure((len(lines) + 4) * layout.leading + 2 * layout.padding)
+
+    right = page.x + page.width
+    for label, value in lines:
+        page.y -= layout.leading + layout.padding
+        page.c.setFont(FONT, layout.font_size)
+        page.c.drawRightString(right, page.y, f"{label} {value}")
+
+    # grand total sits between two rules on the right third, like the HTML box
+    box_x = page.x + page.width * 0.55
+    page.y -= 3 * layout.leading
+    hline(page.c, box_x, page.y, right - box_x)
+    page.y -= layout.leading
+    page.c.setFont(BOLD_FONT, layout.font_size)
+    page.c.drawString(box_x + 2, page.y, "Grand Total:")
+    page.c.drawRightString(right, page.y, f"Rs {order.total_amount}")
+    page.y -= layout.padding
+    hline(page.c, box_x, page.y, right - box_x)
+
+
+def draw_default_invoice(
+    c: Canvas,
+    order: Order_Model,
+    client_name: str,
+    client_id: int,
+    layout: InvoiceLayout = DEFAULT_INVOICE_LAYOUT,
+):
+    page = _InvoicePage(c, layout)
+
+    left, right = page.columns()
+    logo = image_from_data_uri(CLIENT_INVOICE_LOGOS.get(client_id, ""))
+    if logo:
+        left.image(logo, layout.logo_width)
+    right.text("TAX INVOICE", bold=True)
+    right.text(f"Invoice No: LM/{client_id}/{order.order_id}")
+    right.text(f"Invoice Date {_invoice_date(order)}")
+    right.text(f"Order No: {order.order_id}")
+    page.rule(min(left.y, right.y) - layout.padding)
+
+    left, right = page.columns()
+    left.text("STORE", bold=True)
+    left.text(client_name, bold=True)
+    left.text(order.pickup_location.address)
+    left.text(f"Email: {order.pickup_location.contact_person_email}")
+    left.text(f"GSTIN: {CLIENT_GSTIN.get(client_id, '')}")
+    right.text("BILL TO", bold=True)
+    right.text(order.consignee_full_name, bold=True)
+    right.text(order.consignee_address)
+    right.text(f"Email: {order.consignee_email or ''}")
+    right.text(order.consignee_phone)
+    page.rule(min(left.y, right.y) - layout.padding)
+
+    _products(page, order)
+    _totals(page, order, client_id)
+
+    c.showPage()
+
+
+def render_invoice(
+    order: Order_Model, client_name: str, client_id: int
+) -> Optional[BytesIO]:
+    try:
+        buffer = BytesIO()
+        c = Canvas(buffer)
+        draw_default_invoice(c, order, client_name, client_id)
+        c.save()
+
+        buffer.seek(0)
+        return buffer
+
+    except Exception as e:
+        logger.error(msg="could not create invoice : {}".format(str(e)))
+        return None
@@ -0,0 +1,591 @@
+"""
+Shipping labels drawn straight onto a ReportLab canvas.
+
+Mirrors templates/default_label.py and templates/thermal_label.py band for
+band, and honours the same LabelSettingResponseModel toggles.
+"""
+
+from io import BytesIO
+from typing import Optional
+
+from pytz import timezone
+from reportlab.pdfgen.canvas import Canvas
+
+from context_manager.context import get_db_session
+from logger import logger
+from models import Courier_Routing_Code
+from modules.orders.order_schema import Order_Model
+from modules.documents.shipping_label.shipping_label_schema import (
+    LabelSettingResponseModel,
+)
+from modules.documents.shipping_label.templates.common.utils import (
+    get_shipper_gstin,
+    sanitize_product_name,
+)
+from utils.string import truncate_text
+
+from .drawing import BOLD_FONT, FONT, Column, fit_text, get_logo, hline, wrap_text
+from .layouts import DEFAULT_LABEL_LAYOUT, THERMAL_LABEL_LAYOUT, LabelLayout
+
+
+BRANDING = "Last Miles @ Warehousity"
+
+# clients that do not print the pickup contact on thermal labels
+HIDE_PICKUP_CONTACT_CLIENTS = (402, 424)
+
+# clients whose thermal labels leave the product table blank
+HIDE_PRODUCTS_CLIENTS = (310,)
+
+
+# ---------------------------------------------------------------------------
+# Content helpers
+# ---------------------------------------------------------------------------
+
+
+def _order_date(order: Order_Model) -> str:
+    ist = timezone("Asia/Kolkata")
+    date = order.booking_date or order.order_date
+    return date.astimezone(ist).strftime("%Y-%m-%d, %H:%M:%S")
+
+
+def _number(value) -> str:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return "" if value is None else str(value)
+
+    if value.is_integer():
+        return str(int(value))
+    return ("{:.3f}".format(value)).rstrip("0").rstrip(".")
+
+
+def _dimensions(order: Order_Model) -> str:
+    return (
+        f"{_number(order.length)} x {_number(order.breadth)} x "
+        f"{_number(order.height)} cm"
+    )
+
+
+def _bluedart_codes(order: Order_Model):
+    if not (order.courier_partner and "bluedart" in order.courier_partner.lower()):
+        return None, None
+
+    db = get_db_session()
+    codes = (
+        db.query(Courier_Routing_Code)
+        .filter(
+            Courier_Routing_Code.pincode == order.consignee_pincode,
+        )
+        .first()
+    )
+
+    if not codes:
+        return None, None
+
+    return codes.bluedart_routing_code, codes.bluedart_cluster_code
+
+
+def _consignee_address(order: Order_Model) -> str:
+    landmark = getattr(order, "consignee_landmark", None)
+    return f"{order.consignee_address}{' ' + landmark if landmark else ''}"
+
+
+def _pickup_address(order: Order_Model) -> str:
+    landmark = getattr(order.pickup_location, "landmark", None)
+    return f"{order.pickup_location.address}{' ' + landmark if landmark else ''}"
+
+
+def _show_amount(order: Order_Model, settings: LabelSettingResponseModel) -> bool:
+    return (order.payment_mode == "prepaid" and settings.prepaid_amount) or (
+        order.payment_mode == "COD" and settings.COD_amount
+    )
+
+
+def _message(order: Order_Model) -> str:
+    return (
+        f"All disputes will be resolved under {order.pickup_location.state} "
+        "jurisdiction. Sold goods are eligible for return or exchange according "
+        "to the store's policy."
+    )
+
+
+# ---------------------------------------------------------------------------
+# Bands
+# ---------------------------------------------------------------------------
+
+
+def _band(c: Canvas, layout: LabelLayout, top: float, split, aligns=("left", "left")):
+    inner_x = layout.margin + layout.padding
+    inner_width = layout.frame_width - 2 * layout.padding
+    left_width = inner_width * split[0]
+
+    left = Column(
+        c,
+        inner_x,
+        top - layout.padding,
+        left_width - layout.padding,
+        layout.font_size,
+        layout.leading_ratio,
+        aligns[0],
+    )
+    right = Column(
+        c,
+        inner_x + left_width,
+        top - layout.padding,
+        inner_width - left_width,
+        layout.font_size,
+        layout.leading_ratio,
+        aligns[1],
+    )
+    return left, right
+
+
+def _rule(c: Canvas, layout: LabelLayout, y: float) -> float:
+    hline(c, layout.margin, y, layout.frame_width)
+    return y
+
+
+def _close_band(c: Canvas, layout: LabelLayout, *columns) -> float:
+    return _rule(c, layout, min(column.y for column in columns) - layout.padding)
+
+
+def _ship_to(column: Column, order: Order_Model, settings, address_length=None):
+    address = _consignee_address(order)
+    if address_length:
+        address = truncate_text(address, address_length)
+
+    column.text("Ship To :", bold=True)
+    column.text(order.consignee_full_name)
+    column.text(address)
+    column.text(
+        f"{order.consignee_pincode}, {order.consignee_city}, {order.consignee_state}"
+    )
+    if settings.consignee_phone:
+        column.labelled("Mobile Number", f" - {order.consignee_phone}")
+
+
+def _logo(column: Column, settings, layout: LabelLayout):
+    if not (settings.logo_shown and settings.logo_url):
+        return
+
+    logo = get_logo(settings.logo_url)
+    if logo:
+        column.image(logo, layout.logo_width)
+
+
+def _courier(column: Column, order: Order_Model, layout: LabelLayout):
+    routing_code, cluster_code = _bluedart_codes(order)
+
+    column.labelled("Courier", f" - {order.courier_partner}")
+    column.barcode(order.awb_number, layout.barcode_height, layout.barcode_width_ratio)
+    column.labelled("AWB", f" - {order.awb_number}")
+
+    if routing_code:
+        column.labelled("Routing Code", f" - {routing_code}")
+    if cluster_code:
+        column.labelled("Cluster Code", f" - {cluster_code}")
+
+
+def _package(column: Column, order: Order_Model, settings, dimension_label: str):
+    if settings.package_dimensions:
+        column.labelled(dimension_label, f": {_dimensions(order)}")
+    if settings.weight:
+        column.labelled("Weight", f": {_number(order.weight)} kg")
+    if settings.order_date:
+        column.labelled("Date", f": {_order_date(order)}")
+
+
+def _shipper(
+    column: Column,
+    order: Order_Model,
+    settings,
+    client_name: str,
+    show_contact: bool,
+    address_length=None,
+    gst: str = "",
+):
+    pickup = order.pickup_location
+    address = _pickup_address(order)
+    if address_length:
+        address = truncate_text(address, address_length)
+
+    if settings.pickup_address:
+        column.labelled("Shipped By", ": ( if undelivered, return to )")
+    if settings.company_name:
+        column.text(client_name)
+    if settings.pickup_address:
+        column.text(address)
+        column.text(f"{pickup.pincode}, {pickup.city}, {pickup.state}")
+        if show_contact:
+            column.labelled("Mobile Number", f" - {pickup.contact_person_phone}")
+            column.labelled("Email", f" - {pickup.contact_person_email}")
+    if gst:
+        column.text(f"GST - {gst}")
+
+
+def _order_summary(column: Column, order: Order_Model, settings, layout: LabelLayout):
+    column.runs(
+        [("Order ID", True), (f": {truncate_text(order.order_id, 15)}", False)]
+    )
+
+    if settings.order_id_barcode_enabled:
+        column.barcode(
+            order.order_id, layout.barcode_height, layout.barcode_width_ratio
+        )
+
+    column.gap(layout.padding)
+    if settings.payment_type:
+        column.text(
+            order.payment_mode.upper(), bold=True, size=layout.heading_font_size
+        )
+    if _show_amount(order, settings):
+        column.text(
+            f"Rs {float(order.total_amount):.2f}",
+            bold=True,
+            size=layout.heading_font_size,
+        )
+
+
+# ---------------------------------------------------------------------------
+# Default (A4) label
+# ---------------------------------------------------------------------------
+
+
+def _default_footer_height(layout: LabelLayout, order: Order_Model, settings) -> float:
+    inner_width = layout.frame_width - 2 * layout.padding
+    message_lines = (
+        len(
+            wrap_text(
+                _message(order),
+                FONT,
+                layout.font_size,
+                inner_width * layout.footer_split[0] - layout.padding,
+            )
+        )
+        if settings.message
+        else 0
+    )
+    branding_lines = 2 if settings.branding else 0
+
+    return max(message_lines, branding_lines) * layout.leading + 2 * layout.padding
+
+
+def _default_products(
+    c: Canvas,
+    layout: LabelLayout,
+    top: float,
+    floor: float,
+    order: Order_Model,
+    settings,
+) -> float:
+    inner_x = layout.margin + layout.padding
+    inner_width = layout.frame_width - 2 * layout.padding
+    size = layout.product_font_size
+    leading = size * layout.leading_ratio
+
+    name_width = inner_width * 0.7 - layout.padding
+    qty_x = inner_x + inner_width * 0.775
+    amount_x = inner_x + inner_width * 0.925
+
+    y = top - layout.padding - leading
+    c.setFont(BOLD_FONT, size)
+    c.drawString(inner_x, y, "Product" if settings.product_name else "Item")
+    c.drawCentredString(qty_x, y, "Quantity")
+    c.drawCentredString(amount_x, y, "Amount")
+
+    products = order.products or []
+    drawn = 0
+
+    for product in products:
+        lines = []
+        if settings.product_name:
+            lines = [
+                (line, False, size)
+                for line in wrap_text(
+                    sanitize_product_name(product["name"], layout.product_name_length),
+                    FONT,
+                    size,
+                    name_width,
+                )
+            ]
+
+        sku = product.get("sku_code", "")
+        if settings.SKU and sku:
+            sku = truncate_text(sku, layout.product_sku_length)
+            lines.append(
+                (f"SKU - {sku}", True, size - 1) if lines else (sku, False, size)
+            )
+
+        row_height = max(len(lines), 1) * leading
+        # unless this is the last product, keep a line free for "+ N more"
+        is_last = drawn == len(products) - 1
+        if y - row_height - (0 if is_last else leading) < floor:
+            break
+
+        row_y = y - leading
+        amount = float(product.get("quantity", 0)) * float(
+            product.get("unit_price", 0) or 0
+        )
+        c.setFont(FONT, size)
+        c.drawCentredString(qty_x, row_y, _number(product.get("quantity", "")))
+        c.drawCentredString(amount_x, row_y, f"{amount:.2f}")
+
+        for text, bold, line_size in lines:
+            y -= leading
+            c.setFont(BOLD_FONT if bold else FONT, line_size)
+            c.drawString(inner_x, y, text)
+        if not lines:
+            y -= leading
+
+        drawn += 1
+
+    if drawn < len(products):
+        y -= leading
+        c.setFont(FONT, size)
+        c.drawString(inner_x, y, f"+ {len(products) - drawn} more item(s)")
+        drawn += 1
+
+    # pad to the fixed table height of the HTML label
+    for _ in range(max(0, layout.min_product_rows - drawn)):
+        if y - leading < floor:
+            break
+        y -= leading
+
+    return _rule(c, layout, y - layout.padding)
+
+
+def draw_default_label(
+    c: Canvas,
+    order: Order_Model,
+    settings: LabelSettingResponseModel,
+    client_name: str,
+    client_id: int,
+    layout: LabelLayout = DEFAULT_LABEL_LAYOUT,
+):
+    top = layout.height - layout.margin
+    if layout.border:
+        c.rect(layout.margin, layout.margin, layout.frame_width, top - layout.margin)
+
+    left, right = _band(c, layout, top, layout.address_split)
+    _ship_to(left, order, settings)
+    _logo(right, settings, layout)
+    top = _close_band(c, layout, left, right)
+
+    left, right = _band(c, layout, top, layout.courier_split)
+    _courier(left, order, layout)
+    _package(right, order, settings, "Dimensions")
+    top = _close_band(c, layout, left, right)
+
+    left, right = _band(c, layout, top, layout.shipper_split, ("left", "center"))
+    _shipper(
+        left,
+        order,
+        settings,
+        client_name,
+        show_contact=True,
+        gst=get_shipper_gstin(client_id),
+    )
+    _order_summary(right, order, settings, layout)
+    top = _close_band(c, layout, left, right)
+
+    footer_height = _default_footer_height(layout, order, settings)
+    top = _default_products(
+        c, layout, top, layout.margin + footer_height, order, settings
+    )
+
+    left, right = _band(c, layout, top, layout.footer_split)
+    if settings.message:
+        left.text(_message(order))
+    if settings.branding:
+        right.text("Powered by")
+        right.text(BRANDING, bold=True)
+    _close_band(c, layout, left, right)
+
+
+# ---------------------------------------------------------------------------
+# Thermal (4x6in) label
+# ---------------------------------------------------------------------------
+
+
+def _thermal_columns(settings, layout: LabelLayout):
+    """(header, fraction, text length) per column, from the SKU/name toggles."""
+
+    if settings.SKU and settings.product_name:
+        return [
+            ("Product", 0.47, 30),
+            ("SKU", 0.28, 15),
+            ("Qty", 0.1, None),
+            ("Amt", 0.15, None),
+        ]
+    if settings.SKU:
+        return [("SKU", 0.5, 40), ("Qty", 0.25, None), ("Amt", 0.25, None)]
+
+    return [
+        ("Product", 0.6, layout.product_name_length),
+        ("Qty", 0.2, None),
+        ("Amt", 0.2, None),
+    ]
+
+
+def _thermal_products(
+    c: Canvas, layout: LabelLayout, top: float, order: Order_Model, settings
+) -> float:
+    inner_x = layout.margin + layout.padding
+    inner_width = layout.frame_width - 2 * layout.padding
+    size = layout.product_font_size
+    leading = size * layout.leading_ratio
+
+    columns = _thermal_columns(settings, layout)
+    positions = []
+    x = inner_x
+    for header, fraction, length in columns:
+        positions.append((x, inner_width * fraction))
+        x += inner_width * fraction
+
+    def row(values, bold=False):
+        nonlocal y
+        y -= leading
+        c.setFont(BOLD_FONT if bold else FONT, size)
+        for index, ((cell_x, cell_width), value) in enumerate(zip(positions, values)):
+            font = BOLD_FONT if bold else FONT
+            value = fit_text(value, font, size, cell_width - 2)
+            # name/SKU cells are left aligned, Qty and Amt are centered
+            if index < len(columns) - 2:
+                c.drawString(cell_x, y, value)
+            else:
+                c.drawCentredString(cell_x + cell_width / 2, y, value)
+
+    y = top - layout.padding
+    row([header for header, _, _ in columns], bold=True)
+
+    products = order.products or []
+    total_quantity = 0
+
+    for product in products[: layout.max_product_rows]:
+        quantity = float(product["quantity"])
+        total_quantity += quantity
+        amount = quantity * float(product["unit_price"])
+        sku = product.get("sku_code") or "-"
+
+        if settings.product_name:
+            cells = [sanitize_product_name(product["name"], columns[0][2])]
+            if settings.SKU:
+                cells.append(truncate_text(sku, columns[1][2]))
+        else:
+            cells = [truncate_text(sku, columns[0][2])]
+
+        row(cells + [_number(quantity), f"{amount:.2f}"])
+
+    rows = min(len(products), layout.max_product_rows)
+    if len(products) > layout.max_product_rows:
+        remaining = _number(float(order.product_quantity) - total_quantity)
+        row([f" +  {remaining} Items ..."] + [""] * (len(columns) - 1))
+        rows += 1
+
+    for _ in range(max(0, layout.min_product_rows - rows)):
+        y -= leading
+
+    row(
+        ["Total"]
+        + [""] * (len(columns) - 3)
+        + [_number(order.product_quantity), f"{float(order.order_value):.2f}"],
+        bold=True,
+    )
+
+    return _rule(c, layout, y - layout.padding)
+
+
+def draw_thermal_label(
+    c: Canvas,
+    order: Order_Model,
+    settings: LabelSettingResponseModel,
+    client_name: str,
+    client_id: int,
+    layout: LabelLayout = THERMAL_LABEL_LAYOUT,
+):
+    top = layout.height - layout.margin
+    if layout.border:
+        c.rect(layout.margin, layout.margin, layout.frame_width, top - layout.margin)
+
+    left, right = _band(c, layout, top, layout.address_split)
+    _ship_to(left, order, settings, address_length=120)
+    _logo(right, settings, layout)
+    top = _close_band(c, layout, left, right)
+
+    left, right = _band(c, layout, top, layout.courier_split)
+    _package(left, order, settings, "Dim")
+    if settings.payment_type:
+        left.labelled("Payment mode", f": {order.payment_mode.upper()}")
+    _courier(right, order, layout)
+    top = _close_band(c, layout, left, right)
+
+    left, right = _band(c, layout, top, layout.shipper_split, ("left", "center"))
+    _shipper(
+        left,
+        order,
+        settings,
+        client_name,
+        show_contact=client_id not in HIDE_PICKUP_CONTACT_CLIENTS,
+        address_length=120,
+    )
+    _order_summary(right, order, settings, layout)
+    right.text("* All prices are including GST", size=layout.small_font_size)
+    top = _close_band(c, layout, left, right)
+
+    if client_id not in HIDE_PRODUCTS_CLIENTS:
+        top = _thermal_products(c, layout, top, order, settings)
+    else:
+        top -= 5 * layout.leading
+
+    if settings.message or settings.branding:
+        footer, _ = _band(c, layout, top, layout.footer_split)
+        footer.font_size = layout.small_font_size
+        if settings.message:
+            footer.text(_message(order))
+        if settings.branding:
+            footer.runs([("Powered by ", False), (BRANDING, True)], align="center")
+        _close_band(c, layout, footer)
+
+
+# ---------------------------------------------------------------------------
+# Entry points
+# ---------------------------------------------------------------------------
+
+
+def draw_label(
+    c: Canvas,
+    order: Order_Model,
+    settings: LabelSettingResponseModel,
+    client_name: str,
+    client_id: int,
+):
+    """Draw one label on the current page of `c` and finish the page."""
+
+    if settings.label_format == "thermal":
+        c.setPageSize(THERMAL_LABEL_LAYOUT.page_size)
+        draw_thermal_label(c, order, settings, client_name, client_id)
+    else:
+        c.setPageSize(DEFAULT_LABEL_LAYOUT.page_size)
+        draw_default_label(c, order, settings, client_name, client_id)
+
+    c.showPage()
+
+
+def render_label(
+    order: Order_Model,
+    settings: LabelSettingResponseModel,
+    client_name: str,
+    client_id: int,
+) -> Optional[BytesIO]:
+    try:
+        buffer = BytesIO()
+        c = Canvas(buffer)
+        draw_label(c, order, settings, client_name, client_id)
+        c.save()
+
+        buffer.seek(0)
+        return buffer
+
+    except Exception as e:
+        logger.error(msg=f"Could not render shipping label: {str(e)}")
+        return None
@@ -0,0 +1,124 @@
+"""
+Precomputed page layouts for the canvas renderer.
+
+Every size is in points (1/72 inch). Column splits are fractions of the
+printable width so a layout can be rescaled by changing the page size only.
+"""
+
+from dataclasses import dataclass
+from typing import Tuple
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+
+
+@dataclass(frozen=True)
+class PageLayout:
+    page_size: Tuple[float, float]
+    margin: float
+    padding: float
+    font_size: float
+    small_font_size: float
+    heading_font_size: float
+    leading_ratio: float = 1.25
+    border: bool = True
+
+    @property
+    def width(self) -> float:
+        return self.page_size[0]
+
+    @property
+    def height(self) -> float:
+        return self.page_size[1]
+
+    @property
+    def frame_width(self) -> float:
+        return self.width - 2 * self.margin
+
+    @property
+    def leading(self) -> float:
+        return self.font_size * self.leading_ratio
+
+
+@dataclass(frozen=True)
+class LabelLayout(PageLayout):
+    # (left, right) fractions of each band
+    address_split: Tuple[float, float] = (0.7, 0.3)
+    courier_split: Tuple[float, float] = (0.7, 0.3)
+    shipper_split: Tuple[float, float] = (0.6, 0.4)
+    footer_split: Tuple[float, float] = (0.7, 0.3)
+    product_font_size: float = 10
+    logo_width: float = 75
+    barcode_height: float = 50
+    barcode_width_ratio: float = 0.9  # of the column holding the barcode
+    min_product_rows: int = 8
+    max_product_rows: int = 0  # 0 = as many as fit on the page
+    product_name_length: int = 70
+    product_sku_length: int = 50
+
+
+@dataclass(frozen=True)
+class InvoiceLayout(PageLayout):
+    product_columns: Tuple[float, ...] = (0.5, 0.2, 0.15, 0.15)
+    logo_width: float = 90
+    product_name_length: int = 100
+
+
+@dataclass(frozen=True)
+class ManifestLayout(PageLayout):
+    # S.No, Order Id, AWB, Content, Amount, Barcode
+    columns: Tuple[float, ...] = (0.06, 0.17, 0.17, 0.26, 0.1, 0.24)
+    barcode_height: float = 28
+    cell_padding: float = 3
+
+
+# A4 sheet, printed on office printers
+DEFAULT_LABEL_LAYOUT = LabelLayout(
+    page_size=A4,
+    margin=19,
+    padding=7,
+    font_size=10,
+    small_font_size=9,
+    heading_font_size=15,
+    product_font_size=11,
+)
+
+# 4x6in roll, printed on thermal printers
+THERMAL_LABEL_LAYOUT = LabelLayout(
+    page_size=(4 * inch, 6 * inch),
+    margin=4,
+    padding=3,
+    font_size=7.5,
+    small_font_size=6.5,
+    heading_font_size=9.5,
+    address_split=(0.6, 0.4),
+    courier_split=(0.4, 0.6),
+    shipper_split=(0.6, 0.4),
+    footer_split=(1.0, 0.0),
+    product_font_size=7,
+    logo_width=70,
+    barcode_height=34,
+    min_product_rows=3,
+    max_product_rows=3,
+    product_name_length=40,
+    product_sku_length=40,
+)
+
+DEFAULT_INVOICE_LAYOUT = InvoiceLayout(
+    page_size=(4 * inch, 6 * inch),
+    margin=4,
+    padding=4,
+    font_size=7.5,
+    small_font_size=6.5,
+    heading_font_size=8.5,
+)
+
+MANIFEST_LAYOUT = ManifestLayout(
+    page_size=A4,
+    margin=28,
+    padding=6,
+    font_size=8,
+    small_font_size=7,
+    heading_font_size=10,
+    border=False,
+)
@@ -0,0 +1,169 @@
+"""
+Pickup manifest (components/manifest.py::generate_manifest) drawn straight
+onto a ReportLab canvas, one table row per order.
+"""
+
+from datetime import date
+from io import BytesIO
+from typing import List, Optional
+
+from reportlab.pdfgen.canvas import Canvas
+
+from logger import logger
+from modules.orders.order_schema import Order_Model
+from modules.documents.barcode import BarcodeService, MANIFEST_BARCODE
+
+from .drawing import BOLD_FONT, FONT, wrap_text
+from .layouts import MANIFEST_LAYOUT, ManifestLayout
+
+
+HEADERS = ("S.No", "Order Id", "AWB Number", "Content", "Amount", "Barcode")
+
+
+class _ManifestTable:
+    def __init__(self, c: Canvas, layout: ManifestLayout, barcodes):
+        self.c = c
+        self.layout = layout
+        self.barcodes = barcodes
+        self.x = layout.margin
+        self.widths = [layout.frame_width * fraction for fraction in layout.columns]
+        self.y = None
+
+    def _cell_lines(self, values):
+        layout = self.layout
+        return [
+            wrap_text(value, FONT, layout.font_size, width - 2 * layout.cell_padding)
+            for value, width in zip(values, self.widths)
+        ]
+
+    def _grid(self, top: float, height: float):
+        c = self.c
+        x = self.x
+        c.rect(x, top - height, sum(self.widths), height)
+        for width in self.widths[:-1]:
+            x += width
+            c.line(x, top, x, top - height)
+
+    def _write(self, top: float, cells, font: str):
+        layout = self.layout
+        leading = layout.leading
+        x = self.x
+
+        self.c.setFont(font, layout.font_size)
+        for lines, width in zip(cells, self.widths):
+            y = top - layout.cell_padding
+            for line in lines:
+                y -= leading
+                self.c.drawString(x + layout.cell_padding, y, line)
+            x += width
+
+    def start_page(self, first: bool = False):
+        layout = self.layout
+        c = self.c
+        if not first:
+            c.showPage()
+
+        c.setPageSize(layout.page_size)
+        self.y = layout.height - layout.margin
+
+        if first:
+            self.y -= layout.heading_font_size * layout.leading_ratio
+            c.setFont(BOLD_FONT, layout.heading_font_size)
+            c.drawCentredString(
+                layout.width / 2,
+                self.y,
+                f"Order Manifest ({date.today().strftime('%d-%m-%Y')})",
+            )
+            self.y -= layout.padding
+
+        height = layout.leading + 2 * layout.cell_padding
+        self._grid(self.y, height)
+        self._write(self.y, [[header] for header in HEADERS], BOLD_FONT)
+        self.y -= height
+
+    def row(self, values, awb_number):
+        layout = self.layout
+        cells = self._cell_lines(values)
+        text_height = max(len(lines) for lines in cells) * layout.leading
+        height = max(text_height, layout.barcode_height) + 2 * layout.cell_padding
+
+        if self.y - height < layout.margin:
+            self.start_page()
+
+        self._grid(self.y, height)
+        self._write(self.y, cells, FONT)
+
+        pattern = self.barcodes.get(str(awb_number)) if awb_number else None
+        if not pattern:
+            self.y -= height
+            return
+
+        barcode_x = self.x + sum(self.widths[:-1]) + layout.cell_padding
+        BarcodeService.draw_pattern(
+            self.c,
+            pattern,
+            barcode_x,
+            self.y - layout.cell_padding - layout.barcode_height,
+            self.widths[-1] - 2 * layout.cell_padding,
+            layout.barcode_height,
+        )
+        self.y -= height
+
+    def footer(self):
+        layout = self.layout
+        if self.y - 30 - layout.leading < layout.margin:
+            self.start_page()
+
+        self.y -= 30
+        self.c.setFont(BOLD_FONT, layout.heading_font_size)
+        self.c.drawCentredString(
+            layout.width / 2, self.y, "Powered by Last Miles @ Warehousity"
+        )
+
+
+def _content(order: Order_Model) -> str:
+    return "\n".join(
+        f"{product['name'].replace('-', ' ')}(QTY - {product['quantity']})"
+        for product in order.products or []
+    )
+
+
+def draw_manifest(
+    c: Canvas, orders: List[Order_Model], layout: ManifestLayout = MANIFEST_LAYOUT
+):
+    barcodes = BarcodeService.batch(
+        (order.awb_number for order in orders), MANIFEST_BARCODE
+    )
+    table = _ManifestTable(c, layout, barcodes)
+    table.start_page(first=True)
+
+    for count, order in enumerate(orders, 1):
+        table.row(
+            [
+                str(count),
+                order.order_id,
+                f"{order.awb_number}\n{order.courier_partner}",
+                _content(order),
+                f"Rs {round(order.total_amount, 2)}",
+                "",
+            ],
+            order.awb_number,
+        )
+
+    table.footer()
+    c.showPage()
+
+
+def render_manifest(orders: List[Order_Model]) -> Optional[BytesIO]:
+    try:
+        buffer = BytesIO()
+        c = Canvas(buffer)
+        draw_manifest(c, orders)
+        c.save()
+
+        buffer.seek(0)
+        return buffer
+
+    except Exception as e:
+        logger.error(msg=f"Could not render manifest: {str(e)}")
+        return None
@@ -5,26 +5,36 @@ Optimized shipping label service with improved settings handling and template or
 import http
 import base64
 import io
+import uuid
 from psycopg2 import DatabaseError
 from typing import List, Optional
 from sqlalchemy.orm import joinedload
 from fastapi import APIRouter, File, UploadFile, Form
 from xhtml2pdf import pisa
-from pypdf import PdfWriter, PdfReader
 from sqlalchemy import select
 from pathlib import Path
 from logger import logger
-from fastapi.responses import StreamingResponse
+from fastapi.responses import RedirectResponse, StreamingResponse
 from io import BytesIO
-from modules.aws_s3.aws_s3 import upload_file_to_s3, delete_file_from_s3
+from modules.aws_s3 import ArtifactStore
 from http import HTTPStatus
 from context_manager.context import context_user_data, get_db_session
+from utils.environment import Environment
 
 # New optimized templates
 from modules.documents.shipping_label.templates import LabelTemplateFactory
+from modules.documents.shipping_label.templates.common.utils import get_shipper_gstin
+from modules.documents.document_cache import DocumentCache
+from modules.documents.pdf_assembler import PdfAssembler, iter_file, spool
+from modules.documents.renderer import (
+    render_invoice,
+    render_label,
+    use_canvas_renderer,
+)
 
 # models
 from models import Shipping_Label_Setting, Order, Client, User
+from models.order_profiles import OrderProfile
 
 # schema
 from schema.base import GenericResponseModel
@@ -34,6 +44,10 @@ from shipping_partner.shiprocket.shiprocket import Shiprocket
 from shipping_partner.ats.ats import ATS
 
 
+# label PDFs bigger than this are handed out as an S3 link, 0 streams them all
+LABEL_PDF_S3_MB = int(Environment.get_string("LABEL_PDF_S3_MB", "0"))
+
+
 class LabelSettingsCache:
     """Simple cache for label settings to avoid repeated database calls"""
 
@@ -246,9 +260,8 @@ class ShippingLabelService:
 
     @staticmethod
     def generate_label(order_ids: List[str]) -> str:
+        output = None
         try:
-            from ..invoice.invoice import default_invoice, order_invoice
-
             db = get_db_session()
             client_id = context_user_data.get().client_id
 
@@ -261,7 +274,7 @@ class ShippingLabelService:
                     Order.awb_number.isnot(None),
                 )
                 .order_by(Order.created_at.desc())
-                .options(joinedload(Order.pickup_location))
+                .options(joinedload(Order.pickup_location), *OrderProfile.BOOKING)
                 .all()
             )
 
@@ -286,12 +299,15 @@ class ShippingLabelService:
                 logger.error("Could not retrieve label settings")
                 return "Error retrieving label settings"
 
-            # Initialize PDF merger
-            try:
-                merger = PdfWriter()
-            except Exception as e:
-                logger.error(f"Could not initialize PDF merger: {str(e)}")
-                return "Error initializing PDF generation"
+            # labels cached under other settings / client name / GSTIN are not reused
+            version = DocumentCache.version(
+                label_settings, client_name, get_shipper_gstin(client_id)
+            )
+
+            # each order's pages are written out as soon as it is rendered,
+            # fonts and images the labels share are written once
+            output = spool()
+            assembler = PdfAssembler(output)
 
             # Process orders efficiently - generate label with invoice included for client 186
             orders_to_update = []
@@ -301,13 +317,18 @@ class ShippingLabelService:
                 )
 
                 # Generate and add label (with invoice included for client 186)
-                pdf_buffer = ShippingLabelService._process_single_order(
-                    order, label_settings, client_name, client_id
+                documents = ShippingLabelService._process_single_order(
+                    order, label_settings, client_name, client_id, version
                 )
 
-                if pdf_buffer:
-                    pdf_buffer.seek(0)
-                    merger.append(PdfReader(pdf_buffer))
+                # all of an order's documents or none of them
+                try:
+                    assembler.add_all(documents)
+                except Exception as e:
+                    logger.error(f"Unreadable PDF for order {order.order_id}: {str(e)}")
+                    documents = []
+
+                if documents:
                     logger.info(
                         f"Label (with invoice) generated for order {index}/{total_orders}: {order.order_id}"
                     )
@@ -328,17 +349,12 @@ class ShippingLabelService:
                     order.is_label_generated = True
                     db.add(order)
 
-            # Generate final PDF
-            merged_pdf = io.BytesIO()
-            merger.write(merged_pdf)
-            merger.close()
-            merged_pdf.seek(0)
+            # Finish the PDF
+            assembler.close()
 
             # Commit all changes at once
             db.commit()
 
-            pdf_buffer = merged_pdf.getvalue()
-
             # Log message based on client
             if client_id == 186:
                 logger.info(
@@ -356,115 +372,174 @@ class ShippingLabelService:
                 else:
                     filename = "labels.pdf"
 
+            # big batches are downloaded from S3 rather than through the API
+            if LABEL_PDF_S3_MB and assembler.position > LABEL_PDF_S3_MB * 1024 * 1024:
+                output.seek(0)
+                key = ArtifactStore.put_fileobj(
+                    f"{client_id}/labels/{uuid.uuid4()}.pdf",
+                    output,
+                    "application/pdf",
+                )
+                output.close()
+                return RedirectResponse(
+                    ArtifactStore.presigned_url(key, filename=filename),
+                    status_code=HTTPStatus.SEE_OTHER,
+                )
+
             return StreamingResponse(
-                BytesIO(pdf_buffer),
+                iter_file(output),
                 media_type="application/pdf",
                 headers={"Content-Disposition": f'attachment; filename="{filename}"'},
             )
 
         except Exception as e:
             logger.error(f"Error in generate_label: {str(e)}")
+            if output is not None:
+                output.close()
             return "Error generating labels"
 
     @staticmethod
     def _process_single_order(
-        order, label_settings, client_name: str, client_id: int
-    ) -> Optional[BytesIO]:
-        """Process a single order for label generation (with invoice for client 186)"""
+        order, label_settings, client_name: str, client_id: int, version: str
+    ) -> List[bytes]:
+        """The PDFs printed for one order: its label, and its invoice for client 186"""
         try:
-            # Handle ATS courier separately
-            # Amazon only accepts their own Shipping Label
             if order.aggregator == "ats":
-                base64_pdf = ATS.generate_label(order)
+                # Amazon's own label, it only changes with the AWB
+                template, version = "ats", ""
+            else:
+                renderer = "canvas" if use_canvas_renderer() else "html"
+                template = f"{label_settings.label_format}:{renderer}"
+
+            # rendered (or fetched from Amazon) only if not cached yet
+            label_pdf = DocumentCache.fetch(
+                "label",
+                order,
+                template,
+                version,
+                lambda: ShippingLabelService._render_label(
+                    order, label_settings, client_name, client_id
+                ),
+            )
 
-                if base64_pdf:
-                    pdf_binary = base64.b64decode(base64_pdf)
-                    pdf_buffer = io.BytesIO(pdf_binary)
+            if not label_pdf:
+                return []
 
-                    # For client 186, append invoice to ATS label
-                    if client_id == 186:
-                        return ShippingLabelService._append_invoice_to_pdf(
-                            pdf_buffer, order, client_name, client_id
-                        )
+            # For client 186, the invoice follows the label
+            if client_id == 186:
+                return [label_pdf] + ShippingLabelService._order_invoice(
+                    order, client_name, client_id
+                )
 
-                    return pdf_buffer
-                else:
-                    logger.warning(
-                        f"Could not generate ATS label for order {order.order_id}"
-                    )
-                    return None
+            return [label_pdf]
 
-            # Generate label using template factory -> automatically decides which type of label is to generated
-            shipping_label_html = LabelTemplateFactory.create_label(
-                order, label_settings, client_name, client_id
-            )
+        except Exception as e:
+            logger.error(f"Error processing order {order.order_id}: {str(e)}")
+            return []
 
-            if not shipping_label_html:
-                logger.warning(
-                    f"Could not generate label HTML for order {order.order_id}"
-                )
+    @staticmethod
+    def _render_label(
+        order, label_settings, client_name: str, client_id: int
+    ) -> Optional[BytesIO]:
+        # Handle ATS courier separately
+        # Amazon only accepts their own Shipping Label
+        if order.aggregator == "ats":
+            base64_pdf = ATS.generate_label(order)
+
+            if not base64_pdf:
+                logger.warning(f"Could not generate ATS label for order {order.order_id}")
                 return None
 
-            # Convert label to PDF
-            label_pdf_buffer = ShippingLabelService.convert_html_to_pdf(
-                shipping_label_html
-            )
+            return io.BytesIO(base64.b64decode(base64_pdf))
 
-            if not label_pdf_buffer:
-                return None
+        label_pdf_buffer = None
 
-            # For client 186, append invoice to label
-            if client_id == 186:
-                return ShippingLabelService._append_invoice_to_pdf(
-                    label_pdf_buffer, order, client_name, client_id
-                )
+        # Draw the label straight onto a PDF canvas, HTML templates are the fallback
+        if use_canvas_renderer():
+            label_pdf_buffer = render_label(order, label_settings, client_name, client_id)
 
-            return label_pdf_buffer
+        if not label_pdf_buffer:
+            label_pdf_buffer = ShippingLabelService._render_html_label(
+                order, label_settings, client_name, client_id
+            )
 
-        except Exception as e:
-            logger.error(f"Error processing order {order.order_id}: {str(e)}")
-            return None
+        return label_pdf_buffer
 
     @staticmethod
-    def _append_invoice_to_pdf(
-        label_pdf_buffer: BytesIO, order, client_name: str, client_id: int
+    def _render_html_label(
+        order, label_settings, client_name: str, client_id: int
     ) -> Optional[BytesIO]:
-        """Append invoice to label PDF for client 186"""
-        try:
-            from ..invoice.invoice import order_invoice
+        # Generate label using template factory -> automatically decides which type of label is to generated
+        shipping_label_html = LabelTemplateFactory.create_label(
+            order, label_settings, client_name, client_id
+        )
 
-            # Generate invoice HTML
-            invoice_html = order_invoice(order, client_name, client_id)
-            invoice_pdf_buffer = ShippingLabelService.convert_html_to_pdf(invoice_html)
+        if not shipping_label_html:
+            logger.warning(f"Could not generate label HTML for order {order.order_id}")
+            return None
 
-            if not invoice_pdf_buffer:
+        # Convert label to PDF
+        return ShippingLabelService.convert_html_to_pdf(shipping_label_html)
+
+    @staticmethod
+    def _order_invoice(order, client_name: str, client_id: int) -> List[bytes]:
+        """Invoice printed with the label for client 186"""
+        try:
+            # same cached invoice generate_invoice serves
+            invoice_pdf = ShippingLabelService._cached_invoice(
+                order, client_name, client_id
+            )
+
+            if not invoice_pdf:
                 logger.warning(
                     f"Failed to generate invoice for order {order.order_id}, returning label only"
                 )
-                return label_pdf_buffer
+                return []
 
-            # Merge label and invoice PDFs
-            merger = PdfWriter()
-            label_pdf_buffer.seek(0)
-            invoice_pdf_buffer.seek(0)
-
-            merger.append(PdfReader(label_pdf_buffer))
-            merger.append(PdfReader(invoice_pdf_buffer))
-
-            combined_pdf = io.BytesIO()
-            merger.write(combined_pdf)
-            merger.close()
-            combined_pdf.seek(0)
-
-            logger.info(f"Invoice appended to label for order {order.order_id}")
-            return combined_pdf
+            return [invoice_pdf]
 
         except Exception as e:
             logger.error(
                 f"Error appending invoice to label for order {order.order_id}: {str(e)}"
             )
             # Return label only if invoice fails
-            return label_pdf_buffer
+            return []
+
+    @staticmethod
+    def _render_invoice(order, client_name: str, client_id: int) -> Optional[BytesIO]:
+        from ..invoice.invoice import default_invoice, order_invoice
+
+        # client 186 has its own invoice layout, kept on the HTML template
+        if client_id == 186:
+            return ShippingLabelService.convert_html_to_pdf(
+                order_invoice(order, client_name, client_id)
+            )
+        if use_canvas_renderer():
+            invoice_pdf_buffer = render_invoice(order, client_name, client_id)
+            if invoice_pdf_buffer is not None:
+                return invoice_pdf_buffer
+
+        # HTML template, also the fallback when the canvas renderer fails
+        return ShippingLabelService.convert_html_to_pdf(
+            default_invoice(order, client_name, client_id)
+        )
+
+    @staticmethod
+    def _cached_invoice(order, client_name: str, client_id: int) -> Optional[bytes]:
+        if client_id == 186:
+            template = "order_invoice"
+        elif use_canvas_renderer():
+            template = "canvas"
+        else:
+            template = "default_invoice"
+
+        return DocumentCache.fetch(
+            "invoice",
+            order,
+            template,
+            DocumentCache.version(client_name),
+            lambda: ShippingLabelService._render_invoice(order, client_name, client_id),
+        )
 
     # @staticmethod
     # def update_label_settings(
@@ -574,8 +649,6 @@ class ShippingLabelService:
     def generate_invoice(order_ids: List[str]) -> str:
         """Generate invoice - keeping existing functionality"""
         try:
-            from ..invoice.invoice import default_invoice, order_invoice
-
             with get_db_session() as db:
                 client_id = context_user_data.get().client_id
 
@@ -587,40 +660,33 @@ class ShippingLabelService:
                         Order.awb_number.isnot(None),
                     )
                     .order_by(Order.created_at.desc())
-                    .options(joinedload(Order.pickup_location))
+                    .options(joinedload(Order.pickup_location), *OrderProfile.BOOKING)
                 )
 
                 client = db.query(Client).filter(Client.id == client_id).first()
                 client_name = client.client_name
 
-                try:
-                    merger = PdfWriter()
-                except Exception as e:
-                    logger.error(f"Could not generate PDFs: {str(e)}")
-                    return "Error generating PDFs"
-
-                for order in orders:
-                    if order.awb_number is not None:
-                        if client_id == 186:
-                            invoice = order_invoice(order, client_name, client_id)
-                        else:
-                            invoice = default_invoice(order, client_name, client_id)
-
-                        pdf_buffer = ShippingLabelService.convert_html_to_pdf(invoice)
-                        if pdf_buffer:
-                            pdf_buffer.seek(0)
-                            merger.append(PdfReader(pdf_buffer))
-                        else:
-                            logger.warning(
-                                f"Error creating PDF for order {order.order_id}"
+                with spool() as output:
+                    assembler = PdfAssembler(output)
+
+                    for order in orders:
+                        if order.awb_number is not None:
+                            # rendered only for orders not invoiced before
+                            invoice_pdf = ShippingLabelService._cached_invoice(
+                                order, client_name, client_id
                             )
 
-                merged_pdf = io.BytesIO()
-                merger.write(merged_pdf)
-                merger.close()
-                merged_pdf.seek(0)
+                            if invoice_pdf:
+                                assembler.add(invoice_pdf)
+                            else:
+                                logger.warning(
+                                    f"Error creating PDF for order {order.order_id}"
+                                )
+
+                    assembler.close()
+                    output.seek(0)
 
-                return base64.b64encode(merged_pdf.getvalue()).decode("utf-8")
+                    return base64.b64encode(output.read()).decode("utf-8")
 
         except Exception as e:
             logger.error(f"Could not generate invoices: {str(e)}")
@@ -705,14 +771,16 @@ class ShippingLabelService:
             if ext not in {"jpg", "jpeg", "png"}:
                 raise ValueError("Invalid image type")
 
-            s3_key = f"{client_id}/shipping_labels/company_logo.{ext}"
-
             # Read file bytes
             file_bytes = await file.read()
             if not file_bytes:
                 raise ValueError("Empty file received")
 
-            print("FILE BYTES LENGTH =", len(file_bytes))
+            # ---- Upload new logo, keyed by its content ----
+            # the same image uploaded again is found by a HEAD request
+            s3_key = await ArtifactStore.aput_deduplicated(
+                f"{client_id}/shipping_labels", file_bytes, content_type, ext
+            )
 
             # ---- Delete old logo using AsyncSession ----
             async with get_db_session() as db:
@@ -729,20 +797,8 @@ class ShippingLabelService:
                     and ".amazonaws.com/" in existing.logo_url
                 ):
                     old_key = existing.logo_url.split(".amazonaws.com/", 1)[1]
-                    delete_file_from_s3(old_key)
-
-            print("OLD LOGO DELETED IF EXISTS")
-
-            # ---- Upload new logo ----
-            upload_result = await upload_file_to_s3(
-                file_bytes=file_bytes,
-                s3_key=s3_key,
-                content_type=content_type,
-            )
-            print("UPLOAD RESULT =", upload_result)
-
-            if not upload_result["success"]:
-                raise Exception(f"S3 upload failed: {upload_result['error']}")
+                    if old_key != s3_key:
+                        await ArtifactStore.adelete(old_key)
 
             # Invalidate cache
             LabelSettingsCache.invalidate(client_id)
@@ -750,7 +806,7 @@ class ShippingLabelService:
             return GenericResponseModel(
                 status_code=200,
                 status=True,
-                data={"file": upload_result["url"]},
+                data={"file": ArtifactStore.url(s3_key)},
                 message="Image uploaded successfully.",
             )
 
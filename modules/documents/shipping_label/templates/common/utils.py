@@ -4,34 +4,23 @@ Common utilities for shipping label generation
 
 import io
 import base64
+import json
 import requests
-import barcode
-from barcode.writer import ImageWriter
 from logger import logger
 import os
 import re
+from utils.environment import Environment
 from utils.string import truncate_text
 
 
-def generate_barcode_image(data):
-    """Generate barcode image from data and return as BytesIO buffer"""
-    buffer = io.BytesIO()
-    barcode_class = barcode.get_barcode_class("code128")
-
-    writer_options = {
-        "module_width": 0.4,
-        "module_height": 15,
-        "quiet_zone": 0,
-        "font_size": 1,
-        "text_distance": 6,
-        "dpi": 300,
-        "write_text": False,
-    }
-
-    my_barcode = barcode_class(data, writer=ImageWriter())
-    my_barcode.write(buffer, options=writer_options)
-    buffer.seek(0)
-    return buffer
+# JSON object of client id -> GSTIN printed under the shipper on default labels
+LABEL_SHIPPER_GSTIN = {
+    int(client_id): gstin
+    for client_id, gstin in json.loads(
+        Environment.get_string("LABEL_SHIPPER_GSTIN", '{"186": "03AABFF3773C3ZW"}')
+        or "{}"
+    ).items()
+}
 
 
 def convert_image_to_base64(image_buffer):
@@ -119,3 +108,8 @@ def sanitize_product_name(product_name, max_length=64):
     sanitized_name = re.sub(pattern, "", product_name, flags=re.IGNORECASE).strip()
 
     return truncate_text(sanitized_name, max_length)
+
+
+def get_shipper_gstin(client_id) -> str:
+    """GSTIN printed under the shipper on the client's labels, "" for none."""
+    return LABEL_SHIPPER_GSTIN.get(client_id, "")
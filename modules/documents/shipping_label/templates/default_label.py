@@ -8,10 +8,11 @@ from modules.documents.shipping_label.shipping_label_schema import (
     LabelSettingResponseModel,
 )
 
+from modules.documents.barcode import BarcodeService
+
 from .common.utils import (
-    generate_barcode_image,
-    convert_image_to_base64,
     get_base64_from_s3_url,
+    get_shipper_gstin,
     sanitize_product_name,
 )
 
@@ -31,9 +32,9 @@ def generate_default_label(
     try:
         db = get_db_session()
         # Generate barcodes
-        awb_barcode = convert_image_to_base64(generate_barcode_image(order.awb_number))
+        awb_barcode = BarcodeService.png_base64(order.awb_number)
         order_id_barcode = (
-            convert_image_to_base64(generate_barcode_image(order.order_id))
+            BarcodeService.png_base64(order.order_id)
             if settings.order_id_barcode_enabled
             else ""
         )
@@ -161,10 +162,9 @@ def generate_default_label(
             else ""
         )
 
-        # TODO -> DYNAMICALLY FETCH THE GST NUMBER
-        gst = ""
-        if client_id == 186:
-            gst = f"""<br /><span style="margin: 5px 0;"> GST - 03AABFF3773C3ZW  </span>"""
+        gst = get_shipper_gstin(client_id)
+        if gst:
+            gst = f"""<br /><span style="margin: 5px 0;"> GST - {gst}  </span>"""
 
         # Combine and truncate consignee and pickup addresses for display
         consignee_combined = f"{order.consignee_address}{' ' + order.consignee_landmark if getattr(order, 'consignee_landmark', None) else ''}"
@@ -12,9 +12,9 @@ from modules.documents.shipping_label.shipping_label_schema import (
     LabelSettingResponseModel,
 )
 
+from modules.documents.barcode import BarcodeService
+
 from .common.utils import (
-    generate_barcode_image,
-    convert_image_to_base64,
     get_base64_from_s3_url,
     sanitize_product_name,
 )
@@ -32,9 +32,9 @@ def generate_thermal_label(
     try:
         db = get_db_session()
         # Generate barcodes
-        awb_barcode = convert_image_to_base64(generate_barcode_image(order.awb_number))
+        awb_barcode = BarcodeService.png_base64(order.awb_number)
         order_id_barcode = (
-            convert_image_to_base64(generate_barcode_image(order.order_id))
+            BarcodeService.png_base64(order.order_id)
             if settings.order_id_barcode_enabled
             else ""
         )
@@ -0,0 +1,286 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import pytz
+from sqlalchemy import insert, update
+
+from context_manager.context import context_db_session, get_db_session
+from logger import logger
+from utils.environment import Environment
+
+# models
+from models import Ndr, Ndr_history, Order
+
+
+IST = pytz.timezone("Asia/Kolkata")
+
+REATTEMPT_STATUS = "REATTEMPT"
+REATTEMPT_REASON = "Re-attempt requested"
+
+# courier calls in flight at once for couriers without a bulk NDR API
+NDR_ACTION_CONCURRENCY = int(Environment.get_string("NDR_ACTION_CONCURRENCY", "8"))
+
+# waybills sent per request to a bulk NDR API
+NDR_BULK_BATCH_SIZE = int(Environment.get_string("NDR_BULK_BATCH_SIZE", "50"))
+
+# order columns the couriers' ndr_action implementations read
+COURIER_ORDER_COLUMNS = (
+    Order.id,
+    Order.order_id,
+    Order.client_id,
+    Order.aggregator,
+    Order.courier_partner,
+    Order.awb_number,
+    Order.consignee_phone,
+    Order.consignee_address,
+    Order.consignee_landmark,
+    Order.consignee_pincode,
+)
+
+# aggregators whose NDR API takes many waybills of one account per call,
+# and the adapter method that calls it
+BULK_NDR_ACTIONS = {
+    "delhivery": "bulk_ndr_action",
+}
+
+# aggregators whose ndr_action queries and commits on the request's session;
+# a session is not safe across threads, so these are called one at a time
+# on the request's own thread
+SESSION_NDR_ACTIONS = {"amazon", "ats"}
+
+
+@dataclass
+class NdrActionOutcome:
+    uuid: str
+    awb: Optional[str]
+    status: str  # success | failed | not_found
+    message: str
+
+
+@dataclass
+class NdrActionRequest:
+    uuid: str
+    alternate_phone_number: Optional[str] = None
+    address: Optional[str] = None
+
+
+class NdrActionEngine:
+    """
+    Re-attempts a batch of NDRs:
+    - the NDRs and the order fields the couriers need come from one query;
+    - actions are grouped by courier, couriers with a bulk NDR API get one call
+      per account and batch, the rest are called per AWB on a bounded pool,
+      except those that use the request's DB session, which are called in
+      turn on the request's thread;
+    - accepted NDRs are updated and their history written in one statement
+      each, and every requested uuid gets an outcome.
+    """
+
+    @staticmethod
+    def _load(db, client_id: int, uuids: List[str]):
+        rows = (
+            db.query(
+                Ndr.id.label("ndr_id"),
+                Ndr.uuid.label("ndr_uuid"),
+                Ndr.awb,
+                *COURIER_ORDER_COLUMNS,
+            )
+            .join(Order, Order.id == Ndr.order_id)
+            .filter(Ndr.uuid.in_(uuids), Ndr.client_id == client_id)
+            .all()
+        )
+        return {str(row.ndr_uuid): row for row in rows}
+
+    @staticmethod
+    def _courier_order(row, request: NdrActionRequest):
+        # what ndr_action reads off the order, with the client's corrections
+        order = SimpleNamespace(
+            **{column.key: getattr(row, column.key) for column in COURIER_ORDER_COLUMNS}
+        )
+        if request.alternate_phone_number:
+            order.consignee_phone = request.alternate_phone_number
+        if request.address:
+            order.consignee_address = request.address
+            order.consignee_landmark = None
+        return order
+
+    @staticmethod
+    def _single_action(shipping_partner, order, awb: str) -> Optional[str]:
+        try:
+            response = shipping_partner.ndr_action(order, awb)
+        except Exception as e:
+            logger.error(msg=f"NDR action failed for {awb}: {str(e)}")
+            return "Courier did not respond, please try again"
+
+        if response is None or not getattr(response, "status", False):
+            return getattr(response, "message", None) or "Re-attempt rejected by courier"
+        return None
+
+    @staticmethod
+    def _bulk_action(bulk_action, courier_partner: str, awbs: List[str]) -> Dict[str, str]:
+        try:
+            failed = bulk_action(courier_partner, awbs)
+        except Exception as e:
+            logger.error(msg=f"Bulk NDR action failed for {courier_partner}: {str(e)}")
+            failed = None
+
+        # an open circuit breaker answers with a response instead of the errors
+        if not isinstance(failed, dict):
+            message = getattr(failed, "message", None)
+            return {awb: message or "Courier did not respond, please try again" for awb in awbs}
+        return failed
+
+    @staticmethod
+    def _call_couriers(rows, requests_by_uuid) -> Dict[str, Optional[str]]:
+        """Error message per NDR uuid, None where the courier accepted it."""
+
+        from data.courier_service_mapping import courier_service_mapping
+
+        errors: Dict[str, Optional[str]] = {}
+        bulk_groups: Dict[tuple, List] = {}
+        single = []
+        serial = []
+
+        for uuid, row in rows.items():
+            shipping_partner = courier_service_mapping.get(row.aggregator)
+            bulk_action = BULK_NDR_ACTIONS.get(row.aggregator)
+
+            if bulk_action is not None and shipping_partner is not None:
+                bulk_groups.setdefault((row.aggregator, row.courier_partner), []).append(
+                    row
+                )
+            elif shipping_partner is not None and hasattr(shipping_partner, "ndr_action"):
+                if row.aggregator in SESSION_NDR_ACTIONS:
+                    serial.append((uuid, row, shipping_partner))
+                else:
+                    single.append((uuid, row, shipping_partner))
+            else:
+                # no NDR API for this courier, the re-attempt is only recorded
+                errors[uuid] = None
+
+        with ThreadPoolExecutor(max_workers=NDR_ACTION_CONCURRENCY) as executor:
+
+            def submit(fn, *args):
+                # courier code reads the request's user context, but must not
+                # share the request's DB session with other threads
+                context = contextvars.copy_context()
+                context.run(context_db_session.set, None)
+                return executor.submit(context.run, fn, *args)
+
+            bulk_calls = []
+            for (aggregator, courier_partner), group in bulk_groups.items():
+                for start in range(0, len(group), NDR_BULK_BATCH_SIZE):
+                    batch = group[start : start + NDR_BULK_BATCH_SIZE]
+                    future = submit(
+                        NdrActionEngine._bulk_action,
+                        getattr(
+                            courier_service_mapping[aggregator],
+                            BULK_NDR_ACTIONS[aggregator],
+                        ),
+                        courier_partner,
+                        [row.awb for row in batch],
+                    )
+                    bulk_calls.append((batch, future))
+
+            single_calls = [
+                (
+                    uuid,
+                    submit(
+                        NdrActionEngine._single_action,
+                        shipping_partner,
+                        NdrActionEngine._courier_order(row, requests_by_uuid[uuid]),
+                        row.awb,
+                    ),
+                )
+                for uuid, row, shipping_partner in single
+            ]
+
+            for batch, future in bulk_calls:
+                failed = future.result()
+                for row in batch:
+                    errors[str(row.ndr_uuid)] = failed.get(row.awb)
+
+            # runs while the pool works through the rest
+            for uuid, row, shipping_partner in serial:
+                errors[uuid] = NdrActionEngine._single_action(
+                    shipping_partner,
+                    NdrActionEngine._courier_order(row, requests_by_uuid[uuid]),
+                    row.awb,
+                )
+
+            for uuid, future in single_calls:
+                errors[uuid] = future.result()
+
+        return errors
+
+    @staticmethod
+    def _save(db, rows, requests_by_uuid, accepted: List[str]):
+        if not accepted:
+            return
+
+        now = datetime.now(timezone.utc)
+        stamp = datetime.now(IST).strftime("%d-%m-%Y %H:%M:%S")
+
+        ndr_updates = []
+        for uuid in accepted:
+            request = requests_by_uuid[uuid]
+            values = {
+                "id": rows[uuid].ndr_id,
+                "status": REATTEMPT_STATUS,
+                "updated_at": now,
+            }
+            if request.alternate_phone_number is not None:
+                values["alternate_phone_number"] = request.alternate_phone_number
+            if request.address is not None:
+                values["address"] = request.address
+            ndr_updates.append(values)
+
+        db.execute(update(Ndr), ndr_updates)
+        db.execute(
+            insert(Ndr_history),
+            [
+                {
+                    "order_id": rows[uuid].id,
+                    "ndr_id": rows[uuid].ndr_id,
+                    "status": REATTEMPT_STATUS,
+                    "datetime": stamp,
+                    "reason": REATTEMPT_REASON,
+                }
+                for uuid in accepted
+            ],
+        )
+        db.commit()
+
+    @staticmethod
+    def reattempt(client_id: int, requests: List[NdrActionRequest]) -> List[dict]:
+        requests_by_uuid = {request.uuid.lower(): request for request in requests}
+        if not requests_by_uuid:
+            return []
+
+        db = get_db_session()
+        rows = NdrActionEngine._load(db, client_id, list(requests_by_uuid))
+        errors = NdrActionEngine._call_couriers(rows, requests_by_uuid)
+
+        accepted = [uuid for uuid in rows if errors.get(uuid) is None]
+        NdrActionEngine._save(db, rows, requests_by_uuid, accepted)
+
+        outcomes = []
+        for uuid in requests_by_uuid:
+            row = rows.get(uuid)
+            if row is None:
+                outcome = NdrActionOutcome(uuid, None, "not_found", "NDR not found")
+            elif errors.get(uuid) is None:
+                outcome = NdrActionOutcome(uuid, row.awb, "success", REATTEMPT_REASON)
+            else:
+                outcome = NdrActionOutcome(uuid, row.awb, "failed", errors[uuid])
+            outcomes.append(asdict(outcome))
+
+        failed = len([o for o in outcomes if o["status"] != "success"])
+        if failed:
+            logger.info(msg=f"NDR re-attempt: {len(outcomes) - failed} ok, {failed} failed")
+
+        return outcomes
@@ -1,5 +1,8 @@
 import http
+import asyncio
+import base64
 from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
 from typing import Any, List, Dict
 from datetime import datetime
 
@@ -13,13 +16,16 @@ from modules.ndr.ndr_schema import (
     Ndr_reattempt_escalate,
     Ndr_status_update,
     Bulk_Ndr_reattempt_escalate,
+    Ndr_export_filters,
 )
 
 # utils
-from utils.response_handler import build_api_response
+from utils.response_handler import build_api_response, build_fast_api_response
+from database.routing import read_replica
 
 # services
 from .ndr_service import NdrService
+from .ndr_export import CONTENT_TYPES
 
 
 # Creating the router for orders
@@ -113,7 +119,7 @@ def get_all_ndr(
 ):
     try:
         response: GenericResponseModel = NdrService.get_all_ndr(ndr_filters=ndr_filters)
-        return build_api_response(response)
+        return build_fast_api_response(response)
 
     except Exception as e:
         return build_api_response(
@@ -129,14 +135,20 @@ def get_all_ndr(
     "/export",
     status_code=http.HTTPStatus.CREATED,
 )
-def get_all_ndr(
-    ndr_filters: Ndr_filters,
+async def export_all_ndr(
+    ndr_filters: Ndr_export_filters,
 ):
     try:
-        response: GenericResponseModel = NdrService.export_all_ndr(
-            ndr_filters=ndr_filters
-        )
-        return response
+        async with read_replica():
+            response: GenericResponseModel = await NdrService.export_all_ndr(
+                ndr_filters=ndr_filters
+            )
+
+            if not response.status or ndr_filters.background:
+                return build_api_response(response)
+
+            with response.data as output:
+                return base64.b64encode(output.read()).decode("utf-8")
 
     except Exception as e:
         return build_api_response(
@@ -148,6 +160,63 @@ def get_all_ndr(
         )
 
 
+@ndr_router.post(
+    "/export/download",
+    status_code=http.HTTPStatus.OK,
+)
+async def download_ndr_export(
+    ndr_filters: Ndr_export_filters,
+):
+    try:
+        async with read_replica():
+            response: GenericResponseModel = await NdrService.export_all_ndr(
+                ndr_filters=ndr_filters
+            )
+
+        if not response.status or ndr_filters.background:
+            return build_api_response(response)
+
+        # the file is already written, send it in chunks instead of base64
+        return StreamingResponse(
+            response.data,
+            media_type=CONTENT_TYPES[ndr_filters.export_format],
+            headers={
+                "Content-Disposition": 'attachment; filename="ndr.{}"'.format(
+                    ndr_filters.export_format
+                )
+            },
+        )
+
+    except Exception as e:
+        return build_api_response(
+            GenericResponseModel(
+                status_code=http.HTTPStatus.INTERNAL_SERVER_ERROR,
+                data=str(e),
+                message="An error occurred while exporting the NDRs.",
+            )
+        )
+
+
+@ndr_router.get(
+    "/export/jobs/{job_id}",
+    status_code=http.HTTPStatus.OK,
+    response_model=GenericResponseModel,
+)
+def ndr_export_job_status(job_id: str):
+    try:
+        response: GenericResponseModel = NdrService.export_job_status(job_id=job_id)
+        return build_api_response(response)
+
+    except Exception as e:
+        return build_api_response(
+            GenericResponseModel(
+                status_code=http.HTTPStatus.INTERNAL_SERVER_ERROR,
+                data=str(e),
+                message="An error occurred while fetching the export.",
+            )
+        )
+
+
 @ndr_router.post(
     "/bulkstatus",
     status_code=http.HTTPStatus.CREATED,
@@ -0,0 +1,245 @@
+import asyncio
+import csv
+import io
+import tempfile
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional
+
+import xlsxwriter
+from sqlalchemy import select
+
+from context_manager.context import context_db_session, get_db_session
+from database.db import LazyAsyncSession
+from database.routing import read_replica
+from logger import logger
+from utils.environment import Environment
+
+# models
+from models import Ndr, Order
+
+# service
+from modules.aws_s3 import ArtifactStore
+
+
+# rows fetched from the cursor and written to the file per round trip
+NDR_EXPORT_BATCH_SIZE = int(Environment.get_string("NDR_EXPORT_BATCH_SIZE", "2000"))
+
+# exports up to this size stay in memory, bigger ones spill to a temp file
+NDR_EXPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+# finished background jobs remembered per worker for status polling
+NDR_EXPORT_JOBS_KEPT = 500
+
+SHEET_NAME = "NDR"
+
+EXPORT_HEADERS = (
+    "awb",
+    "status",
+    "datetime",
+    "attempt",
+    "reason",
+    "order_id",
+    "order_date",
+    "payment_mode",
+    "total_value",
+    "consignee_address",
+    "consignee_phone",
+)
+
+CONTENT_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+}
+
+
+def _export_row(row) -> list:
+    return [
+        row.awb,
+        row.status,
+        row.datetime,
+        row.attempt,
+        row.reason,
+        row.order_id or "",
+        row.order_date.strftime("%Y-%m-%d %H:%M:%S") if row.order_date else "",
+        row.payment_mode or "",
+        float(row.order_value) if row.order_value is not None else 0,
+        row.consignee_address or "",
+        row.consignee_phone or "",
+    ]
+
+
+class _XlsxWriter:
+    def __init__(self, output):
+        self.workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+        self.worksheet = self.workbook.add_worksheet(SHEET_NAME)
+        self.worksheet.write_row(0, 0, EXPORT_HEADERS)
+        self.next_row = 1
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.worksheet.write_row(self.next_row, 0, _export_row(row))
+            self.next_row += 1
+
+    def close(self):
+        self.workbook.close()
+
+
+class _CsvWriter:
+    def __init__(self, output):
+        self.text = io.TextIOWrapper(output, encoding="utf-8", newline="")
+        self.writer = csv.writer(self.text)
+        self.writer.writerow(EXPORT_HEADERS)
+
+    def write_rows(self, rows):
+        self.writer.writerows(_export_row(row) for row in rows)
+
+    def close(self):
+        self.text.flush()
+        # hand the underlying file back without closing it
+        self.text.detach()
+
+
+WRITERS = {"xlsx": _XlsxWriter, "csv": _CsvWriter}
+
+
+class NdrExport:
+    """
+    NDR export streamed from one narrow query: only the exported columns of
+    Ndr and Order are selected and rows are fetched in batches of
+    NDR_EXPORT_BATCH_SIZE, each written straight to a constant-memory xlsx
+    sheet or a csv file, so no ORM objects or full row lists are kept.
+    """
+
+    @staticmethod
+    def query(client_id: int, statuses: List[str], start_date, end_date):
+        return (
+            select(
+                Ndr.awb,
+                Ndr.status,
+                Ndr.datetime,
+                Ndr.attempt,
+                Ndr.reason,
+                Order.order_id,
+                Order.order_date,
+                Order.payment_mode,
+                Order.order_value,
+                Order.consignee_address,
+                Order.consignee_phone,
+            )
+            .join(Order, Ndr.order_id == Order.id)
+            .where(
+                Ndr.client_id == client_id,
+                Ndr.status.in_(statuses),
+                # compared as stored, so the order_date index can be used
+                Order.order_date >= start_date,
+                Order.order_date <= end_date,
+            )
+            .order_by(Ndr.id)
+            .execution_options(yield_per=NDR_EXPORT_BATCH_SIZE)
+        )
+
+    @staticmethod
+    async def build(db, statement, export_format: str = "xlsx"):
+        """Write the export and return it as a file object positioned at the start."""
+
+        output = tempfile.SpooledTemporaryFile(max_size=NDR_EXPORT_SPOOL_BYTES)
+        writer = WRITERS[export_format](output)
+
+        row_count = 0
+        result = await db.stream(statement)
+        async for rows in result.partitions():
+            # formatting a batch is CPU work, keep it off the event loop
+            await asyncio.to_thread(writer.write_rows, rows)
+            row_count += len(rows)
+
+        writer.close()
+        output.seek(0)
+
+        logger.info(f"NDR Export: wrote {row_count} NDR records as {export_format}")
+        return output
+
+
+class NdrExportJobs:
+    """
+    Exports run in the background: the file is built on a read replica,
+    uploaded to S3 and its key kept against a job id for polling, which
+    answers with a freshly presigned URL. Jobs live in the worker that
+    started them.
+    """
+
+    _jobs: "OrderedDict[str, dict]" = OrderedDict()
+    _tasks: set = set()
+
+    @classmethod
+    def start(cls, client_id: int, statement, export_format: str) -> str:
+        job_id = str(uuid.uuid4())
+        cls._remember(
+            job_id,
+            {"client_id": client_id, "status": "running", "url": None, "error": None},
+        )
+        task = asyncio.create_task(
+            cls._run(job_id, client_id, statement, export_format)
+        )
+        cls._tasks.add(task)
+        task.add_done_callback(cls._tasks.discard)
+        return job_id
+
+    @classmethod
+    def get(cls, client_id: int, job_id: str) -> Optional[dict]:
+        job = cls._jobs.get(job_id)
+        if job is None or job["client_id"] != client_id:
+            return None
+
+        status = {
+            key: value
+            for key, value in job.items()
+            if key not in ("client_id", "key", "filename")
+        }
+        # signed on every read, a link handed out earlier may have expired
+        if job.get("key"):
+            status["url"] = ArtifactStore.presigned_url(
+                job["key"], filename=job["filename"]
+            )
+        return status
+
+    @classmethod
+    def _remember(cls, job_id: str, job: dict):
+        cls._jobs[job_id] = job
+        while len(cls._jobs) > NDR_EXPORT_JOBS_KEPT:
+            cls._jobs.popitem(last=False)
+
+    @classmethod
+    async def _run(cls, job_id: str, client_id: int, statement, export_format: str):
+        job = cls._jobs[job_id]
+
+        # the request's session is gone by now, the job opens its own
+        session = LazyAsyncSession()
+        context_db_session.set(session)
+        try:
+            async with read_replica():
+                output = await NdrExport.build(
+                    get_db_session(), statement, export_format
+                )
+
+            stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+            filename = f"ndr_{stamp}_{job_id}.{export_format}"
+            try:
+                # streamed from the spool file part by part, never read whole
+                key = await ArtifactStore.aput_fileobj(
+                    f"{client_id}/ndr_export/{filename}",
+                    output,
+                    CONTENT_TYPES[export_format],
+                )
+            finally:
+                output.close()
+
+            job.update(status="completed", key=key, filename=filename)
+
+        except Exception as e:
+            logger.error(msg=f"NDR export job {job_id} failed: {str(e)}")
+            job.update(status="failed", error="Export failed, please try again")
+
+        finally:
+            await session.close()
@@ -1,6 +1,6 @@
 from enum import Enum
 from uuid import UUID
-from typing import Optional, Any, List, Dict
+from typing import Optional, Any, List, Dict, Literal
 from datetime import datetime
 
 from pydantic import BaseModel
@@ -18,6 +18,12 @@ class Ndr_filters(BaseModel):
     search_term: Optional[str] = ""
 
 
+class Ndr_export_filters(Ndr_filters):
+    export_format: Literal["xlsx", "csv"] = "xlsx"
+    # build the file in the background and upload it to S3
+    background: bool = False
+
+
 class Ndr_reattempt_escalate(BaseModel):
     alternatePhoneNumber: Optional[str] = None
     address: Optional[str] = None
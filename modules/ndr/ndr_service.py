@@ -5,10 +5,7 @@ from sqlalchemy import or_, desc, cast, func
 from sqlalchemy.types import DateTime, String
 from sqlalchemy.orm import joinedload
 from datetime import datetime, timezone
-import pandas as pd
-import base64
 from fastapi.encoders import jsonable_encoder
-from io import BytesIO
 
 # import requests
 import json  # Import the json module
@@ -20,16 +17,20 @@ from logger import logger
 
 # schema
 from schema.base import GenericResponseModel
-from modules.orders.order_schema import Order_Model, Order_Response_Model
+from modules.orders.order_schema import Order_Model
+from modules.orders.order_projection import ORDER_RESPONSE_PROJECTION
 from modules.ndr.ndr_schema import (
     Ndr_filters,
     Ndr_reattempt_escalate,
     Ndr_status_update,
     Bulk_Ndr_reattempt_escalate,
+    Ndr_export_filters,
 )
 
 # services
 from modules.ndr_history.ndr_history_service import NdrHistoryService
+from modules.ndr.ndr_action_engine import NdrActionEngine, NdrActionRequest
+from modules.ndr.ndr_export import NdrExport, NdrExportJobs
 
 
 # models
@@ -219,28 +220,44 @@ class NdrService:
             # Pagination - Get total count before applying pagination
             total_count = query.count()
 
-            # Apply pagination
-            ndrs_with_orders = (
-                query.offset((page_number - 1) * batch_size).limit(batch_size).all()
+            # Apply pagination, selecting only the NDR fields and the order
+            # columns the response needs instead of full ORM rows
+            page = (
+                ORDER_RESPONSE_PROJECTION.joins(
+                    query.with_entities(
+                        Ndr.awb,
+                        Ndr.uuid,
+                        Ndr.status,
+                        Ndr.datetime,
+                        Ndr.attempt,
+                        Ndr.reason,
+                        *ORDER_RESPONSE_PROJECTION.columns,
+                    )
+                )
+                .offset((page_number - 1) * batch_size)
+                .limit(batch_size)
+                .all()
             )
 
+            orders = ORDER_RESPONSE_PROJECTION.build(page)
+
             ndrs = [
                 {
-                    "awb": ndr.awb,
-                    "uuid": ndr.uuid,
-                    "status": ndr.status,
-                    "datetime": ndr.datetime,
-                    "attempt": ndr.attempt,
-                    "reason": ndr.reason,
-                    "order_id": ndr.order.order_id,
-                    "order_date": ndr.order.order_date,
-                    "payment_mode": ndr.order.payment_mode,
-                    "total_value": ndr.order.order_value,
-                    "consignee_address": ndr.order.consignee_address,
-                    "consignee_phone": ndr.order.consignee_phone,
-                    "order": Order_Response_Model(**ndr.order.to_model().model_dump()),
+                    "awb": row.awb,
+                    "uuid": row.uuid,
+                    "status": row.status,
+                    "datetime": row.datetime,
+                    "attempt": row.attempt,
+                    "reason": row.reason,
+                    "order_id": order.order_id,
+                    "order_date": order.order_date,
+                    "payment_mode": order.payment_mode,
+                    "total_value": order.order_value,
+                    "consignee_address": order.consignee_address,
+                    "consignee_phone": order.consignee_phone,
+                    "order": order,
                 }
-                for ndr in ndrs_with_orders
+                for row, order in zip(page, orders)
             ]
 
             print(6)
@@ -276,7 +293,6 @@ class NdrService:
                 "pagination": pagination_info,  # Pagination metadata
             }
 
-            print(response_data, "new status with pagination")
             return GenericResponseModel(
                 status_code=http.HTTPStatus.OK,
                 message="Orders fetched Successfully",
@@ -314,113 +330,43 @@ class NdrService:
             )
 
     @staticmethod
-    def export_all_ndr(ndr_filters: Ndr_filters):
+    async def export_all_ndr(ndr_filters: Ndr_export_filters):
         try:
-            # if search term is present, give it the highest priority and no other filter will be applied
-            ndr_status = ndr_filters.ndr_status
-            # ndr_type = ndr_filters.ndr_type
-            # keyword = ndr_filters.keyword
-            start_date = ndr_filters.start_date
-            end_date = ndr_filters.end_date
-            db = get_db_session()
             client_id = context_user_data.get().client_id
-            query = db.query(Ndr)
 
             # ✅ NEW: Use enhanced status mapping to support status groups
-            mapped_statuses = NdrService.get_mapped_statuses(ndr_status)
+            mapped_statuses = NdrService.get_mapped_statuses(ndr_filters.ndr_status)
             logger.info(
-                f"NDR Export: Mapped statuses for '{ndr_status}': {mapped_statuses}"
+                f"NDR Export: Mapped statuses for '{ndr_filters.ndr_status}': {mapped_statuses}"
             )
 
-            query = query.filter(
-                Ndr.client_id == client_id,
-                Ndr.status.in_(mapped_statuses),  # Use .in_() for multiple statuses
+            statement = NdrExport.query(
+                client_id,
+                mapped_statuses,
+                ndr_filters.start_date,
+                ndr_filters.end_date,
             )
 
-            # Join with Order table first, then apply Order filters
-            query = query.join(Order, Ndr.order_id == Order.id)
+            if ndr_filters.background:
+                job_id = NdrExportJobs.start(
+                    client_id, statement, ndr_filters.export_format
+                )
+                return GenericResponseModel(
+                    status_code=http.HTTPStatus.ACCEPTED,
+                    status=True,
+                    data={"job_id": job_id},
+                    message="Export started",
+                )
 
-            query = query.filter(
-                cast(Order.order_date, DateTime) >= start_date,
-                cast(Order.order_date, DateTime) <= end_date,
+            output = await NdrExport.build(
+                get_db_session(), statement, ndr_filters.export_format
+            )
+            return GenericResponseModel(
+                status_code=http.HTTPStatus.OK,
+                status=True,
+                data=output,
+                message="Export ready",
             )
-
-            # if keyword != "":
-            #     if ndr_type == "Order_Id":
-            #         query = query.filter(Order.order_id == keyword)
-            #     else:
-            #         query = query.filter(Order.awb_number == keyword)
-
-            ndrs_with_orders = query.all()
-            logger.info(f"NDR Export: Found {len(ndrs_with_orders)} NDR records")
-
-            ndr_data = []
-
-            for ndr in ndrs_with_orders:
-                try:
-                    body = {
-                        "awb": ndr.awb,
-                        "status": ndr.status,
-                        "datetime": ndr.datetime,
-                        "attempt": ndr.attempt,
-                        "reason": ndr.reason,
-                        "order_id": ndr.order.order_id if ndr.order else "",
-                        "order_date": (
-                            ndr.order.order_date.strftime("%Y-%m-%d %H:%M:%S")
-                            if ndr.order and ndr.order.order_date
-                            else ""
-                        ),
-                        "payment_mode": ndr.order.payment_mode if ndr.order else "",
-                        "total_value": ndr.order.order_value if ndr.order else 0,
-                        "consignee_address": (
-                            ndr.order.consignee_address if ndr.order else ""
-                        ),
-                        "consignee_phone": (
-                            ndr.order.consignee_phone if ndr.order else ""
-                        ),
-                    }
-                    ndr_data.append(body)
-                except Exception as row_error:
-                    logger.error(
-                        f"NDR Export: Error processing NDR row {ndr.id}: {str(row_error)}"
-                    )
-                    continue
-
-            logger.info(f"NDR Export: Processed {len(ndr_data)} NDR records for export")
-
-            if len(ndr_data) == 0:
-                logger.warning("NDR Export: No data found for export")
-                # Create empty DataFrame with headers
-                df = pd.DataFrame(
-                    columns=[
-                        "awb",
-                        "status",
-                        "datetime",
-                        "attempt",
-                        "reason",
-                        "order_id",
-                        "order_date",
-                        "payment_mode",
-                        "total_value",
-                        "consignee_address",
-                        "consignee_phone",
-                    ]
-                )
-            else:
-                df = pd.DataFrame(ndr_data)
-
-            # Create an in-memory bytes buffer
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-                df.to_excel(writer, index=False, sheet_name="NDR")
-
-            # Return the file as a downloadable response
-            output.seek(0)
-            headers = {
-                "Content-Disposition": 'attachment; filename="ndr.xlsx"',
-                "Content-Type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            }
-            return base64.b64encode(output.getvalue()).decode("utf-8")
 
         except DatabaseError as e:
             # Log database error
@@ -446,33 +392,63 @@ class NdrService:
                 status_code=http.HTTPStatus.INTERNAL_SERVER_ERROR,
                 message="An internal server error occurred. Please try again later.",
             )
-        finally:
-            if "db" in locals():
-                db.close()
+
+    @staticmethod
+    def export_job_status(job_id: str):
+        client_id = context_user_data.get().client_id
+        job = NdrExportJobs.get(client_id, job_id)
+
+        if job is None:
+            return GenericResponseModel(
+                status_code=http.HTTPStatus.NOT_FOUND,
+                status=False,
+                message="Export not found",
+            )
+
+        return GenericResponseModel(
+            status_code=http.HTTPStatus.OK,
+            status=True,
+            data=job,
+            message="Export {}".format(job["status"]),
+        )
 
     @staticmethod
     def ndr_reattempt_escalate(ndr_reattempt_escalate: Ndr_reattempt_escalate):
         try:
-            db = get_db_session()
-            get_result = (
-                db.query(Ndr).filter(Ndr.uuid == ndr_reattempt_escalate.uuid).first()
+            client_id = context_user_data.get().client_id
+
+            (outcome,) = NdrActionEngine.reattempt(
+                client_id,
+                [
+                    NdrActionRequest(
+                        uuid=ndr_reattempt_escalate.uuid,
+                        alternate_phone_number=ndr_reattempt_escalate.alternatePhoneNumber,
+                        address=ndr_reattempt_escalate.address,
+                    )
+                ],
             )
-            print(get_result.awb)
-            if get_result != None:
-                get_result.alternate_phone_number = (
-                    ndr_reattempt_escalate.alternatePhoneNumber
+
+            if outcome["status"] == "not_found":
+                return GenericResponseModel(
+                    status_code=http.HTTPStatus.NOT_FOUND,
+                    message="Ndr not found",
+                    status=False,
                 )
-                get_result.address = ndr_reattempt_escalate.address
-                get_result.status = "REATTEMPT"
-                get_result.updated_at = datetime.now(timezone.utc)
-                db.add(get_result)
-                db.commit()
 
+            if outcome["status"] == "failed":
                 return GenericResponseModel(
-                    status_code=http.HTTPStatus.OK,
-                    message="Ndr Updated Successfully",
-                    status=True,
+                    status_code=http.HTTPStatus.BAD_REQUEST,
+                    message=outcome["message"],
+                    data=outcome,
+                    status=False,
                 )
+
+            return GenericResponseModel(
+                status_code=http.HTTPStatus.OK,
+                message="Ndr Updated Successfully",
+                data=outcome,
+                status=True,
+            )
         except DatabaseError as e:
             # Log database error without context_user_data to avoid serialization issues
             logger.error(
@@ -501,26 +477,19 @@ class NdrService:
     @staticmethod
     def bulk_ndr_status_change(bulkstatus: Bulk_Ndr_reattempt_escalate):
         try:
-            db = get_db_session()
             client_id = context_user_data.get().client_id
-            updated_count = 0
-            for uuid in bulkstatus.order_ids:
-                record = (
-                    db.query(Ndr)
-                    .filter(Ndr.uuid == uuid, Ndr.client_id == client_id)
-                    .first()
-                )
-                if record:
-                    record.status = "REATTEMPT"
-                    record.updated_at = datetime.now(timezone.utc)
-                    db.add(record)
-                    updated_count += 1
 
-            db.commit()  # Commit once after all updates for better performance
+            # one courier call per account / batch where the courier supports it
+            outcomes = NdrActionEngine.reattempt(
+                client_id,
+                [NdrActionRequest(uuid=uuid) for uuid in bulkstatus.order_ids],
+            )
+            updated_count = len([o for o in outcomes if o["status"] == "success"])
 
             return GenericResponseModel(
                 status_code=http.HTTPStatus.OK,
                 message=f"Successfully updated {updated_count} NDR records",
+                data=outcomes,
                 status=True,
             )
         except DatabaseError as e:
@@ -906,18 +875,13 @@ class NdrService:
                     if ndr_record.status not in ["DELIVERED", "RTO"]:
                         print("Updating existing NDR record")
 
-                        # ✅ FIX: Check for duplicate datetime entries
-                        duplicate_ndr = (
-                            db.query(Ndr)
-                            .filter(
-                                Ndr.order_id == order.id,
-                                Ndr.datetime == latest_ndr_event["datetime"],
-                                Ndr.client_id == client_id,
-                            )
-                            .first()
+                        # an order has a single NDR row, so the event is a
+                        # duplicate when that row already carries its datetime
+                        is_duplicate = (
+                            ndr_record.datetime == latest_ndr_event["datetime"]
                         )
 
-                        if duplicate_ndr is None:
+                        if not is_duplicate:
                             # Update existing record
                             ndr_record.status = NdrService.status_mapping.get(
                                 status, mapped_status
@@ -21,7 +21,8 @@ from modules.orders.order_schema import (
 )
 
 # utils
-from utils.response_handler import build_api_response
+from utils.response_handler import build_api_response, build_fast_api_response
+from database.routing import read_replica
 
 # services
 from .order_service import OrderService
@@ -180,7 +181,7 @@ async def get_customers(phone: str):
 
         print(1)
         response: GenericResponseModel = OrderService.get_customers(phone=phone)
-        return build_api_response(response)
+        return build_fast_api_response(response)
 
     except Exception as e:
         return build_api_response(
@@ -409,7 +410,7 @@ async def get_all_orders(order_filters: Order_filters):
         response: GenericResponseModel = await OrderService.get_all_orders(
             order_filters=order_filters
         )
-        return build_api_response(response)
+        return build_fast_api_response(response)
 
     except Exception as e:
         return build_api_response(
@@ -497,7 +498,8 @@ async def export_orders(order_filters: Order_Export_Filters):
 )
 async def get_order_status_counts():
     try:
-        response: GenericResponseModel = OrderService.get_remittance()
+        async with read_replica():
+            response: GenericResponseModel = OrderService.get_remittance()
         return build_api_response(response)
 
     except Exception as e:
@@ -0,0 +1,23 @@
+from schema.projection import Projection
+
+# models
+from models import Order, Pickup_Location
+
+# schema
+from modules.orders.order_schema import Order_Response_Model, customerResponseModel
+from modules.pickup_location.pickup_location_schema import (
+    PickupLocationResponseModel,
+)
+
+
+# order lists (orders page, NDR list): no tracking/request/action_history blobs
+ORDER_RESPONSE_PROJECTION = Projection(
+    Order_Response_Model,
+    Order,
+    nested={
+        "pickup_location": Projection(PickupLocationResponseModel, Pickup_Location)
+    },
+)
+
+# consignee + billing columns only, for the customer lookup by phone
+CUSTOMER_PROJECTION = Projection(customerResponseModel, Order)
@@ -35,6 +35,7 @@ import re
 import requests
 
 from context_manager.context import context_user_data, get_db_session
+from database.routing import use_read_replica
 from utils.error_excel_generator import ErrorExcelGenerator
 
 from logger import logger
@@ -53,6 +54,7 @@ from .order_schema import (
     BulkImportValidationError,
     BulkImportResponseModel,
 )
+from .order_projection import CUSTOMER_PROJECTION, ORDER_RESPONSE_PROJECTION
 from modules.shipment.shipment_schema import CreateShipmentModel
 
 from shipping_partner.shiperfecto.status_mapping import status_mapping
@@ -81,12 +83,13 @@ from models import (
     New_Company_To_Client_Rate,
     BulkOrderUploadLogs,
 )
+from models.order_profiles import OrderProfile
 
 # service
 from modules.shipment import ShipmentService
 from modules.serviceability import ServiceabilityService
 from modules.wallet import WalletService
-from modules.aws_s3.aws_s3 import upload_file_to_s3
+from modules.aws_s3 import ArtifactStore
 from data.Locations import metro_cities, special_zone
 import random
 import os
@@ -2202,14 +2205,12 @@ class OrderService:
                     # Upload to S3
                     s3_key = f"{client_id}/bulk_upload_errors/{filename}"
 
-                    upload_result = upload_file_to_s3(
-                        file_obj=excel_buffer,
-                        s3_key=s3_key,
-                        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    ArtifactStore.put_fileobj(
+                        s3_key,
+                        excel_buffer,
+                        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                     )
-
-                    if upload_result.get("success"):
-                        error_file_url = upload_result.get("url")
+                    error_file_url = ArtifactStore.url(s3_key)
 
                     error_end = time.time()
                     print(
@@ -2308,6 +2309,7 @@ class OrderService:
             )
 
     @staticmethod
+    @use_read_replica
     async def get_all_orders(order_filters: Order_filters):
 
         # -----------------------
@@ -2507,9 +2509,9 @@ class OrderService:
             # --------------------------------
             # MAIN QUERY
             # --------------------------------
+            # only the columns Order_Response_Model needs, no JSON blobs
             main_query = (
-                select(Order)
-                .options(joinedload(Order.pickup_location))
+                ORDER_RESPONSE_PROJECTION.select()
                 .where(*base_filters, *common_filters, *remaining_filters)
                 .order_by(
                     desc(Order.order_date), desc(Order.created_at), desc(Order.id)
@@ -2537,13 +2539,13 @@ class OrderService:
             main_query = main_query.offset(offset_value).limit(batch_size)
 
             result = await db.execute(main_query)
-            fetched_orders = result.scalars().all()
+            fetched_orders = ORDER_RESPONSE_PROJECTION.dicts(result.all())
 
             # --------------------------------
             # REPEAT CUSTOMER PREVIOUS ORDERS
             # --------------------------------
             phone_numbers = [
-                o.consignee_phone for o in fetched_orders if o.consignee_phone
+                o["consignee_phone"] for o in fetched_orders if o["consignee_phone"]
             ]
 
             previous_counts = {}
@@ -2561,13 +2563,11 @@ class OrderService:
                 res = await db.execute(q)
                 previous_counts = dict(res.all())
 
-            orders_response = []
             for o in fetched_orders:
-                d = o.to_model().model_dump()
-                phone = o.consignee_phone
-                tot = previous_counts.get(phone, 1)
-                d["previous_order_count"] = max(0, tot - 1)
-                orders_response.append(Order_Response_Model(**d))
+                tot = previous_counts.get(o["consignee_phone"], 1)
+                o["previous_order_count"] = max(0, tot - 1)
+
+            orders_response = ORDER_RESPONSE_PROJECTION.build(fetched_orders)
 
             return GenericResponseModel(
                 status_code=200,
@@ -2952,7 +2952,7 @@ class OrderService:
             # query the db for fetching the orders
 
             customers = (
-                db.query(Order)
+                db.query(*CUSTOMER_PROJECTION.columns)
                 .filter(
                     Order.client_id == client_id,
                     Order.consignee_phone == phone,
@@ -2961,16 +2961,9 @@ class OrderService:
                 .all()
             )
 
-            print(customers)
-
             # applying company and client filter
 
-            customer_data = [
-                customerResponseModel(
-                    **order.to_model().model_dump(),
-                )
-                for order in customers
-            ]
+            customer_data = CUSTOMER_PROJECTION.build(customers)
 
             return GenericResponseModel(
                 status_code=http.HTTPStatus.OK,
@@ -3272,6 +3265,7 @@ class OrderService:
     #         )
 
     @staticmethod
+    @use_read_replica
     async def export_orders(order_filters: Order_filters):
         try:
             # destructure the filters
@@ -3298,7 +3292,7 @@ class OrderService:
             # BASE QUERY
             stmt = (
                 select(Order)
-                .options(joinedload(Order.pickup_location))
+                .options(joinedload(Order.pickup_location), *OrderProfile.LISTING)
                 .where(
                     and_(
                         Order.client_id == client_id,
@@ -3906,7 +3900,7 @@ class OrderService:
 
             # query the db for fetching the orders
 
-            query = db.query(Order)
+            query = db.query(Order).options(*OrderProfile.BOOKING)
 
             # # applying company and client filter
             fetched_orders = query.filter(
@@ -0,0 +1,2 @@
+from .partner_health import COURIER_HTTP_TIMEOUT_SECONDS, PartnerHealth
+from .partner_health_controller import partner_health_router
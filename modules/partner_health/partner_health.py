@@ -0,0 +1,316 @@
+import functools
+import http
+import inspect
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from logger import logger
+from utils.environment import Environment
+
+# schema
+from schema.base import GenericResponseModel
+
+
+# calls remembered per partner and operation
+PARTNER_HEALTH_WINDOW_SECONDS = float(
+    Environment.get_string("PARTNER_HEALTH_WINDOW_SECONDS", "60")
+)
+
+# a breaker only judges a window with at least this many calls
+PARTNER_BREAKER_MIN_CALLS = int(Environment.get_string("PARTNER_BREAKER_MIN_CALLS", "10"))
+
+# share of failed or slow calls in the window that opens the breaker
+PARTNER_BREAKER_FAILURE_RATE = float(
+    Environment.get_string("PARTNER_BREAKER_FAILURE_RATE", "0.5")
+)
+
+# how long an open breaker fails fast before letting a probe call through
+PARTNER_BREAKER_OPEN_SECONDS = float(
+    Environment.get_string("PARTNER_BREAKER_OPEN_SECONDS", "30")
+)
+
+# a call slower than this counts against the partner even if it succeeded
+PARTNER_SLOW_CALL_SECONDS = float(Environment.get_string("PARTNER_SLOW_CALL_SECONDS", "10"))
+
+# timeout the courier adapters pass to their HTTP calls
+COURIER_HTTP_TIMEOUT_SECONDS = float(
+    Environment.get_string("COURIER_HTTP_TIMEOUT_SECONDS", "15")
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# operations whose health decides where new shipments are routed
+ROUTING_OPERATIONS = ("create_order", "dev_create_order", "generate_awb")
+
+# inbound handlers, they never call the partner
+UNGUARDED_OPERATIONS = ("tracking_webhook",)
+
+
+class CircuitBreaker:
+    """Rolling window and breaker state of one partner operation."""
+
+    def __init__(self, partner: str, operation: str):
+        self.partner = partner
+        self.operation = operation
+        self._lock = threading.Lock()
+        # (finished_at, failed, latency_seconds)
+        self._calls: deque = deque()
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self.rejected = 0
+
+    def _trim(self, now: float):
+        while self._calls and now - self._calls[0][0] > PARTNER_HEALTH_WINDOW_SECONDS:
+            self._calls.popleft()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            now = time.monotonic()
+            if self.state == OPEN and now - self.opened_at >= PARTNER_BREAKER_OPEN_SECONDS:
+                self.state = HALF_OPEN
+                self._probing = False
+
+            # half open: one probe call at a time decides
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def abandon(self):
+        """A call that never finished (cancelled): the next one may probe."""
+
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+
+    def record(self, failed: bool, latency: float):
+        failed = failed or latency > PARTNER_SLOW_CALL_SECONDS
+        now = time.monotonic()
+
+        with self._lock:
+            self._calls.append((now, failed, latency))
+            self._trim(now)
+
+            if self.state == HALF_OPEN:
+                self._probing = False
+                if failed:
+                    self._open(now)
+                else:
+                    self.state = CLOSED
+                    self._calls.clear()
+                    logger.info(msg=f"{self.partner}.{self.operation} breaker closed")
+                return
+
+            if self.state == CLOSED and len(self._calls) >= PARTNER_BREAKER_MIN_CALLS:
+                failures = sum(1 for _, f, _ in self._calls if f)
+                if failures / len(self._calls) >= PARTNER_BREAKER_FAILURE_RATE:
+                    self._open(now)
+
+    def _open(self, now: float):
+        self.state = OPEN
+        self.opened_at = now
+        logger.error(msg=f"{self.partner}.{self.operation} breaker opened")
+
+    def failure_rate(self) -> float:
+        with self._lock:
+            self._trim(time.monotonic())
+            if not self._calls:
+                return 0.0
+            return sum(1 for _, f, _ in self._calls if f) / len(self._calls)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._trim(time.monotonic())
+            latencies = sorted(latency for _, _, latency in self._calls)
+            calls = len(latencies)
+            failures = sum(1 for _, f, _ in self._calls if f)
+
+        def percentile(p):
+            return round(latencies[min(int(calls * p), calls - 1)] * 1000, 1) if calls else 0
+
+        return {
+            "partner": self.partner,
+            "operation": self.operation,
+            "state": self.state,
+            "calls": calls,
+            "failures": failures,
+            "failure_rate": round(failures / calls, 3) if calls else 0,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "rejected": self.rejected,
+        }
+
+
+def _failed(result) -> bool:
+    # adapters turn exceptions and timeouts into 5xx responses; 4xx are the
+    # partner saying no to this shipment, not the partner being unhealthy
+    status_code = getattr(result, "status_code", None)
+    return isinstance(status_code, int) and status_code >= 500
+
+
+def _unavailable(partner: str) -> GenericResponseModel:
+    return GenericResponseModel(
+        status_code=http.HTTPStatus.SERVICE_UNAVAILABLE,
+        status=False,
+        message=f"{partner} is temporarily unavailable, please try another courier",
+    )
+
+
+class GuardedPartner:
+    """
+    Stands in for a courier adapter class in courier_service_mapping: every
+    public method call goes through the partner's breaker for that operation.
+    """
+
+    def __init__(self, partner: str, adapter):
+        self._partner = partner
+        self._adapter = adapter
+        self._wrapped: Dict[str, Callable] = {}
+
+    @property
+    def adapter(self):
+        return self._adapter
+
+    def __getattr__(self, name):
+        attribute = getattr(self._adapter, name)
+        if name.startswith("_") or name in UNGUARDED_OPERATIONS or not callable(attribute):
+            return attribute
+
+        wrapped = self._wrapped.get(name)
+        if wrapped is None:
+            wrapped = self._wrapped[name] = self._guard(name, attribute)
+        return wrapped
+
+    def _guard(self, operation: str, method):
+        breaker = PartnerHealth.breaker(self._partner, operation)
+        partner = self._partner
+
+        if inspect.iscoroutinefunction(method):
+
+            @functools.wraps(method)
+            async def guarded_async(*args, **kwargs):
+                if not breaker.allow():
+                    return _unavailable(partner)
+                start = time.perf_counter()
+                try:
+                    result = await method(*args, **kwargs)
+                except Exception:
+                    breaker.record(True, time.perf_counter() - start)
+                    raise
+                except BaseException:
+                    # cancelled, e.g. a hedged booking that lost: says nothing
+                    # about the partner
+                    breaker.abandon()
+                    raise
+                breaker.record(_failed(result), time.perf_counter() - start)
+                return result
+
+            return guarded_async
+
+        @functools.wraps(method)
+        def guarded(*args, **kwargs):
+            if not breaker.allow():
+                return _unavailable(partner)
+            start = time.perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            except Exception:
+                breaker.record(True, time.perf_counter() - start)
+                raise
+            except BaseException:
+                breaker.abandon()
+                raise
+            breaker.record(_failed(result), time.perf_counter() - start)
+            return result
+
+        return guarded
+
+    def __repr__(self):
+        return f"GuardedPartner({self._partner!r}, {self._adapter.__name__})"
+
+
+class PartnerHealth:
+    """
+    Health of every courier partner, per operation, from the calls this
+    worker made in the last PARTNER_HEALTH_WINDOW_SECONDS.
+
+    A breaker opens when PARTNER_BREAKER_FAILURE_RATE of its calls failed or
+    were slower than PARTNER_SLOW_CALL_SECONDS; while open, calls return a 503
+    response at once instead of tying up a worker on a dead API. After
+    PARTNER_BREAKER_OPEN_SECONDS one probe call is let through, and its outcome
+    closes or re-opens the breaker. Courier selection uses tier() to try
+    healthy partners first.
+    """
+
+    _lock = threading.Lock()
+    _breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+
+    @classmethod
+    def guard(cls, partner: str, adapter) -> GuardedPartner:
+        return GuardedPartner(partner, adapter)
+
+    @classmethod
+    def breaker(cls, partner: str, operation: str) -> CircuitBreaker:
+        key = (partner, operation)
+        with cls._lock:
+            breaker = cls._breakers.get(key)
+            if breaker is None:
+                breaker = cls._breakers[key] = CircuitBreaker(partner, operation)
+            return breaker
+
+    @classmethod
+    def _routing_breakers(cls, partner: str) -> List[CircuitBreaker]:
+        with cls._lock:
+            return [
+                breaker
+                for (name, operation), breaker in cls._breakers.items()
+                if name == partner and operation in ROUTING_OPERATIONS
+            ]
+
+    @classmethod
+    def tier(cls, partner: Optional[str]) -> int:
+        """0 healthy, 1 degraded, 2 down: the order couriers should be tried in."""
+
+        tier = 0
+        for breaker in cls._routing_breakers(partner):
+            if breaker.state == OPEN:
+                return 2
+            if (
+                breaker.state == HALF_OPEN
+                or breaker.failure_rate() >= PARTNER_BREAKER_FAILURE_RATE / 2
+            ):
+                tier = 1
+        return tier
+
+    @classmethod
+    def prefer_healthy(cls, items: Iterable, partner_of: Callable) -> list:
+        """`items` in their order, with degraded and down partners moved last."""
+
+        tiers: Dict[str, int] = {}
+
+        def tier(item):
+            partner = partner_of(item)
+            if partner not in tiers:
+                tiers[partner] = cls.tier(partner)
+            return tiers[partner]
+
+        return sorted(items, key=tier)
+
+    @classmethod
+    def snapshot(cls) -> List[dict]:
+        with cls._lock:
+            breakers = list(cls._breakers.values())
+        return sorted(
+            (breaker.snapshot() for breaker in breakers),
+            key=lambda b: (b["partner"], b["operation"]),
+        )
@@ -0,0 +1,27 @@
+import http
+from fastapi import APIRouter
+
+# schema
+from schema.base import GenericResponseModel
+
+# utils
+from utils.response_handler import build_api_response
+
+# service
+from .partner_health import PartnerHealth
+
+
+partner_health_router = APIRouter(prefix="/partner-health", tags=["partner_health"])
+
+
+# courier circuit breaker states with their rolling error rate and latency
+@partner_health_router.get("", status_code=http.HTTPStatus.OK)
+async def partner_health():
+    return build_api_response(
+        GenericResponseModel(
+            status_code=http.HTTPStatus.OK,
+            status=True,
+            data={"breakers": PartnerHealth.snapshot()},
+            message="Partner health",
+        )
+    )
@@ -0,0 +1,341 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+
+from logger import logger
+from utils.environment import Environment
+
+# models
+from models import Pincode_Serviceability
+
+# data
+from shipping_partner.xpressbees.pincodes import xb_blocked_pincodes, xb_cream_pincodes
+
+
+# coverage is reloaded from pincode_serviceability at least this often; the
+# table is loaded from outside the app, so that is how soon a change is seen
+SERVICEABILITY_INDEX_TTL_SECONDS = float(
+    Environment.get_string("SERVICEABILITY_INDEX_TTL_SECONDS", "900")
+)
+
+# six digit pincodes, one bit each
+PINCODE_SPACE = 1_000_000
+
+
+@dataclass(frozen=True)
+class Coverage:
+    """pincode_serviceability columns of one courier."""
+
+    fm: str
+    lm_prepaid: str
+    lm_cod: str
+
+
+DTDC_SURFACE = Coverage("dtdc_surface_fm", "dtdc_surface_lm_prepaid", "dtdc_surface_lm_cod")
+DTDC_AIR = Coverage("dtdc_air_fm", "dtdc_air_lm_prepaid", "dtdc_air_lm_cod")
+ATS = Coverage("ats_fm", "ats_lm", "ats_lm")
+
+# courier or aggregator slug -> its coverage; couriers not listed here are
+# not restricted by the table, as their adapters do not check it either.
+# The table only ever rules a courier out: a pincode it has no row for, or a
+# column no pincode is flagged in (not loaded yet), says nothing about it
+COURIER_COVERAGE: Dict[str, Coverage] = {
+    "delhivery": Coverage("delhivery_fm", "delhivery_lm_prepaid", "delhivery_lm_cod"),
+    "dtdc": DTDC_SURFACE,
+    "dtdc-surface": DTDC_SURFACE,
+    "dtdc-air": DTDC_AIR,
+    "ekart": Coverage("ekart_fm", "ekart_lm_prepaid", "ekart_lm_cod"),
+    "ats": ATS,
+    "amazon": ATS,
+    "shadowfax": Coverage("shadowfax_fm", "shadowfax_lm", "shadowfax_lm"),
+}
+
+COVERAGE_COLUMNS = sorted(
+    {column for coverage in COURIER_COVERAGE.values() for column in vars(coverage).values()}
+)
+
+# pincodes a courier refuses for pickup or delivery
+COURIER_BLOCKED_PINCODES = {
+    "xpressbees": xb_blocked_pincodes,
+}
+
+# (client_id, courier) -> the only delivery pincodes that client may book
+CLIENT_DELIVERY_PINCODES = {
+    (422, "xpressbees"): xb_cream_pincodes,
+}
+
+
+def _pincodes(values) -> np.ndarray:
+    """Pincodes as int64, -1 for anything that is not a pincode."""
+
+    out = np.full(len(values), -1, dtype=np.int64)
+    for i, value in enumerate(values):
+        try:
+            pincode = int(str(value).strip())
+        except (TypeError, ValueError):
+            continue
+        if 0 <= pincode < PINCODE_SPACE:
+            out[i] = pincode
+    return out
+
+
+class PincodeBitset:
+    """One bit per pincode, 125 KB per set."""
+
+    __slots__ = ("bits",)
+
+    def __init__(self, pincodes: Iterable = ()):
+        self.bits = np.zeros(PINCODE_SPACE // 8, dtype=np.uint8)
+        codes = _pincodes(list(pincodes))
+        codes = codes[codes >= 0]
+        np.bitwise_or.at(
+            self.bits, codes >> 3, np.left_shift(1, codes & 7).astype(np.uint8)
+        )
+
+    def contains(self, pincodes: np.ndarray) -> np.ndarray:
+        """Membership of each pincode of an int64 array (-1 is never a member)."""
+
+        valid = pincodes >= 0
+        codes = np.where(valid, pincodes, 0)
+        return valid & ((self.bits[codes >> 3] >> (codes & 7)) & 1).astype(bool)
+
+    def __contains__(self, pincode) -> bool:
+        return bool(self.contains(_pincodes([pincode]))[0])
+
+    def __len__(self) -> int:
+        return int(np.unpackbits(self.bits).sum())
+
+
+@dataclass(frozen=True)
+class ServiceabilitySnapshot:
+    # coverage column -> the pincodes it flags False, for columns that flag
+    # at least one pincode True
+    denied: Dict[str, PincodeBitset]
+    blocked: Dict[str, PincodeBitset]
+    client_delivery: Dict[tuple, PincodeBitset]
+    loaded_at: float
+
+    @staticmethod
+    def build(rows) -> "ServiceabilitySnapshot":
+        pincodes = np.array([row[0] for row in rows], dtype=object)
+
+        denied = {}
+        for position, name in enumerate(COVERAGE_COLUMNS, start=1):
+            flags = np.array([row[position] is False for row in rows], dtype=bool)
+            if flags.all():
+                continue
+            denied[name] = PincodeBitset(pincodes[flags])
+
+        return ServiceabilitySnapshot(
+            denied=denied,
+            blocked={c: PincodeBitset(p) for c, p in COURIER_BLOCKED_PINCODES.items()},
+            client_delivery={
+                key: PincodeBitset(p) for key, p in CLIENT_DELIVERY_PINCODES.items()
+            },
+            loaded_at=time.monotonic(),
+        )
+
+    def serviceable(
+        self,
+        courier: str,
+        pickup: np.ndarray,
+        delivery: np.ndarray,
+        is_cod: np.ndarray,
+        client_id: Optional[int] = None,
+    ) -> np.ndarray:
+        """Vectorized check of many shipments against one courier."""
+
+        ok = np.ones(len(delivery), dtype=bool)
+
+        coverage = COURIER_COVERAGE.get(courier)
+        if coverage is not None:
+            ok &= ~self._denied(coverage.fm, pickup)
+            ok &= ~np.where(
+                is_cod,
+                self._denied(coverage.lm_cod, delivery),
+                self._denied(coverage.lm_prepaid, delivery),
+            )
+
+        blocked = self.blocked.get(courier)
+        if blocked is not None:
+            ok &= ~blocked.contains(pickup) & ~blocked.contains(delivery)
+
+        allowed = self.client_delivery.get((client_id, courier))
+        if allowed is not None:
+            ok &= allowed.contains(delivery)
+
+        return ok
+
+    def _denied(self, column: str, pincodes: np.ndarray) -> np.ndarray:
+        denied = self.denied.get(column)
+        if denied is None:
+            return np.zeros(len(pincodes), dtype=bool)
+        return denied.contains(pincodes)
+
+
+def courier_slugs(contract) -> List[str]:
+    """Slugs a rate card entry is known by, most specific first."""
+
+    slugs = []
+    if contract.shipping_partner is not None:
+        slugs.append(contract.shipping_partner.slug)
+    if contract.client_contract is not None and contract.client_contract.slug:
+        slugs.append(contract.client_contract.slug)
+    return slugs
+
+
+def _rule_slug(slugs: List[str]) -> Optional[str]:
+    for slug in slugs:
+        if (
+            slug in COURIER_COVERAGE
+            or slug in COURIER_BLOCKED_PINCODES
+            or any(courier == slug for _, courier in CLIENT_DELIVERY_PINCODES)
+        ):
+            return slug
+    return None
+
+
+class PincodeServiceabilityIndex:
+    """
+    First mile / last mile coverage of every courier as pincode bitsets, built
+    once per worker from pincode_serviceability plus the couriers' static
+    pincode lists, so quoting and booking can drop couriers that cannot serve
+    a shipment before any rate is calculated or courier called.
+
+        contracts = PincodeServiceabilityIndex.filter_contracts(
+            db, rate_card.active(), pickup_pincode, consignee_pincode, payment_mode,
+            client_id,
+        )
+    """
+
+    _lock = threading.Lock()
+    _snapshot: Optional[ServiceabilitySnapshot] = None
+
+    @staticmethod
+    def _statement():
+        return select(
+            Pincode_Serviceability.pincode,
+            *(getattr(Pincode_Serviceability, name) for name in COVERAGE_COLUMNS),
+        ).where(Pincode_Serviceability.is_deleted.isnot(True))
+
+    @classmethod
+    def _fresh(cls) -> Optional[ServiceabilitySnapshot]:
+        snapshot = cls._snapshot
+        if (
+            snapshot is not None
+            and time.monotonic() - snapshot.loaded_at < SERVICEABILITY_INDEX_TTL_SECONDS
+        ):
+            return snapshot
+        return None
+
+    @classmethod
+    def _store(cls, rows) -> ServiceabilitySnapshot:
+        snapshot = ServiceabilitySnapshot.build(rows)
+        with cls._lock:
+            cls._snapshot = snapshot
+        logger.info(msg=f"Pincode serviceability index loaded: {len(rows)} pincodes")
+        return snapshot
+
+    @classmethod
+    def get(cls, db) -> ServiceabilitySnapshot:
+        snapshot = cls._fresh()
+        if snapshot is None:
+            snapshot = cls._store(db.execute(cls._statement()).all())
+        return snapshot
+
+    @classmethod
+    async def aget(cls, db) -> ServiceabilitySnapshot:
+        snapshot = cls._fresh()
+        if snapshot is None:
+            snapshot = cls._store((await db.execute(cls._statement())).all())
+        return snapshot
+
+    @staticmethod
+    def mask(
+        snapshot: ServiceabilitySnapshot,
+        contracts,
+        pickup_pincode,
+        consignee_pincode,
+        payment_mode: str,
+        client_id: Optional[int] = None,
+    ) -> List[bool]:
+        pickup = _pincodes([pickup_pincode])
+        delivery = _pincodes([consignee_pincode])
+        is_cod = np.array([(payment_mode or "").lower() == "cod"])
+
+        # each courier is checked once, however many contracts it has
+        verdicts: Dict[Optional[str], bool] = {None: True}
+        mask = []
+        for contract in contracts:
+            slug = _rule_slug(courier_slugs(contract))
+            if slug not in verdicts:
+                verdicts[slug] = bool(
+                    snapshot.serviceable(slug, pickup, delivery, is_cod, client_id)[0]
+                )
+            mask.append(verdicts[slug])
+        return mask
+
+    @classmethod
+    def filter_contracts(
+        cls, db, contracts, pickup_pincode, consignee_pincode, payment_mode, client_id=None
+    ) -> list:
+        """The contracts whose courier serves this pickup / delivery / payment mode."""
+
+        snapshot = cls.get(db)
+        mask = cls.mask(
+            snapshot, contracts, pickup_pincode, consignee_pincode, payment_mode, client_id
+        )
+        return [contract for contract, ok in zip(contracts, mask) if ok]
+
+    @classmethod
+    async def afilter_contracts(
+        cls, db, contracts, pickup_pincode, consignee_pincode, payment_mode, client_id=None
+    ) -> list:
+        """Same as filter_contracts(), for an AsyncSession."""
+
+        snapshot = await cls.aget(db)
+        mask = cls.mask(
+            snapshot, contracts, pickup_pincode, consignee_pincode, payment_mode, client_id
+        )
+        return [contract for contract, ok in zip(contracts, mask) if ok]
+
+    @classmethod
+    def is_serviceable(
+        cls, db, courier: str, pickup_pincode, consignee_pincode, payment_mode, client_id=None
+    ) -> bool:
+        return cls._check(
+            cls.get(db), courier, pickup_pincode, consignee_pincode, payment_mode, client_id
+        )
+
+    @classmethod
+    async def ais_serviceable(
+        cls, db, courier: str, pickup_pincode, consignee_pincode, payment_mode, client_id=None
+    ) -> bool:
+        """Same as is_serviceable(), for an AsyncSession."""
+
+        return cls._check(
+            await cls.aget(db), courier, pickup_pincode, consignee_pincode, payment_mode, client_id
+        )
+
+    @staticmethod
+    def _check(
+        snapshot: ServiceabilitySnapshot,
+        courier: str,
+        pickup_pincode,
+        consignee_pincode,
+        payment_mode,
+        client_id=None,
+    ) -> bool:
+        return bool(
+            snapshot.serviceable(
+                courier,
+                _pincodes([pickup_pincode]),
+                _pincodes([consignee_pincode]),
+                np.array([(payment_mode or "").lower() == "cod"]),
+                client_id,
+            )[0]
+        )
@@ -31,11 +31,16 @@ from models import (
     Company_To_Client_Rates,
     Company_To_Client_COD_Rates,
     New_Company_To_Client_Rate,
+    Pickup_Location,
 )
 
 # data
 from data.courier_service_mapping import courier_service_mapping
 
+# cache
+from modules.client_contract.rate_card_cache import RateCardCache
+from modules.serviceability.pincode_index import PincodeServiceabilityIndex
+
 
 class ServiceabilityService:
 
@@ -49,19 +54,13 @@ class ServiceabilityService:
             client_id = user_data.client_id
             order_id = serviceability_params.order_id
             async with get_db_session() as db:
-                stmt = (
-                    select(New_Company_To_Client_Rate)
-                    .where(
-                        New_Company_To_Client_Rate.client_id == client_id,
-                        New_Company_To_Client_Rate.isActive == True,
-                    )
-                    .options(joinedload(New_Company_To_Client_Rate.shipping_partner))
+                rate_card = await RateCardCache.aget(db, client_id)
+                contracts = await ServiceabilityService.serviceable_contracts(
+                    db, client_id, order_id, rate_card.active(), rate_type
                 )
-                result = await db.execute(stmt)
-                fetched_contracts = result.scalars().all()
                 available_contracts = []
-                for contract in fetched_contracts:
-                    contract_dict = jsonable_encoder(contract)
+                for contract in contracts:
+                    contract_dict = contract.to_dict()
                     freight = await ServiceabilityService.calculate_freight(
                         order_id=order_id,
                         min_chargeable_weight=0.5,
@@ -102,6 +101,37 @@ class ServiceabilityService:
                 message=str(e),
             )
 
+    @staticmethod
+    async def serviceable_contracts(
+        db, client_id: int, order_id: str, contracts, rate_type: str = "forward"
+    ):
+        """The contracts whose courier can serve the order's pickup and delivery pincodes."""
+
+        model = Return_Order if rate_type == "reverse" else Order
+        result = await db.execute(
+            select(model.consignee_pincode, model.payment_mode, Pickup_Location.pincode)
+            .join(
+                Pickup_Location,
+                Pickup_Location.location_code == model.pickup_location_code,
+            )
+            .where(model.client_id == client_id, model.order_id == order_id)
+        )
+        shipment = result.first()
+        if shipment is None:
+            return list(contracts)
+
+        consignee_pincode, payment_mode, location_pincode = shipment
+
+        # a return is picked up from the consignee and delivered to the location
+        if rate_type == "reverse":
+            pickup_pincode, delivery_pincode = consignee_pincode, location_pincode
+        else:
+            pickup_pincode, delivery_pincode = location_pincode, consignee_pincode
+
+        return await PincodeServiceabilityIndex.afilter_contracts(
+            db, contracts, pickup_pincode, delivery_pincode, payment_mode, client_id
+        )
+
     @staticmethod
     def get_rate_card():
 
@@ -111,62 +141,23 @@ class ServiceabilityService:
             client_id = user_data.client_id
 
             with get_db_session() as db:
-
-                # fetched_contracts = (
-                #     db.query(Company_To_Client_Contract)
-                #     .filter(
-                #         Company_To_Client_Contract.client_id == client_id,
-                #         Company_To_Client_Contract.isActive == True,
-                #     )
-                #     .options(joinedload(Company_To_Client_Contract.aggregator_courier))
-                #     .options(joinedload(Company_To_Client_Contract.rates))
-                #     .options(joinedload(Company_To_Client_Contract.cod_rates))
-                #     .all()
-                # )
-
-                fetched_contracts = (
-                    db.query(New_Company_To_Client_Rate)
-                    .join(New_Company_To_Client_Rate.aggregator_courier)
-                    .filter(
-                        New_Company_To_Client_Rate.client_id == client_id,
-                        New_Company_To_Client_Rate.isActive == True,
-                    )
-                    .options(joinedload(New_Company_To_Client_Rate.aggregator_courier))
-                    .all()
-                )
-
-                # print(jsonable_encoder(fetched_contracts))
-                # print("**<<old>>**")
-                # print(jsonable_encoder(fetched_contracts_new))
-                # print("**<<new>>**")
-                print("cross section 1")
-                # fetched_contracts = [
-                #     contract.to_model().model_dump()
-                #     for contract in fetched_contracts_new
-                # ]
-                # print("cross section 2")
-                # print(fetched_contracts, "<*<fetched_contracts>*>")
-
-                rate_card = []
+                rate_card = RateCardCache.get(db, client_id)
 
                 zones = ["a", "b", "c", "d", "e"]
                 contract_data = []
 
-                for contract in jsonable_encoder(fetched_contracts):
-                    ac = contract.get("aggregator_courier", {})
-                    print(jsonable_encoder(ac))
+                for contract in rate_card.active():
+                    partner = contract.shipping_partner
                     courier_entry = {
-                        "courier_name": ac.get("name", ""),
-                        "aggregator_slug": ac.get("aggregator_slug", ""),
-                        "mode": ac.get("mode", "").capitalize(),
-                        "min_chargeable_weight": ac.get("min_chargeable_weight", 0.5),
-                        "additional_weight_bracket": ac.get(
-                            "additional_weight_bracket", 0.5
-                        ),
+                        "courier_name": partner.name if partner else "",
+                        "aggregator_slug": partner.slug if partner else "",
+                        "mode": ((partner.mode if partner else "") or "").capitalize(),
+                        "min_chargeable_weight": 0.5,
+                        "additional_weight_bracket": 0.5,
                         "zones": [],
                         "cod_charges": {
-                            "absolute": contract.get("absolute_rate", 0),
-                            "percentage": contract.get("percentage_rate", 0),
+                            "absolute": contract.absolute_rate,
+                            "percentage": contract.percentage_rate,
                         },
                     }
                     for z in zones:
@@ -174,16 +165,16 @@ class ServiceabilityService:
                             {
                                 "zone": z.upper(),
                                 "forward": {
-                                    "base": contract.get(f"base_rate_zone_{z}", 0),
-                                    "additional": contract.get(
-                                        f"additional_rate_zone_{z}", 0
-                                    ),
+                                    "base": contract.rates[f"base_rate_zone_{z}"],
+                                    "additional": contract.rates[
+                                        f"additional_rate_zone_{z}"
+                                    ],
                                 },
                                 "rto": {
-                                    "base": contract.get(f"rto_base_rate_zone_{z}", 0),
-                                    "additional": contract.get(
-                                        f"rto_additional_rate_zone_{z}", 0
-                                    ),
+                                    "base": contract.rates[f"rto_base_rate_zone_{z}"],
+                                    "additional": contract.rates[
+                                        f"rto_additional_rate_zone_{z}"
+                                    ],
                                 },
                             }
                         )
@@ -1,2 +1,3 @@
 from .shipment_controller import shipment_router
 from .shipment_service import ShipmentService
+from .hedged_assign import StaleBookingRecovery
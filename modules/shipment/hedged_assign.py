@@ -0,0 +1,444 @@
+import asyncio
+import http
+import json
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import select, update
+
+from context_manager.context import context_db_session, context_user_data, get_db_session
+from database.db import AsyncSessionLocal, LazyAsyncSession
+from logger import logger
+from utils.environment import Environment
+
+# schema
+from schema.base import GenericResponseModel
+from modules.shipment.shipment_schema import AutoCreateShipmentModel, CreateShipmentModel
+
+# models
+from models import Courier_Priority_Meta, Order, Pickup_Location
+from models.order_profiles import OrderProfile
+
+# service
+from modules.client_contract.rate_card_cache import RateCardCache
+from modules.serviceability.pincode_index import PincodeServiceabilityIndex
+from modules.partner_health import PartnerHealth
+from modules.wallet import WalletService
+from .shipment_service import PER_ORDER_CHARGE, ShipmentService
+
+
+# a booking slower than this gets the next candidate started alongside it
+AUTO_ASSIGN_HEDGE_DELAY_SECONDS = float(
+    Environment.get_string("AUTO_ASSIGN_HEDGE_DELAY_SECONDS", "3")
+)
+
+# courier bookings of one order in flight at once
+AUTO_ASSIGN_MAX_IN_FLIGHT = int(Environment.get_string("AUTO_ASSIGN_MAX_IN_FLIGHT", "2"))
+
+# an order claimed for booking this long ago that never saved the booking
+# (the worker died in between) is put back to "new"; well above any booking
+AUTO_ASSIGN_CLAIM_TIMEOUT_SECONDS = int(
+    Environment.get_string("AUTO_ASSIGN_CLAIM_TIMEOUT_SECONDS", "900")
+)
+
+# how often claims are checked for that
+AUTO_ASSIGN_CLAIM_SWEEP_SECONDS = int(
+    Environment.get_string("AUTO_ASSIGN_CLAIM_SWEEP_SECONDS", "300")
+)
+
+# JSON object of courier slug -> heaviest shipment it takes, in kg
+COURIER_MAX_WEIGHT_KG = json.loads(
+    Environment.get_string("COURIER_MAX_WEIGHT_KG", "{}") or "{}"
+)
+
+MIN_CHARGEABLE_WEIGHT = 0.5
+ADDITIONAL_WEIGHT_BRACKET = 0.5
+
+
+@dataclass(frozen=True)
+class Candidate:
+    rate_id: int
+    slug: str
+    total_freight: float
+
+
+def _rate(value) -> float:
+    # rate cards leave the zones and COD rates a courier does not offer empty
+    return float(value or 0)
+
+
+def _quote(contract, order, weight: float) -> float:
+    # same slabs as auto_assign_available_courier
+    applicable_weight = max(weight, MIN_CHARGEABLE_WEIGHT)
+    brackets = math.ceil(
+        (applicable_weight - MIN_CHARGEABLE_WEIGHT) / ADDITIONAL_WEIGHT_BRACKET
+    )
+    zone = (order.zone or "D").lower()
+
+    freight = _rate(getattr(contract, f"base_rate_zone_{zone}", 0)) + _rate(
+        getattr(contract, f"additional_rate_zone_{zone}", 0)
+    ) * brackets
+    if (order.payment_mode or "").lower() == "cod":
+        freight += max(
+            _rate(contract.absolute_rate),
+            _rate(contract.percentage_rate) * _rate(order.total_amount) * 0.01,
+        )
+    return freight
+
+
+class _AttemptSession(LazyAsyncSession):
+    """
+    Session of one hedged booking. Courier adapters commit the booked order
+    themselves; here their commits (and the closes that would drop what they
+    wrote) are held, with autoflush off, until the booking has claimed the
+    order in the database. A booking that lost the claim is rolled back, so
+    its AWB never reaches the order row.
+    """
+
+    __slots__ = ("held",)
+
+    def __init__(self):
+        super().__init__()
+        self.held = True
+
+    def materialize(self):
+        session = super().materialize()
+        if self.held:
+            session.sync_session.autoflush = False
+        return session
+
+    def release(self):
+        self.held = False
+        if self.is_materialized:
+            self.materialize().sync_session.autoflush = True
+
+    async def __aenter__(self):
+        # `async with get_db_session() as db` in the adapters gets the holder
+        return self
+
+    async def commit(self):
+        if not self.held:
+            await self.materialize().commit()
+
+    async def close(self):
+        if not self.held:
+            await super().close()
+
+
+class HedgedAutoAssign:
+    """
+    Auto-assign that books the best courier without waiting on the others
+    serially:
+    - every candidate is prechecked at once: pincode serviceability, courier
+      weight limit and wallet balance, so no booking is tried that cannot work,
+      and couriers whose breakers report them unhealthy go last;
+    - the best candidate is booked first; if it has not answered within
+      AUTO_ASSIGN_HEDGE_DELAY_SECONDS the next one is started alongside it, up
+      to AUTO_ASSIGN_MAX_IN_FLIGHT, and a rejection starts the next at once;
+    - the first booking to succeed claims the order with a conditional
+      UPDATE on its own connection; any other booking that succeeds later is
+      rolled back and cancelled at its courier by assign_awb.
+    """
+
+    _tasks: set = set()
+
+    @staticmethod
+    async def _order(db, client_id: int, order_id: str):
+        result = await db.execute(
+            select(Order)
+            .options(*OrderProfile.ROUTING)
+            .where(Order.client_id == client_id, Order.order_id == order_id)
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def candidates(db, client_id: int, order, priority_type: str) -> List[Candidate]:
+        rate_card = await RateCardCache.aget(db, client_id)
+
+        meta_slugs = []
+        if priority_type == "custom":
+            result = await db.execute(
+                select(Courier_Priority_Meta.meta_slug)
+                .where(Courier_Priority_Meta.client_id == client_id)
+                .order_by(Courier_Priority_Meta.ordering_key)
+            )
+            meta_slugs = list(result.scalars().all())
+            contracts = rate_card.for_slugs(meta_slugs)
+        else:
+            contracts = rate_card.active()
+
+        pickup_pincode = (
+            await db.execute(
+                select(Pickup_Location.pincode).where(
+                    Pickup_Location.location_code == order.pickup_location_code
+                )
+            )
+        ).scalar()
+        contracts = await PincodeServiceabilityIndex.afilter_contracts(
+            db,
+            contracts,
+            pickup_pincode,
+            order.consignee_pincode,
+            order.payment_mode,
+            client_id,
+        )
+
+        weight = round(
+            float(max(order.applicable_weight or 0, order.volumetric_weight or 0)), 3
+        )
+
+        candidates = []
+        for contract in contracts:
+            slug = contract.shipping_partner.slug if contract.shipping_partner else ""
+            max_weight = COURIER_MAX_WEIGHT_KG.get(slug)
+            if max_weight is not None and weight > float(max_weight):
+                continue
+            candidates.append(Candidate(contract.id, slug, _quote(contract, order, weight)))
+
+        if priority_type == "custom":
+            rank = {slug: i for i, slug in enumerate(meta_slugs)}
+            candidates.sort(key=lambda c: rank.get(c.slug, len(rank)))
+        else:
+            candidates.sort(key=lambda c: c.total_freight)
+
+        # couriers with failing or open breakers are tried last
+        return PartnerHealth.prefer_healthy(candidates, lambda c: c.slug)
+
+    @staticmethod
+    async def _claim(order_id: int) -> bool:
+        # committed at once, so every other booking of the order sees it
+        async with AsyncSessionLocal() as session:
+            claimed = (
+                await session.execute(
+                    update(Order)
+                    .where(Order.id == order_id, Order.status == "new")
+                    .values(status="booking")
+                    .returning(Order.id)
+                )
+            ).scalar()
+            await session.commit()
+        return claimed is not None
+
+    @staticmethod
+    async def _unclaim(order_id: int):
+        # the claiming booking failed to save, the order can be booked again
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(Order)
+                .where(Order.id == order_id, Order.status == "booking")
+                .values(status="new")
+            )
+            await session.commit()
+
+    @staticmethod
+    async def _attempt(order_id: str, candidate: Candidate, winner: List[int]):
+        # each booking runs on its own session, assign_awb commits or rolls it back
+        session = _AttemptSession()
+        context_db_session.set(session)
+        claimed_id = None
+
+        async def claim(order) -> bool:
+            nonlocal claimed_id
+            # the adapter has written the booking; from here assign_awb either
+            # commits it or rolls it back
+            session.release()
+            if winner or not await HedgedAutoAssign._claim(order.id):
+                return False
+            winner.append(candidate.rate_id)
+            claimed_id = order.id
+            return True
+
+        try:
+            response = await ShipmentService.assign_awb(
+                CreateShipmentModel(order_id=order_id, contract_id=candidate.rate_id),
+                claim=claim,
+            )
+            if claimed_id is not None:
+                if response.status != True:
+                    await HedgedAutoAssign._unclaim(claimed_id)
+                    winner.remove(candidate.rate_id)
+                elif isinstance(response.data, dict) and response.data.get("is_processing"):
+                    # the courier books it later, until then the order stays
+                    # "new" as it does without hedging
+                    await HedgedAutoAssign._unclaim(claimed_id)
+            return response
+        finally:
+            # a booking the courier rejected writes nothing, its response
+            # carries the error
+            session.release()
+            if session.is_materialized:
+                await session.rollback()
+            await session.close()
+
+    @classmethod
+    def _keep(cls, tasks):
+        # late bookings still have to finish, and cancel themselves if they lost
+        for task in tasks:
+            cls._tasks.add(task)
+            task.add_done_callback(cls._tasks.discard)
+
+    @classmethod
+    async def assign(cls, params: AutoCreateShipmentModel) -> GenericResponseModel:
+        try:
+            client_id = context_user_data.get().client_id
+            db = get_db_session()
+
+            order = await cls._order(db, client_id, params.order_id)
+            if order is None:
+                return GenericResponseModel(
+                    status_code=http.HTTPStatus.NOT_FOUND,
+                    message="Order not found",
+                )
+            if order.status != "new":
+                return GenericResponseModel(
+                    status_code=http.HTTPStatus.CONFLICT,
+                    status=True,
+                    data={
+                        "awb_number": order.awb_number or "",
+                        "delivery_partner": order.courier_partner or "",
+                    },
+                    message="AWB already assigned",
+                )
+
+            balance = await WalletService.check_sufficient_balance(PER_ORDER_CHARGE)
+            if balance.status == False:
+                return GenericResponseModel(
+                    status_code=http.HTTPStatus.BAD_REQUEST,
+                    message=balance.message,
+                )
+
+            candidates = await cls.candidates(db, client_id, order, params.priority_type)
+            await db.close()
+
+        except Exception as e:
+            logger.error(
+                extra=context_user_data.get(),
+                msg="Auto assign precheck failed: {}".format(str(e)),
+            )
+            return GenericResponseModel(
+                status_code=http.HTTPStatus.INTERNAL_SERVER_ERROR,
+                message="An internal server error occurred. Please try again later.",
+            )
+
+        if not candidates:
+            return GenericResponseModel(
+                status_code=http.HTTPStatus.BAD_REQUEST,
+                message="No courier available for this shipment",
+            )
+
+        return await cls._book(params.order_id, candidates)
+
+    @classmethod
+    async def _book(cls, order_id: str, candidates: List[Candidate]) -> GenericResponseModel:
+        winner: List[int] = []
+
+        queue = list(candidates)
+        in_flight = {}
+        last_response: Optional[GenericResponseModel] = None
+
+        def start_next():
+            candidate = queue.pop(0)
+            task = asyncio.create_task(
+                cls._attempt(order_id, candidate, winner)
+            )
+            in_flight[task] = candidate
+
+        start_next()
+        while in_flight:
+            can_hedge = bool(queue) and len(in_flight) < AUTO_ASSIGN_MAX_IN_FLIGHT
+            done, _ = await asyncio.wait(
+                in_flight,
+                timeout=AUTO_ASSIGN_HEDGE_DELAY_SECONDS if can_hedge else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+
+            if not done:
+                # the booking is slow, hedge with the next candidate
+                start_next()
+                continue
+
+            for task in done:
+                candidate = in_flight.pop(task)
+                response = task.result()
+                if winner and winner[0] == candidate.rate_id:
+                    cls._keep(in_flight)
+                    return response
+
+                last_response = response
+                logger.info(
+                    msg=f"Auto assign of {order_id} with {candidate.slug} failed: {response.message}"
+                )
+                if queue:
+                    start_next()
+
+        return last_response or GenericResponseModel(
+            status_code=http.HTTPStatus.BAD_REQUEST,
+            message="No courier could book this shipment",
+        )
+
+
+class StaleBookingRecovery:
+    """
+    Periodic job that puts orders left in "booking" back to "new": a worker
+    that claimed an order and died before saving or undoing the booking
+    leaves it there, and nothing else would ever book it again.
+    """
+
+    _task: Optional[asyncio.Task] = None
+
+    @classmethod
+    async def start(cls):
+        if cls._task is not None:
+            return
+
+        cls._task = asyncio.create_task(cls._run_forever())
+        logger.info(msg="Stale booking recovery started")
+
+    @classmethod
+    async def stop(cls):
+        if cls._task is None:
+            return
+
+        cls._task.cancel()
+        try:
+            await cls._task
+        except asyncio.CancelledError:
+            pass
+        cls._task = None
+
+    @classmethod
+    async def _run_forever(cls):
+        while True:
+            try:
+                await cls.run_once()
+            except Exception as e:
+                logger.error(msg=f"Stale booking recovery failed: {str(e)}")
+
+            await asyncio.sleep(AUTO_ASSIGN_CLAIM_SWEEP_SECONDS)
+
+    @staticmethod
+    async def run_once(now: Optional[datetime] = None) -> List[str]:
+        # the claim's UPDATE set updated_at when it moved the order to "booking"
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(
+            seconds=AUTO_ASSIGN_CLAIM_TIMEOUT_SECONDS
+        )
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Order)
+                .where(Order.status == "booking", Order.updated_at < cutoff)
+                .values(status="new")
+                .returning(Order.order_id)
+                .execution_options(synchronize_session=False)
+            )
+            order_ids = list(result.scalars().all())
+            await session.commit()
+
+        if order_ids:
+            # the courier may hold a shipment for these, check before rebooking
+            logger.warning(
+                msg=f"Reset {len(order_ids)} orders stuck in booking: {order_ids}"
+            )
+        return order_ids
@@ -7,6 +7,7 @@ from context_manager.context import build_request_context
 # schema
 from schema.base import GenericResponseModel
 from modules.shipment.shipment_schema import (
+    AutoCreateShipmentModel,
     CreateShipmentModel,
     generateLabelRequest,
     BulkCreateShipmentModel,
@@ -20,6 +21,7 @@ from utils.response_handler import build_api_response
 
 # services
 from .shipment_service import ShipmentService
+from .hedged_assign import HedgedAutoAssign
 
 
 # Creating the router for orders
@@ -92,6 +94,27 @@ async def assign_awb(shipment_params: CreateShipmentModel):
         )
 
 
+# book the best available courier, hedging slow bookings with the next one
+@shipment_router.post(
+    "/auto-assign-awb",
+    status_code=http.HTTPStatus.CREATED,
+    response_model=GenericResponseModel,
+)
+async def auto_assign_awb(shipment_params: AutoCreateShipmentModel):
+    try:
+        response = await HedgedAutoAssign.assign(shipment_params)
+        return build_api_response(response)
+
+    except Exception as e:
+        return build_api_response(
+            GenericResponseModel(
+                status_code=http.HTTPStatus.INTERNAL_SERVER_ERROR,
+                data=str(e),
+                message="An error occurred while assigning awb.",
+            )
+        )
+
+
 # create a new shipment
 @shipment_router.post(
     "/assign-reverse-awb",
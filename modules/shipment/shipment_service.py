@@ -9,7 +9,7 @@ from sqlalchemy.dialects import postgresql  # or mysql / sqlite depending on you
 from psycopg2 import DatabaseError
 import time
 from sqlalchemy.orm import joinedload
-from typing import List
+from typing import Awaitable, Callable, List, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, asc, and_, func
 import requests
@@ -66,19 +66,26 @@ from models import (
     Courier_Priority_Rules,
     Courier_Priority,
     New_Company_To_Client_Rate,
+    Pickup_Location,
 )
 
 # ✅ NEW: Import NDR model for status updates
 from models.ndr import Ndr
+from models.order_profiles import OrderProfile
 
 # data
 from data.Locations import metro_cities, special_zone
 from data.courier_service_mapping import courier_service_mapping
+from modules.courier_adapter import Booking, CourierRegistry
+from modules.tracking_status import StatusEngine
 
 # service
 from modules.serviceability import ServiceabilityService
+from modules.client_contract.rate_card_cache import RateCardCache
+from modules.serviceability.pincode_index import PincodeServiceabilityIndex
+from modules.partner_health import PartnerHealth
 from modules.wallet import WalletService
-from marketplace.shopify.shopify_service import Shopify
+from marketplace.fulfillment import MarketplaceFulfillmentQueue
 from shipping_partner.ats.ats import ATS
 from shipping_partner.shiprocket.shiprocket import Shiprocket
 from modules.shipping_notifications.shipping_notifications_service import (
@@ -90,6 +97,7 @@ from modules.ndr.ndr_service import NdrService
 from modules.ndr_history.ndr_history_service import NdrHistoryService
 
 from components.manifest import generate_manifest
+from modules.documents.renderer import render_manifest, use_canvas_renderer
 
 
 # utils
@@ -591,7 +599,7 @@ class ShipmentService:
 
         # return sorted(
         # make_dict, key=lambda x: meta_slugs.index(x["courier_slug"])
-        return make_dict
+        return PartnerHealth.prefer_healthy(make_dict, lambda x: x["courier_slug"])
 
         # )
 
@@ -650,7 +658,10 @@ class ShipmentService:
                     # )
                     # print(compiled_query, "*<compiled_query>*")
                     orders_data = (
-                        db.query(Order).filter(and_(*filter_conditions)).first()
+                        db.query(Order)
+                        .options(*OrderProfile.ROUTING)
+                        .filter(and_(*filter_conditions))
+                        .first()
                     )
                     if orders_data:
                         logger.info(
@@ -715,6 +726,7 @@ class ShipmentService:
                 if sorted_contracts_list != None and len(sorted_contracts_list) > 0:
                     order = (
                         db.query(Order)
+                        .options(*OrderProfile.ROUTING)
                         .filter(
                             Order.client_id == client_id, Order.order_id == order_id
                         )
@@ -794,6 +806,7 @@ class ShipmentService:
             db = get_db_session()
             order = (
                 db.query(Order)
+                .options(*OrderProfile.ROUTING)
                 .filter(Order.client_id == client_id, Order.order_id == order_id)
                 .first()
             )
@@ -814,38 +827,25 @@ class ShipmentService:
                     )
                 ]
                 print(meta_slugs, "**meta_slugs**")
-                contracts = (
-                    db.query(New_Company_To_Client_Rate)
-                    .join(New_Company_To_Client_Rate.shipping_partner)
-                    .filter(
-                        New_Company_To_Client_Rate.client_id == client_id,
-                        Shipping_Partner.slug.in_(meta_slugs),
-                        New_Company_To_Client_Rate.isActive == True,
-                    )
-                    .options(
-                        joinedload(
-                            New_Company_To_Client_Rate.client_contract
-                        ).joinedload(Client_Contract.shipping_partner)
-                    )
-                    .all()
-                )
-                # print(jsonable_encoder(contracts), "<<contracts>>")
+                contracts = RateCardCache.get(db, client_id).for_slugs(meta_slugs)
             else:
                 print("I AM SHIPING SERVICE I AM NOT CUSTOM")
-                contracts = (
-                    db.query(New_Company_To_Client_Rate)
-                    .filter(
-                        New_Company_To_Client_Rate.client_id == client_id,
-                        New_Company_To_Client_Rate.isActive == True,
-                    )
-                    .options(
-                        joinedload(
-                            New_Company_To_Client_Rate.client_contract
-                        ).joinedload(Client_Contract.shipping_partner),
-                        joinedload(New_Company_To_Client_Rate.shipping_partner),
-                    )
-                    .all()
-                )
+                contracts = RateCardCache.get(db, client_id).active()
+
+            # couriers that cannot serve this lane are never quoted or tried
+            pickup_pincode = (
+                db.query(Pickup_Location.pincode)
+                .filter(Pickup_Location.location_code == order.pickup_location_code)
+                .scalar()
+            )
+            contracts = PincodeServiceabilityIndex.filter_contracts(
+                db,
+                contracts,
+                pickup_pincode,
+                order.consignee_pincode,
+                order.payment_mode,
+                client_id,
+            )
 
             if contracts != None:
                 weight = round(
@@ -928,18 +928,17 @@ class ShipmentService:
                             }
                         )
                 if priority_type == "cheapest":
-                    return sorted(make_dict, key=lambda x: x["total_freight"])
+                    ranked = sorted(make_dict, key=lambda x: x["total_freight"])
                 else:
                     print("BEFORE SORTING", jsonable_encoder(make_dict))
-                    print(
-                        "AFTER SORTING",
-                        sorted(
-                            make_dict, key=lambda x: meta_slugs.index(x["courier_slug"])
-                        ),
-                    )
-                    return sorted(
+                    ranked = sorted(
                         make_dict, key=lambda x: meta_slugs.index(x["courier_slug"])
                     )
+                    print("AFTER SORTING", ranked)
+                # couriers with failing or open breakers are tried last
+                return PartnerHealth.prefer_healthy(
+                    ranked, lambda x: x["courier_slug"]
+                )
             else:
                 return []
         except DatabaseError as e:
@@ -1068,18 +1067,8 @@ class ShipmentService:
                 return "AWB already assigned"
             else:
                 print(contract_id, "<<<contract_id")
-                client_contract = (
-                    db.query(New_Company_To_Client_Rate)
-                    .filter(
-                        New_Company_To_Client_Rate.client_contract_id == contract_id
-                    )
-                    .options(
-                        # Eager load the related Company_Contract and its Shipping_Partner
-                        joinedload(
-                            New_Company_To_Client_Rate.client_contract
-                        ).joinedload(Client_Contract.shipping_partner)
-                    )
-                    .first()
+                client_contract = RateCardCache.get(db, client_id).by_contract_id(
+                    contract_id
                 )
                 shipping_partner_slug = (
                     client_contract.client_contract.shipping_partner.slug
@@ -1095,7 +1084,7 @@ class ShipmentService:
                     )
                     shipment_response = shipping_partner.dev_create_order(
                         order,
-                        client_contract.client_contract.credentials,
+                        dict(client_contract.client_contract.credentials),
                         client_contract.client_contract.shipping_partner,
                     )
 
@@ -1126,12 +1115,8 @@ class ShipmentService:
                 #     )
 
                 if shipment_response.status == True:
-                    if order.source == "shopify":
-                        Shopify.update_order_fulfillment_status(
-                            order_id=order.marketplace_order_id,
-                            awb_number=order.awb_number,
-                            store_id=order.store_id,
-                        )
+                    # push the fulfillment to the marketplace after commit, off the booking path
+                    MarketplaceFulfillmentQueue.enqueue_order(order)
                     order.booking_date = datetime.now(timezone.utc)
                     is_processing = shipment_response.data.get("processing", None)
                     order.forward_freight = freight
@@ -1198,7 +1183,14 @@ class ShipmentService:
     @staticmethod
     async def assign_awb(
         shipment_params: CreateShipmentModel,
+        claim: Optional[Callable[[Order], Awaitable[bool]]] = None,
     ):
+        """
+        `claim`, when given, is awaited once the courier has accepted the
+        booking and returns False if another courier already booked this
+        order, in which case this booking is cancelled at the courier and
+        nothing saved.
+        """
         db = None
         try:
             order_id = shipment_params.order_id
@@ -1207,9 +1199,9 @@ class ShipmentService:
             db: AsyncSession = get_db_session()
             # Fetch order
             result = await db.execute(
-                select(Order).where(
-                    Order.client_id == client_id, Order.order_id == order_id
-                )
+                select(Order)
+                .options(*OrderProfile.BOOKING)
+                .where(Order.client_id == client_id, Order.order_id == order_id)
             )
             order = result.scalars().first()
             if order.status != "new":
@@ -1223,40 +1215,39 @@ class ShipmentService:
                     message="AWB already assigned",
                 )
             # Fetch client contract
-            query = (
-                select(New_Company_To_Client_Rate)
-                .options(
-                    joinedload(New_Company_To_Client_Rate.client_contract).joinedload(
-                        Client_Contract.shipping_partner
-                    )
-                )
-                .where(
-                    New_Company_To_Client_Rate.id == courier_id,
-                    New_Company_To_Client_Rate.client_id == client_id,
-                    New_Company_To_Client_Rate.isActive == True,
-                )
-            )
-            # Debug SQL
-            compiled_query = query.compile(
-                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
-            )
-            print("\n=== Generated SQL Query ===\n")
-            print(compiled_query)
-            print("\n===========================\n")
-            result = await db.execute(query)
-            client_contract = result.scalars().first()
-            if client_contract is None:
+            client_contract = (await RateCardCache.aget(db, client_id)).by_id(courier_id)
+            if client_contract is None or not client_contract.isActive:
                 return GenericResponseModel(
                     status_code=http.HTTPStatus.NOT_FOUND,
                     message="Invalid Courier Id",
                 )
+            pickup_location = (
+                await db.execute(
+                    select(Pickup_Location).where(
+                        Pickup_Location.location_code == order.pickup_location_code
+                    )
+                )
+            ).scalar()
+            # fail fast instead of a courier round trip that can only be rejected
+            if not await PincodeServiceabilityIndex.afilter_contracts(
+                db,
+                [client_contract],
+                pickup_location.pincode if pickup_location else None,
+                order.consignee_pincode,
+                order.payment_mode,
+                client_id,
+            ):
+                return GenericResponseModel(
+                    status_code=http.HTTPStatus.BAD_REQUEST,
+                    message="Pincode not serviceable by the selected courier",
+                )
             # ➤ calculate freight (converted function must be async)
             freight = await ServiceabilityService.calculate_freight(
                 order_id=order_id,
                 min_chargeable_weight=0.5,
                 additional_weight_bracket=0.5,
                 contract_id=courier_id,
-                contract_data=ShipmentService.model_to_dict(client_contract),
+                contract_data=client_contract.to_dict(),
             )
             print(">>>>")
             print(jsonable_encoder(freight))
@@ -1275,25 +1266,42 @@ class ShipmentService:
             )
             # Development override
             shipping_partner_slug = "xpressbees"
-            shipping_partner = courier_service_mapping[shipping_partner_slug]
-            # external API call (sync → wrap in thread)
-            if shipping_partner_slug == "xpressbees":
-                shipment_response = await shipping_partner.dev_create_order(
-                    order,
-                    client_contract.client_contract.credentials,
-                    client_contract.client_contract.shipping_partner,
+            courier = CourierRegistry.get(shipping_partner_slug)
+            shipment_response = await courier.create_order(
+                Booking(
+                    order=order,
+                    credentials=dict(client_contract.client_contract.credentials),
+                    delivery_partner=client_contract.client_contract.shipping_partner,
+                    company_contract=client_contract.client_contract,
+                    pickup_location=pickup_location,
                 )
+            )
 
+            if (
+                shipment_response.status == True
+                and claim is not None
+                and not await claim(order)
+            ):
+                awb_number = shipment_response.data["awb_number"]
+                try:
+                    await courier.cancel(order, awb_number)
+                except Exception as e:
+                    logger.error(
+                        extra=context_user_data.get(),
+                        msg="Could not cancel superseded AWB {}: {}".format(
+                            awb_number, str(e)
+                        ),
+                    )
+                await db.rollback()
+                return GenericResponseModel(
+                    status_code=http.HTTPStatus.CONFLICT,
+                    message="Order was booked with another courier",
+                )
             if shipment_response.status == True:
                 order.booking_date = datetime.now(timezone.utc)
                 order.shipment_booking_error = None
-                if order.source == "shopify":
-                    await asyncio.to_thread(
-                        Shopify.update_order_fulfillment_status,
-                        order_id=order.marketplace_order_id,
-                        awb_number=order.awb_number,
-                        store_id=order.store_id,
-                    )
+                # push the fulfillment to the marketplace after commit, off the booking path
+                MarketplaceFulfillmentQueue.enqueue_order(order)
                 is_processing = shipment_response.data.get("processing")
                 # store freight
                 order.forward_freight = freight["freight"]
@@ -1301,6 +1309,8 @@ class ShipmentService:
                 order.forward_tax = freight["tax_amount"]
                 db.add(order)
                 if is_processing:
+                    # adapters' own commits are held on a hedged booking
+                    await db.commit()
                     return GenericResponseModel(
                         status_code=http.HTTPStatus.OK,
                         data={"is_processing": True},
@@ -1732,36 +1742,24 @@ class ShipmentService:
                 print(shipping_partner_slug)
 
                 # create the shipment based on the courier parnter selected
-                shipping_partner = courier_service_mapping[shipping_partner_slug]
-
-                # Use the create order function of the required shipping partner service
-                if shipping_partner_slug == "ekart":
+                courier = CourierRegistry.get(shipping_partner_slug)
 
-                    shipment_response = shipping_partner.create_order(
-                        order,
-                        client_contract.company_contract.credentials,
-                        client_contract.aggregator_courier,
-                        client_contract.company_contract,
-                    )
-
-                else:
-                    shipment_response = shipping_partner.create_order(
-                        order,
-                        client_contract.company_contract.credentials,
-                        client_contract.aggregator_courier,
+                shipment_response = courier.create_order_blocking(
+                    Booking(
+                        order=order,
+                        credentials=client_contract.company_contract.credentials,
+                        delivery_partner=client_contract.aggregator_courier,
+                        company_contract=client_contract.company_contract,
                     )
+                )
 
                 # if the shipment is created successfully, i.e, the awb is assigned, deduct from wallet
                 if shipment_response.status == True:
 
                     # ShippingNotificaitions.send_notification(order, "order_shipped")
 
-                    if order.source == "shopify":
-                        Shopify.update_order_fulfillment_status(
-                            order_id=order.marketplace_order_id,
-                            awb_number=order.awb_number,
-                            store_id=order.store_id,
-                        )
+                    # push the fulfillment to the marketplace after commit, off the booking path
+                    MarketplaceFulfillmentQueue.enqueue_order(order)
 
                     is_processing = shipment_response.data.get("processing", None)
                     posted_shipment_count += 1
@@ -1921,18 +1919,8 @@ class ShipmentService:
                         )
 
                 if courier_type == "manual":
-                    client_contract = (
-                        db.query(New_Company_To_Client_Rate)
-                        .filter(
-                            New_Company_To_Client_Rate.id == courier_id,
-                            New_Company_To_Client_Rate.client_id == client_id,
-                        )
-                        .options(
-                            joinedload(
-                                New_Company_To_Client_Rate.client_contract
-                            ).joinedload(Client_Contract.shipping_partner)
-                        )
-                        .first()
+                    client_contract = RateCardCache.get(db, client_id).by_id(
+                        courier_id
                     )
                     for order_id in order_ids:
                         order = (
@@ -1950,9 +1938,7 @@ class ShipmentService:
                             min_chargeable_weight=0.5,
                             additional_weight_bracket=0.5,
                             contract_id=courier_id,
-                            contract_data=ShipmentService.model_to_dict(
-                                client_contract
-                            ),
+                            contract_data=client_contract.to_dict(),
                             # contract_data=client_contract,
                         )
                         # total_freight = (
@@ -1990,7 +1976,7 @@ class ShipmentService:
                             )
                             shipment_response = shipping_partner.dev_create_order(
                                 order,
-                                client_contract.client_contract.credentials,
+                                dict(client_contract.client_contract.credentials),
                                 client_contract.client_contract.shipping_partner,
                             )
 
@@ -2017,12 +2003,8 @@ class ShipmentService:
                             order.shipment_booking_error = None
                             db.add(order)
                             db.flush()
-                            if order.source == "shopify":
-                                Shopify.update_order_fulfillment_status(
-                                    order_id=order.marketplace_order_id,
-                                    awb_number=order.awb_number,
-                                    store_id=order.store_id,
-                                )
+                            # push the fulfillment to the marketplace after commit, off the booking path
+                            MarketplaceFulfillmentQueue.enqueue_order(order)
                             is_processing = shipment_response.data.get(
                                 "processing", None
                             )
@@ -2416,7 +2398,12 @@ class ShipmentService:
 
             db = get_db_session()
 
-            order = db.query(Order).filter(Order.awb_number == awb_number).first()
+            order = (
+                db.query(Order)
+                .options(*OrderProfile.TRACKING)
+                .filter(Order.awb_number == awb_number)
+                .first()
+            )
 
             if not order:
                 return GenericResponseModel(
@@ -3406,7 +3393,7 @@ class ShipmentService:
                 select(Order)
                 .where(Order.order_id.in_(order_ids), Order.client_id == client_id)
                 .order_by(desc(Order.created_at))
-                .options(joinedload(Order.pickup_location))
+                .options(joinedload(Order.pickup_location), *OrderProfile.BOOKING)
             )
 
             # Execute async query
@@ -3414,8 +3401,24 @@ class ShipmentService:
             orders = result.scalars().all()
 
             # --- PDF Generation ---
-            manifest_html = generate_manifest(orders)
-            pdf_buffer = ShipmentService.convert_html_to_pdf(manifest_html)
+            pdf_buffer = None
+            if use_canvas_renderer():
+                pdf_buffer = render_manifest(orders)
+
+            # the HTML template is the fallback when the canvas renderer fails
+            if pdf_buffer is None:
+                manifest_html = generate_manifest(orders)
+                pdf_buffer = ShipmentService.convert_html_to_pdf(manifest_html)
+
+            if pdf_buffer is None:
+                logger.error(
+                    extra=context_user_data.get(),
+                    msg="Manifest PDF could not be rendered",
+                )
+                return GenericResponseModel(
+                    status_code=http.HTTPStatus.INTERNAL_SERVER_ERROR,
+                    message="Manifest generation failed",
+                )
 
             pdf_buffer.seek(0)
 
@@ -4427,6 +4430,9 @@ class ShipmentService:
             if current_status == None:
                 return
 
+            # what this status triggers, worked out once by the status engine
+            canonical = StatusEngine.of_order(current_status, order.sub_status)
+
             print(1)
 
             db = get_db_session()
@@ -4442,7 +4448,7 @@ class ShipmentService:
             # if a cod Order has just been delivered, add it to the cod remittance cycle
             # also move amount from provisional to realised cod
             if (
-                current_status == "delivered"
+                canonical.credits_cod
                 and order.payment_mode.lower() == "cod"
                 and order.cod_remittance_cycle_id == None
             ):
@@ -4505,7 +4511,7 @@ class ShipmentService:
                 # db.commit()
 
             # # if the order has just moved to RTO, add the COD money to the wallet, and apply RTO charges
-            if current_status == "RTO" and order.rto_freight == None:
+            if canonical.charges_rto and order.rto_freight == None:
 
                 contract = (
                     db.query(Company_To_Client_Contract)
@@ -4582,13 +4588,7 @@ class ShipmentService:
                 ndr_list = []
                 for act in order.tracking_info:
                     # ✅ FIX: Check for NDR status variations like in backfill
-                    if act.get("status", "").lower() in [
-                        "ndr",
-                        "non delivery report",
-                        "customer not available",
-                        "address issue",
-                        "refused by customer",
-                    ]:
+                    if StatusEngine.is_ndr_event(act.get("status")):
                         ndr_list.append(act)
                         print(
                             f"   📦 Found NDR event: {act.get('status')} at {act.get('datetime')}"
@@ -4621,13 +4621,7 @@ class ShipmentService:
 
                 # ✅ NEW: Handle reattempt to NDR again scenario (in post_tracking)
                 # If current status is NDR and there was a previous reattempt, increment attempt count
-                if order_current_status in [
-                    "ndr",
-                    "non delivery report",
-                    "customer not available",
-                    "address issue",
-                    "refused by customer",
-                ]:
+                if canonical.is_ndr:
                     try:
                         print(
                             f"   🔄 Checking for existing REATTEMPT NDR for order {order.order_id}"
@@ -4702,7 +4696,7 @@ class ShipmentService:
 
                 # 2. ✅ NEW: Handle status transitions for existing NDR records
                 # Check if current status is RTO/Delivered and update existing NDR
-                if order_current_status in ["delivered", "rto"]:
+                if canonical.closes_ndr:
                     try:
                         print(
                             f"   🎯 Processing {order_current_status.upper()} status for order {order.order_id}"
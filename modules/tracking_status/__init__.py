@@ -0,0 +1 @@
+from .status_engine import CanonicalStatus, StatusEngine, format_event_time, parse_event_time
@@ -0,0 +1,244 @@
+import importlib
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pytz
+
+from utils.datetime import parse_datetime
+
+
+IST = pytz.timezone("Asia/Kolkata")
+
+# integration package in shipping_partner/ -> the slugs orders carry for it
+PARTNER_SLUGS = {
+    "ats": ("ats", "amazon"),
+    "blitz": ("blitz",),
+    "bluedart": ("bluedart",),
+    "delhivery": ("delhivery",),
+    "dtdc": ("dtdc",),
+    "ecom": ("ecom", "ecom-express"),
+    "ekart": ("ekart",),
+    "fship": ("fship",),
+    "logistify": ("logistify",),
+    "shadowfax": ("shadowfax",),
+    "shiperfecto": ("shiperfecto",),
+    "shipmozo": ("shipmozo",),
+    "shiprocket": ("shiprocket", "shiprocket2"),
+    "xpressbees": ("xpressbees",),
+    "zippyy": ("zippyy",),
+}
+
+# tracking event statuses post_tracking raises NDRs for
+NDR_STATUSES = frozenset(
+    (
+        "ndr",
+        "non delivery report",
+        "customer not available",
+        "address issue",
+        "refused by customer",
+    )
+)
+
+# order statuses that settle an open NDR
+NDR_CLOSING_STATUSES = frozenset(("delivered", "rto"))
+
+
+@dataclass(frozen=True)
+class CanonicalStatus:
+    """
+    One (status, sub_status) pair of the platform with what post_tracking does
+    for it worked out once, so webhook and polling code need not re-derive it.
+    """
+
+    status: Optional[str]
+    sub_status: Optional[str]
+    # a COD order reaching it is credited to the COD remittance cycle
+    credits_cod: bool
+    # the RTO freight is charged and the COD charge refunded
+    charges_rto: bool
+    # as the order status, it re-opens a re-attempted NDR
+    is_ndr: bool
+    # as the order status, it settles an open NDR
+    closes_ndr: bool
+
+
+@dataclass(frozen=True)
+class NormalizedEvent:
+    status: Optional[CanonicalStatus]
+    at: Optional[datetime]
+    event: Any
+
+
+# one object per (status, sub_status), shared by every courier code mapping to it
+_interned: Dict[Tuple[Optional[str], Optional[str]], CanonicalStatus] = {}
+
+# (partner slug, scan type or None, courier code) -> status
+_table: Dict[Tuple[str, Optional[str], Any], CanonicalStatus] = {}
+
+
+def _classify(status: Optional[str], sub_status: Optional[str]) -> CanonicalStatus:
+    status_key = (status or "").lower()
+    return CanonicalStatus(
+        status=status,
+        sub_status=sub_status,
+        credits_cod=status == "delivered",
+        charges_rto=status == "RTO",
+        is_ndr=status_key in NDR_STATUSES,
+        closes_ndr=status_key in NDR_CLOSING_STATUSES,
+    )
+
+
+def _intern(status: Optional[str], sub_status: Optional[str]) -> CanonicalStatus:
+    key = (status, sub_status)
+    canonical = _interned.get(key)
+    if canonical is None:
+        canonical = _interned[key] = _classify(status, sub_status)
+    return canonical
+
+
+def _entries(mapping: dict):
+    """(scan type, code, mapping entry) of a flat or scan type keyed mapping."""
+
+    for key, value in mapping.items():
+        if not isinstance(value, dict):
+            # described but unmapped codes
+            continue
+        if "status" in value or "sub_status" in value:
+            yield None, key, value
+        else:
+            for code, entry in value.items():
+                if isinstance(entry, dict):
+                    yield key, code, entry
+
+
+def _compile():
+    for package, slugs in PARTNER_SLUGS.items():
+        mapping = importlib.import_module(
+            f"shipping_partner.{package}.status_mapping"
+        ).status_mapping
+
+        for scan_type, code, entry in _entries(mapping):
+            canonical = _intern(entry.get("status"), entry.get("sub_status"))
+            for slug in slugs:
+                _table[(slug, scan_type, code)] = canonical
+                # numeric codes arrive as text in some payloads
+                if code is not None and not isinstance(code, str):
+                    _table.setdefault((slug, scan_type, str(code)), canonical)
+
+
+_compile()
+
+
+_DMY = re.compile(
+    r"(\d{1,2})-(\d{1,2})-(\d{4}) (\d{1,2}):(\d{1,2})(?::(\d{1,2})(?:\.(\d{1,6}))?)?"
+)
+_YMD = re.compile(
+    r"(\d{4})-(\d{1,2})-(\d{1,2})[ T](\d{1,2}):(\d{1,2})(?::(\d{1,2})(?:\.(\d{1,6}))?)?"
+)
+_DMY_SPACED = re.compile(r"(\d{1,2}) (\d{1,2}) (\d{4}) (\d{1,2}):(\d{1,2}):(\d{1,2})")
+
+
+def parse_event_time(value: str) -> datetime:
+    """
+    parse_datetime() without its strptime-per-format retries: the formats it
+    takes, plus ISO 8601 timestamps with a "T" and fractional seconds, parsed
+    with one regex match. Gives the same IST datetime for the same input.
+    """
+
+    value = value.strip()
+
+    match = _DMY.fullmatch(value)
+    if match:
+        day, month, year, hour, minute, second, fraction = match.groups()
+    else:
+        match = _YMD.fullmatch(value)
+        if match:
+            year, month, day, hour, minute, second, fraction = match.groups()
+        else:
+            match = _DMY_SPACED.fullmatch(value)
+            if match is None:
+                return parse_datetime(value)
+            day, month, year, hour, minute, second = match.groups()
+            fraction = None
+
+    return datetime(
+        int(year),
+        int(month),
+        int(day),
+        int(hour),
+        int(minute),
+        int(second or 0),
+        int(fraction.ljust(6, "0")) if fraction else 0,
+    ).astimezone(IST)
+
+
+def format_event_time(value: str) -> str:
+    """A courier timestamp as tracking_info stores it."""
+
+    return parse_event_time(value).strftime("%d-%m-%Y %H:%M:%S")
+
+
+class StatusEngine:
+    """
+    Every courier's status_mapping.py compiled at import into one flat table
+    of (slug, scan type, courier code) -> CanonicalStatus:
+
+        status = StatusEngine.lookup("delhivery", "EOD-38", scan_type="DL")
+        order.status, order.sub_status = status.status, status.sub_status
+
+    Couriers whose mapping is not keyed by scan type are looked up without one.
+    """
+
+    @staticmethod
+    def lookup(partner: str, code, scan_type: Optional[str] = None) -> Optional[CanonicalStatus]:
+        return _table.get((partner, scan_type, code))
+
+    @staticmethod
+    def normalize(events: Iterable[dict]) -> List[NormalizedEvent]:
+        """
+        Statuses and timestamps of a batch of courier events, each a dict with
+        "partner", "code" and optionally "scan_type" and "datetime". Unknown
+        codes and unreadable timestamps come back as None.
+        """
+
+        normalized = []
+        for event in events:
+            at = event.get("datetime")
+            if isinstance(at, str):
+                try:
+                    at = parse_event_time(at)
+                except ValueError:
+                    at = None
+
+            normalized.append(
+                NormalizedEvent(
+                    status=_table.get(
+                        (event.get("partner"), event.get("scan_type"), event.get("code"))
+                    ),
+                    at=at,
+                    event=event,
+                )
+            )
+        return normalized
+
+    @staticmethod
+    def of_order(status: Optional[str], sub_status: Optional[str] = None) -> CanonicalStatus:
+        """
+        The CanonicalStatus of an order's current status, for post_tracking
+        to take its side effects from; statuses no courier maps to are
+        classified the same way but not kept.
+        """
+
+        return _interned.get((status, sub_status)) or _classify(status, sub_status)
+
+    @staticmethod
+    def is_ndr_event(tracking_status: Optional[str]) -> bool:
+        """Whether a tracking_info entry's status opens an NDR."""
+
+        return (tracking_status or "").lower() in NDR_STATUSES
+
+    @staticmethod
+    def statuses() -> List[CanonicalStatus]:
+        return list(_interned.values())
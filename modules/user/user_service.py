@@ -132,7 +132,9 @@ class UserService:
                     message="Invalid company or client Id",
                 )
 
-            hashed_password = PasswordHasher.get_password_hash(user_data.password)
+            hashed_password = await PasswordHasher.aget_password_hash(
+                user_data.password
+            )
             user_entity = user_data.model_dump()
             user_entity["client_id"] = client_id
             user_entity["company_id"] = company_id
@@ -262,11 +264,9 @@ class UserService:
                         message="User not found",
                     )
 
-                # Verify old password (blocking hash, run in thread)
-                valid_old = await asyncio.to_thread(
-                    PasswordHasher.verify_password,
-                    user_data.old_password,
-                    user.password_hash,
+                # Verify old password (blocking hash, run on the CPU pool)
+                valid_old = await PasswordHasher.averify_password(
+                    user_data.old_password, user.password_hash
                 )
                 if not valid_old:
                     logger.error(
@@ -288,9 +288,9 @@ class UserService:
                         status=False,
                     )
 
-                # Hash new password (blocking, run in thread)
-                hashed_password = await asyncio.to_thread(
-                    PasswordHasher.get_password_hash, user_data.new_password
+                # Hash new password (blocking, run on the CPU pool)
+                hashed_password = await PasswordHasher.aget_password_hash(
+                    user_data.new_password
                 )
                 user.password_hash = hashed_password
                 db.add(user)
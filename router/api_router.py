@@ -40,6 +40,8 @@ from modules.shipping_notifications.shipping_notifications_controller import (
 )
 
 from modules.channels.channel_controller import router as channel_router
+from modules.partner_health import partner_health_router
+from modules.awb_pool import awb_pool_router
 
 
 # settings
@@ -88,3 +90,5 @@ CommonRouter.include_router(ndr_router)
 CommonRouter.include_router(courier_allocation_router)
 CommonRouter.include_router(billing_invoice_router)
 CommonRouter.include_router(channel_router)
+CommonRouter.include_router(partner_health_router)
+CommonRouter.include_router(awb_pool_router)
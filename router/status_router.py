@@ -3,7 +3,7 @@ from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 from sqlalchemy import text
 
-from database.db import db_engine
+from database.db import db_engine, pool_metrics
 
 StatusRouter = APIRouter(tags=["health_checks"])
 
@@ -28,3 +28,12 @@ async def deep_status_check():
             )
 
     return JSONResponse(status_code=http.HTTPStatus.OK, content={"db": is_db_ok})
+
+
+# connection pool usage and checkout wait times
+@StatusRouter.get("/poolstatus", status_code=http.HTTPStatus.OK)
+async def pool_status_check():
+    return JSONResponse(
+        status_code=http.HTTPStatus.OK,
+        content=pool_metrics.snapshot(db_engine.pool),
+    )
@@ -0,0 +1,89 @@
+from typing import Dict, List, Optional, Sequence, Type
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import inspect, select
+
+
+class Projection:
+    """
+    The columns a response schema actually declares, and the fastest way to
+    turn the selected rows into that schema.
+
+    Instead of loading whole ORM rows (JSON blobs included), validating them
+    into the DB model and then again into the response model, the query
+    selects only `columns`, and `build` validates the plain row dicts into
+    the response schema once.
+
+        ORDER_LIST = Projection(
+            Order_Response_Model,
+            Order,
+            nested={"pickup_location": Projection(PickupLocationResponseModel, Pickup_Location)},
+        )
+        rows = (await db.execute(ORDER_LIST.select().where(...))).all()
+        orders = ORDER_LIST.build(rows)
+    """
+
+    def __init__(
+        self,
+        schema: Type[BaseModel],
+        entity,
+        nested: Optional[Dict[str, "Projection"]] = None,
+        exclude: Sequence[str] = (),
+    ):
+        self.schema = schema
+        self.entity = entity
+        self.nested = nested or {}
+
+        column_keys = set(inspect(entity).columns.keys())
+        self.fields = tuple(
+            name
+            for name in schema.model_fields
+            if name in column_keys and name not in self.nested and name not in exclude
+        )
+
+        self.adapter = TypeAdapter(List[schema])
+
+    def _labelled_columns(self, prefix: str = ""):
+        columns = [
+            getattr(self.entity, name).label(f"{prefix}{name}") for name in self.fields
+        ]
+        for relation, projection in self.nested.items():
+            columns.extend(projection._labelled_columns(f"{prefix}{relation}__"))
+        return columns
+
+    @property
+    def columns(self):
+        return self._labelled_columns()
+
+    def joins(self, statement):
+        # nested projections hang off relationships of the root entity
+        for relation in self.nested:
+            statement = statement.outerjoin(getattr(self.entity, relation))
+        return statement
+
+    def select(self, *extra_columns):
+        return self.joins(select(*self.columns, *extra_columns))
+
+    def to_dict(self, mapping, prefix: str = "") -> Optional[dict]:
+        data = {name: mapping[f"{prefix}{name}"] for name in self.fields}
+
+        for relation, projection in self.nested.items():
+            data[relation] = projection.to_dict(mapping, f"{prefix}{relation}__")
+
+        # an outer join that matched nothing
+        if prefix and all(value is None for value in data.values()):
+            return None
+
+        return data
+
+    def dicts(self, rows) -> List[dict]:
+        return [self.to_dict(row._mapping) for row in rows]
+
+    def build(self, rows_or_dicts) -> List[BaseModel]:
+        """Validate rows (or dicts from `dicts`, after adding computed keys) once."""
+
+        items = [
+            item if isinstance(item, dict) else self.to_dict(item._mapping)
+            for item in rows_or_dicts
+        ]
+        return self.adapter.validate_python(items)
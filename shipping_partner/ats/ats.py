@@ -19,6 +19,7 @@ import re
 
 # models
 from models import Pickup_Location, Order, Pincode_Serviceability, Shipping_Label_Files
+from models.order_profiles import OrderProfile
 
 # schema
 from schema.base import GenericResponseModel
@@ -29,6 +30,7 @@ from modules.shipping_partner.shipping_partner_schema import AggregatorCourierMo
 from .status_mapping import status_mapping
 
 # service
+from modules.partner_health import COURIER_HTTP_TIMEOUT_SECONDS
 from modules.wallet.wallet_service import WalletService
 
 from utils.datetime import parse_datetime
@@ -93,7 +95,9 @@ class ATS:
             }
             print(payload, "<<payload>>")
             headers = {"Content-Type": "application/x-www-form-urlencoded"}
-            response = requests.post(url, headers=headers, data=payload)
+            response = requests.post(
+                url, headers=headers, data=payload, timeout=COURIER_HTTP_TIMEOUT_SECONDS
+            )
 
             token_data = response.json()
             access_token = token_data.get("access_token")
@@ -125,7 +129,9 @@ class ATS:
 
             headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
-            response = requests.post(url, headers=headers, data=payload)
+            response = requests.post(
+                url, headers=headers, data=payload, timeout=COURIER_HTTP_TIMEOUT_SECONDS
+            )
             response.raise_for_status()
 
             token_data = response.json()
@@ -411,7 +417,12 @@ class ATS:
 
                 url = "https://sellingpartnerapi-eu.amazon.com/shipping/v2/shipments"
 
-                response = requests.post(url, headers=headers, json=payload)
+                response = requests.post(
+                    url,
+                    headers=headers,
+                    json=payload,
+                    timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+                )
 
                 print(response.text)
                 response = response.json()
@@ -528,7 +539,12 @@ class ATS:
         }
 
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = requests.get(
+                url,
+                headers=headers,
+                params=params,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
             response.raise_for_status()
             # Raise an HTTPError for bad responses
 
@@ -724,7 +740,12 @@ class ATS:
                     message="Invalid AWB",
                 )
 
-            order = db.query(Order).filter(Order.awb_number == awb_number).first()
+            order = (
+                db.query(Order)
+                .options(*OrderProfile.TRACKING)
+                .filter(Order.awb_number == awb_number)
+                .first()
+            )
 
             if order is None:
                 return GenericResponseModel(
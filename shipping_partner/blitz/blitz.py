@@ -19,6 +19,7 @@ import re
 
 # models
 from models import Pickup_Location, Order, Pincode_Serviceability, Shipping_Label_Files
+from models.order_profiles import OrderProfile
 
 # schema
 from schema.base import GenericResponseModel
@@ -29,6 +30,7 @@ from modules.shipping_partner.shipping_partner_schema import AggregatorCourierMo
 from .status_mapping import status_mapping
 
 # service
+from modules.partner_health import COURIER_HTTP_TIMEOUT_SECONDS
 from modules.wallet.wallet_service import WalletService
 
 from utils.datetime import parse_datetime
@@ -97,7 +99,9 @@ class Blitz:
 
             headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
-            response = requests.post(url, headers=headers, data=payload)
+            response = requests.post(
+                url, headers=headers, data=payload, timeout=COURIER_HTTP_TIMEOUT_SECONDS
+            )
             response.raise_for_status()
 
             token_data = response.json()
@@ -382,7 +386,12 @@ class Blitz:
 
                 url = "https://sellingpartnerapi-eu.amazon.com/shipping/v2/shipments"
 
-                response = requests.post(url, headers=headers, json=payload)
+                response = requests.post(
+                    url,
+                    headers=headers,
+                    json=payload,
+                    timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+                )
 
                 print(response.text)
                 response = response.json()
@@ -499,7 +508,12 @@ class Blitz:
         }
 
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = requests.get(
+                url,
+                headers=headers,
+                params=params,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
             response.raise_for_status()
             # Raise an HTTPError for bad responses
 
@@ -701,7 +715,12 @@ class Blitz:
                         message="Invalid AWB",
                     )
 
-                order = db.query(Order).filter(Order.awb_number == awb_number).first()
+                order = (
+                    db.query(Order)
+                    .options(*OrderProfile.TRACKING)
+                    .filter(Order.awb_number == awb_number)
+                    .first()
+                )
 
                 if order is None:
                     return GenericResponseModel(
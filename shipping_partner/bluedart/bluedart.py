@@ -23,6 +23,7 @@ from models import (
     Company_Contract,
     Pincode_Serviceability,
 )
+from models.order_profiles import OrderProfile
 
 # schema
 from schema.base import GenericResponseModel
@@ -823,7 +824,12 @@ class Bluedart:
                     message="Invalid AWB",
                 )
 
-            order = db.query(Order).filter(Order.awb_number == awb_number).first()
+            order = (
+                db.query(Order)
+                .options(*OrderProfile.TRACKING)
+                .filter(Order.awb_number == awb_number)
+                .first()
+            )
 
             if order is None:
                 return GenericResponseModel(
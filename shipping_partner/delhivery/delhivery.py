@@ -11,9 +11,11 @@ from context_manager.context import context_user_data, get_db_session
 import re
 
 from logger import logger
+from modules.partner_health import COURIER_HTTP_TIMEOUT_SECONDS
 
 # models
 from models import Pickup_Location, Order, Pincode_Serviceability
+from models.order_profiles import OrderProfile
 
 # schema
 from schema.base import GenericResponseModel
@@ -21,9 +23,7 @@ from modules.orders.order_schema import Order_Model
 from modules.shipping_partner.shipping_partner_schema import AggregatorCourierModel
 
 # data
-from .status_mapping import status_mapping
-
-from utils.datetime import parse_datetime
+from modules.tracking_status import StatusEngine, format_event_time
 
 # utils
 from utils.datetime import convert_ist_to_utc
@@ -118,7 +118,13 @@ class Delhivery:
                 headers,
             )
             print(4)
-            response = requests.request("POST", api_url, headers=headers, data=body)
+            response = requests.request(
+                "POST",
+                api_url,
+                headers=headers,
+                data=body,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
 
             print(response)
 
@@ -369,7 +375,13 @@ class Delhivery:
                 "Authorization": "Token " + credentials["token"],
             }
 
-            response = requests.request("POST", api_url, headers=headers, data=body)
+            response = requests.request(
+                "POST",
+                api_url,
+                headers=headers,
+                data=body,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
 
             try:
                 response_data = response.json()
@@ -574,7 +586,13 @@ class Delhivery:
                 "Authorization": "Token " + credentials["token"],
             }
             print("headers", headers)
-            response = requests.request("POST", api_url, headers=headers, data=body)
+            response = requests.request(
+                "POST",
+                api_url,
+                headers=headers,
+                data=body,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
             print(3)
             try:
                 response_data = response.json()
@@ -708,7 +726,13 @@ class Delhivery:
 
             logger.info("Delhivery cancel_shipment api payload %s", body)
 
-            response = requests.request("POST", api_url, headers=headers, data=body)
+            response = requests.request(
+                "POST",
+                api_url,
+                headers=headers,
+                data=body,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
             print(2)
 
             print(headers)
@@ -783,9 +807,7 @@ class Delhivery:
             # logger.info("Api Ready to post %s", api_url)
 
             response = requests.request(
-                "GET",
-                api_url,
-                headers=headers,
+                "GET", api_url, headers=headers, timeout=COURIER_HTTP_TIMEOUT_SECONDS
             )
 
             try:
@@ -835,18 +857,13 @@ class Delhivery:
             old_sub_status = order.sub_status
             # update the order status, and awb if different
 
-            order.status = (
-                status_mapping[tracking_data[0]["Shipment"]["Status"]["StatusType"]][
-                    tracking_data[0]["Shipment"]["Status"]["StatusCode"]
-                ].get("status", None)
-                or old_status
-            )
-            order.sub_status = (
-                status_mapping[tracking_data[0]["Shipment"]["Status"]["StatusType"]][
-                    tracking_data[0]["Shipment"]["Status"]["StatusCode"]
-                ].get("sub_status", None)
-                or old_sub_status
+            new_status = StatusEngine.lookup(
+                "delhivery",
+                tracking_data[0]["Shipment"]["Status"]["StatusCode"],
+                tracking_data[0]["Shipment"]["Status"]["StatusType"],
             )
+            order.status = (new_status and new_status.status) or old_status
+            order.sub_status = (new_status and new_status.sub_status) or old_sub_status
 
             order.courier_status = courier_status
 
@@ -878,24 +895,29 @@ class Delhivery:
             # update the tracking info
             if activites:
                 new_tracking_info = []
-                for activity in activites:
+                scans = [activity.get("ScanDetail") or {} for activity in activites]
+                events = StatusEngine.normalize(
+                    {
+                        "partner": "delhivery",
+                        "scan_type": scan.get("ScanType"),
+                        "code": scan.get("StatusCode"),
+                        "datetime": scan.get("StatusDateTime"),
+                    }
+                    for scan in scans
+                )
+                for scan, event in zip(scans, events):
                     try:
+                        if event.status is None or event.at is None:
+                            raise ValueError(
+                                f"unmapped scan {scan.get('ScanType')}/{scan.get('StatusCode')}"
+                            )
                         new_tracking_info.append(
                             {
-                                "status": status_mapping[
-                                    activity["ScanDetail"]["ScanType"]
-                                ][activity["ScanDetail"]["StatusCode"]].get(
-                                    "sub_status", ""
-                                )
-                                or "",
-                                "description": activity["ScanDetail"]["Instructions"],
-                                "subinfo": activity["ScanDetail"]["Scan"],
-                                "datetime": parse_datetime(
-                                    Delhivery.date_formatter(
-                                        activity["ScanDetail"]["StatusDateTime"]
-                                    )
-                                ).strftime("%d-%m-%Y %H:%M:%S"),
-                                "location": activity["ScanDetail"]["ScannedLocation"],
+                                "status": event.status.sub_status or "",
+                                "description": scan["Instructions"],
+                                "subinfo": scan["Scan"],
+                                "datetime": event.at.strftime("%d-%m-%Y %H:%M:%S"),
+                                "location": scan["ScannedLocation"],
                             }
                         )
                     except Exception as e:
@@ -955,7 +977,12 @@ class Delhivery:
                     message="Invalid AWB",
                 )
 
-            order = db.query(Order).filter(Order.awb_number == awb_number).first()
+            order = (
+                db.query(Order)
+                .options(*OrderProfile.TRACKING)
+                .filter(Order.awb_number == awb_number)
+                .first()
+            )
 
             if order is None:
                 return GenericResponseModel(
@@ -967,17 +994,17 @@ class Delhivery:
             scan_type = payload["Status"]["StatusType"]
             courier_status = payload.get("NSLCode")
 
-            new_status = status_mapping[scan_type][courier_status].get("status", None)
+            new_status = StatusEngine.lookup("delhivery", courier_status, scan_type)
 
-            if not new_status:
+            if new_status is None or not new_status.status:
                 return GenericResponseModel(
                     status_code=http.HTTPStatus.OK,
                     status=False,
                     message="Invalid Status",
                 )
 
-            order.status = status_mapping[scan_type][courier_status]["status"]
-            order.sub_status = status_mapping[scan_type][courier_status]["sub_status"]
+            order.status = new_status.status
+            order.sub_status = new_status.sub_status
 
             order.courier_status = courier_status
 
@@ -985,9 +1012,7 @@ class Delhivery:
                 "status": order.sub_status,
                 "description": payload["Status"]["Instructions"],
                 "subinfo": payload["Status"]["Status"],
-                "datetime": parse_datetime(
-                    Delhivery.date_formatter(payload["Status"]["StatusDateTime"])
-                ).strftime("%d-%m-%Y %H:%M:%S"),
+                "datetime": format_event_time(payload["Status"]["StatusDateTime"]),
                 "location": payload["Status"]["StatusLocation"],
             }
 
@@ -1025,6 +1050,65 @@ class Delhivery:
             if db:
                 db.close()
 
+    @staticmethod
+    def ndr_token(courier_partner: str) -> str:
+        if courier_partner == "delhivery-air":
+            return "d21f3e7f152d6d1a1e9f7655b5d4a1bc38c393e1"
+
+        if courier_partner in (
+            "delhivery 5kg",
+            "delhivery 10kg",
+            "delhivery 15kg",
+            "delhivery 20kg",
+        ):
+            return "0e203da7ec3308920a659cb1fbf5d156eb9603b0"
+
+        return Delhivery.Token
+
+    @staticmethod
+    def bulk_ndr_action(courier_partner: str, awb_numbers: List[str]) -> Dict[str, str]:
+        """
+        Re-attempt many waybills of one Delhivery account with a single call to
+        the NDR update API. Returns an error message for each waybill that was
+        not accepted, so an empty dict means all of them went through.
+        """
+
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "Authorization": "token " + Delhivery.ndr_token(courier_partner),
+        }
+        body = {"data": [{"waybill": awb, "act": "RE-ATTEMPT"} for awb in awb_numbers]}
+
+        logger.info("Delhivery bulk ndr_action for %s waybills", len(awb_numbers))
+
+        try:
+            response = requests.post(
+                Delhivery.ndr_url, headers=headers, json=body, timeout=30
+            )
+            response_data = response.json()
+
+        except (requests.RequestException, ValueError) as e:
+            logger.error("Delhivery bulk ndr_action failed: %s", e)
+            return {awb: "Courier did not respond, please try again" for awb in awb_numbers}
+
+        if not isinstance(response_data, dict):
+            response_data = {}
+
+        if (
+            response.status_code != 200
+            or response_data.get("error")
+            or response_data.get("status") == "Failure"
+        ):
+            message = str(
+                response_data.get("error")
+                or response_data.get("remark")
+                or "Re-attempt rejected by courier"
+            )
+            return {awb: message for awb in awb_numbers}
+
+        return {}
+
     @staticmethod
     def ndr_action(
         order: Order_Model,
@@ -1033,23 +1117,7 @@ class Delhivery:
     ):
         try:
 
-            courier = order.courier_partner
-
-            token = ""
-
-            if courier == "delhivery-air":
-                token = "d21f3e7f152d6d1a1e9f7655b5d4a1bc38c393e1"
-
-            elif (
-                courier == "delhivery 5kg"
-                or courier == "delhivery 10kg"
-                or courier == "delhivery 15kg"
-                or courier == "delhivery 20kg"
-            ):
-                token = "0e203da7ec3308920a659cb1fbf5d156eb9603b0"
-
-            else:
-                token = Delhivery.Token
+            token = Delhivery.ndr_token(order.courier_partner)
 
             print(0)
             headers = {
@@ -1064,7 +1132,13 @@ class Delhivery:
 
             logger.info("Delhivery ndr_attempt api payload %s", body)
 
-            response = requests.request("POST", api_url, headers=headers, data=body)
+            response = requests.request(
+                "POST",
+                api_url,
+                headers=headers,
+                data=body,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
             print(2)
 
             print(headers)
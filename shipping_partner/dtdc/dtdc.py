@@ -28,6 +28,7 @@ from models import (
     Aggregator_Courier,
     Pincode_Serviceability,
 )
+from models.order_profiles import OrderProfile
 
 # schema
 from schema.base import GenericResponseModel
@@ -55,6 +56,7 @@ from .status_mapping import status_mapping
 
 
 # service
+from modules.partner_health import COURIER_HTTP_TIMEOUT_SECONDS
 from modules.wallet.wallet_service import WalletService
 
 from utils.datetime import parse_datetime
@@ -169,7 +171,9 @@ class Dtdc:
                 + credentials["password"]
             )
             # print(url, "<url>")
-            response = requests.request("GET", url)
+            response = requests.request(
+                "GET", url, timeout=COURIER_HTTP_TIMEOUT_SECONDS
+            )
             #  Debug prints
             print(f"Status Code: {response.status_code}")
             print(f"Response Text: {response.text}")
@@ -238,7 +242,9 @@ class Dtdc:
                 + "&password="
                 + Dtdc.Dtdc_password
             )
-            response = requests.request("GET", url)
+            response = requests.request(
+                "GET", url, timeout=COURIER_HTTP_TIMEOUT_SECONDS
+            )
             response.raise_for_status()
             return response.text
 
@@ -808,7 +814,13 @@ class Dtdc:
                 {"AWBNo": [awb_number], "customerCode": "GL9132"}
             )  # credentials["customer_code"]
 
-            response = requests.request("POST", api_url, headers=headers, data=body)
+            response = requests.request(
+                "POST",
+                api_url,
+                headers=headers,
+                data=body,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
 
             print(2)
 
@@ -884,7 +896,11 @@ class Dtdc:
                 logger.info("DTDC track_shipment payload ready to post: %s", payload)
 
                 response = requests.request(
-                    "POST", api_url, headers=headers, data=payload
+                    "POST",
+                    api_url,
+                    headers=headers,
+                    data=payload,
+                    timeout=COURIER_HTTP_TIMEOUT_SECONDS,
                 )
 
                 try:
@@ -1043,7 +1059,10 @@ class Dtdc:
             db = get_db_session()
 
             order = (
-                db.query(Order).filter(Order.awb_number == updated_awb_number).first()
+                db.query(Order)
+                .options(*OrderProfile.TRACKING)
+                .filter(Order.awb_number == updated_awb_number)
+                .first()
             )
 
             if order is None:
@@ -29,7 +29,12 @@ from modules.shipping_partner.shipping_partner_schema import AggregatorCourierMo
 from .status_mapping import status_mapping
 
 # service
+from modules.partner_health import COURIER_HTTP_TIMEOUT_SECONDS
 from modules.wallet.wallet_service import WalletService
+from modules.awb_pool import AwbPool
+
+
+ECOM_AGGREGATOR = "ecom-express"
 
 
 def convert_ist_to_utc(ist_datetime_str):
@@ -146,7 +151,9 @@ class Ecom:
                 "type": "PPD",
             }
             print("1")
-            response = requests.post(url, headers=headers, json=payload)
+            response = requests.post(
+                url, headers=headers, json=payload, timeout=COURIER_HTTP_TIMEOUT_SECONDS
+            )
             print("2")
             print(response)
             if response.status_code == 200:
@@ -213,53 +220,61 @@ class Ecom:
             )
 
     @staticmethod
-    def generate_awb(credentials: Dict[str, str], order: Order_Model):
+    def fetch_awbs(credentials: Dict[str, str], payment_type: str, count: int):
+        """Waybills of the account's series, raises if Ecom does not issue them."""
 
-        try:
+        api_url = "https://api.ecomexpress.in/apiv2/fetch_awb/"
 
-            api_url = "https://api.ecomexpress.in/apiv2/fetch_awb/"
+        data = {
+            "username": credentials["username"],
+            "password": credentials["password"],
+            "count": count,
+            "type": payment_type,
+        }
 
-            data = {
-                "username": credentials["username"],
-                "password": credentials["password"],
-                "count": 1,
-                "type": "PPD" if order.payment_mode.lower() == "prepaid" else "COD",
-            }
+        response = requests.post(api_url, data=data, timeout=30)
+        response.raise_for_status()
+        response = response.json()
 
-            try:
-                response = requests.post(api_url, data=data)
-                # print("lalalalalalalala", response.text)
-                response.raise_for_status()  # Raise an exception for HTTP errors
-                response = response.json()
+        if response.get("success") != "yes":
+            raise ValueError(f"fetch_awb failed: {response}")
 
-            except requests.exceptions.RequestException as e:
-                print(f"Error while fetching AWB: {e}")
-                return GenericResponseModel(
-                    status_code=http.HTTPStatus.BAD_REQUEST,
-                    status=False,
-                    message="There was some issue in Generating AWB, please try again",
-                )
+        return [str(awb) for awb in response["awb"]]
 
-            # if location creation failed
-            if response["success"] != "yes":
-                return GenericResponseModel(
-                    status_code=http.HTTPStatus.BAD_REQUEST,
-                    status=False,
-                    message="There was some issue in Generating AWB, please try again",
-                )
+    @staticmethod
+    def generate_awb(credentials: Dict[str, str], order: Order_Model):
 
-            # if successfully created location
+        try:
 
-            if response["success"] == "yes":
+            payment_type = "PPD" if order.payment_mode.lower() == "prepaid" else "COD"
 
-                awb = response["awb"][0]
+            # pre-fetched by the AWB pool, saves a round trip per booking
+            awb = AwbPool.claim(
+                ECOM_AGGREGATOR,
+                credentials,
+                payment_type,
+                Ecom.fetch_awbs,
+                order_id=getattr(order, "id", None),
+            )
 
-                return GenericResponseModel(
-                    status_code=http.HTTPStatus.OK,
-                    status=True,
-                    data=awb,
-                    message="Awb generated",
-                )
+            if awb is None:
+                try:
+                    awb = Ecom.fetch_awbs(credentials, payment_type, 1)[0]
+
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    print(f"Error while fetching AWB: {e}")
+                    return GenericResponseModel(
+                        status_code=http.HTTPStatus.BAD_REQUEST,
+                        status=False,
+                        message="There was some issue in Generating AWB, please try again",
+                    )
+
+            return GenericResponseModel(
+                status_code=http.HTTPStatus.OK,
+                status=True,
+                data=awb,
+                message="Awb generated",
+            )
 
         except DatabaseError as e:
             # Log database error
@@ -431,6 +446,10 @@ class Ecom:
 
             # If order creation failed at Shiperfecto, return message
             if response["success"] != True:
+                # the waybill was not booked, it can go to the next order
+                # unless the waybill itself is what Ecom rejected
+                if "awb" not in str(response.get("reason", "")).lower():
+                    AwbPool.release(ECOM_AGGREGATOR, awb)
                 return GenericResponseModel(
                     status_code=http.HTTPStatus.BAD_REQUEST,
                     message=(
@@ -21,6 +21,7 @@ from models import (
     Company_Contract,
     Pincode_Serviceability,
 )
+from models.order_profiles import OrderProfile
 
 # schema
 from schema.base import GenericResponseModel
@@ -32,6 +33,7 @@ from modules.company_contract.company_contract_schema import CompanyContractMode
 from .status_mapping import status_mapping
 
 # service
+from modules.partner_health import COURIER_HTTP_TIMEOUT_SECONDS
 from modules.wallet.wallet_service import WalletService
 
 
@@ -87,7 +89,13 @@ class Ekart:
                 "Content-Type": "application/json",
             }
 
-            response = requests.post(api_url, json=body, headers=headers, verify=False)
+            response = requests.post(
+                api_url,
+                json=body,
+                headers=headers,
+                verify=False,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
 
             response_data = response.json()
 
@@ -166,7 +174,12 @@ class Ekart:
                 "HTTP_X_MERCHANT_CODE": credentials.get("client_code"),
             }
 
-            response = requests.post(api_url, headers=headers, verify=False)
+            response = requests.post(
+                api_url,
+                headers=headers,
+                verify=False,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
             data = response.json()  # convert response to dict
             print(data, "<<data>>")
             if "unauthorised" in data:
@@ -249,7 +262,12 @@ class Ekart:
                 "HTTP_X_MERCHANT_CODE": credentials["client_code"],
             }
 
-            response = requests.post(api_url, headers=headers, verify=False)
+            response = requests.post(
+                api_url,
+                headers=headers,
+                verify=False,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
             response = response.json()
 
             if response.get("failed", ""):
@@ -1268,7 +1286,12 @@ class Ekart:
                     message="Invalid AWB",
                 )
 
-            order = db.query(Order).filter(Order.awb_number == awb_number).first()
+            order = (
+                db.query(Order)
+                .options(*OrderProfile.TRACKING)
+                .filter(Order.awb_number == awb_number)
+                .first()
+            )
 
             if order is None:
                 return GenericResponseModel(
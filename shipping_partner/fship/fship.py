@@ -7,6 +7,7 @@ from datetime import datetime
 from context_manager.context import context_user_data, get_db_session
 
 from logger import logger
+from modules.partner_health import COURIER_HTTP_TIMEOUT_SECONDS
 
 # models
 from models import Pickup_Location, Order
@@ -58,7 +59,13 @@ class Fship:
                 "Content-Type": "application/json",
             }
 
-            response = requests.post(api_url, json=body, headers=headers, verify=False)
+            response = requests.post(
+                api_url,
+                json=body,
+                headers=headers,
+                verify=False,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
 
             response_data = response.json()
 
@@ -24,6 +24,7 @@ from .status_mapping import status_mapping
 from .delivery_partner_mapping import courier_mapping
 
 # service
+from modules.partner_health import COURIER_HTTP_TIMEOUT_SECONDS
 from modules.wallet.wallet_service import WalletService
 
 
@@ -81,7 +82,13 @@ class Logistify:
                 "Content-Type": "application/json",
             }
 
-            response = requests.post(api_url, json=body, headers=headers, verify=False)
+            response = requests.post(
+                api_url,
+                json=body,
+                headers=headers,
+                verify=False,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
 
             response_data = response.json()
 
@@ -24,6 +24,7 @@ import re
 
 # models
 from models import Pickup_Location, Order
+from models.order_profiles import OrderProfile
 
 # schema
 from schema.base import GenericResponseModel
@@ -672,7 +673,12 @@ class Shadowfax:
                     message="Invalid AWB",
                 )
 
-            order = db.query(Order).filter(Order.awb_number == awb_number).first()
+            order = (
+                db.query(Order)
+                .options(*OrderProfile.TRACKING)
+                .filter(Order.awb_number == awb_number)
+                .first()
+            )
 
             if order is None:
                 return GenericResponseModel(
@@ -16,6 +16,7 @@ from requests.exceptions import HTTPError, ConnectionError, Timeout, RequestExce
 
 # models
 from models import Pickup_Location, Order
+from models.order_profiles import OrderProfile
 
 # schema
 from schema.base import GenericResponseModel
@@ -26,6 +27,7 @@ from modules.shipping_partner.shipping_partner_schema import AggregatorCourierMo
 from .status_mapping import status_mapping
 
 # service
+from modules.partner_health import COURIER_HTTP_TIMEOUT_SECONDS
 from modules.wallet.wallet_service import WalletService
 
 
@@ -171,7 +173,13 @@ class Shiperfecto:
                 "Content-Type": "application/json",
             }
 
-            response = requests.post(api_url, json=body, headers=headers, verify=False)
+            response = requests.post(
+                api_url,
+                json=body,
+                headers=headers,
+                verify=False,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
 
             response_data = response.json()
 
@@ -675,7 +683,12 @@ class Shiperfecto:
                     message="Invalid AWB",
                 )
 
-            order = db.query(Order).filter(Order.awb_number == awb_number).first()
+            order = (
+                db.query(Order)
+                .options(*OrderProfile.TRACKING)
+                .filter(Order.awb_number == awb_number)
+                .first()
+            )
 
             if order is None:
                 return GenericResponseModel(
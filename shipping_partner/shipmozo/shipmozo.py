@@ -15,6 +15,7 @@ from logger import logger
 
 # models
 from models import Pickup_Location, Order
+from models.order_profiles import OrderProfile
 
 # schema
 from schema.base import GenericResponseModel
@@ -26,6 +27,7 @@ from .status_mapping import status_mapping
 from .delivery_partner_mapping import courier_mapping
 
 # service
+from modules.partner_health import COURIER_HTTP_TIMEOUT_SECONDS
 from modules.wallet.wallet_service import WalletService
 
 
@@ -86,7 +88,13 @@ class Shipmozo:
                 "private-key": credentials["private_key"],
             }
 
-            response = requests.post(api_url, json=body, headers=headers, verify=False)
+            response = requests.post(
+                api_url,
+                json=body,
+                headers=headers,
+                verify=False,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
 
             response_data = response.json()
 
@@ -631,7 +639,12 @@ class Shipmozo:
                     message="Invalid AWB",
                 )
 
-            order = db.query(Order).filter(Order.awb_number == awb_number).first()
+            order = (
+                db.query(Order)
+                .options(*OrderProfile.TRACKING)
+                .filter(Order.awb_number == awb_number)
+                .first()
+            )
 
             if order is None:
                 return GenericResponseModel(
@@ -23,6 +23,7 @@ import re
 
 # models
 from models import Pickup_Location, Order, Courier_Routing_Code
+from models.order_profiles import OrderProfile
 from requests.exceptions import HTTPError, ConnectionError, Timeout, RequestException
 
 # schema
@@ -34,6 +35,7 @@ from modules.shipping_partner.shipping_partner_schema import AggregatorCourierMo
 from .status_mapping import status_mapping
 
 # service
+from modules.partner_health import COURIER_HTTP_TIMEOUT_SECONDS
 from modules.wallet.wallet_service import WalletService
 
 
@@ -64,7 +66,13 @@ class Shiprocket:
                 "Content-Type": "application/json",
             }
 
-            response = requests.post(api_url, json=body, headers=headers, verify=False)
+            response = requests.post(
+                api_url,
+                json=body,
+                headers=headers,
+                verify=False,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
             data = response.json()  # convert response to dict
             print(response.text, "<<response>>")
             #  Debug prints
@@ -155,7 +163,13 @@ class Shiprocket:
                 "Content-Type": "application/json",
             }
 
-            response = requests.post(api_url, json=body, headers=headers, verify=False)
+            response = requests.post(
+                api_url,
+                json=body,
+                headers=headers,
+                verify=False,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
 
             response_data = response.json()
 
@@ -236,7 +250,13 @@ class Shiprocket:
                 "Content-Type": "application/json",
             }
 
-            response = requests.post(api_url, json=body, headers=headers, verify=False)
+            response = requests.post(
+                api_url,
+                json=body,
+                headers=headers,
+                verify=False,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
 
             if response.status_code != 200:
                 return GenericResponseModel(
@@ -840,7 +860,9 @@ class Shiprocket:
 
         try:
             # Make the POST request
-            response = requests.post(url, headers=headers, json=payload)
+            response = requests.post(
+                url, headers=headers, json=payload, timeout=COURIER_HTTP_TIMEOUT_SECONDS
+            )
             response.raise_for_status()  # Raise an HTTPError for bad responses (4xx and 5xx)
 
             print(response.json())
@@ -870,7 +892,12 @@ class Shiprocket:
                     message="Invalid AWB",
                 )
 
-            order = db.query(Order).filter(Order.awb_number == awb_number).first()
+            order = (
+                db.query(Order)
+                .options(*OrderProfile.TRACKING)
+                .filter(Order.awb_number == awb_number)
+                .first()
+            )
 
             if order is None:
                 return GenericResponseModel(
@@ -947,7 +974,7 @@ def pdf_to_base64(s3_url):
     """
     try:
         # Fetch the PDF from the URL
-        response = requests.get(s3_url)
+        response = requests.get(s3_url, timeout=COURIER_HTTP_TIMEOUT_SECONDS)
         response.raise_for_status()  # Raise an error for HTTP issues
 
         # Get the binary content of the PDF
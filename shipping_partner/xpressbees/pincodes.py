@@ -10594,3 +10594,368 @@ xb_cream_pincodes = [
     875102,
     896109,
 ]
+
+
+# pincodes Xpressbees refuses for pickup or delivery
+xb_blocked_pincodes = [
+    "713358",
+    "713321",
+    "713323",
+    "713347",
+    "713338",
+    "756122",
+    "756120",
+    "756112",
+    "202002",
+    "202122",
+    "301712",
+    "824231",
+    "824203",
+    "175010",
+    "175011",
+    "175046",
+    "201206",
+    "321210",
+    "301607",
+    "335512",
+    "335528",
+    "249306",
+    "133206",
+    "843325",
+    "843329",
+    "843334",
+    "845403",
+    "175009",
+    "171018",
+    "786158",
+    "504293",
+    "504295",
+    "505528",
+    "505473",
+    "505530",
+    "509209",
+    "603104",
+    "603102",
+    "603127",
+    "500003",
+    "600060",
+    "600001",
+    "600063",
+    "603048",
+    "600045",
+    "600047",
+    "600064",
+    "602024",
+    "509215",
+    "509203",
+    "632511",
+    "632531",
+    "632516",
+    "591304",
+    "635103",
+    "635114",
+    "635119",
+    "577526",
+    "626116",
+    "626126",
+    "626132",
+    "626133",
+    "626138",
+    "626149",
+    "626190",
+    "671312",
+    "671310",
+    "670353",
+    "670644",
+    "670646",
+    "400064",
+    "400095",
+    "400019",
+    "412201",
+    "400057",
+    "415540",
+    "431207",
+    "422210",
+    "416510",
+    "414602",
+    "400612",
+    "412202",
+    "392061",
+    "392060",
+    "388120",
+    "387310",
+    "388110",
+    "431117",
+    "431114",
+    "431007",
+    "425109",
+    "431216",
+    "423120",
+    "431200",
+    "431218",
+    "431222",
+    "431223",
+    "431224",
+    "431225",
+    "431534",
+    "443107",
+    "443108",
+    "422219",
+    "425449",
+    "422213",
+    "422212",
+    "422010",
+    "431121",
+    "413737",
+    "400012",
+    "843327",
+    "143601",
+    "144201",
+    "441701",
+    "752111",
+    "144303",
+    "144301",
+    "752107",
+    "146115",
+    "144302",
+    "752106",
+    "609807",
+    "752110",
+    "146114",
+    "609802",
+    "609810",
+    "609204",
+    "609202",
+    "609811",
+    "752116",
+    "612106",
+    "609803",
+    "441703",
+    "221406",
+    "221404",
+    "711107",
+    "711227",
+    "711204",
+    "711203",
+    "700105",
+    "711101",
+    "202150",
+    "202001",
+    "202117",
+    "202171",
+    "281005",
+    "281006",
+    "281002",
+    "281001",
+    "281004" "400004",
+    "400006",
+    "400007",
+    "400008",
+    "400010",
+    "400011",
+    "400026",
+    "400027",
+    "400033",
+    "400035",
+    "400043",
+    "400088",
+    "400071",
+    "400072",
+    "400074",
+    "400089",
+    "400094",
+    "400086",
+    "410101",
+    "400067",
+    "400066",
+    "400017",
+    "400018",
+    "400013",
+    "410221",
+    "410216",
+    "410208",
+    "400615",
+    "421102",
+    "401107",
+    "465230",
+    "465444",
+    "441902",
+    "444301",
+    "444307",
+    "441906",
+    "497235",
+    "475220",
+    "473865",
+    "455118",
+    "455116",
+    "455115",
+    "444105",
+    "495444",
+    "495445",
+    "485666",
+    "454221",
+    "465677",
+    "464114",
+    "458895",
+    "458669",
+    "458667",
+    "491340",
+    "472442",
+    "457769",
+    "493221",
+    "496445",
+    "493559",
+    "496450",
+    "458990",
+    "458558",
+    "458389",
+    "451228",
+    "451224",
+    "451221",
+    "454552",
+    "854202",
+    "854205",
+    "854203",
+    "848202",
+    "848203",
+    "848204",
+    "848201",
+    "493662",
+    "442502",
+    "443203",
+    "443308",
+    "456313",
+    "312606",
+    "454010",
+    "457772",
+    "484336",
+    "473287",
+    "484444",
+    "484771",
+    "484776",
+    "443202",
+    "453551",
+    "465441",
+    "484774",
+    "442505",
+    "484770",
+    "484334",
+    "741233",
+    "803121",
+    "803117",
+    "805107",
+    "805141",
+    "743291",
+    "759127",
+    "723213",
+    "805124",
+    "854327",
+    "805130",
+    "803116",
+    "845301",
+    "828205",
+    "193411",
+    "193404",
+    "185102",
+    "185101",
+    "182121",
+    "180004",
+    "180012",
+    "180020",
+    "185155",
+    "185151",
+    "185152",
+    "185153",
+    "185156",
+    "185234",
+    "185131",
+    "185132",
+    "190021",
+    "190009",
+    "190007",
+    "191132",
+    "190005",
+    "190008",
+    "190018",
+    "190014",
+    "192121",
+    "191102",
+    "180003",
+    "180009",
+    "181101",
+    "181102",
+    "181103",
+    "181105",
+    "181111",
+    "181113",
+    "181131",
+    "181132",
+    "181104",
+    "181112",
+    "181114",
+    "493554",
+    "493555",
+    "495695",
+    "497449",
+    "497450",
+    "494553",
+    "494556",
+    "492885",
+    "491885",
+    "491444",
+    "491881",
+    "412240",
+    "412212",
+    "412213",
+    "412238",
+    "412239",
+    "412241",
+    "412236",
+    "412211",
+    "415022",
+    "413409",
+    "413401",
+    "413022",
+    "413021",
+    "413411",
+    "431603",
+    "415302",
+    "416408",
+    "412308",
+    "412101",
+    "410506",
+    "412113",
+    "412106",
+    "412109",
+    "410507",
+    "425115",
+    "424006",
+    "423402",
+    "423104",
+    "363421",
+    "383310",
+    "383330",
+    "385535",
+    "382241",
+    "382276",
+    "363424",
+    "392230",
+    "392170",
+    "411057",
+    "441107",
+    "441109",
+    "441112",
+    "441113",
+    "441117",
+    "441403",
+    "441502",
+    "441503",
+    "441504",
+    "445210",
+    "443404",
+    "443407",
+    "444304",
+    "444704",
+    "444720",
+    "444810",
+]
@@ -11,10 +11,12 @@ from context_manager.context import context_user_data, get_db_session
 import re
 from requests.exceptions import HTTPError, ConnectionError, Timeout, RequestException
 from logger import logger
+from modules.partner_health import COURIER_HTTP_TIMEOUT_SECONDS
 
 # models
 from marketplace.easyecom.easyecom_schema import credentials
 from models import Pickup_Location, Order, Pincode_Serviceability
+from models.order_profiles import OrderProfile
 
 # schema
 from schema.base import GenericResponseModel
@@ -85,7 +87,13 @@ class Zippyy:
 
             headers = {"Content-Type": "application/json", "x-api-version": "1"}
 
-            response = requests.post(api_url, json=body, headers=headers, verify=False)
+            response = requests.post(
+                api_url,
+                json=body,
+                headers=headers,
+                verify=False,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
 
             if response.status_code != 200:
                 return GenericResponseModel(
@@ -142,7 +150,13 @@ class Zippyy:
 
             headers = {"Content-Type": "application/json", "x-api-version": "1"}
 
-            response = requests.post(api_url, json=body, headers=headers, verify=False)
+            response = requests.post(
+                api_url,
+                json=body,
+                headers=headers,
+                verify=False,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
             data = response.json()
             print(data, "||<<response>>||")
             if "message" in data:
@@ -598,7 +612,13 @@ class Zippyy:
                 "Authorization": "Token " + credentials["token"],
             }
             print("headers", headers)
-            response = requests.request("POST", api_url, headers=headers, data=body)
+            response = requests.request(
+                "POST",
+                api_url,
+                headers=headers,
+                data=body,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
             print(3)
             try:
                 response_data = response.json()
@@ -815,9 +835,7 @@ class Zippyy:
             )
 
             response = requests.request(
-                "GET",
-                api_url,
-                headers=headers,
+                "GET", api_url, headers=headers, timeout=COURIER_HTTP_TIMEOUT_SECONDS
             )
 
             try:
@@ -931,7 +949,12 @@ class Zippyy:
                     message="Invalid AWB",
                 )
 
-            order = db.query(Order).filter(Order.awb_number == awb_number).first()
+            order = (
+                db.query(Order)
+                .options(*OrderProfile.TRACKING)
+                .filter(Order.awb_number == awb_number)
+                .first()
+            )
 
             if order is None:
                 return GenericResponseModel(
@@ -1040,7 +1063,13 @@ class Zippyy:
 
             logger.info("Delhivery ndr_attempt api payload %s", body)
 
-            response = requests.request("POST", api_url, headers=headers, data=body)
+            response = requests.request(
+                "POST",
+                api_url,
+                headers=headers,
+                data=body,
+                timeout=COURIER_HTTP_TIMEOUT_SECONDS,
+            )
             print(2)
 
             print(headers)
@@ -0,0 +1,17 @@
+import os
+import sys
+
+# the app reads its database settings at import; tests never connect
+for name, value in (
+    ("db_user", "test"),
+    ("db_password", "test"),
+    ("db_host", "localhost"),
+    ("db_port", "5432"),
+    ("db_name", "test"),
+):
+    os.environ.setdefault(name, value)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# load the modules in the order the app does, some only import that way round
+import main  # noqa: E402,F401
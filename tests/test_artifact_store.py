@@ -0,0 +1,144 @@
+import asyncio
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlparse
+
+import boto3
+import pytest
+import requests
+from moto import mock_aws
+
+from modules.aws_s3 import artifact_store
+from modules.aws_s3.artifact_store import S3_PART_SIZE, ArtifactStore
+from modules.ndr.ndr_export import NdrExportJobs
+
+
+BUCKET = "artifact-store-test"
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setattr(artifact_store, "S3_BUCKET_NAME", BUCKET)
+    monkeypatch.setattr(artifact_store, "REGION_NAME", "us-east-1")
+    monkeypatch.setattr(artifact_store, "AWS_ACCESS_KEY", "testing")
+    monkeypatch.setattr(artifact_store, "AWS_SECRET_KEY", "testing")
+
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        ArtifactStore._client = None
+        yield client
+        ArtifactStore._client = None
+        ArtifactStore.shutdown()
+
+
+def chunks(size: int, chunk: int = 1024 * 1024):
+    data = bytes(range(256)) * (size // 256)
+    for start in range(0, len(data), chunk):
+        yield data[start : start + chunk]
+
+
+def parts_of(client, key: str) -> int:
+    etag = client.head_object(Bucket=BUCKET, Key=key)["ETag"]
+    # multipart ETags end in -<part count>
+    return int(etag.strip('"').split("-")[1]) if "-" in etag else 1
+
+
+def test_put_stream_uploads_big_files_in_parts(s3):
+    size = 2 * S3_PART_SIZE + 1024 * 1024
+
+    key = ArtifactStore.put_stream("exports/big.bin", chunks(size), "application/octet-stream")
+
+    assert ArtifactStore.get_bytes(key) == b"".join(chunks(size))
+    assert parts_of(s3, key) == 3
+
+
+def test_aput_stream_uploads_async_chunks_in_parts(s3):
+    size = S3_PART_SIZE + 1024 * 1024
+
+    async def produce():
+        for chunk in chunks(size):
+            yield chunk
+
+    key = asyncio.run(
+        ArtifactStore.aput_stream("exports/async.bin", produce(), "application/octet-stream")
+    )
+
+    assert ArtifactStore.get_bytes(key) == b"".join(chunks(size))
+    assert parts_of(s3, key) == 2
+
+
+def test_small_streams_are_a_single_put(s3):
+    key = ArtifactStore.put_stream("exports/small.csv", [b"a,b\n", b"1,2\n"], "text/csv")
+
+    assert ArtifactStore.get_bytes(key) == b"a,b\n1,2\n"
+    assert parts_of(s3, key) == 1
+
+
+def failing(size: int):
+    yield from chunks(size)
+    raise RuntimeError("export failed")
+
+
+def test_put_stream_aborts_the_upload_when_the_source_fails(s3):
+    with pytest.raises(RuntimeError):
+        ArtifactStore.put_stream(
+            "exports/broken.bin", failing(S3_PART_SIZE + 1), "application/octet-stream"
+        )
+
+    assert s3.list_multipart_uploads(Bucket=BUCKET).get("Uploads", []) == []
+    assert ArtifactStore.get_bytes("exports/broken.bin") is None
+
+
+def test_aput_stream_aborts_the_upload_when_the_source_fails(s3):
+    with pytest.raises(RuntimeError):
+        asyncio.run(
+            ArtifactStore.aput_stream(
+                "exports/broken.bin", failing(S3_PART_SIZE + 1), "application/octet-stream"
+            )
+        )
+
+    assert s3.list_multipart_uploads(Bucket=BUCKET).get("Uploads", []) == []
+
+
+def test_presigned_url_downloads_the_object_as_an_attachment(s3):
+    ArtifactStore.put_bytes("exports/ndr.csv", b"awb\n", "text/csv")
+
+    url = ArtifactStore.presigned_url("exports/ndr.csv", expires=60, filename="ndr.csv")
+    response = requests.get(url)
+
+    query = parse_qs(urlparse(url).query)
+    assert "X-Amz-Expires" in query or "Expires" in query
+    assert response.status_code == 200
+    assert response.content == b"awb\n"
+    assert response.headers["Content-Disposition"] == 'attachment; filename="ndr.csv"'
+
+
+def test_ndr_export_status_signs_a_new_url_on_every_read(s3, monkeypatch):
+    monkeypatch.setattr(NdrExportJobs, "_jobs", OrderedDict())
+    signed = []
+    monkeypatch.setattr(
+        ArtifactStore,
+        "presigned_url",
+        classmethod(lambda cls, key, filename=None: signed.append(key) or f"url-{len(signed)}"),
+    )
+    NdrExportJobs._remember(
+        "job-1",
+        {
+            "client_id": 7,
+            "status": "completed",
+            "url": None,
+            "error": None,
+            "key": "7/ndr_export/ndr.xlsx",
+            "filename": "ndr.xlsx",
+        },
+    )
+
+    first = NdrExportJobs.get(7, "job-1")
+    second = NdrExportJobs.get(7, "job-1")
+
+    assert (first["url"], second["url"]) == ("url-1", "url-2")
+    assert signed == ["7/ndr_export/ndr.xlsx"] * 2
+    assert "key" not in first and "client_id" not in first
+    assert NdrExportJobs.get(8, "job-1") is None
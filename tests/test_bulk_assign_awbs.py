@@ -0,0 +1,127 @@
+from types import SimpleNamespace
+
+import pytest
+
+from context_manager.context import context_user_data
+from modules.courier_adapter import CourierRegistry
+from modules.courier_adapter.courier_adapter import LegacyCourierAdapter
+from modules.shipment import shipment_service
+from modules.shipment.shipment_schema import BulkCreateShipmentModel
+from modules.shipment.shipment_service import ShipmentService
+from schema.base import GenericResponseModel
+from shipping_partner.xpressbees.xpressbees import Xpressbees
+
+
+class FakeQuery:
+    def __init__(self, result):
+        self.result = result
+
+    def filter(self, *args):
+        return self
+
+    def options(self, *args):
+        return self
+
+    def first(self):
+        return self.result
+
+
+class FakeSession:
+    def __init__(self, contract, order):
+        self.results = [contract, order]
+        self.commits = 0
+
+    def query(self, model):
+        return FakeQuery(self.results.pop(0))
+
+    def add(self, instance):
+        pass
+
+    def flush(self):
+        pass
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def client():
+    token = context_user_data.set(SimpleNamespace(client_id=1))
+    yield
+    context_user_data.reset(token)
+
+
+@pytest.fixture
+def booked(monkeypatch):
+    calls = []
+
+    def create_order(order, credentials, delivery_partner):
+        calls.append(order.order_id)
+        return GenericResponseModel(
+            status_code=200,
+            status=True,
+            data={"awb_number": "XB1", "delivery_partner": "xpressbees"},
+            message="AWB assigned successfully",
+        )
+
+    async def dev_create_order(order, credentials, delivery_partner):
+        raise AssertionError("bulk assign must not use the async booking")
+
+    monkeypatch.setattr(Xpressbees, "create_order", staticmethod(create_order))
+    monkeypatch.setattr(Xpressbees, "dev_create_order", staticmethod(dev_create_order))
+    monkeypatch.setitem(
+        CourierRegistry._adapters,
+        "xpressbees",
+        LegacyCourierAdapter("xpressbees", Xpressbees),
+    )
+    return calls
+
+
+def test_bulk_assign_books_xpressbees_through_sync_create_order(monkeypatch, client, booked):
+    contract = SimpleNamespace(
+        company_contract=SimpleNamespace(
+            shipping_partner=SimpleNamespace(slug="xpressbees"),
+            credentials={"clientName": "test"},
+        ),
+        aggregator_courier=SimpleNamespace(
+            min_chargeable_weight=0.5, additional_weight_bracket=0.5
+        ),
+    )
+    order = SimpleNamespace(order_id="ORD-1", status="new", payment_mode="prepaid")
+    db = FakeSession(contract, order)
+
+    monkeypatch.setattr(shipment_service, "get_db_session", lambda: db)
+    monkeypatch.setattr(
+        shipment_service.ServiceabilityService,
+        "calculate_freight",
+        staticmethod(
+            lambda **kwargs: {"freight": 40, "cod_charges": 0, "tax_amount": 7.2}
+        ),
+    )
+    monkeypatch.setattr(
+        shipment_service.WalletService,
+        "check_sufficient_balance",
+        staticmethod(lambda amount: SimpleNamespace(status=True)),
+    )
+    deducted = []
+    monkeypatch.setattr(
+        shipment_service.WalletService,
+        "deduct_money",
+        staticmethod(lambda amount, awb: deducted.append(awb)),
+    )
+    monkeypatch.setattr(
+        shipment_service.MarketplaceFulfillmentQueue,
+        "enqueue_order",
+        staticmethod(lambda order: None),
+    )
+
+    response = ShipmentService.bulk_assign_awbs(
+        BulkCreateShipmentModel(order_ids=["ORD-1"], courier_id=7)
+    )
+
+    assert response.status is True
+    assert response.data == {"total_shipments": 1, "posted_count": 1}
+    assert booked == ["ORD-1"]
+    assert deducted == ["XB1"]
+    assert order.forward_freight == 40
+    assert db.commits == 1
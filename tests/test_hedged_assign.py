@@ -0,0 +1,79 @@
+"""
+A hedged booking claims the order (status "booking") before it is saved;
+every way out of the booking has to leave the order in a status something
+will move it on from.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from modules.shipment.hedged_assign import Candidate, HedgedAutoAssign
+from modules.shipment.shipment_service import ShipmentService
+from schema.base import GenericResponseModel
+
+
+CANDIDATE = Candidate(rate_id=5, slug="logistify", total_freight=60.0)
+
+
+@pytest.fixture
+def claims(monkeypatch):
+    claims = {"claimed": [], "unclaimed": []}
+
+    async def claim(order_id):
+        claims["claimed"].append(order_id)
+        return True
+
+    async def unclaim(order_id):
+        claims["unclaimed"].append(order_id)
+
+    monkeypatch.setattr(HedgedAutoAssign, "_claim", staticmethod(claim))
+    monkeypatch.setattr(HedgedAutoAssign, "_unclaim", staticmethod(unclaim))
+    return claims
+
+
+def booking(monkeypatch, response):
+    async def assign_awb(params, claim=None):
+        assert await claim(SimpleNamespace(id=11))
+        return response
+
+    monkeypatch.setattr(ShipmentService, "assign_awb", staticmethod(assign_awb))
+
+
+def attempt(winner):
+    return asyncio.run(HedgedAutoAssign._attempt("ORD-1", CANDIDATE, winner))
+
+
+def test_booked_order_keeps_its_claim(monkeypatch, claims):
+    booking(monkeypatch, GenericResponseModel(status_code=200, status=True, data={}))
+    winner = []
+
+    attempt(winner)
+
+    assert claims == {"claimed": [11], "unclaimed": []}
+    assert winner == [CANDIDATE.rate_id]
+
+
+def test_processing_order_goes_back_to_new(monkeypatch, claims):
+    booking(
+        monkeypatch,
+        GenericResponseModel(status_code=200, status=True, data={"is_processing": True}),
+    )
+    winner = []
+
+    attempt(winner)
+
+    # the courier has it: the order is not booked elsewhere, but stays "new"
+    assert claims == {"claimed": [11], "unclaimed": [11]}
+    assert winner == [CANDIDATE.rate_id]
+
+
+def test_failed_save_releases_the_claim(monkeypatch, claims):
+    booking(monkeypatch, GenericResponseModel(status_code=500, status=False))
+    winner = []
+
+    attempt(winner)
+
+    assert claims == {"claimed": [11], "unclaimed": [11]}
+    assert winner == []
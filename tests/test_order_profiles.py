@@ -0,0 +1,119 @@
+"""
+Order profiles are used on async sessions, where reading a column the query
+did not load is an error (MissingGreenlet, or InvalidRequestError with
+ORDER_PROFILE_RAISELOAD=true) rather than one more SELECT. These tests pin
+the columns each profile's callers read to the columns it loads.
+"""
+
+import ast
+import inspect
+import textwrap
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from models import Order
+from models.order_profiles import OrderProfile
+from modules.orders.order_schema import Order_Model
+from modules.orders.order_service import OrderService
+
+
+def loaded(profile) -> set:
+    sql = str(select(Order).options(*profile).compile(dialect=postgresql.dialect()))
+    columns = sql.split(" FROM ")[0]
+    return {
+        column.key
+        for column in Order.__table__.columns
+        if f'"order".{column.name}' in columns
+    }
+
+
+ALL_COLUMNS = {column.key for column in Order.__table__.columns}
+
+# HedgedAutoAssign._order / candidates / _quote and the sync auto-assign
+# paths of ShipmentService
+ROUTING_READS = {
+    "id",
+    "order_id",
+    "client_id",
+    "status",
+    "awb_number",
+    "courier_partner",
+    "payment_mode",
+    "total_amount",
+    "consignee_pincode",
+    "pickup_location_code",
+    "applicable_weight",
+    "volumetric_weight",
+    "zone",
+}
+
+# shipping_partner/*/tracking_webhook, ShipmentService.post_tracking and
+# external_track_only_shipment
+TRACKING_READS = {
+    "id",
+    "order_id",
+    "client_id",
+    "status",
+    "sub_status",
+    "courier_status",
+    "awb_number",
+    "aggregator",
+    "courier_partner",
+    "payment_mode",
+    "total_amount",
+    "tracking_info",
+    "action_history",
+    "edd",
+    "booking_date",
+    "is_label_generated",
+    "cod_remittance_cycle_id",
+    "delivered_date",
+    "rto_initiated_date",
+    "rto_freight",
+    "rto_tax",
+    "forward_freight",
+    "forward_cod_charge",
+    "forward_tax",
+}
+
+
+def columns_read(function, name: str) -> set:
+    """Order columns a function reads off the variable `name`."""
+
+    tree = ast.parse(textwrap.dedent(inspect.getsource(function)))
+    return {
+        node.attr
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Attribute)
+        and isinstance(node.value, ast.Name)
+        and node.value.id == name
+    } & ALL_COLUMNS
+
+
+# the rows OrderService.export_orders builds from each fetched `order`
+LISTING_READS = columns_read(OrderService.export_orders, "order")
+
+
+def test_routing_loads_every_column_auto_assign_reads():
+    assert ROUTING_READS <= loaded(OrderProfile.ROUTING)
+
+
+def test_tracking_loads_every_column_webhooks_read():
+    assert TRACKING_READS <= loaded(OrderProfile.TRACKING)
+
+
+def test_listing_loads_every_column_the_export_reads():
+    # the export reads most of the order, a parse that found nothing is broken
+    assert len(LISTING_READS) > 40
+    assert LISTING_READS <= loaded(OrderProfile.LISTING)
+
+
+def test_booking_loads_everything_to_model_reads():
+    # assign_awb, labels, invoices and manifests all go through Order_Model
+    read = set(Order_Model.model_fields) & ALL_COLUMNS
+    assert read <= loaded(OrderProfile.BOOKING)
+
+
+def test_only_write_only_columns_are_left_out_of_booking():
+    assert ALL_COLUMNS - loaded(OrderProfile.BOOKING) == {"tracking_response", "request"}
@@ -0,0 +1,50 @@
+"""
+A half open breaker lets one probe call through; a probe that never
+finishes must not leave the partner rejected for good.
+"""
+
+import asyncio
+
+import pytest
+
+from modules.partner_health import partner_health
+from modules.partner_health.partner_health import (
+    CLOSED,
+    HALF_OPEN,
+    GuardedPartner,
+    PartnerHealth,
+)
+
+
+class SlowCourier:
+    @staticmethod
+    async def create_order(booking):
+        await asyncio.sleep(60)
+
+
+@pytest.fixture
+def half_open(monkeypatch):
+    monkeypatch.setattr(PartnerHealth, "_breakers", {})
+    monkeypatch.setattr(partner_health, "PARTNER_BREAKER_OPEN_SECONDS", 0)
+
+    breaker = PartnerHealth.breaker("slow", "create_order")
+    breaker._open(0)
+    return breaker
+
+
+def test_cancelled_probe_lets_the_next_call_probe(half_open):
+    courier = GuardedPartner("slow", SlowCourier)
+
+    async def probe_then_cancel():
+        task = asyncio.create_task(courier.create_order(None))
+        await asyncio.sleep(0)
+        assert half_open.state == HALF_OPEN
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(probe_then_cancel())
+
+    assert half_open.allow()
+    half_open.record(False, 0.1)
+    assert half_open.state == CLOSED
@@ -0,0 +1,56 @@
+"""
+An order's label and invoice go into a batch with PdfAssembler.add_all:
+when one of them is unreadable none of the order's pages may stay behind.
+"""
+
+import io
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+
+from modules.documents.pdf_assembler import PdfAssembler, spool
+
+
+def document(pages: int) -> bytes:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=288, height=432)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def assembled(output) -> PdfReader:
+    output.seek(0)
+    return PdfReader(io.BytesIO(output.read()))
+
+
+def test_failed_order_leaves_no_pages():
+    output = spool()
+    assembler = PdfAssembler(output)
+
+    assert assembler.add_all([document(1)]) == 1
+    with pytest.raises(Exception):
+        assembler.add_all([document(2), b"not a pdf"])
+    assert assembler.page_count == 1
+
+    assert assembler.add_all([document(1), document(1)]) == 2
+    assembler.close()
+
+    reader = assembled(output)
+    assert len(reader.pages) == 3
+
+
+def test_rewound_output_is_a_valid_pdf():
+    output = spool()
+    assembler = PdfAssembler(output)
+    written = assembler.position
+
+    with pytest.raises(Exception):
+        assembler.add_all([document(3), b"%PDF-1.4 truncated"])
+    assert assembler.position == written
+    assert output.tell() == written
+
+    assembler.add(document(1))
+    assembler.close()
+    assert len(assembled(output).pages) == 1
@@ -0,0 +1,61 @@
+"""
+pincode_serviceability only rules couriers out on an explicit False flag;
+a pincode without a row, or a column nothing is flagged in, is unknown and
+stays serviceable.
+"""
+
+import numpy as np
+
+from modules.serviceability.pincode_index import (
+    COVERAGE_COLUMNS,
+    ServiceabilitySnapshot,
+    _pincodes,
+)
+
+
+def row(pincode, **flags):
+    return (pincode, *(flags.get(column, False) for column in COVERAGE_COLUMNS))
+
+
+def serviceable(snapshot, courier, pickup, delivery, cod=False):
+    return bool(
+        snapshot.serviceable(
+            courier, _pincodes([pickup]), _pincodes([delivery]), np.array([cod])
+        )[0]
+    )
+
+
+def test_empty_table_restricts_nobody():
+    snapshot = ServiceabilitySnapshot.build([])
+    for courier in ("delhivery", "dtdc", "ekart", "ats", "amazon", "shadowfax"):
+        assert serviceable(snapshot, courier, "110001", "560001")
+
+
+def test_only_explicit_false_flags_rule_a_courier_out():
+    snapshot = ServiceabilitySnapshot.build(
+        [
+            row(110001, delhivery_fm=True, delhivery_lm_prepaid=True),
+            row(560001, delhivery_fm=True, delhivery_lm_cod=True),
+            row(400001),
+        ]
+    )
+
+    assert serviceable(snapshot, "delhivery", "110001", "110001")
+    # 400001 has a row, flagged False for delhivery
+    assert not serviceable(snapshot, "delhivery", "400001", "110001")
+    assert not serviceable(snapshot, "delhivery", "110001", "400001")
+    # prepaid is not flagged for 560001, cod is
+    assert not serviceable(snapshot, "delhivery", "110001", "560001")
+    assert serviceable(snapshot, "delhivery", "110001", "560001", cod=True)
+    # 700001 has no row at all
+    assert serviceable(snapshot, "delhivery", "700001", "700001")
+
+
+def test_column_without_any_true_flag_is_unknown():
+    snapshot = ServiceabilitySnapshot.build(
+        [row(110001, delhivery_fm=True), row(400001)]
+    )
+
+    # no ekart column flags anything True: nothing is known about ekart
+    assert serviceable(snapshot, "ekart", "400001", "400001")
+    assert not serviceable(snapshot, "delhivery", "400001", "110001")
@@ -0,0 +1,53 @@
+"""
+price_orders with rate tables that have no card at all: no active sell card
+for the client, or no buy rates, leaves that side unpriced instead of failing
+the run.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data.courier_buy_rates import COURIER_BUY_RATES
+from modules.courier_billing.pnl_engine import RateTable, price_orders
+
+
+def orders() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "id": [1, 2],
+            "order_id": ["A1", "A2"],
+            "client_id": [7, 7],
+            "aggregator": ["delhivery", "delhivery"],
+            "courier_partner": ["delhivery", "delhivery"],
+            "zone": ["A", "D"],
+            "applicable_weight": [0.5, 1.2],
+            "order_value": [500, 800],
+            "total_amount": [500, 800],
+            "payment_mode": ["prepaid", "cod"],
+            "status": ["delivered", "RTO"],
+            "rto_initiated_date": [None, pd.Timestamp("2026-01-05")],
+            "forward_freight": [None, None],
+            "forward_cod_charge": [None, None],
+            "forward_tax": [None, None],
+            "rto_freight": [None, None],
+            "rto_tax": [None, None],
+        }
+    )
+
+
+def test_empty_sell_table_leaves_orders_unbilled():
+    priced = price_orders(
+        orders(), RateTable.compile_buy(COURIER_BUY_RATES), RateTable.compile_sell([])
+    )
+
+    assert priced["unbilled"].all()
+    assert priced["sell_total"].isna().all()
+    assert not priced["unpriced"].any()
+    assert priced.loc[0, "buy_forward_freight"] == 23.0
+
+
+def test_empty_buy_table_leaves_orders_unpriced():
+    priced = price_orders(orders(), RateTable.compile_buy({}), RateTable.compile_sell([]))
+
+    assert priced["unpriced"].all()
+    assert np.isnan(priced["buy_total"]).all()
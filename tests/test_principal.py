@@ -0,0 +1,72 @@
+"""
+context_user_data holds the Principal cached for a token, and services log
+it with `user_data.model_dump()` as they did with UserDataModel.
+"""
+
+import asyncio
+
+import pytest
+
+from context_manager.context import context_user_data
+from modules.client.client_onboarding_service import ClientOnboardingService
+from utils.jwt_token_handler import JWTHandler, principal_cache
+
+
+USER = {
+    "id": 7,
+    "first_name": "Asha",
+    "last_name": "Rao",
+    "email": "asha@example.com",
+    "status": "active",
+    "client_id": 42,
+    "company_id": 3,
+}
+
+
+@pytest.fixture
+def principal():
+    token = JWTHandler.create_access_token(dict(USER))
+    JWTHandler.decode_access_token(token)
+    # the second decode is served from the cache
+    cached = principal_cache.get(token)
+    assert JWTHandler.decode_access_token(token) is cached
+
+    reset = context_user_data.set(cached)
+    yield cached
+    context_user_data.reset(reset)
+
+
+def test_model_dump_has_the_user_fields(principal):
+    dumped = principal.model_dump()
+    assert {key: dumped[key] for key in USER} == USER
+    assert dumped["exp"] == principal.exp
+
+
+class FakeSession:
+    def __init__(self):
+        self.added = []
+
+    def add(self, instance):
+        self.added.append(instance)
+
+    async def flush(self):
+        pass
+
+
+class FakeOnboardingDetails:
+    is_term = False
+    is_stepper = 2
+    is_otp = None
+    otp_expires_at = None
+
+
+def test_stepper_runs_with_a_cached_principal(principal):
+    details = FakeOnboardingDetails()
+    db = FakeSession()
+
+    asyncio.run(ClientOnboardingService._handle_stepper_3(details, db))
+
+    assert details.is_term is True
+    assert details.is_stepper == 3
+    assert len(details.is_otp) == 6
+    assert db.added == [details]
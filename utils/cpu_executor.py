@@ -0,0 +1,50 @@
+import os
+import asyncio
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from .environment import Environment
+
+
+# "thread" works for work that releases the GIL (bcrypt, zlib, PIL); switch to
+# "process" for pure python CPU work. Process mode needs picklable callables.
+CPU_EXECUTOR_KIND = Environment.get_string("CPU_EXECUTOR_KIND", "thread")
+CPU_EXECUTOR_WORKERS = int(
+    Environment.get_string("CPU_EXECUTOR_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+
+_executor: Executor = None
+
+
+def get_cpu_executor() -> Executor:
+    global _executor
+
+    if _executor is None:
+        if CPU_EXECUTOR_KIND == "process":
+            _executor = ProcessPoolExecutor(max_workers=CPU_EXECUTOR_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=CPU_EXECUTOR_WORKERS, thread_name_prefix="cpu"
+            )
+
+    return _executor
+
+
+async def run_cpu_bound(func, *args, **kwargs):
+    """
+    Run CPU heavy work off the event loop on the bounded CPU pool.
+    The pool size caps how many cores a burst (e.g. logins) can take, so
+    other requests keep being served while it drains.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_cpu_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+def shutdown_cpu_executor():
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
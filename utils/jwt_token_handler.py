@@ -1,5 +1,8 @@
 from datetime import timedelta, datetime
+from collections import OrderedDict
 from pydantic import BaseModel, EmailStr
+import threading
+import time
 import jwt
 import http
 from fastapi import HTTPException
@@ -19,6 +22,74 @@ class UserDataModel(BaseModel):
     id: int
 
 
+class Principal:
+    """
+    Lightweight, immutable view of the authenticated user that is stored in
+    context_user_data. Built once per token and shared by every request that
+    presents the same token.
+    """
+
+    __slots__ = (
+        "id",
+        "first_name",
+        "last_name",
+        "email",
+        "status",
+        "client_id",
+        "company_id",
+        "exp",
+    )
+
+    def __init__(self, user: UserDataModel, exp: float):
+        for field in UserDataModel.model_fields:
+            object.__setattr__(self, field, getattr(user, field))
+        object.__setattr__(self, "exp", exp)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Principal is immutable")
+
+    def model_dump(self) -> dict:
+        """The fields as a dict, like UserDataModel.model_dump(), for log records."""
+
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self):
+        return "Principal(id=%s, client_id=%s, company_id=%s)" % (
+            self.id,
+            self.client_id,
+            self.company_id,
+        )
+
+
+class PrincipalCache:
+    """Bounded LRU of verified tokens -> Principal, honouring token expiry."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str):
+        with self._lock:
+            principal = self._entries.get(token)
+            if principal is None:
+                return None
+
+            if principal.exp <= time.time():
+                del self._entries[token]
+                return None
+
+            self._entries.move_to_end(token)
+            return principal
+
+    def put(self, token: str, principal: Principal):
+        with self._lock:
+            self._entries[token] = principal
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
 # utils
 from .environment import Environment
 
@@ -30,6 +101,12 @@ class JWTToken:
     access_token_expire_minutes = Environment.get_string(
         "JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "300"
     )
+    principal_cache_size = int(
+        Environment.get_string("JWT_PRINCIPAL_CACHE_SIZE", "10000")
+    )
+
+
+principal_cache = PrincipalCache(JWTToken.principal_cache_size)
 
 
 class JWTHandler:
@@ -48,12 +125,22 @@ class JWTHandler:
 
     @staticmethod
     def decode_access_token(token: str):
+        # fast path: token already verified and not yet expired
+        principal = principal_cache.get(token)
+        if principal is not None:
+            context_user_data.set(principal)
+            return principal
+
         try:
             payload = jwt.decode(
                 token, JWTToken.secret, algorithms=[JWTToken.algorithm]
             )
 
-            context_user_data.set(UserDataModel(**payload))
+            principal = Principal(UserDataModel(**payload), exp=payload["exp"])
+            principal_cache.put(token, principal)
+
+            context_user_data.set(principal)
+            return principal
 
         except jwt.ExpiredSignatureError:
             raise HTTPException(
@@ -1,6 +1,8 @@
 from passlib.context import CryptContext
 from passlib.exc import UnknownHashError
 
+from .cpu_executor import run_cpu_bound
+
 
 class PasswordHasher:
     pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -28,3 +30,15 @@ class PasswordHasher:
             # Handle other unexpected exceptions
             print("Unexpected error occurred during password verification:", e)
             return False
+
+    # async variants for request handlers: bcrypt takes ~250ms per call and
+    # must not run on the event loop
+    @staticmethod
+    async def aget_password_hash(password: str) -> str:
+        return await run_cpu_bound(PasswordHasher.get_password_hash, password)
+
+    @staticmethod
+    async def averify_password(plain_password: str, hashed_password: str) -> bool:
+        return await run_cpu_bound(
+            PasswordHasher.verify_password, plain_password, hashed_password
+        )
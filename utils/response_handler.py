@@ -1,7 +1,15 @@
+from decimal import Decimal
+
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel
 from schema.base import GenericResponseModel
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
 from context_manager.context import context_user_data
 
 from logger import logger
@@ -33,3 +41,51 @@ def build_api_response(generic_response: GenericResponseModel) -> JSONResponse:
         )
 
         return JSONResponse(status_code=generic_response.status_code, content=str(e))
+
+
+def _orjson_default(value):
+    # orjson handles dict/list/str/datetime/UUID natively, the rest lands here
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+
+class FastJSONResponse(ORJSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS
+        )
+
+
+# same payload as build_api_response, serialized by orjson without the
+# jsonable_encoder walk; meant for large list pages
+def build_fast_api_response(generic_response: GenericResponseModel) -> JSONResponse:
+    if orjson is None:
+        return build_api_response(generic_response)
+
+    try:
+        res = FastJSONResponse(
+            status_code=generic_response.status_code,
+            content={
+                "message": generic_response.message,
+                "status": generic_response.status,
+                "data": generic_response.data,
+            },
+        )
+
+        logger.info(
+            extra=context_user_data.get(),
+            msg="build_fast_api_response: Generated Response with status_code:"
+            + f"{generic_response.status_code}",
+        )
+        return res
+
+    except Exception as e:
+        logger.error(
+            extra=context_user_data.get(),
+            msg=f"Exception in build_fast_api_response error : {e}",
+        )
+
+        return build_api_response(generic_response)